@@ -7,6 +7,7 @@ import validation_database.model as validation_models
 import config_database.model as config_models
 import hippo_rag_database.model as hippo_rag_models
 import fact_store_database.model as fact_models
+import llm_cache_database.model as llm_cache_models
 
 from core.config_loader import ConfigLoaderImplementation
 from database.session import DatabaseConfig, PostgresSession
@@ -48,6 +49,7 @@ async def main():
             hippo_rag_models,
             hippo_rag_models,
             fact_models,
+            llm_cache_models,
         ],
     )
     await PostgresSession.Instance().start()
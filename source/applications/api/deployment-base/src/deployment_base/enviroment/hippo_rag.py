@@ -13,6 +13,8 @@ EMBEDDING_SIZE = "EMBEDDING_SIZE"
 
 SYNONYME_EDEGE_TOP_N = "SYNONYME_EDEGE_TOP_N"
 SYNONYMY_EDGE_SIM_THRESHOLD = "SYNONYMY_EDGE_SIM_THRESHOLD"
+# writes the metadata payload onto collections created without it, once on startup
+MIGRATE_PAYLOAD_FILTERS = "MIGRATE_PAYLOAD_FILTERS"
 
 SETTINGS: list[ConfigAttribute[Any]] = [
     EnvConfigAttribute(
@@ -55,4 +57,10 @@ SETTINGS: list[ConfigAttribute[Any]] = [
         value_type=float,
         is_secret=False,
     ),
+    EnvConfigAttribute(
+        name=MIGRATE_PAYLOAD_FILTERS,
+        default_value=True,
+        value_type=bool,
+        is_secret=False,
+    ),
 ]
@@ -0,0 +1,79 @@
+from typing import Any
+from core.config_loader import ConfigAttribute, EnvConfigAttribute
+
+# "" disables the cache, otherwise "memory", "sqlite" or "postgres"
+LLM_CACHE_BACKEND = "LLM_CACHE_BACKEND"
+LLM_CACHE_SQLITE_PATH = "LLM_CACHE_SQLITE_PATH"
+LLM_CACHE_MAX_ENTRIES = "LLM_CACHE_MAX_ENTRIES"
+# 0 keeps the responses until the cache is cleared
+LLM_CACHE_TTL_SECONDS = "LLM_CACHE_TTL_SECONDS"
+LLM_CACHE_ONLY_DETERMINISTIC = "LLM_CACHE_ONLY_DETERMINISTIC"
+# ttl per llm caller, -1 uses LLM_CACHE_TTL_SECONDS and 0 keeps the responses until the cache is cleared
+LLM_CACHE_TTL_OPENIE_SECONDS = "LLM_CACHE_TTL_OPENIE_SECONDS"
+LLM_CACHE_TTL_GRADING_SECONDS = "LLM_CACHE_TTL_GRADING_SECONDS"
+LLM_CACHE_TTL_QA_SECONDS = "LLM_CACHE_TTL_QA_SECONDS"
+LLM_CACHE_TTL_DSPY_FILTER_SECONDS = "LLM_CACHE_TTL_DSPY_FILTER_SECONDS"
+
+NAMESPACE_TTL_SETTINGS: dict[str, str] = {
+    "openie": LLM_CACHE_TTL_OPENIE_SECONDS,
+    "grading": LLM_CACHE_TTL_GRADING_SECONDS,
+    "qa": LLM_CACHE_TTL_QA_SECONDS,
+    "dspy_filter": LLM_CACHE_TTL_DSPY_FILTER_SECONDS,
+}
+
+SETTINGS: list[ConfigAttribute[Any]] = [
+    EnvConfigAttribute(
+        name=LLM_CACHE_BACKEND,
+        default_value="",
+        value_type=str,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_CACHE_SQLITE_PATH,
+        default_value="./cache/llm_responses.sqlite",
+        value_type=str,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_CACHE_MAX_ENTRIES,
+        default_value=10_000,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_CACHE_TTL_SECONDS,
+        default_value=7 * 24 * 3600,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_CACHE_ONLY_DETERMINISTIC,
+        default_value=True,
+        value_type=bool,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_CACHE_TTL_OPENIE_SECONDS,
+        default_value=-1,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_CACHE_TTL_GRADING_SECONDS,
+        default_value=-1,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_CACHE_TTL_QA_SECONDS,
+        default_value=-1,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_CACHE_TTL_DSPY_FILTER_SECONDS,
+        default_value=-1,
+        value_type=int,
+        is_secret=False,
+    ),
+]
@@ -0,0 +1,30 @@
+from typing import Any
+from core.config_loader import ConfigAttribute, EnvConfigAttribute
+
+# requests in flight per llm client, batch_chat and the openie extraction wait for a free slot
+LLM_MAX_CONCURRENCY = "LLM_MAX_CONCURRENCY"
+# 0 disables the budget
+LLM_REQUESTS_PER_MINUTE = "LLM_REQUESTS_PER_MINUTE"
+# 0 disables the budget
+LLM_TOKENS_PER_MINUTE = "LLM_TOKENS_PER_MINUTE"
+
+SETTINGS: list[ConfigAttribute[Any]] = [
+    EnvConfigAttribute(
+        name=LLM_MAX_CONCURRENCY,
+        default_value=16,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_REQUESTS_PER_MINUTE,
+        default_value=0,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=LLM_TOKENS_PER_MINUTE,
+        default_value=0,
+        value_type=int,
+        is_secret=False,
+    ),
+]
@@ -11,6 +11,9 @@ QDRANT_PREFER_GRPC = "QDRANT_PREFER_GRPC"
 VECTOR_COLLECTION = "VECTOR_COLLECTION"
 SPARSE_MODEL = "SPARSE_MODEL"
 VECTOR_BATCH_SIZE = "VECTOR_BATCH_SIZE"
+# nodes embedded and added per request while indexing, and requests in flight
+VECTOR_INGEST_BATCH_SIZE = "VECTOR_INGEST_BATCH_SIZE"
+VECTOR_INGEST_CONCURRENCY = "VECTOR_INGEST_CONCURRENCY"
 
 
 SETTINGS: list[ConfigAttribute[Any]] = [
@@ -43,3 +46,18 @@ SETTINGS: list[ConfigAttribute[Any]] = [
         is_secret=False,
     ),
 ]
+
+SETTINGS_INGEST: list[ConfigAttribute[Any]] = [
+    EnvConfigAttribute(
+        name=VECTOR_INGEST_BATCH_SIZE,
+        default_value=256,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=VECTOR_INGEST_CONCURRENCY,
+        default_value=4,
+        value_type=int,
+        is_secret=False,
+    ),
+]
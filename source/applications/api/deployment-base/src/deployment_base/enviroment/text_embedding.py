@@ -12,6 +12,10 @@ EMEDDING_NORMALIZE = "EMEDDING_NORMALIZE"
 TRUNCATE = "TRUNCATE"
 TRUNCATE_DIRECTION = "TRUNCATE_DIRECTION"
 
+QUERY_CACHE_MAX_ENTRIES = "QUERY_CACHE_MAX_ENTRIES"
+QUERY_CACHE_MAX_BYTES = "QUERY_CACHE_MAX_BYTES"
+QUERY_CACHE_PATH = "QUERY_CACHE_PATH"
+
 SETTINGS_HOST: list[ConfigAttribute[Any]] = [
     EnvConfigAttribute(
         name=EMBEDDING_HOST,
@@ -73,4 +77,25 @@ SETTINGS_MODEL: list[ConfigAttribute[Any]] = [
     ),
 ]
 
+SETTINGS_QUERY_CACHE: list[ConfigAttribute[Any]] = [
+    EnvConfigAttribute(
+        name=QUERY_CACHE_MAX_ENTRIES,
+        default_value=10_000,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=QUERY_CACHE_MAX_BYTES,
+        default_value=256 * 1024 * 1024,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=QUERY_CACHE_PATH,
+        default_value="",
+        value_type=str,
+        is_secret=False,
+    ),
+]
+
 SETTINGS_ALL: list[ConfigAttribute[Any]] = [*SETTINGS_MODEL, *SETTINGS_HOST]
@@ -0,0 +1,90 @@
+from types import ModuleType
+from core.config_loader import ConfigLoader
+from core.singelton import BaseSingleton
+from deployment_base.enviroment import llm_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai_client.response_cache import LLMResponseCache
+
+
+def _backend(config_loader: ConfigLoader) -> str:
+    result = config_loader.load_values(llm_cache.SETTINGS)
+    if result.is_error():
+        raise result.get_error()
+    return config_loader.get_str(llm_cache.LLM_CACHE_BACKEND).strip().lower()
+
+
+def _ttl(seconds: int) -> float | None:
+    return seconds if seconds > 0 else None
+
+
+class LLMResponseCacheHolder(BaseSingleton):
+    """One cache per process, all llm clients share its entries and metrics."""
+
+    response_cache: "LLMResponseCache"
+
+    def _init_once(self, config_loader: ConfigLoader):
+        from domain.llm.interface import LLMResponseCacheStore
+        from openai_client.response_cache import (
+            InMemoryLLMResponseCache,
+            LLMResponseCache,
+            LLMResponseCacheConfig,
+            SqliteLLMResponseCache,
+        )
+
+        backend = _backend(config_loader)
+        store: LLMResponseCacheStore
+        if backend == "memory":
+            store = InMemoryLLMResponseCache(
+                max_entries=config_loader.get_int(llm_cache.LLM_CACHE_MAX_ENTRIES)
+            )
+        elif backend == "sqlite":
+            store = SqliteLLMResponseCache(
+                config_loader.get_str(llm_cache.LLM_CACHE_SQLITE_PATH)
+            )
+        elif backend == "postgres":
+            from llm_cache_database.db_implementation import PostgresLLMResponseCache
+
+            store = PostgresLLMResponseCache()
+        else:
+            raise ValueError(f"invalid {llm_cache.LLM_CACHE_BACKEND} {backend}")
+
+        # a negative namespace ttl falls back to LLM_CACHE_TTL_SECONDS
+        namespace_ttl_seconds: dict[str, float | None] = {}
+        for namespace, setting in llm_cache.NAMESPACE_TTL_SETTINGS.items():
+            seconds = config_loader.get_int(setting)
+            if seconds >= 0:
+                namespace_ttl_seconds[namespace] = _ttl(seconds)
+
+        self.response_cache = LLMResponseCache(
+            store,
+            LLMResponseCacheConfig(
+                default_ttl_seconds=_ttl(
+                    config_loader.get_int(llm_cache.LLM_CACHE_TTL_SECONDS)
+                ),
+                namespace_ttl_seconds=namespace_ttl_seconds,
+                only_deterministic=config_loader.get_bool(
+                    llm_cache.LLM_CACHE_ONLY_DETERMINISTIC
+                ),
+            ),
+        )
+
+
+def llm_cache_models(config_loader: ConfigLoader) -> list[ModuleType | str]:
+    """Models to register with PostgresStartupSequence, the postgres backend needs its table."""
+    if _backend(config_loader) != "postgres":
+        return []
+    import llm_cache_database.model as llm_cache_models
+
+    return [llm_cache_models]
+
+
+def llm_response_cache(config_loader: ConfigLoader) -> "LLMResponseCache | None":
+    """
+    The response cache for OpenAIAsyncLLM selected by LLM_CACHE_BACKEND, None when it is disabled.
+    The postgres backend needs llm_cache_models in the PostgresStartupSequence.
+    """
+    if _backend(config_loader) == "":
+        return None
+    return LLMResponseCacheHolder(config_loader).response_cache
@@ -0,0 +1,23 @@
+from core.config_loader import ConfigLoader
+from deployment_base.enviroment import llm_governor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai_client.governor import LLMGovernorConfig
+
+
+def llm_governor_config(config_loader: ConfigLoader) -> "LLMGovernorConfig":
+    """The governor limits for OpenAIAsyncLLM, taken from LLM_MAX_CONCURRENCY and the per minute budgets."""
+    result = config_loader.load_values(llm_governor.SETTINGS)
+    if result.is_error():
+        raise result.get_error()
+
+    from openai_client.governor import LLMGovernorConfig
+
+    requests_per_minute = config_loader.get_int(llm_governor.LLM_REQUESTS_PER_MINUTE)
+    tokens_per_minute = config_loader.get_int(llm_governor.LLM_TOKENS_PER_MINUTE)
+    return LLMGovernorConfig(
+        max_concurrency=max(config_loader.get_int(llm_governor.LLM_MAX_CONCURRENCY), 1),
+        requests_per_minute=requests_per_minute if requests_per_minute > 0 else None,
+        tokens_per_minute=tokens_per_minute if tokens_per_minute > 0 else None,
+    )
@@ -0,0 +1,54 @@
+from core.config_loader import ConfigLoader
+from deployment_base.enviroment import text_embedding
+from domain.database.config.model import RagEmbeddingConfig
+from domain.text_embedding.interface import AsyncEmbeddClient, EmbeddClient
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from text_embedding.query_cache import QueryEmbeddingCache
+
+
+def _query_cache(config_loader: ConfigLoader) -> "QueryEmbeddingCache":
+    from text_embedding.query_cache import (
+        QueryEmbeddingCache,
+        QueryEmbeddingCacheConfig,
+    )
+
+    result = config_loader.load_values(text_embedding.SETTINGS_QUERY_CACHE)
+    if result.is_error():
+        raise result.get_error()
+
+    return QueryEmbeddingCache(
+        QueryEmbeddingCacheConfig(
+            max_entries=config_loader.get_int(text_embedding.QUERY_CACHE_MAX_ENTRIES),
+            max_bytes=config_loader.get_int(text_embedding.QUERY_CACHE_MAX_BYTES),
+            persist_path=config_loader.get_str(text_embedding.QUERY_CACHE_PATH) or None,
+        )
+    )
+
+
+def with_query_cache(
+    embedder: EmbeddClient,
+    embedding_config: RagEmbeddingConfig,
+    config_loader: ConfigLoader,
+) -> EmbeddClient:
+    """
+    Wraps the embedder with the process wide query embedding cache.
+    The embedding config id is used as model id, it pins model, query prompt and normalization.
+    """
+    from text_embedding.query_cache import CachedEmbeddClient
+
+    cache = _query_cache(config_loader)
+    return CachedEmbeddClient(embedder, model_id=embedding_config.id, cache=cache)
+
+
+def with_async_query_cache(
+    embedder: AsyncEmbeddClient,
+    embedding_config: RagEmbeddingConfig,
+    config_loader: ConfigLoader,
+) -> AsyncEmbeddClient:
+    """Async counterpart of with_query_cache, both share the same cache."""
+    from text_embedding.query_cache import CachedAsyncEmbeddClient
+
+    cache = _query_cache(config_loader)
+    return CachedAsyncEmbeddClient(embedder, model_id=embedding_config.id, cache=cache)
@@ -18,6 +18,12 @@ from deployment_base.enviroment.openai_env import (
 )
 from domain.database.config.model import RAGConfig
 from domain.rag.interface import RAGLLM
+from deployment_base.startup_sequence.llm_cache import llm_response_cache
+from deployment_base.startup_sequence.llm_governor import llm_governor_config
+from deployment_base.startup_sequence.query_cache import (
+    with_async_query_cache,
+    with_query_cache,
+)
 
 
 def init_hipp_rag(config_loader: ConfigLoader, rag_config: RAGConfig) -> RAGLLM:
@@ -36,30 +42,40 @@ def init_hipp_rag(config_loader: ConfigLoader, rag_config: RAGConfig) -> RAGLLM:
     from qdrant_client.models import Distance
     from text_embedding.proto import (
         EmbeddingClientConfig,
+        GrpcAsyncEmbeddClient,
         GrpcEmbeddClient,
     )
 
     result = config_loader.load_values([*openai_env.SETTINGS])
     if result.is_error():
         raise result.get_error()
+    embedding_config = EmbeddingClientConfig(
+        normalize=rag_config.embedding.addition_information[
+            text_embedding.EMEDDING_NORMALIZE
+        ],
+        truncate=rag_config.embedding.addition_information[text_embedding.TRUNCATE],
+        truncate_direction=rag_config.embedding.addition_information[
+            text_embedding.TRUNCATE_DIRECTION
+        ],
+        prompt_name_doc=rag_config.embedding.addition_information[
+            text_embedding.EMBEDDING_DOC_PROMPT_NAME
+        ],
+        prompt_name_query=rag_config.embedding.addition_information[
+            text_embedding.EMBEDDING_QUERY_PROMPT_NAME
+        ],
+    )
+    address = config_loader.get_str(text_embedding.EMBEDDING_HOST)
+    is_secure = config_loader.get_bool(text_embedding.IS_EMBEDDING_HOST_SECURE)
     embedder = GrpcEmbeddClient(
-        address=config_loader.get_str(text_embedding.EMBEDDING_HOST),
-        is_secure=config_loader.get_bool(text_embedding.IS_EMBEDDING_HOST_SECURE),
-        config=EmbeddingClientConfig(
-            normalize=rag_config.embedding.addition_information[
-                text_embedding.EMEDDING_NORMALIZE
-            ],
-            truncate=rag_config.embedding.addition_information[text_embedding.TRUNCATE],
-            truncate_direction=rag_config.embedding.addition_information[
-                text_embedding.TRUNCATE_DIRECTION
-            ],
-            prompt_name_doc=rag_config.embedding.addition_information[
-                text_embedding.EMBEDDING_DOC_PROMPT_NAME
-            ],
-            prompt_name_query=rag_config.embedding.addition_information[
-                text_embedding.EMBEDDING_QUERY_PROMPT_NAME
-            ],
+        address=address, is_secure=is_secure, config=embedding_config
+    )
+    embedder = with_query_cache(embedder, rag_config.embedding, config_loader)
+    async_embedder = with_async_query_cache(
+        GrpcAsyncEmbeddClient(
+            address=address, is_secure=is_secure, config=embedding_config
         ),
+        rag_config.embedding,
+        config_loader,
     )
     cfg_ent = QdrantEmbeddingStoreConfig(
         collection=rag_config.embedding.id,
@@ -96,12 +112,23 @@ def init_hipp_rag(config_loader: ConfigLoader, rag_config: RAGConfig) -> RAGLLM:
             temperature=rag_config.retrieval_config.temp,
             context_cutoff=int(128_000 * 0.90),
             base_url=config_loader.get_str(OPENAI_HOST),
-        )
+            does_support_structured_output=config_loader.get_bool(
+                openai_env.DOES_SUPPORT_STRUCTURED_OUTPUT
+            ),
+            governor=llm_governor_config(config_loader),
+        ),
+        response_cache=llm_response_cache(config_loader),
     )
     return HippoRAG(
-        vector_store_entity=QdrantEmbeddingStore(cfg_ent, embedder=embedder),
-        vector_store_fact=QdrantEmbeddingStore(cfg_link, embedder=embedder),
-        vector_store_chunk=QdrantEmbeddingStore(cfg_chunk, embedder=embedder),
+        vector_store_entity=QdrantEmbeddingStore(
+            cfg_ent, embedder=embedder, async_embedder=async_embedder
+        ),
+        vector_store_fact=QdrantEmbeddingStore(
+            cfg_link, embedder=embedder, async_embedder=async_embedder
+        ),
+        vector_store_chunk=QdrantEmbeddingStore(
+            cfg_chunk, embedder=embedder, async_embedder=async_embedder
+        ),
         llm=client,
         config=HippoRAGConfig(
             retrieval_top_k=int(
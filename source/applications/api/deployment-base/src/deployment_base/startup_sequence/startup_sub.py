@@ -19,6 +19,10 @@ from domain.database.config.model import (
     RAGConfig,
 )
 from domain.rag.interface import RAGLLM
+from deployment_base.startup_sequence.query_cache import (
+    with_async_query_cache,
+    with_query_cache,
+)
 
 
 def init_sub(rag_config: RAGConfig, config_loader: ConfigLoader) -> RAGLLM:
@@ -32,31 +36,44 @@ def init_sub(rag_config: RAGConfig, config_loader: ConfigLoader) -> RAGLLM:
         CohereHttpRerankerClient,
         CohereRerankerConfig,
     )
-    from text_embedding.proto import EmbeddingClientConfig, GrpcEmbeddClient
+    from text_embedding.proto import (
+        EmbeddingClientConfig,
+        GrpcAsyncEmbeddClient,
+        GrpcEmbeddClient,
+    )
 
     result = config_loader.load_values(
         [*openai_env.SETTINGS, *text_embedding.SETTINGS_HOST, *vllm_reranker.SETTINGS]
     )
     if result.is_error():
         raise result.get_error()
+    embedding_config = EmbeddingClientConfig(
+        normalize=rag_config.embedding.addition_information[
+            text_embedding.EMEDDING_NORMALIZE
+        ],
+        truncate=rag_config.embedding.addition_information[text_embedding.TRUNCATE],
+        truncate_direction=rag_config.embedding.addition_information[
+            text_embedding.TRUNCATE_DIRECTION
+        ],
+        prompt_name_doc=rag_config.embedding.addition_information[
+            text_embedding.EMBEDDING_DOC_PROMPT_NAME
+        ],
+        prompt_name_query=rag_config.embedding.addition_information[
+            text_embedding.EMBEDDING_QUERY_PROMPT_NAME
+        ],
+    )
+    address = config_loader.get_str(text_embedding.EMBEDDING_HOST)
+    is_secure = config_loader.get_bool(text_embedding.IS_EMBEDDING_HOST_SECURE)
     embedder = GrpcEmbeddClient(
-        address=config_loader.get_str(text_embedding.EMBEDDING_HOST),
-        is_secure=config_loader.get_bool(text_embedding.IS_EMBEDDING_HOST_SECURE),
-        config=EmbeddingClientConfig(
-            normalize=rag_config.embedding.addition_information[
-                text_embedding.EMEDDING_NORMALIZE
-            ],
-            truncate=rag_config.embedding.addition_information[text_embedding.TRUNCATE],
-            truncate_direction=rag_config.embedding.addition_information[
-                text_embedding.TRUNCATE_DIRECTION
-            ],
-            prompt_name_doc=rag_config.embedding.addition_information[
-                text_embedding.EMBEDDING_DOC_PROMPT_NAME
-            ],
-            prompt_name_query=rag_config.embedding.addition_information[
-                text_embedding.EMBEDDING_QUERY_PROMPT_NAME
-            ],
+        address=address, is_secure=is_secure, config=embedding_config
+    )
+    embedder = with_query_cache(embedder, rag_config.embedding, config_loader)
+    async_embedder = with_async_query_cache(
+        GrpcAsyncEmbeddClient(
+            address=address, is_secure=is_secure, config=embedding_config
         ),
+        rag_config.embedding,
+        config_loader,
     )
     reranker = CohereHttpRerankerClient(
         base_url=config_loader.get_str(vllm_reranker.RERANK_HOST),
@@ -89,6 +106,7 @@ def init_sub(rag_config: RAGConfig, config_loader: ConfigLoader) -> RAGLLM:
         temperatur=rag_config.retrieval_config.temp,
         context_window=128000,
         embedding=embedder,
+        async_embedding=async_embedder,
         reranker=reranker,
     )
 
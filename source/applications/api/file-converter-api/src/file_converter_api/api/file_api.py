@@ -1,9 +1,13 @@
 import logging
+from core.model import NotFoundException
+from fastapi import HTTPException, Query
 from fastapi_core.base_api import BaseAPI, Lifespan
-from file_converter_service.usecase.convert_file import (
-    ConvertFileToMarkdown,
-    UploadedFiles,
+from file_converter_service.usecase.conversion_jobs import (
+    ConversionJob,
+    ConversionJobs,
+    TooManyJobsException,
 )
+from file_converter_service.usecase.convert_file import UploadedFiles
 from pydantic import BaseModel
 
 
@@ -18,6 +22,16 @@ convert pdf and wordfiles to markdown
 fetches file from s3 and stores it in a selected bucket
 """
 
+submit_summary = """
+submits a conversion job and returns it without waiting for the conversion
+a file that is already being converted returns the running job
+"""
+
+job_summary = """
+returns the state of a conversion job, the pages once it is done
+with wait the request is held until the job finished or wait seconds passed
+"""
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,11 +48,38 @@ class FileConverterApi(BaseAPI):
         async def convert_files(request: Request) -> UploadedFiles:
             # span verarbeitung
             logger.info(request)
-            result = ConvertFileToMarkdown.Instance().convert_file(
+            result = await ConversionJobs.Instance().convert(
                 filename=request.filename,
                 source_bucket=request.source_bucket,
                 destination_bucket=request.destination_bucket,
             )
             if result.is_error():
-                raise result.get_error()
+                _raise_job_error(result.get_error())
             return result.get_ok()
+
+        @self.app.post("/jobs", summary=submit_summary, status_code=202)
+        async def submit_job(request: Request) -> ConversionJob:
+            logger.info(request)
+            result = ConversionJobs.Instance().submit(
+                filename=request.filename,
+                source_bucket=request.source_bucket,
+                destination_bucket=request.destination_bucket,
+            )
+            if result.is_error():
+                _raise_job_error(result.get_error())
+            return result.get_ok()
+
+        @self.app.get("/jobs/{job_id}", summary=job_summary)
+        async def get_job(
+            job_id: str, wait: float = Query(default=0, ge=0, le=60)
+        ) -> ConversionJob:
+            job = await ConversionJobs.Instance().wait(job_id, timeout=wait)
+            if job is None:
+                raise NotFoundException(f"conversion job {job_id} not found")
+            return job
+
+
+def _raise_job_error(error: Exception):
+    if isinstance(error, TooManyJobsException):
+        raise HTTPException(status_code=429, detail=str(error))
+    raise error
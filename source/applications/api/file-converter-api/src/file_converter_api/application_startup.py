@@ -10,18 +10,37 @@ from deployment_base.startup_sequence.s3 import MinioStartupSequence
 
 from pdf_converter.marker import MarkerPDFConverter, MarkerPDFConverterConfig
 from word_converter import OfficeToPDFConverter
+from word_converter.office_pool import (
+    OfficeConversionPool,
+    OfficeConversionPoolConfig,
+)
 from pdf_converter.html_converter import SimpleHTMLConverter
 from pdf_converter.txt_converter import SimpleTXTConverter
 
-from word_converter.excel_converter import ExcelToMarkdownConverter
+from word_converter.excel_converter import (
+    ExcelToMarkdownConverter,
+    ExcelToMarkdownConverterConfig,
+)
 
 from file_converter_api.settings import (
     API_NAME,
     API_VERSION,
+    CONVERSION_MAX_JOBS,
+    CONVERSION_RESULT_TTL,
+    CONVERSION_WORKERS,
     DEVICE,
+    EXCEL_ROWS_PER_PAGE,
+    EXCEL_STREAMING_THRESHOLD_MB,
+    OFFICE_JOB_TIMEOUT,
+    OFFICE_PYTHON,
+    OFFICE_WORKERS,
     SETTINGS,
 )
 from file_converter_service.usecase.convert_file import ConvertFileToMarkdown
+from file_converter_service.usecase.conversion_jobs import (
+    ConversionJobs,
+    ConversionJobsConfig,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,13 +71,31 @@ class FileConverterAPIApplication(Application):
         )
 
         html_converter = SimpleHTMLConverter()
-        word_converter = OfficeToPDFConverter(pdf_converter=pdf_convert)
-        exel_converter = ExcelToMarkdownConverter()
+        word_converter = OfficeToPDFConverter(
+            pdf_converter=pdf_convert,
+            pool=OfficeConversionPool(
+                OfficeConversionPoolConfig(
+                    workers=self._config_loader.get_int(OFFICE_WORKERS),
+                    job_timeout=self._config_loader.get_float(OFFICE_JOB_TIMEOUT),
+                    python_executable=self._config_loader.get_str(OFFICE_PYTHON),
+                )
+            ),
+        )
+        exel_converter = ExcelToMarkdownConverter(
+            ExcelToMarkdownConverterConfig(
+                streaming_threshold_bytes=self._config_loader.get_int(
+                    EXCEL_STREAMING_THRESHOLD_MB
+                )
+                * 1024
+                * 1024,
+                rows_per_page=self._config_loader.get_int(EXCEL_ROWS_PER_PAGE),
+            )
+        )
         txt_converter = SimpleTXTConverter()
 
         connection = MinioConnection.get_instance(self._config_loader.get_str(S3_HOST))
 
-        ConvertFileToMarkdown.create(
+        converter = ConvertFileToMarkdown.create(
             file_storage=MinioFileStorage(minio=connection),
             file_converter=[
                 pdf_convert,
@@ -68,3 +105,13 @@ class FileConverterAPIApplication(Application):
                 txt_converter,
             ],
         )
+        ConversionJobs.create(
+            converter=converter,
+            config=ConversionJobsConfig(
+                workers=self._config_loader.get_int(CONVERSION_WORKERS),
+                max_unfinished_jobs=self._config_loader.get_int(CONVERSION_MAX_JOBS),
+                result_ttl_seconds=self._config_loader.get_float(
+                    CONVERSION_RESULT_TTL
+                ),
+            ),
+        )
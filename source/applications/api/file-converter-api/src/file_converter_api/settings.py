@@ -2,6 +2,14 @@ from core.config_loader import ConfigAttribute, EnvConfigAttribute
 from typing import Any
 
 DEVICE = "DEVICE"
+OFFICE_WORKERS = "OFFICE_WORKERS"
+OFFICE_JOB_TIMEOUT = "OFFICE_JOB_TIMEOUT"
+OFFICE_PYTHON = "OFFICE_PYTHON"
+EXCEL_STREAMING_THRESHOLD_MB = "EXCEL_STREAMING_THRESHOLD_MB"
+EXCEL_ROWS_PER_PAGE = "EXCEL_ROWS_PER_PAGE"
+CONVERSION_WORKERS = "CONVERSION_WORKERS"
+CONVERSION_MAX_JOBS = "CONVERSION_MAX_JOBS"
+CONVERSION_RESULT_TTL = "CONVERSION_RESULT_TTL"
 
 API_VERSION = "0.2.0"
 API_NAME = "file-converter-api"
@@ -10,4 +18,38 @@ SETTINGS: list[ConfigAttribute[Any]] = [
     EnvConfigAttribute(
         name=DEVICE, default_value="cpu", value_type=str, is_secret=False
     ),
+    EnvConfigAttribute(
+        name=OFFICE_WORKERS, default_value=2, value_type=int, is_secret=False
+    ),
+    EnvConfigAttribute(
+        name=OFFICE_JOB_TIMEOUT, default_value=300.0, value_type=float, is_secret=False
+    ),
+    # interpreter with the python3-uno bindings installed by dependencies.sh
+    EnvConfigAttribute(
+        name=OFFICE_PYTHON,
+        default_value="/usr/bin/python3",
+        value_type=str,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=EXCEL_STREAMING_THRESHOLD_MB,
+        default_value=10,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=EXCEL_ROWS_PER_PAGE, default_value=1000, value_type=int, is_secret=False
+    ),
+    EnvConfigAttribute(
+        name=CONVERSION_WORKERS, default_value=2, value_type=int, is_secret=False
+    ),
+    EnvConfigAttribute(
+        name=CONVERSION_MAX_JOBS, default_value=1000, value_type=int, is_secret=False
+    ),
+    EnvConfigAttribute(
+        name=CONVERSION_RESULT_TTL,
+        default_value=3600.0,
+        value_type=float,
+        is_secret=False,
+    ),
 ]
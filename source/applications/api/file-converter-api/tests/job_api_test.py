@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import time
+
+import httpx
+from core.logger import init_logging
+from core.model import NotFoundException
+from core.result import Result
+from core.singelton import SingletonMeta
+from domain.file_converter.model import PageLite
+from domain_test import AsyncTestBase
+from file_converter_service.usecase.conversion_jobs import (
+    ConversionJobs,
+    ConversionJobsConfig,
+)
+from file_converter_service.usecase.convert_file import UploadedFiles
+
+from file_converter_api.api.file_api import FileConverterApi, Request
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+SUBMISSIONS = 50
+# seconds one fake conversion blocks its thread
+CONVERSION_TIME = 0.1
+PROBE_INTERVAL = 0.01
+
+
+class SlowConverter:
+    """Stands in for ConvertFileToMarkdown, blocks like a real conversion does."""
+
+    def __init__(self, seconds: float = CONVERSION_TIME):
+        self.calls = 0
+        self.seconds = seconds
+
+    def convert_file(
+        self, source_bucket: str, destination_bucket: str, filename: str
+    ) -> Result[UploadedFiles]:
+        self.calls += 1
+        time.sleep(self.seconds)
+        if filename.startswith("missing"):
+            return Result.Err(NotFoundException(f"File {filename} not found"))
+        return Result.Ok(UploadedFiles([PageLite(page_number=0, fragments=[])]))
+
+
+class BlockingConverterApi(FileConverterApi):
+    """The conversion endpoint as it was, converting on the event loop."""
+
+    def _register_api_paths(self):
+        @self.app.put("/convert")
+        async def convert_files(request: Request) -> UploadedFiles:
+            result = self.converter.convert_file(
+                filename=request.filename,
+                source_bucket=request.source_bucket,
+                destination_bucket=request.destination_bucket,
+            )
+            if result.is_error():
+                raise result.get_error()
+            return result.get_ok()
+
+    converter: SlowConverter
+
+
+async def _health_latency(client: httpx.AsyncClient, until: asyncio.Task) -> float:
+    """
+    Worst latency of the health endpoint while *until* is running.
+    The in process transport only yields at real suspensions, the pause between two
+    probes is measured too, the time a blocked event loop delays the next probe.
+    """
+    worst = 0.0
+    while not until.done():
+        start = time.perf_counter()
+        response = await client.get("/health")
+        assert response.status_code == 200
+        await asyncio.sleep(PROBE_INTERVAL)
+        worst = max(worst, time.perf_counter() - start - PROBE_INTERVAL)
+    return worst
+
+
+def _request(filename: str) -> dict[str, str]:
+    return {"source_bucket": "src", "destination_bucket": "dest", "filename": filename}
+
+
+class TestConversionJobApi(AsyncTestBase):
+    __test__ = True
+
+    def setup_method_sync(self, test_name: str):
+        if test_name == "test_too_many_jobs":
+            # conversions outlast the submissions
+            self.converter = SlowConverter(seconds=2)
+            config = ConversionJobsConfig(workers=1, max_unfinished_jobs=3)
+        else:
+            self.converter = SlowConverter()
+            config = ConversionJobsConfig(workers=4, max_unfinished_jobs=SUBMISSIONS)
+        ConversionJobs.create(converter=self.converter, config=config)
+        api = FileConverterApi(title="file-converter-api", version="test", lifespan=None)  # type: ignore
+        self.client = httpx.AsyncClient(
+            # errors are answered by the error handler of the api
+            transport=httpx.ASGITransport(app=api.app, raise_app_exceptions=False),
+            base_url="http://test",
+        )
+
+    def teardown_method_sync(self, test_name: str):
+        ConversionJobs.Instance()._reset()
+        SingletonMeta.clear_all()
+
+    async def _wait_for(self, job_id: str) -> dict:
+        while True:
+            response = await self.client.get(f"/jobs/{job_id}", params={"wait": 5})
+            assert response.status_code == 200
+            if response.json()["status"] in ("DONE", "FAILED"):
+                return response.json()
+
+    async def test_submit_and_long_poll(self):
+        response = await self.client.post("/jobs", json=_request("a.pdf"))
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] in ("PENDING", "RUNNING")
+
+        # a second submission of the running file returns the same job
+        again = await self.client.post("/jobs", json=_request("a.pdf"))
+        assert again.json()["id"] == job["id"]
+
+        start = time.perf_counter()
+        done = await self._wait_for(job["id"])
+        assert time.perf_counter() - start < 5
+        assert done["status"] == "DONE"
+        assert done["pages"] == [{"page_number": 0, "fragments": []}]
+        assert self.converter.calls == 1
+
+    async def test_failed_job_and_unknown_job(self):
+        job = (await self.client.post("/jobs", json=_request("missing.pdf"))).json()
+        failed = await self._wait_for(job["id"])
+        assert failed["status"] == "FAILED"
+        assert "missing.pdf" in failed["error"]
+
+        assert (await self.client.get("/jobs/unknown")).status_code == 404
+        response = await self.client.put("/convert", json=_request("missing.pdf"))
+        assert response.status_code == 404
+
+    async def test_convert_waits_for_the_job(self):
+        response = await self.client.put("/convert", json=_request("a.pdf"))
+        assert response.status_code == 200
+        assert response.json() == [{"page_number": 0, "fragments": []}]
+
+    async def test_too_many_jobs(self):
+        for i in range(3):
+            response = await self.client.post("/jobs", json=_request(f"{i}.pdf"))
+            assert response.status_code == 202
+        response = await self.client.post("/jobs", json=_request("one-more.pdf"))
+        assert response.status_code == 429
+
+    async def test_load_stays_responsive(self):
+        """Health latency under 50 concurrent conversions, blocking handler against jobs."""
+        blocking_api = BlockingConverterApi(
+            title="file-converter-api", version="test", lifespan=None  # type: ignore
+        )
+        blocking_api.converter = SlowConverter()
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=blocking_api.app),
+            base_url="http://test",
+        ) as blocking_client:
+
+            async def blocking_load():
+                responses = await asyncio.gather(
+                    *(
+                        blocking_client.put("/convert", json=_request(f"{i}.pdf"))
+                        for i in range(SUBMISSIONS)
+                    )
+                )
+                assert all(r.status_code == 200 for r in responses)
+
+            start = time.perf_counter()
+            load = asyncio.create_task(blocking_load())
+            before_latency = await _health_latency(blocking_client, load)
+            await load
+            before_total = time.perf_counter() - start
+
+        async def job_load():
+            responses = await asyncio.gather(
+                *(
+                    self.client.post("/jobs", json=_request(f"{i}.pdf"))
+                    for i in range(SUBMISSIONS)
+                )
+            )
+            assert all(r.status_code == 202 for r in responses)
+            jobs = await asyncio.gather(
+                *(self._wait_for(r.json()["id"]) for r in responses)
+            )
+            assert all(job["status"] == "DONE" for job in jobs)
+
+        start = time.perf_counter()
+        load = asyncio.create_task(job_load())
+        after_latency = await _health_latency(self.client, load)
+        await load
+        after_total = time.perf_counter() - start
+
+        logger.info(
+            f"{SUBMISSIONS} conversions of {CONVERSION_TIME}s: "
+            f"before worst health latency {before_latency * 1000:.0f} ms, total {before_total:.1f}s, "
+            f"after worst health latency {after_latency * 1000:.0f} ms, total {after_total:.1f}s"
+        )
+        assert self.converter.calls == SUBMISSIONS
+        # the remaining latency is the event loop answering the burst of submissions
+        assert after_latency * 10 < before_latency
+        assert after_total < before_total
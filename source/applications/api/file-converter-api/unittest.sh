@@ -0,0 +1 @@
+pytest tests/job_api_test.py
@@ -11,6 +11,7 @@ from openai_client.async_openai import ConfigOpenAI, OpenAIAsyncLLM
 from deployment_base.enviroment.minio_env import S3_HOST
 from deployment_base.enviroment import openai_env
 from deployment_base.startup_sequence.s3 import MinioStartupSequence
+from deployment_base.startup_sequence.llm_governor import llm_governor_config
 
 from s3.minio import MinioFileStorage, MinioConnection
 from rest_client.async_client import OTELAsyncHTTPClient
@@ -35,6 +36,7 @@ from file_converter_prefect.settings import (
     API_NAME,
     API_VERSION,
     FILE_CONVERTER_API,
+    MAX_PARALLEL_IMAGE_DESCRIPTIONS,
     PROMPT,
     REQUEST_TIMEOUT_IN_SECONDS,
     SETTINGS,
@@ -95,6 +97,7 @@ class ApplicationFileConverterPrefect(Application):
                 timeout=self._config_loader.get_int(openai_env.LLM_REQUEST_TIMEOUT),
                 temperature=self._config_loader.get_float(openai_env.TEMPERATUR),
                 context_cutoff=int(128_000 * 0.90),
+                governor=llm_governor_config(self._config_loader),
             )
         )
 
@@ -103,6 +106,9 @@ class ApplicationFileConverterPrefect(Application):
         description_config = DescribeImageUsecaseConfig(
             system_prompt=self._config_loader.get_str(SYSTEM_PROMPT),
             prompt=self._config_loader.get_str(PROMPT),
+            max_parallel_descriptions=self._config_loader.get_int(
+                MAX_PARALLEL_IMAGE_DESCRIPTIONS
+            ),
         )
 
         DescribeImageUsecase.create(
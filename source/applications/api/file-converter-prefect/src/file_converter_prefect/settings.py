@@ -2,6 +2,7 @@ from typing import Any
 from core.config_loader import ConfigAttribute, EnvConfigAttribute, FileConfigAttribute
 
 ENABLED_IMAGE_DESCRIPTION = "ENABLED_IMAGE_DESCRIPTION"
+MAX_PARALLEL_IMAGE_DESCRIPTIONS = "MAX_PARALLEL_IMAGE_DESCRIPTIONS"
 
 SYSTEM_PROMPT = "SYSTEM_PROMPT"
 PROMPT = "PROMPT"
@@ -43,4 +44,10 @@ SETTINGS: list[ConfigAttribute[Any]] = [
         value_type=bool,
         is_secret=False,
     ),
+    EnvConfigAttribute(
+        name=MAX_PARALLEL_IMAGE_DESCRIPTIONS,
+        default_value=4,
+        value_type=int,
+        is_secret=False,
+    ),
 ]
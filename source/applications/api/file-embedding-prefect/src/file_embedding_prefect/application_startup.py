@@ -25,6 +25,11 @@ from deployment_base.startup_sequence.llama_index import (
     LlamaIndexQdrantStartupSequence,
     LlamaIndexStartupSequence,
 )
+from deployment_base.startup_sequence.llm_cache import (
+    llm_cache_models,
+    llm_response_cache,
+)
+from deployment_base.startup_sequence.llm_governor import llm_governor_config
 from deployment_base.startup_sequence.log import LoggerStartupSequence
 from deployment_base.startup_sequence.neo4j import Neo4jStartupSequence
 from deployment_base.startup_sequence.postgres import PostgresStartupSequence
@@ -60,6 +65,7 @@ from text_embedding.async_client import (
 )
 from text_embedding.proto import (
     EmbeddingClientConfig,
+    GrpcAsyncEmbeddClient,
     GrpcEmbeddClient,
 )
 from text_splitter.node_splitter import (
@@ -78,6 +84,9 @@ from file_embedding_prefect.settings import (
     DOCUMENT_LANGUAGE,
     EMBEDDING_CONFIG,
     EMBEDDING_IMPLEMENTATION,
+    MAX_BUFFERED_FRAGMENT_BYTES,
+    PARALLEL_FRAGMENT_DOWNLOADS,
+    PARALLEL_PAGES,
     QUED_TASKS,
     SETTINGS,
 )
@@ -178,6 +187,9 @@ class FileEmbeddingPrefectApplication(Application):
             ]
         )
         if self._config_loader.get_str(EMBEDDING_IMPLEMENTATION) == "vector":
+            result = self._config_loader.load_values(qdrant_env.SETTINGS_INGEST)
+            if result.is_error():
+                raise result.get_error()
             self._with_acomponent(
                 component=PostgresStartupSequence(models=[file_models, config_models])
             )._with_acomponent(component=MinioStartupSequence())._with_acomponent(
@@ -195,7 +207,12 @@ class FileEmbeddingPrefectApplication(Application):
                 raise result.get_error()
             self._with_acomponent(
                 component=PostgresStartupSequence(
-                    models=[file_models, hippo_rag_models, config_models]
+                    models=[
+                        file_models,
+                        hippo_rag_models,
+                        config_models,
+                        *llm_cache_models(self._config_loader),
+                    ]
                 )
             )._with_acomponent(component=MinioStartupSequence())._with_acomponent(
                 component=Neo4jStartupSequence()
@@ -222,28 +239,31 @@ class FileEmbeddingPrefectApplication(Application):
 
         indexer: AsyncDocumentIndexer | None = None
 
+        embedding_client_config = EmbeddingClientConfig(
+            normalize=self.embedding_config.addition_information[
+                text_embedding.EMEDDING_NORMALIZE
+            ],
+            truncate=self.embedding_config.addition_information[
+                text_embedding.TRUNCATE
+            ],
+            truncate_direction=self.embedding_config.addition_information[
+                text_embedding.TRUNCATE_DIRECTION
+            ],
+            prompt_name_doc=self.embedding_config.addition_information[
+                text_embedding.EMBEDDING_DOC_PROMPT_NAME
+            ],
+            prompt_name_query=self.embedding_config.addition_information[
+                text_embedding.EMBEDDING_QUERY_PROMPT_NAME
+            ],
+        )
+        address = self._config_loader.get_str(text_embedding.EMBEDDING_HOST)
+        is_secure = self._config_loader.get_bool(text_embedding.IS_EMBEDDING_HOST_SECURE)
         embedder = GrpcEmbeddClient(
-            address=self._config_loader.get_str(text_embedding.EMBEDDING_HOST),
-            is_secure=self._config_loader.get_bool(
-                text_embedding.IS_EMBEDDING_HOST_SECURE
-            ),
-            config=EmbeddingClientConfig(
-                normalize=self.embedding_config.addition_information[
-                    text_embedding.EMEDDING_NORMALIZE
-                ],
-                truncate=self.embedding_config.addition_information[
-                    text_embedding.TRUNCATE
-                ],
-                truncate_direction=self.embedding_config.addition_information[
-                    text_embedding.TRUNCATE_DIRECTION
-                ],
-                prompt_name_doc=self.embedding_config.addition_information[
-                    text_embedding.EMBEDDING_DOC_PROMPT_NAME
-                ],
-                prompt_name_query=self.embedding_config.addition_information[
-                    text_embedding.EMBEDDING_QUERY_PROMPT_NAME
-                ],
-            ),
+            address=address, is_secure=is_secure, config=embedding_client_config
+        )
+        # ingest awaits the embedding server instead of blocking the event loop
+        async_embedder = GrpcAsyncEmbeddClient(
+            address=address, is_secure=is_secure, config=embedding_client_config
         )
         if self._config_loader.get_str(EMBEDDING_IMPLEMENTATION) == "vector":
             reranker = CohereHttpRerankerClient(
@@ -262,8 +282,15 @@ class FileEmbeddingPrefectApplication(Application):
                     top_n_count_dens=5,
                     top_n_count_reranker=5,
                     embedding=embedder,
+                    async_embedding=async_embedder,
                     reranker=reranker,
                     sparse_model=self.embedding_config.models[qdrant_env.SPARSE_MODEL],
+                    ingest_batch_size=self._config_loader.get_int(
+                        qdrant_env.VECTOR_INGEST_BATCH_SIZE
+                    ),
+                    ingest_concurrency=self._config_loader.get_int(
+                        qdrant_env.VECTOR_INGEST_CONCURRENCY
+                    ),
                 ),
             )
         elif self._config_loader.get_str(EMBEDDING_IMPLEMENTATION) == "hippo_rag":
@@ -305,14 +332,23 @@ class FileEmbeddingPrefectApplication(Application):
                     does_support_structured_output=self._config_loader.get_bool(
                         openai_env.DOES_SUPPORT_STRUCTURED_OUTPUT
                     ),
-                )
+                    governor=llm_governor_config(self._config_loader),
+                ),
+                # re-indexing a file extracts the same triples again
+                response_cache=llm_response_cache(self._config_loader),
             )
 
             indexer = HippoRAGIndexer(
                 text_splitter=text_splitter,
-                vector_store_entity=QdrantEmbeddingStore(cfg_ent, embedder=embedder),
-                vector_store_fact=QdrantEmbeddingStore(cfg_link, embedder=embedder),
-                vector_store_chunk=QdrantEmbeddingStore(cfg_chunk, embedder=embedder),
+                vector_store_entity=QdrantEmbeddingStore(
+                    cfg_ent, embedder=embedder, async_embedder=async_embedder
+                ),
+                vector_store_fact=QdrantEmbeddingStore(
+                    cfg_link, embedder=embedder, async_embedder=async_embedder
+                ),
+                vector_store_chunk=QdrantEmbeddingStore(
+                    cfg_chunk, embedder=embedder, async_embedder=async_embedder
+                ),
                 graph=Neo4jGraphDB(config=Neo4jConfig()),
                 openie=AsyncOpenIE(llm=client, config=OpenIEConfig(retries=3)),
                 state_store=PostgresDBStateStore(),
@@ -326,6 +362,12 @@ class FileEmbeddingPrefectApplication(Application):
                     ],
                 ),
             )
+            if self._config_loader.get_bool(hippo_rag_env.MIGRATE_PAYLOAD_FILTERS):
+                result = await indexer.migrate_payload_filters()
+                if result.is_error():
+                    raise result.get_error()
+                if result.get_ok():
+                    logger.info("Migrated the metadata payload of the hippo rag collections")
         else:
             raise Exception("Not valid implementation")
 
@@ -336,7 +378,14 @@ class FileEmbeddingPrefectApplication(Application):
             vectore_store=indexer,
             file_database=file_database,
             config=EmbeddFilePiplineUsecaseConfig(
-                consider_images=self._config_loader.get_bool(CONSIDER_IMAGES)
+                consider_images=self._config_loader.get_bool(CONSIDER_IMAGES),
+                parallel_downloads=self._config_loader.get_int(
+                    PARALLEL_FRAGMENT_DOWNLOADS
+                ),
+                max_buffered_bytes=self._config_loader.get_int(
+                    MAX_BUFFERED_FRAGMENT_BYTES
+                ),
+                parallel_pages=self._config_loader.get_int(PARALLEL_PAGES),
             ),
             embed_config=self.embedding_config,
         )
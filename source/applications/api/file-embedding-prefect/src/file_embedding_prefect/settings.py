@@ -7,6 +7,9 @@ QUED_TASKS = "QUED_TASKS"
 PRE_ALLOCATED_TASK = "PRE_ALLOCATED_TASK"
 DOCUMENT_LANGUAGE = "DOCUMENT_LANGUAGE"
 CONSIDER_IMAGES = "CONSIDER_IMAGES"
+PARALLEL_FRAGMENT_DOWNLOADS = "PARALLEL_FRAGMENT_DOWNLOADS"
+MAX_BUFFERED_FRAGMENT_BYTES = "MAX_BUFFERED_FRAGMENT_BYTES"
+PARALLEL_PAGES = "PARALLEL_PAGES"
 # EMBEDDING_TYPE = "EMBEDDING_TYPE"
 EMBEDDING_CONFIG = "EMBEDDING_CONFIG"
 
@@ -41,6 +44,24 @@ SETTINGS: list[ConfigAttribute[Any]] = [
     EnvConfigAttribute(
         name=CONSIDER_IMAGES, default_value=False, value_type=bool, is_secret=False
     ),
+    EnvConfigAttribute(
+        name=PARALLEL_FRAGMENT_DOWNLOADS,
+        default_value=8,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=MAX_BUFFERED_FRAGMENT_BYTES,
+        default_value=32 * 1024 * 1024,
+        value_type=int,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=PARALLEL_PAGES,
+        default_value=4,
+        value_type=int,
+        is_secret=False,
+    ),
     FileConfigAttribute(
         name=EMBEDDING_CONFIG,
         default_value="",
@@ -1,7 +1,11 @@
 from core.config_loader import ConfigLoaderImplementation
-from domain.database.file.model import File, FragementTypes
+from domain.database.file.model import File
 from domain.pipeline.events import EventName
-from image_description_service.usecase.image_description import DescribeImageUsecase
+from image_description_service.usecase.image_description import (
+    DescribeImageUsecase,
+    ImageDescriptionRequest,
+    build_image_description_requests,
+)
 from prefect import logging, task
 from prefect.events import emit_event
 
@@ -23,34 +27,12 @@ async def convert_file(file_id: str) -> File:
 
 
 @task
-async def describe_image(file: File):
+async def describe_images(requests: list[ImageDescriptionRequest]):
     logger = logging.get_run_logger()
-    bucket = file.metadata.project_id
-
-    for page in file.pages:
-        for index, fragement in enumerate(page.fragements):
-            if fragement.fragement_type != FragementTypes.IMAGE:
-                continue
-            context_files: list[str] = []
-
-            for i in range(index, len(page.fragements)):
-                if page.fragements[i].fragement_type == FragementTypes.TEXT:
-                    context_files.append(page.fragements[i].storage_filename)
-                    break
-
-            for i in range(0, index + 1, -1):  # count in reverse
-                if page.fragements[i].fragement_type == FragementTypes.TEXT:
-                    context_files.append(page.fragements[i].storage_filename)
-                    break
-
-            logger.info(f"describe {fragement.storage_filename}")
-            result = await DescribeImageUsecase.Instance().describe_image(
-                bucket=bucket,
-                filename=fragement.storage_filename,
-                context_files=context_files,
-            )
-            if result.is_error():
-                raise result.get_error()
+    logger.info(f"describe {len(requests)} images")
+    result = await DescribeImageUsecase.Instance().describe_images(requests)
+    if result.is_error():
+        raise result.get_error()
 
 
 @task
@@ -72,7 +54,10 @@ async def created_or_updated_file(file_id: str):
         file = await convert_file(file_id=file_id)
 
         if ConfigLoaderImplementation.Instance().get_bool(ENABLED_IMAGE_DESCRIPTION):
-            await describe_image(file=file)
+            # the embedding reads the descriptions, files without images hand off at once
+            requests = build_image_description_requests(file)
+            if requests:
+                await describe_images(requests=requests)
 
         emit_event(
             event=EventName.FILE_CONVERTED.value,
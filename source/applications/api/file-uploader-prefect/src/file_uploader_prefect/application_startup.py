@@ -8,7 +8,10 @@ from deployment_base.startup_sequence.log import LoggerStartupSequence
 from deployment_base.startup_sequence.postgres import PostgresStartupSequence
 from deployment_base.startup_sequence.s3 import MinioStartupSequence
 from file_database.file_db_implementation import PostgresFileDatabase
-from file_uploader_service.usecase.upload_files import UploadeFilesUsecase
+from file_uploader_service.usecase.upload_files import (
+    IncrementalUploadConfig,
+    UploadeFilesUsecase,
+)
 from project_database.project_db_implementation import PostgresDBProjectDatbase
 from s3.minio import MinioConnection, MinioFileStorage
 
@@ -18,6 +21,8 @@ from file_uploader_prefect.settings import (
     FILE_TYPES_TO_OBSERVE,
     OBSERVE_DIR,
     SETTINGS,
+    UPLOAD_CONCURRENCY,
+    UPLOAD_MANIFEST,
 )
 
 logger = logging.getLogger(__name__)
@@ -63,4 +68,8 @@ class FileUploaderPrefect(Application):
             supported_file_types=supported_file_types,
             root_dir=root_dir,
             application_version=0,
+            upload_config=IncrementalUploadConfig(
+                manifest_path=self._config_loader.get_str(UPLOAD_MANIFEST),
+                concurrency=self._config_loader.get_int(UPLOAD_CONCURRENCY),
+            ),
         )
@@ -40,6 +40,18 @@ async def upload_file(filepath: str):
     logger.info(f"Emitted file ID {db_id}")
 
 
+@task
+async def upload_changed_files() -> list[str]:
+    results = await UploadeFilesUsecase.Instance().upload_changed_files()
+    db_ids: list[str] = []
+    for result in results:
+        if result.is_error():
+            logger.error(result.get_error())
+            continue
+        db_ids.append(result.get_ok())
+    return db_ids
+
+
 @task
 async def startup():
     FileUploaderPrefect.create(config_loader=ConfigLoaderImplementation.create())
@@ -56,9 +68,12 @@ async def shutdown():
 async def upload_files():
     try:
         await startup()
-        filepaths = load_file()
-        logger.info(f"found {len(filepaths)} Files")
-        for filepath in filepaths:
-            await upload_file(filepath=filepath)
+        db_ids = await upload_changed_files()
+        logger.info(f"uploaded {len(db_ids)} new or changed Files")
+        for db_id in db_ids:
+            emit_event(
+                event=EventName.FILE_CREATED_UPDATES.value,
+                resource={"prefect.resource.id": f"file/{db_id}"},
+            )
     finally:
         await shutdown()
@@ -3,6 +3,8 @@ from core.config_loader import ConfigAttribute, EnvConfigAttribute
 
 OBSERVE_DIR = "OBSERVE_DIR"
 FILE_TYPES_TO_OBSERVE = "FILE_TYPES_TO_OBSERVE"
+UPLOAD_MANIFEST = "UPLOAD_MANIFEST"
+UPLOAD_CONCURRENCY = "UPLOAD_CONCURRENCY"
 
 API_VERSION = "0.2.0"
 API_NAME = "file-uploader-prefrect-deployment"
@@ -18,4 +20,13 @@ SETTINGS: list[ConfigAttribute[Any]] = [
         value_type=str,
         is_secret=False,
     ),
+    EnvConfigAttribute(
+        name=UPLOAD_MANIFEST,
+        default_value="./upload_manifest.jsonl",
+        value_type=str,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=UPLOAD_CONCURRENCY, default_value=8, value_type=int, is_secret=False
+    ),
 ]
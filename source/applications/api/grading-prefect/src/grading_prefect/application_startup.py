@@ -1,6 +1,11 @@
 from deployment_base.enviroment import openai_env
 from deployment_base.startup_sequence.log import LoggerStartupSequence
 from deployment_base.startup_sequence.postgres import PostgresStartupSequence
+from deployment_base.startup_sequence.llm_governor import llm_governor_config
+from deployment_base.startup_sequence.llm_cache import (
+    llm_cache_models,
+    llm_response_cache,
+)
 from domain.database.config.model import Config, GradingServiceConfig
 from config_service.usecase.config_storage import ConfigLoaderUsecase
 from domain.database.config.interface import SystemConfigDatabase
@@ -131,7 +136,13 @@ class GradingApplication(Application):
                 application_version=API_VERSION,
             )
         )._with_acomponent(
-            component=PostgresStartupSequence(models=[validation_model, fact_model])
+            component=PostgresStartupSequence(
+                models=[
+                    validation_model,
+                    fact_model,
+                    *llm_cache_models(self._config_loader),
+                ]
+            )
         )
 
     async def _create_usecase(self):
@@ -141,6 +152,9 @@ class GradingApplication(Application):
             raise result.get_error()
 
         evaluation_database = PostgresDBEvaluation()
+        # the grading of a re-run evaluation sends the same requests again
+        response_cache = llm_response_cache(self._config_loader)
+        governor = llm_governor_config(self._config_loader)
         # --- 5. prepare LLM client ----------------------------------------------------
         async_llm: AsyncLLM | None = None
         if self._config_loader.get_str(EVAL_TYPE) == "openai":
@@ -153,7 +167,9 @@ class GradingApplication(Application):
                     timeout=self._config_loader.get_int(LLM_REQUEST_TIMEOUT),
                     temperature=self._config_loader.get_float(TEMPERATUR),
                     context_cutoff=int(128_000 * 0.90),
-                )
+                    governor=governor,
+                ),
+                response_cache=response_cache,
             )
         if self._config_loader.get_str(EVAL_TYPE) == "local":
             async_llm = OpenAIAsyncLLM(
@@ -165,7 +181,9 @@ class GradingApplication(Application):
                     temperature=self._grading_config.data.temp,
                     context_cutoff=int(128_000 * 0.90),
                     base_url=self._config_loader.get_str(OPENAI_HOST),
-                )
+                    governor=governor,
+                ),
+                response_cache=response_cache,
             )
         assert async_llm, "Either OpenAI or Ollama credentials must be supplied"
 
@@ -178,7 +196,9 @@ class GradingApplication(Application):
                 temperature=self._grading_config.data.temp,
                 context_cutoff=int(128_000 * 0.90),
                 base_url=self._config_loader.get_str(OPENAI_HOST),
-            )
+                governor=governor,
+            ),
+            response_cache=response_cache,
         )
 
         # --- 6. initialise grading use-cases -----------------------------------------
@@ -27,6 +27,7 @@ from deployment_base.startup_sequence.llama_index import (
     LlamaIndexQdrantStartupSequence,
     LlamaIndexStartupSequence,
 )
+from deployment_base.startup_sequence.llm_cache import llm_cache_models
 from deployment_base.startup_sequence.log import LoggerStartupSequence
 from deployment_base.startup_sequence.neo4j import Neo4jStartupSequence
 from deployment_base.startup_sequence.postgres import PostgresStartupSequence
@@ -193,6 +194,7 @@ class RAGPrefectApplication(Application):
                     project_models,
                     hippo_rag_models,
                     fact_models,
+                    *llm_cache_models(self._config_loader),
                 ]
             )
         )
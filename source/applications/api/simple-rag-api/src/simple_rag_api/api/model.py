@@ -33,6 +33,7 @@ class ChatCompletionRequest(BaseModel):
     model: str
     messages: list[ChatMessage]
     stream: bool = False
+    n: int = Field(default=1, ge=1, le=16, description="answers to generate, not streamed")
     max_tokens: int | None = None
     temperature: float | None = None
     config_id: str | None = None
@@ -56,12 +57,44 @@ class ChatChoice(BaseModel):
     finish_reason: str
 
 
+class Usage(BaseModel):
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
 class ChatCompletionResponse(BaseModel):
     id: str
     object: str
     created: int
     model: str
     choices: list[ChatChoice]
+    usage: Usage | None = None
+
+
+class CompletionRequest(BaseModel):
+    model: str
+    prompt: str | list[str]
+    n: int = Field(default=1, ge=1, le=16)
+    max_tokens: int | None = None
+    temperature: float | None = None
+    config_id: str | None = None
+    project_id: str | None = None
+
+
+class CompletionChoice(BaseModel):
+    index: int
+    text: str
+    finish_reason: str
+
+
+class CompletionResponse(BaseModel):
+    id: str
+    object: str = "text_completion"
+    created: int
+    model: str
+    choices: list[CompletionChoice]
+    usage: Usage
 
 
 # Optional: OpenAI standard error response format
@@ -6,9 +6,9 @@ import time
 from typing import Any
 from uuid import uuid4
 
-from core.hash import compute_mdhash_id
 from core.model import NotFoundException
-from domain.database.config.model import RAGConfigTypeE
+from domain.database.config.model import RAGConfig, RAGConfigTypeE
+from domain.database.project.model import Project
 from fastapi_core.base_api import BaseAPI, JSONResponse, Lifespan
 from pydantic import BaseModel
 from starlette.responses import HTMLResponse, StreamingResponse
@@ -18,7 +18,7 @@ from fastapi import HTTPException, Request
 from fastapi.templating import Jinja2Templates
 
 from core.config_loader import ConfigLoaderImplementation
-from domain.rag.model import Conversation, Message, RoleType
+from domain.rag.model import Conversation, Message, RAGResponse, RoleType
 from simple_rag_service.usecase.rag import SimpleRAGUsecase
 
 from simple_rag_api.api.model import (
@@ -28,11 +28,15 @@ from simple_rag_api.api.model import (
     ChatCompletionRequest,
     ChatCompletionResponse,
     ChatMessage,
+    CompletionChoice,
+    CompletionRequest,
+    CompletionResponse,
     DeltaMessage,
     ModelData,
     ModelList,
     QueryRequest,
     QueryResposne,
+    Usage,
 )
 from simple_rag_api.api.search_engine import search
 from simple_rag_api.application_startup import RAGAPIApplication
@@ -48,6 +52,9 @@ logger = logging.getLogger(__name__)
 
 
 class AnswerContextDump(BaseModel):
+    chat_id: str
+    config_id: str
+    created: datetime
     messages: list[ChatMessage]
     context: list[str]
     answer: str
@@ -157,28 +164,16 @@ class RAGApi(BaseAPI):
 
             config_id = request.config_id or config_loader.get_str(DEFAULT_CONFIG)
             project_id = request.project_id or config_loader.get_str(DEFAULT_PROJECT)
-
-            config_result = await RAGAPIApplication.Instance().get_config_by_id(
-                config_id
-            )
-
-            project_result = await RAGAPIApplication.Instance().get_project(project_id)
-
-            if config_result.is_error():
-                raise config_result.get_error()
-            if project_result.is_error():
-                raise project_result.get_error()
-
-            project = project_result.get_ok()
-            config = config_result.get_ok()
-
-            if project is None:
-                raise NotFoundException(f"Project {project_id} not found")
-            if config is None:
-                raise NotFoundException(f"Config {config_id} not found")
+            config = await _fetch_config(config_id)
+            await _fetch_project(project_id)
 
             query_dump = AnswerContextDump(
-                messages=request.messages, context=[], answer=""
+                chat_id=chat_id,
+                config_id=config_id,
+                created=datetime.now(),
+                messages=request.messages,
+                context=[],
+                answer="",
             )
 
             async def stream_generator():
@@ -256,11 +251,7 @@ class RAGApi(BaseAPI):
                     index += 1
                     yield f"data: {first_chunk.model_dump_json()}\n\n"
                 yield "data: [DONE]\n\n"
-                model_dump_str = query_dump.model_dump_json(indent=2)
-                hash = compute_mdhash_id(model_dump_str)
-                timestemp = datetime.now().strftime("%Y%m%d-%H%M%S")
-                with open(f"./chat_dump/{timestemp}-{config_id}-{hash}", "w") as f:
-                    f.write(model_dump_str)
+                await RAGAPIApplication.Instance().store_transcript(query_dump)
 
             # --- Streaming response
             if request.stream:
@@ -281,10 +272,37 @@ class RAGApi(BaseAPI):
                     },
                 )
 
-            full_response = (
-                "Das ist eine RAG-basierte Antwort auf Ihre Anfrage. "
-                "Die Informationen wurden aus der Wissensbasis abgerufen."
+            # --- Non-streaming response, n answers generated concurrently
+            conversation = Conversation(
+                messages=[
+                    Message(
+                        message=chat_message.content,
+                        role=RoleType(chat_message.role),
+                    )
+                    for chat_message in request.messages
+                ],
+                model=request.model,
             )
+            responses = await _complete(
+                config=config,
+                collection=f"{project_id}-{config.embedding.id}",
+                conversations=[conversation] * request.n,
+            )
+            RAGAPIApplication.Instance().store_context(
+                context_id=context_id, context=_project_nodes(responses[0].nodes)
+            )
+            for response in responses:
+                await RAGAPIApplication.Instance().store_transcript(
+                    query_dump.model_copy(
+                        update={
+                            "context": [
+                                n.model_dump_json(indent=2) for n in response.nodes
+                            ],
+                            "answer": response.message or "",
+                        }
+                    )
+                )
+
             payload = ChatCompletionResponse(
                 id=chat_id,
                 object="chat.completion",
@@ -292,11 +310,18 @@ class RAGApi(BaseAPI):
                 model=request.model,
                 choices=[
                     ChatChoice(
-                        index=0,
-                        message=ChatMessage(role="assistant", content=full_response),
+                        index=index,
+                        message=ChatMessage(
+                            role="assistant", content=response.message or ""
+                        ),
                         finish_reason="stop",
                     )
+                    for index, response in enumerate(responses)
                 ],
+                usage=_usage(
+                    [" ".join(m.content for m in request.messages)] * request.n,
+                    responses,
+                ),
             )
             # Return as JSONResponse so we can attach headers
             return JSONResponse(
@@ -308,6 +333,47 @@ class RAGApi(BaseAPI):
                 },
             )
 
+        @self.app.post(
+            "/v1/completions",
+            tags=["OpenAI-compatible"],
+            summary="OpenAI-compatible completion endpoint, one RAG answer per prompt and n",
+        )
+        async def completions(request: CompletionRequest):  # type: ignore
+            config_loader = ConfigLoaderImplementation.Instance()
+
+            config_id = request.config_id or config_loader.get_str(DEFAULT_CONFIG)
+            project_id = request.project_id or config_loader.get_str(DEFAULT_PROJECT)
+            config = await _fetch_config(config_id)
+            await _fetch_project(project_id)
+
+            prompts = [request.prompt] if isinstance(request.prompt, str) else request.prompt
+            # like OpenAI the n answers of a prompt follow each other
+            prompts = [prompt for prompt in prompts for _ in range(request.n)]
+            responses = await _complete(
+                config=config,
+                collection=f"{project_id}-{config.embedding.id}",
+                conversations=[
+                    Conversation(
+                        messages=[Message(message=prompt, role=RoleType.User)],
+                        model=request.model,
+                    )
+                    for prompt in prompts
+                ],
+            )
+            payload = CompletionResponse(
+                id=f"cmpl-{uuid4()}",
+                created=int(time.time()),
+                model=request.model,
+                choices=[
+                    CompletionChoice(
+                        index=index, text=response.message or "", finish_reason="stop"
+                    )
+                    for index, response in enumerate(responses)
+                ],
+                usage=_usage(prompts, responses),
+            )
+            return JSONResponse(status_code=200, content=payload.model_dump())
+
         # ---------------------- Context retrieval endpoint -----------------------
         @self.app.get(
             "/v1/contexts/{context_id}",
@@ -388,6 +454,62 @@ class RAGApi(BaseAPI):
             )
 
 
+# ------------------------------ Helper: completions -----------------------------
+
+
+async def _fetch_config(config_id: str) -> RAGConfig:
+    config_result = await RAGAPIApplication.Instance().get_config_by_id(config_id)
+    if config_result.is_error():
+        raise config_result.get_error()
+    config = config_result.get_ok()
+    if config is None:
+        raise NotFoundException(f"Config {config_id} not found")
+    return config
+
+
+async def _fetch_project(project_id: str) -> Project:
+    project_result = await RAGAPIApplication.Instance().get_project(project_id)
+    if project_result.is_error():
+        raise project_result.get_error()
+    project = project_result.get_ok()
+    if project is None:
+        raise NotFoundException(f"Project {project_id} not found")
+    return project
+
+
+async def _complete(
+    config: RAGConfig, collection: str, conversations: list[Conversation]
+) -> list[RAGResponse]:
+    """Runs the rag pipeline of *config* to its end for every conversation."""
+    rag_llm = RAGAPIApplication.Instance().get_llm_based_on_config_type(config)
+    result = await SimpleRAGUsecase(rag_llm=rag_llm).complete_many(
+        conversations=conversations,
+        collection=collection,
+        max_parallel=RAGAPIApplication.Instance().max_parallel_completions,
+    )
+    if result.is_error():
+        raise result.get_error()
+    return result.get_ok()
+
+
+def _usage(prompts: list[str], responses: list[RAGResponse]) -> Usage:
+    """
+    Tokens of every run, the prompt of a run counts its messages and the
+    retrieved context the model answered from.
+    """
+    count = RAGAPIApplication.Instance().count_tokens
+    prompt_tokens = sum(
+        count(prompt) + sum(count(node.content) for node in response.nodes)
+        for prompt, response in zip(prompts, responses)
+    )
+    completion_tokens = sum(count(response.message or "") for response in responses)
+    return Usage(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+    )
+
+
 # ------------------------------ Helper: node projection ------------------------
 
 
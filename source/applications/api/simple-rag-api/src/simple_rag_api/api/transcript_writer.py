@@ -0,0 +1,137 @@
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import IO
+
+from core.config_loader import ConfigLoader
+from deployment_base.application import AsyncLifetimeReg
+from opentelemetry import metrics
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "transcripts.jsonl"
+
+
+class TranscriptWriterConfig(BaseModel):
+    directory: str = "./chat_dump"
+    # transcripts waiting for the disk, bounds the memory of the writer
+    max_queued: int = 1000
+    batch_size: int = 100
+    # the current file is rotated and compressed once it is larger
+    max_file_bytes: int = 64 * 1024 * 1024
+    # True: a full queue makes the request wait, False: the transcript is dropped
+    block_when_full: bool = False
+
+
+class TranscriptWriter(AsyncLifetimeReg):
+    """
+    Persists chat transcripts in the background.
+    Requests only queue their transcript, a single task writes the queue in
+    batches as JSONL on a worker thread. Full files are rotated and gzipped.
+    Shutdown writes everything that is still queued.
+    """
+
+    def __init__(self, config: TranscriptWriterConfig = TranscriptWriterConfig()):
+        self._config = config
+        self._queue: asyncio.Queue[BaseModel] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._file: IO[str] | None = None
+        self._closed = False
+        self.dropped = 0
+        meter = metrics.get_meter("chat_transcript_writer")
+        self._written_counter = meter.create_counter(
+            name="chat_transcript.written",
+            unit="1",
+            description="Chat transcripts written to disk",
+        )
+        self._dropped_counter = meter.create_counter(
+            name="chat_transcript.dropped",
+            unit="1",
+            description="Chat transcripts dropped because the queue was full",
+        )
+
+    async def start(self, config_loader: ConfigLoader):
+        await asyncio.to_thread(os.makedirs, self._config.directory, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self._config.max_queued)
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, transcript: BaseModel) -> bool:
+        """Queues *transcript*, returns False when it was dropped."""
+        if self._queue is None or self._closed:
+            logger.warning("transcript writer is not running, transcript dropped")
+            return False
+        if self._config.block_when_full:
+            await self._queue.put(transcript)
+            return True
+        try:
+            self._queue.put_nowait(transcript)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._dropped_counter.add(1)
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"transcript queue is full, {self.dropped} dropped")
+            return False
+
+    async def flush(self):
+        """Waits until all queued transcripts are written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def shutdown(self):
+        self._closed = True
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._close_file)
+
+    async def _run(self):
+        assert self._queue is not None
+        while True:
+            batch = [await self._queue.get()]
+            # whatever arrived while the last batch was written goes into this one
+            while len(batch) < self._config.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self._written_counter.add(len(batch))
+            except Exception as e:
+                logger.error(f"failed to write {len(batch)} transcripts: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[BaseModel]):
+        if self._file is None:
+            self._file = open(
+                os.path.join(self._config.directory, CURRENT_FILE), "a", encoding="utf-8"
+            )
+        self._file.write("".join(f"{t.model_dump_json()}\n" for t in batch))
+        self._file.flush()
+        if self._file.tell() >= self._config.max_file_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._close_file()
+        current = os.path.join(self._config.directory, CURRENT_FILE)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated = os.path.join(self._config.directory, f"transcripts-{stamp}.jsonl")
+        os.replace(current, rotated)
+        with open(rotated, "rb") as source, gzip.open(f"{rotated}.gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(rotated)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,6 +1,9 @@
 import logging
 from typing import Any
 
+import tiktoken
+from pydantic import BaseModel
+
 import config_database.model as config_models
 
 # import fact_store_database.model as fact_models
@@ -9,6 +12,7 @@ import hippo_rag_database.model as hippo_rag_models
 import project_database.model as project_models
 
 # import validation_database.model as validation_models
+from config_database.cache import CachedConfigDatabase, ConfigCacheConfig
 from config_database.db_implementation import PostgresRAGConfigDatabase
 from core.result import Result
 from deployment_base.application import Application
@@ -17,6 +21,7 @@ from deployment_base.startup_sequence.llama_index import (
     LlamaIndexQdrantStartupSequence,
     LlamaIndexStartupSequence,
 )
+from deployment_base.startup_sequence.llm_cache import llm_cache_models
 from deployment_base.startup_sequence.log import LoggerStartupSequence
 from deployment_base.startup_sequence.neo4j import Neo4jStartupSequence
 from deployment_base.startup_sequence.postgres import PostgresStartupSequence
@@ -34,6 +39,7 @@ from domain.database.config.model import (
 from domain.database.project.model import Project
 from domain.rag.interface import RAGLLM
 from hippo_rag.implementation import HippoRAG
+from openai_client.token_budget import TokenBudgetFitter
 from project_database.project_db_implementation import (
     PostgresDBProjectDatbase,
     ProjectDatabase,
@@ -41,15 +47,27 @@ from project_database.project_db_implementation import (
 from simple_rag.llama_index_rag import LlamaIndexRAG, LlamaIndexSubRAG
 
 from simple_rag_api.api.context_store import ContextStore
+from simple_rag_api.api.transcript_writer import (
+    TranscriptWriter,
+    TranscriptWriterConfig,
+)
 from simple_rag_api.settings import (
     API_NAME,
     API_VERSION,
+    CONFIG_CACHE_NEGATIVE_TTL_SECONDS,
+    CONFIG_CACHE_POLL_SECONDS,
     CONTEXT_MAX_ITEMS,
     CONTEXT_TTL_SECONDS,
     DEFAULT_HIP_CONFIG,
     DEFAULT_SIMPLE_CONFIG,
     DEFAULT_SUB_CONFIG,
+    MAX_PARALLEL_COMPLETIONS,
     SETTINGS,
+    TRANSCRIPT_BLOCK_WHEN_FULL,
+    TRANSCRIPT_DIRECTORY,
+    TRANSCRIPT_MAX_FILE_MB,
+    TRANSCRIPT_MAX_QUEUED,
+    USAGE_TOKENIZER,
 )
 
 
@@ -109,8 +127,11 @@ class RAGCofigApplication(Application):
 
 class RAGAPIApplication(Application):
     project_database: ProjectDatabase | None = None
-    config_database: RAGConfigDatabase | None = None
+    config_database: CachedConfigDatabase[RAGConfig] | None = None
     context_store: ContextStore | None = None
+    transcript_writer: TranscriptWriter | None = None
+    token_counter: TokenBudgetFitter | None = None
+    max_parallel_completions: int = 8
 
     hippo_rag_llm: HippoRAG | None = None
     sub_question: LlamaIndexSubRAG | None = None
@@ -143,6 +164,18 @@ class RAGAPIApplication(Application):
         )
         return self.context_store.get(context_id)
 
+    async def store_transcript(self, transcript: BaseModel) -> bool:
+        assert self.transcript_writer, (
+            "transcript writer must first be created through start"
+        )
+        return await self.transcript_writer.submit(transcript)
+
+    def count_tokens(self, text: str) -> int:
+        assert self.token_counter, (
+            "token counter must first be created through create_usecase"
+        )
+        return self.token_counter.count(text)
+
     async def get_all_project_names(self) -> Result[list[tuple[str, str]]]:
         assert self.project_database, (
             "project database must first be created through create_usecase"
@@ -218,6 +251,31 @@ class RAGAPIApplication(Application):
         )
         if result.is_error():
             raise result.get_error()
+        # started after postgres, polls the config version in the background
+        rag_configs = PostgresRAGConfigDatabase()
+        self.config_database = CachedConfigDatabase(
+            rag_configs,
+            name="rag-config",
+            config=ConfigCacheConfig(
+                poll_interval=self._config_loader.get_float(CONFIG_CACHE_POLL_SECONDS),
+                negative_ttl=self._config_loader.get_float(
+                    CONFIG_CACHE_NEGATIVE_TTL_SECONDS
+                ),
+            ),
+            version_source=rag_configs.get_version,
+        )
+        self.transcript_writer = TranscriptWriter(
+            TranscriptWriterConfig(
+                directory=self._config_loader.get_str(TRANSCRIPT_DIRECTORY),
+                max_queued=self._config_loader.get_int(TRANSCRIPT_MAX_QUEUED),
+                max_file_bytes=self._config_loader.get_int(TRANSCRIPT_MAX_FILE_MB)
+                * 1024
+                * 1024,
+                block_when_full=self._config_loader.get_bool(
+                    TRANSCRIPT_BLOCK_WHEN_FULL
+                ),
+            )
+        )
         self._with_component(
             component=LoggerStartupSequence(
                 application_name=self.get_application_name(),
@@ -229,24 +287,34 @@ class RAGAPIApplication(Application):
                     project_models,
                     hippo_rag_models,
                     config_models,
+                    *llm_cache_models(self._config_loader),
                 ]
             )
         )._with_acomponent(
             component=LlamaIndexQdrantStartupSequence()
         )._with_acomponent(component=LlamaIndexStartupSequence())._with_acomponent(
             component=Neo4jStartupSequence()
-        )._with_acomponent(component=HippoRAGQdrantStartupSequence())
+        )._with_acomponent(component=HippoRAGQdrantStartupSequence())._with_acomponent(
+            component=self.config_database
+        )._with_acomponent(
+            component=self.transcript_writer
+        )
 
     async def _create_usecase(self):
         result = self._config_loader.load_values(SETTINGS)
         if result.is_error():
             raise result.get_error()
         self.project_database = PostgresDBProjectDatbase()
-        self.config_database = PostgresRAGConfigDatabase()
         self.context_store = ContextStore(
             max_items=self._config_loader.get_int(CONTEXT_MAX_ITEMS),
             ttl_seconds=self._config_loader.get_int(CONTEXT_TTL_SECONDS),
         )
+        self.token_counter = TokenBudgetFitter(
+            tiktoken.get_encoding(self._config_loader.get_str(USAGE_TOKENIZER))
+        )
+        self.max_parallel_completions = self._config_loader.get_int(
+            MAX_PARALLEL_COMPLETIONS
+        )
 
         for config in self.configs:
             if config.config_type == RAGConfigTypeE.HYBRID:
@@ -9,6 +9,17 @@ CONTEXT_TTL_SECONDS = "CONTEXT_TTL_SECONDS"
 
 DEFAULT_PROJECT = "DEFAULT_PROJECT"
 
+MAX_PARALLEL_COMPLETIONS = "MAX_PARALLEL_COMPLETIONS"
+USAGE_TOKENIZER = "USAGE_TOKENIZER"
+
+CONFIG_CACHE_POLL_SECONDS = "CONFIG_CACHE_POLL_SECONDS"
+CONFIG_CACHE_NEGATIVE_TTL_SECONDS = "CONFIG_CACHE_NEGATIVE_TTL_SECONDS"
+
+TRANSCRIPT_DIRECTORY = "TRANSCRIPT_DIRECTORY"
+TRANSCRIPT_MAX_QUEUED = "TRANSCRIPT_MAX_QUEUED"
+TRANSCRIPT_MAX_FILE_MB = "TRANSCRIPT_MAX_FILE_MB"
+TRANSCRIPT_BLOCK_WHEN_FULL = "TRANSCRIPT_BLOCK_WHEN_FULL"
+
 LLMS_AVAILABALE = "LLMS_AVAILABALE"
 
 RUNNING_HOST = "RUNNING_HOST"
@@ -46,4 +57,43 @@ SETTINGS: list[ConfigAttribute[Any]] = [
     EnvConfigAttribute(
         name=RUNNING_HOST, default_value="", value_type=str, is_secret=False
     ),
+    EnvConfigAttribute(
+        name=MAX_PARALLEL_COMPLETIONS, default_value=8, value_type=int, is_secret=False
+    ),
+    EnvConfigAttribute(
+        name=USAGE_TOKENIZER,
+        default_value="cl100k_base",
+        value_type=str,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=CONFIG_CACHE_POLL_SECONDS,
+        default_value=5.0,
+        value_type=float,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=CONFIG_CACHE_NEGATIVE_TTL_SECONDS,
+        default_value=30.0,
+        value_type=float,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=TRANSCRIPT_DIRECTORY,
+        default_value="./chat_dump",
+        value_type=str,
+        is_secret=False,
+    ),
+    EnvConfigAttribute(
+        name=TRANSCRIPT_MAX_QUEUED, default_value=1000, value_type=int, is_secret=False
+    ),
+    EnvConfigAttribute(
+        name=TRANSCRIPT_MAX_FILE_MB, default_value=64, value_type=int, is_secret=False
+    ),
+    EnvConfigAttribute(
+        name=TRANSCRIPT_BLOCK_WHEN_FULL,
+        default_value=False,
+        value_type=bool,
+        is_secret=False,
+    ),
 ]
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import AsyncGenerator
+
+import httpx
+from core.config_loader import ConfigLoaderImplementation
+from core.logger import init_logging
+from core.result import Result
+from core.singelton import SingletonMeta
+from domain.database.config.model import (
+    RAGConfig,
+    RAGConfigTypeE,
+    RagEmbeddingConfig,
+    RagRetrievalConfig,
+)
+from domain.database.project.model import Project
+from domain.rag.model import Conversation, Node, RAGResponse
+from domain_test import AsyncTestBase
+
+from simple_rag_api.api.context_store import ContextStore
+from simple_rag_api.api.rag_api import RAGApi
+from simple_rag_api.api.transcript_writer import (
+    TranscriptWriter,
+    TranscriptWriterConfig,
+)
+from simple_rag_api.application_startup import RAGAPIApplication
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+BENCHMARK_ANSWERS = int(os.environ.get("COMPLETIONS_BENCHMARK_ANSWERS", "800"))
+CONCURRENCY = 50
+ANSWER_TOKENS = 20
+# answers asked for in one non-streaming request
+BATCH = 4
+
+
+class FakeRAGLLM:
+    """Answers with the last message, one token per word, and one context node."""
+
+    async def request(
+        self,
+        conversation: Conversation,
+        metadata_filters: dict[str, list[str] | list[int] | list[float]] | None = None,
+        collection: str | None = None,
+    ) -> Result[RAGResponse]:
+        words = conversation.messages[-1].message.split(" ")
+
+        async def tokens() -> AsyncGenerator[str, None]:
+            for word in words:
+                await asyncio.sleep(0)
+                yield f"{word} "
+
+        return Result.Ok(
+            RAGResponse.create_stream_response(
+                generator=tokens(),
+                nodes=[Node(id="n1", content="some context", similarity=1.0, metadata={})],
+            )
+        )
+
+
+class FakeConfigDatabase:
+    async def get_config_by_id(self, id: str) -> Result[RAGConfig | None]:
+        return Result.Ok(
+            RAGConfig(
+                id=id,
+                name="fake",
+                config_type=RAGConfigTypeE.HYBRID,
+                embedding=RagEmbeddingConfig(
+                    id="embedding",
+                    chunk_size=512,
+                    chunk_overlap=0,
+                    models={},
+                    addition_information={},
+                ),
+                retrieval_config=RagRetrievalConfig(
+                    id="retrieval",
+                    generator_model="llm",
+                    temp=0.0,
+                    prompts={},
+                    addition_information={},
+                ),
+            )
+        )
+
+
+class FakeProjectDatabase:
+    async def get(self, id: str) -> Result[Project | None]:
+        return Result.Ok(Project(id=id, version=1, name="project", year=2024, address=None))
+
+
+class WordCounter:
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def chat_request(question: str, stream: bool, n: int = 1) -> dict:
+    return {
+        "model": "llm",
+        "messages": [{"role": "user", "content": question}],
+        "stream": stream,
+        "n": n,
+        "config_id": "config",
+        "project_id": "project",
+    }
+
+
+class TestCompletions(AsyncTestBase):
+    __test__ = True
+
+    def setup_method_sync(self, test_name: str):
+        self._tmp = tempfile.TemporaryDirectory()
+        ConfigLoaderImplementation.create()
+        application = RAGAPIApplication.create(ConfigLoaderImplementation.Instance())
+        application.config_database = FakeConfigDatabase()  # type: ignore[assignment]
+        application.project_database = FakeProjectDatabase()  # type: ignore[assignment]
+        application.context_store = ContextStore()
+        application.token_counter = WordCounter()  # type: ignore[assignment]
+        application.max_parallel_completions = 8
+        application.transcript_writer = TranscriptWriter(
+            TranscriptWriterConfig(directory=self._tmp.name, max_queued=100_000)
+        )
+        fake_llm = FakeRAGLLM()
+        application.get_llm_based_on_config_type = lambda config: fake_llm  # type: ignore[method-assign]
+        app = RAGApi(title=f"completions-{test_name}", version="test", lifespan=None).get_app()  # type: ignore[arg-type]
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+
+    async def setup_method_async(self, test_name: str):
+        assert RAGAPIApplication.Instance().transcript_writer
+        await RAGAPIApplication.Instance().transcript_writer.start(None)  # type: ignore
+
+    async def teardown_method_async(self, test_name: str):
+        await self.client.aclose()
+        await RAGAPIApplication.Instance().transcript_writer.shutdown()  # type: ignore
+
+    def teardown_method_sync(self, test_name: str):
+        RAGAPIApplication._instances.pop(RAGAPIApplication, None)
+        SingletonMeta.clear_all()
+        self._tmp.cleanup()
+
+    async def test_chat_completion_with_n_answers(self):
+        response = await self.client.post(
+            "/v1/chat/completions", json=chat_request("what is rag", False, n=3)
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert [c["index"] for c in body["choices"]] == [0, 1, 2]
+        assert all(c["message"]["content"] == "what is rag " for c in body["choices"])
+        # every run: 3 words of the question and 2 of the context, 3 answered
+        assert body["usage"] == {
+            "prompt_tokens": 15,
+            "completion_tokens": 9,
+            "total_tokens": 24,
+        }
+        context_id = response.headers["X-Context-Id"]
+        context = await self.client.get(f"/v1/contexts/{context_id}")
+        assert context.json()["data"][0]["text"] == "some context"
+
+    async def test_completions_with_several_prompts(self):
+        response = await self.client.post(
+            "/v1/completions",
+            json={
+                "model": "llm",
+                "prompt": ["first prompt", "the second prompt"],
+                "n": 2,
+                "config_id": "config",
+                "project_id": "project",
+            },
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["object"] == "text_completion"
+        assert [c["text"] for c in body["choices"]] == [
+            "first prompt ",
+            "first prompt ",
+            "the second prompt ",
+            "the second prompt ",
+        ]
+        assert [c["index"] for c in body["choices"]] == [0, 1, 2, 3]
+        assert body["usage"]["completion_tokens"] == 10
+        assert body["usage"]["prompt_tokens"] == 10 + 4 * 2
+
+    async def test_benchmark_against_streaming(self):
+        """Answers per second for short answers, streamed against completed."""
+        question = " ".join(f"word{i}" for i in range(ANSWER_TOKENS))
+        expected = f"{question} "
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def call(stream: bool, n: int):
+            async with semaphore:
+                response = await self.client.post(
+                    "/v1/chat/completions", json=chat_request(question, stream, n)
+                )
+                assert response.status_code == 200
+                if stream:
+                    # what a client does to get the answer out of the events
+                    answer = "".join(
+                        json.loads(event[6:])["choices"][0]["delta"]["content"]
+                        for event in response.text.split("\n\n")
+                        if event.startswith("data: {")
+                    )
+                    assert answer == expected
+                else:
+                    choices = response.json()["choices"]
+                    assert [c["message"]["content"] for c in choices] == [expected] * n
+
+        measured: dict[str, float] = {}
+        for name, stream, n in (
+            ("streaming", True, 1),
+            ("completed", False, 1),
+            (f"completed n={BATCH}", False, BATCH),
+        ):
+            requests = BENCHMARK_ANSWERS // n
+            await asyncio.gather(*(call(stream, n) for _ in range(CONCURRENCY)))
+            start = time.perf_counter()
+            await asyncio.gather(*(call(stream, n) for _ in range(requests)))
+            measured[name] = requests * n / (time.perf_counter() - start)
+
+        logger.info(
+            f"{BENCHMARK_ANSWERS} answers of {ANSWER_TOKENS} tokens, answers/s: "
+            + ", ".join(f"{name} {value:.0f}" for name, value in measured.items())
+        )
+        assert measured[f"completed n={BATCH}"] > measured["streaming"]
@@ -0,0 +1,212 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from core.hash import compute_mdhash_id
+from core.logger import init_logging
+from domain_test import AsyncTestBase
+from pydantic import BaseModel
+
+from simple_rag_api.api.transcript_writer import (
+    CURRENT_FILE,
+    TranscriptWriter,
+    TranscriptWriterConfig,
+)
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+BENCHMARK_STREAMS = int(os.environ.get("TRANSCRIPT_BENCHMARK_STREAMS", "200"))
+BENCHMARK_ROUNDS = 5
+TOKENS = 50
+# pause between two tokens of the stub model
+TOKEN_INTERVAL = 0.002
+CONTEXT_NODES = 10
+
+
+class Transcript(BaseModel):
+    chat_id: str
+    config_id: str
+    created: datetime
+    context: list[str]
+    answer: str
+
+
+def build_transcript(number: int) -> Transcript:
+    return Transcript(
+        chat_id=f"chat-{number}",
+        config_id="config",
+        created=datetime.now(),
+        context=[f"node {i} " + "lorem ipsum " * 200 for i in range(CONTEXT_NODES)],
+        answer="token " * TOKENS,
+    )
+
+
+def read_lines(directory: str) -> list[dict]:
+    lines: list[dict] = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:  # type: ignore
+            lines.extend(json.loads(line) for line in f)
+    return lines
+
+
+def legacy_store(directory: str, transcript: Transcript):
+    """The dump as it was, one file per chat written in the request."""
+    model_dump_str = transcript.model_dump_json(indent=2)
+    hash = compute_mdhash_id(model_dump_str)
+    timestemp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    with open(
+        os.path.join(directory, f"{timestemp}-{transcript.config_id}-{hash}"), "w"
+    ) as f:
+        f.write(model_dump_str)
+
+
+async def stream_request(number: int, store) -> float:
+    """A stub streamed completion, returns its latency including the dump."""
+    start = time.perf_counter()
+    transcript = build_transcript(number)
+    for _ in range(TOKENS):
+        await asyncio.sleep(TOKEN_INTERVAL)
+    await store(transcript)
+    return time.perf_counter() - start
+
+
+def p99(latencies: list[float]) -> float:
+    return statistics.quantiles(latencies, n=100)[98]
+
+
+class TestTranscriptWriter(AsyncTestBase):
+    __test__ = True
+
+    def setup_method_sync(self, test_name: str):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self._tmp.name, "transcripts")
+        self.legacy_directory = os.path.join(self._tmp.name, "legacy")
+        os.makedirs(self.legacy_directory)
+
+    def teardown_method_sync(self, test_name: str):
+        self._tmp.cleanup()
+
+    async def test_writes_all_transcripts_on_shutdown(self):
+        writer = TranscriptWriter(
+            TranscriptWriterConfig(directory=self.directory, batch_size=7)
+        )
+        await writer.start(None)  # type: ignore[arg-type]
+        for number in range(50):
+            assert await writer.submit(build_transcript(number))
+        await writer.shutdown()
+
+        lines = read_lines(self.directory)
+        assert [line["chat_id"] for line in lines] == [f"chat-{n}" for n in range(50)]
+        assert not await writer.submit(build_transcript(50))
+
+    async def test_full_files_are_rotated_and_compressed(self):
+        writer = TranscriptWriter(
+            TranscriptWriterConfig(
+                directory=self.directory, batch_size=1, max_file_bytes=50_000
+            )
+        )
+        await writer.start(None)  # type: ignore[arg-type]
+        for number in range(10):
+            await writer.submit(build_transcript(number))
+            await writer.flush()
+        await writer.shutdown()
+
+        names = os.listdir(self.directory)
+        rotated = [n for n in names if n.endswith(".jsonl.gz")]
+        assert len(rotated) >= 3
+        assert all(not n.endswith(".jsonl") or n == CURRENT_FILE for n in names)
+        assert sorted(line["chat_id"] for line in read_lines(self.directory)) == sorted(
+            f"chat-{n}" for n in range(10)
+        )
+
+    async def test_full_queue_drops(self):
+        writer = TranscriptWriter(
+            TranscriptWriterConfig(directory=self.directory, max_queued=5)
+        )
+        await writer.start(None)  # type: ignore[arg-type]
+        # nothing is written before the event loop gets back to the writer
+        accepted = [
+            await writer.submit(build_transcript(number)) for number in range(8)
+        ]
+        await writer.shutdown()
+
+        assert accepted == [True] * 5 + [False] * 3
+        assert writer.dropped == 3
+        assert len(read_lines(self.directory)) == 5
+
+    async def test_full_queue_blocks(self):
+        writer = TranscriptWriter(
+            TranscriptWriterConfig(
+                directory=self.directory, max_queued=5, block_when_full=True
+            )
+        )
+        await writer.start(None)  # type: ignore[arg-type]
+        accepted = await asyncio.gather(
+            *(writer.submit(build_transcript(number)) for number in range(20))
+        )
+        await writer.shutdown()
+
+        assert all(accepted)
+        assert writer.dropped == 0
+        assert len(read_lines(self.directory)) == 20
+
+    async def test_benchmark_p99_latency(self):
+        """
+        p99 latency of concurrent streams, dump in the request against the writer.
+        The timings are only logged, the test checks that the request never writes the file.
+        """
+        writer = TranscriptWriter(TranscriptWriterConfig(directory=self.directory))
+        await writer.start(None)  # type: ignore[arg-type]
+        loop_thread = threading.get_ident()
+        writing_threads: set[int] = set()
+        write_batch = writer._write_batch
+
+        def recording_write_batch(batch):
+            writing_threads.add(threading.get_ident())
+            write_batch(batch)
+
+        writer._write_batch = recording_write_batch  # type: ignore[method-assign]
+
+        async def store_legacy(transcript: Transcript):
+            legacy_store(self.legacy_directory, transcript)
+
+        measured: dict[str, float] = {}
+        for name, store in (("before", store_legacy), ("after", writer.submit)):
+            latencies: list[float] = []
+            for repetition in range(BENCHMARK_ROUNDS + 1):
+                measured_round = await asyncio.gather(
+                    *(
+                        stream_request(number, store)
+                        for number in range(BENCHMARK_STREAMS)
+                    )
+                )
+                # the first round warms up
+                if repetition > 0:
+                    latencies.extend(measured_round)
+            measured[name] = p99(latencies)
+        await writer.shutdown()
+
+        logger.info(
+            f"{BENCHMARK_STREAMS} concurrent streams: "
+            f"p99 before {measured['before'] * 1000:.1f} ms, "
+            f"after {measured['after'] * 1000:.1f} ms, {writer.dropped} dropped"
+        )
+        assert writer.dropped == 0
+        lines = read_lines(self.directory)
+        assert len(lines) == (BENCHMARK_ROUNDS + 1) * BENCHMARK_STREAMS
+        assert {line["chat_id"] for line in lines} == {
+            f"chat-{number}" for number in range(BENCHMARK_STREAMS)
+        }
+        # the file is only written from the worker threads, never on the event loop
+        assert writing_threads
+        assert loop_thread not in writing_threads
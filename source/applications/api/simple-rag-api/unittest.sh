@@ -0,0 +1,3 @@
+set -e 
+pytest tests/transcript_writer_test.py
+pytest tests/completions_test.py
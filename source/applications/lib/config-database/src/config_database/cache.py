@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from core.config_loader import ConfigLoader
+from core.result import Result
+from domain.database.config.interface import ConfigDatabase
+from domain.database.config.model import ConfigInterface
+from opentelemetry import metrics, trace
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=ConfigInterface)
+
+# (lookup, key), lookup is "id" or "hash"
+_CacheKey = tuple[str, str]
+
+
+class ConfigCacheConfig(BaseModel):
+    # seconds between two version checks, bounds how long another process' change stays unseen
+    poll_interval: float = 5.0
+    # unknown ids and hashes are answered with None for this many seconds
+    negative_ttl: float = 30.0
+    max_entries: int = 1000
+
+
+class ConfigCacheStats(BaseModel):
+    hits: int
+    misses: int
+    invalidations: int
+    entries: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class CachedConfigDatabase(ConfigDatabase[T], Generic[T]):
+    """
+    Read-through cache in front of a ConfigDatabase.
+    Configs are never updated in place, a change creates a new config, so found
+    configs stay valid and are only dropped when the version of the store changes.
+    Unknown ids and hashes are cached for negative_ttl seconds.
+    Concurrent lookups of the same key share one database query.
+    start() polls version_source, e.g. PostgresRAGConfigDatabase.get_version,
+    and clears the cache once it differs. Without a version source only configs
+    created through this cache invalidate the negative entries.
+    Callers get their own copy of a cached config.
+    """
+
+    def __init__(
+        self,
+        db: ConfigDatabase[T],
+        name: str,
+        config: ConfigCacheConfig = ConfigCacheConfig(),
+        version_source: Callable[[], Awaitable[Result[str]]] | None = None,
+    ):
+        self._db = db
+        self.name = name
+        self._config = config
+        self._version_source = version_source
+        self._entries: OrderedDict[_CacheKey, tuple[T | None, float]] = OrderedDict()
+        self._in_flight: dict[_CacheKey, asyncio.Future[Result[T | None]]] = {}
+        # bumped by every invalidation, loads started before are not stored
+        self._generation = 0
+        self._version: str | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+        self.tracer = trace.get_tracer("CachedConfigDatabase")
+        meter = metrics.get_meter("config_cache")
+        self._hit_counter = meter.create_counter(
+            name="config_cache.hits",
+            unit="1",
+            description="Config lookups served from the cache",
+        )
+        self._miss_counter = meter.create_counter(
+            name="config_cache.misses",
+            unit="1",
+            description="Config lookups that had to query the database",
+        )
+        self._invalidation_counter = meter.create_counter(
+            name="config_cache.invalidations",
+            unit="1",
+            description="Times the config cache was cleared after a version change",
+        )
+
+    # ---------- lifetime ----------
+    async def start(self, config_loader: ConfigLoader | None = None):
+        if self._version_source is None or self._config.poll_interval <= 0:
+            return
+        result = await self._version_source()
+        if result.is_error():
+            logger.warning(
+                f"[{self.name}] could not read the config version: {result.get_error()}"
+            )
+        else:
+            self._version = result.get_ok()
+        self._task = asyncio.create_task(self._poll())
+
+    async def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self._config.poll_interval)
+            await self.check_version()
+
+    async def check_version(self) -> Result[bool]:
+        """Clears the cache if the version of the store changed, returns whether it did."""
+        assert self._version_source, "no version source configured"
+        result = await self._version_source()
+        if result.is_error():
+            logger.warning(
+                f"[{self.name}] could not read the config version: {result.get_error()}"
+            )
+            return result.propagate_exception()
+        version = result.get_ok()
+        if version == self._version:
+            return Result.Ok(False)
+        if self._version is not None:
+            logger.info(f"[{self.name}] config version changed, clearing the cache")
+        self._version = version
+        self.invalidate()
+        return Result.Ok(True)
+
+    def invalidate(self):
+        self._entries.clear()
+        self._generation += 1
+        self._invalidations += 1
+        self._invalidation_counter.add(1, {"cache": self.name})
+
+    def stats(self) -> ConfigCacheStats:
+        return ConfigCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            invalidations=self._invalidations,
+            entries=len(self._entries),
+        )
+
+    # ---------- entries ----------
+    def _lookup(self, key: _CacheKey) -> tuple[bool, T | None]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _put(self, key: _CacheKey, value: T | None):
+        expires = (
+            float("inf")
+            if value is not None
+            else time.monotonic() + self._config.negative_ttl
+        )
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._config.max_entries:
+            self._entries.popitem(last=False)
+
+    def _store(self, config: T):
+        self._put(("id", config.id), config)
+        if config.hash:
+            self._put(("hash", config.hash), config)
+
+    @staticmethod
+    def _copy(value: T | None) -> T | None:
+        return None if value is None else value.model_copy(deep=True)
+
+    async def _get(
+        self, key: _CacheKey, load: Callable[[], Awaitable[Result[T | None]]]
+    ) -> Result[T | None]:
+        found, value = self._lookup(key)
+        attributes = {"cache": self.name, "lookup": key[0]}
+        if found:
+            self._hits += 1
+            self._hit_counter.add(1, attributes)
+            return Result.Ok(self._copy(value))
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self._hits += 1
+            self._hit_counter.add(1, attributes)
+            result = await asyncio.shield(pending)
+            return Result.Ok(self._copy(result.get_ok())) if result.is_ok() else result
+
+        self._misses += 1
+        self._miss_counter.add(1, attributes)
+        future: asyncio.Future[Result[T | None]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[key] = future
+        generation = self._generation
+        try:
+            try:
+                result = await load()
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                result = Result.Err(e)
+            if result.is_ok() and generation == self._generation:
+                loaded = result.get_ok()
+                if loaded is None:
+                    self._put(key, None)
+                else:
+                    self._store(loaded)
+            future.set_result(result)
+        finally:
+            del self._in_flight[key]
+            if not future.done():
+                future.cancel()
+        return Result.Ok(self._copy(result.get_ok())) if result.is_ok() else result
+
+    # ---------- protocol ----------
+    async def get_config_by_id(self, id: str) -> Result[T | None]:
+        with self.tracer.start_as_current_span("cached-get-config-by-id"):
+            return await self._get(("id", id), lambda: self._db.get_config_by_id(id))
+
+    async def get_config_by_hash(self, hash: str) -> Result[T | None]:
+        with self.tracer.start_as_current_span("cached-get-config-by-hash"):
+            return await self._get(
+                ("hash", hash), lambda: self._db.get_config_by_hash(hash)
+            )
+
+    async def create_config(self, obj: T) -> Result[T]:
+        result = await self._db.create_config(obj)
+        if result.is_error():
+            return result
+        self._store(result.get_ok().model_copy(deep=True))
+        return result
+
+    async def fetch_all(self) -> Result[list[T]]:
+        result = await self._db.fetch_all()
+        if result.is_ok():
+            for config in result.get_ok():
+                self._store(config.model_copy(deep=True))
+        return result
@@ -3,7 +3,7 @@ from uuid import uuid4
 from core.model import DublicateException
 from typing import Any, Generic, Type, TypeVar
 from core.result import Result
-from database.session import BaseDatabase
+from database.session import BaseDatabase, DatabaseBaseModel
 from domain.database.config.interface import (
     RAGConfigDatabase,
     RAGRetrivalConfigDatabase,
@@ -11,6 +11,7 @@ from domain.database.config.interface import (
 )
 
 from opentelemetry import trace
+from tortoise import Tortoise
 
 from pydantic import BaseModel
 from config_database.model import BasicConfig
@@ -33,6 +34,25 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=BaseModel)
 
 
+async def _table_version(*models: Type[DatabaseBaseModel]) -> Result[str]:
+    """
+    Row count and last change of the tables.
+    Changes whenever a row is created, updated or deleted through the ORM.
+    """
+    try:
+        conn = Tortoise.get_connection("default")
+        parts: list[str] = []
+        for model in models:
+            rows = await conn.execute_query_dict(
+                f'SELECT count(*) AS row_count, max(updated_at) AS last_change FROM "{model._meta.db_table}"'
+            )
+            parts.append(f"{rows[0]['row_count']}:{rows[0]['last_change']}")
+        return Result.Ok("|".join(parts))
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return Result.Err(e)
+
+
 class _InternPostgreDBRetrievalConfig(BaseDatabase[RagRetrievalConfigDB]):
     def __init__(self):
         super().__init__(RagRetrievalConfigDB)
@@ -127,6 +147,10 @@ class PostgresRAGEmbeddingConfigDatabase(RAGEmbeddingConfigDatabase):
             return result.propagate_exception()
         return Result.Ok([self._to_domain(o) for o in result.get_ok()])
 
+    async def get_version(self) -> Result[str]:
+        """Changes with every change of the stored embedding configs."""
+        return await _table_version(RagEmbeddingConfigDB)
+
 
 # ======================================================================================
 # 2) Retrieval config repository
@@ -208,6 +232,10 @@ class PostgresRAGRetrievalConfigDatabase(RAGRetrivalConfigDatabase):
             return result.propagate_exception()
         return Result.Ok([self._to_domain(o) for o in result.get_ok()])
 
+    async def get_version(self) -> Result[str]:
+        """Changes with every change of the stored retrieval configs."""
+        return await _table_version(RagRetrievalConfigDB)
+
 
 # ======================================================================================
 # 3) Top-level RAG config repository (orchestrates embedding + retrieval)
@@ -372,6 +400,12 @@ class PostgresRAGConfigDatabase(RAGConfigDatabase):
             logger.error(e, exc_info=True)
             return Result.Err(e)
 
+    async def get_version(self) -> Result[str]:
+        """Changes with every change of the RAG configs or the configs they combine."""
+        return await _table_version(
+            RagConfigDB, RagEmbeddingConfigDB, RagRetrievalConfigDB
+        )
+
 
 class PostgresSystemConfigDatabase(SystemConfigDatabase[T]):
     _db_config: _InternPostgreDBSystemConfig[T]
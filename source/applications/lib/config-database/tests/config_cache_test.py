@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import random
+import time
+from uuid import uuid4
+
+from core.logger import init_logging
+from core.result import Result
+from domain.database.config.interface import RAGEmbeddingConfigDatabase
+from domain.database.config.model import RagEmbeddingConfig
+from domain_test import AsyncTestBase
+
+from config_database.cache import CachedConfigDatabase, ConfigCacheConfig
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+# latency of one query against the stub store
+QUERY_LATENCY = 0.002
+POLL_INTERVAL = 0.05
+
+
+def embedding_config(chunk_size: int) -> RagEmbeddingConfig:
+    config = RagEmbeddingConfig(
+        id="",
+        chunk_size=chunk_size,
+        chunk_overlap=0,
+        models={"EMBEDDING_MODEL": "model"},
+        addition_information={},
+    )
+    config.compute_config_hash()
+    return config
+
+
+class InMemoryEmbeddingConfigStore(RAGEmbeddingConfigDatabase):
+    """Config store with a query latency and a version bumped by every write."""
+
+    def __init__(self):
+        self.configs: dict[str, RagEmbeddingConfig] = {}
+        self.queries = 0
+        self.version = 0
+
+    async def _query(self):
+        self.queries += 1
+        await asyncio.sleep(QUERY_LATENCY)
+
+    async def get_config_by_id(self, id: str) -> Result[RagEmbeddingConfig | None]:
+        await self._query()
+        config = self.configs.get(id)
+        return Result.Ok(None if config is None else config.model_copy(deep=True))
+
+    async def get_config_by_hash(self, hash: str) -> Result[RagEmbeddingConfig | None]:
+        await self._query()
+        for config in self.configs.values():
+            if config.hash == hash:
+                return Result.Ok(config.model_copy(deep=True))
+        return Result.Ok(None)
+
+    async def create_config(self, obj: RagEmbeddingConfig) -> Result[RagEmbeddingConfig]:
+        await self._query()
+        created = obj.model_copy(update={"id": obj.id or str(uuid4())})
+        self.configs[created.id] = created
+        self.version += 1
+        return Result.Ok(created)
+
+    async def fetch_all(self) -> Result[list[RagEmbeddingConfig]]:
+        await self._query()
+        return Result.Ok(list(self.configs.values()))
+
+    async def delete(self, id: str):
+        """A change made by another process, the cache only learns it from the version."""
+        del self.configs[id]
+        self.version += 1
+
+    async def get_version(self) -> Result[str]:
+        await asyncio.sleep(QUERY_LATENCY)
+        return Result.Ok(str(self.version))
+
+
+class TestCachedConfigDatabase(AsyncTestBase):
+    __test__ = True
+
+    def setup_method_sync(self, test_name: str):
+        self.store = InMemoryEmbeddingConfigStore()
+        self.cache = CachedConfigDatabase(
+            self.store,
+            name=test_name,
+            config=ConfigCacheConfig(poll_interval=POLL_INTERVAL, negative_ttl=0.2),
+            version_source=self.store.get_version,
+        )
+
+    async def teardown_method_async(self, test_name: str):
+        await self.cache.shutdown()
+
+    async def _fill(self, count: int) -> list[RagEmbeddingConfig]:
+        configs = []
+        for chunk_size in range(count):
+            result = await self.store.create_config(embedding_config(chunk_size))
+            configs.append(result.get_ok())
+        self.store.queries = 0
+        return configs
+
+    async def test_hit_ratio_of_a_request_mix(self):
+        configs = await self._fill(10)
+        rng = random.Random(7)
+        lookups = 2000
+
+        start = time.perf_counter()
+        for _ in range(lookups):
+            config = rng.choice(configs)
+            if rng.random() < 0.8:
+                result = await self.cache.get_config_by_id(config.id)
+            else:
+                result = await self.cache.get_config_by_hash(config.hash)
+            assert result.get_ok() == config
+        elapsed = time.perf_counter() - start
+
+        stats = self.cache.stats()
+        logger.info(
+            f"{lookups} lookups of {len(configs)} configs: hit ratio "
+            f"{stats.hit_ratio:.3f}, {self.store.queries} queries, mean latency "
+            f"{elapsed / lookups * 1000:.3f} ms against {QUERY_LATENCY * 1000:.0f} ms per query"
+        )
+        # one query per id and per hash at most
+        assert self.store.queries <= 2 * len(configs)
+        assert stats.hit_ratio >= 0.99
+
+    async def test_concurrent_lookups_share_one_query(self):
+        configs = await self._fill(1)
+        results = await asyncio.gather(
+            *(self.cache.get_config_by_id(configs[0].id) for _ in range(50))
+        )
+        assert all(r.get_ok() == configs[0] for r in results)
+        assert self.store.queries == 1
+
+    async def test_unknown_ids_are_cached_until_the_ttl(self):
+        for _ in range(20):
+            assert (await self.cache.get_config_by_id("unknown")).get_ok() is None
+        assert self.store.queries == 1
+
+        await asyncio.sleep(0.25)
+        assert (await self.cache.get_config_by_id("unknown")).get_ok() is None
+        assert self.store.queries == 2
+
+    async def test_created_configs_replace_negative_entries(self):
+        config = embedding_config(512)
+        assert (await self.cache.get_config_by_hash(config.hash)).get_ok() is None
+
+        created = (await self.cache.create_config(config)).get_ok()
+        self.store.queries = 0
+        assert (await self.cache.get_config_by_hash(config.hash)).get_ok() == created
+        assert (await self.cache.get_config_by_id(created.id)).get_ok() == created
+        assert self.store.queries == 0
+
+    async def test_returned_configs_are_copies(self):
+        configs = await self._fill(1)
+        first = (await self.cache.get_config_by_id(configs[0].id)).get_ok()
+        assert first
+        first.models["EMBEDDING_MODEL"] = "changed"
+        second = (await self.cache.get_config_by_id(configs[0].id)).get_ok()
+        assert second and second.models["EMBEDDING_MODEL"] == "model"
+
+    async def test_invalidation_latency(self):
+        configs = await self._fill(2)
+        await self.cache.start()
+        assert (await self.cache.get_config_by_id(configs[0].id)).get_ok()
+        assert (await self.cache.get_config_by_id("created-elsewhere")).get_ok() is None
+
+        # another process deletes one config and creates the one that was unknown
+        changed = time.perf_counter()
+        await self.store.delete(configs[0].id)
+        await self.store.create_config(
+            embedding_config(4096).model_copy(update={"id": "created-elsewhere"})
+        )
+
+        latencies: dict[str, float] = {}
+        while len(latencies) < 2:
+            if "deleted" not in latencies:
+                if (await self.cache.get_config_by_id(configs[0].id)).get_ok() is None:
+                    latencies["deleted"] = time.perf_counter() - changed
+            if "created" not in latencies:
+                if (await self.cache.get_config_by_id("created-elsewhere")).get_ok():
+                    latencies["created"] = time.perf_counter() - changed
+            assert time.perf_counter() - changed < 1.0, "change was not picked up"
+            await asyncio.sleep(0.001)
+
+        logger.info(
+            f"invalidation latency with a poll interval of {POLL_INTERVAL * 1000:.0f} ms: "
+            f"deleted {latencies['deleted'] * 1000:.1f} ms, "
+            f"created {latencies['created'] * 1000:.1f} ms"
+        )
+        assert max(latencies.values()) < POLL_INTERVAL * 2
+        # the other config is loaded again after the invalidation
+        assert (await self.cache.get_config_by_id(configs[1].id)).get_ok() == configs[1]
@@ -133,3 +133,16 @@ class TestPostgresRAGConfigDatabase(TestRAGConfigDatabase):
 
     async def teardown_method_async(self, test_name: str):
         await self.session.shutdown()
+
+    async def test_version_changes_with_new_configs(self):
+        before = await self.db_rag.get_version()
+        assert before.is_ok()
+        assert (await self.db_rag.get_version()).get_ok() == before.get_ok()
+
+        emb = self._make_embedding()
+        emb.compute_config_hash()
+        assert (await self.db_embedding.create_config(emb)).is_ok()
+
+        after = await self.db_rag.get_version()
+        assert after.is_ok()
+        assert after.get_ok() != before.get_ok()
@@ -0,0 +1,2 @@
+set -e 
+pytest tests/config_cache_test.py
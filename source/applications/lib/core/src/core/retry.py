@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import random
+import time
+from enum import Enum
+from typing import Awaitable, Callable, TypeVar
+
+from opentelemetry import metrics
+from pydantic import BaseModel
+
+from core.result import Result
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+class RetryDecision(Enum):
+    STOP = "stop"
+    """the error will not go away, return it"""
+    BACKOFF = "backoff"
+    """wait the backoff, then try again"""
+    IMMEDIATE = "immediate"
+    """try again right away, something else paces the caller (e.g. a rate limiter)"""
+
+
+class RetryConfig(BaseModel):
+    attempts: int = 3
+    initial_backoff: float = 1.0
+    multiplier: float = 2.0
+    max_backoff: float = 30.0
+    # share of the backoff drawn at random, so failed callers do not retry in lockstep
+    jitter: float = 0.2
+    # no retry is started once it would end after this many seconds
+    max_elapsed: float | None = None
+
+
+def retry_all(error: Exception) -> RetryDecision:
+    return RetryDecision.BACKOFF
+
+
+class RetryPolicy:
+    """
+    Retries an operation returning a Result with exponential backoff.
+    The async variant waits with asyncio.sleep, the event loop keeps serving
+    other coroutines while one of them backs off.
+    Raised exceptions are treated like errors of the Result.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: RetryConfig = RetryConfig(),
+        classify: Callable[[Exception], RetryDecision] = retry_all,
+    ):
+        self.name = name
+        self._config = config
+        self._classify = classify
+        meter = metrics.get_meter("retry_policy")
+        self._retry_counter = meter.create_counter(
+            name="retry.retries",
+            unit="1",
+            description="Attempts repeated after a failure",
+        )
+        self._backoff_histogram = meter.create_histogram(
+            name="retry.backoff",
+            unit="s",
+            description="Time waited before a retry",
+        )
+        self._exhausted_counter = meter.create_counter(
+            name="retry.exhausted",
+            unit="1",
+            description="Operations that failed after their last attempt",
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Wait after the failed *attempt* (starting at 1)."""
+        delay = min(
+            self._config.initial_backoff * self._config.multiplier ** (attempt - 1),
+            self._config.max_backoff,
+        )
+        return delay * (1.0 - self._config.jitter * random.random())
+
+    async def run(self, operation: Callable[[], Awaitable[Result[T]]]) -> Result[T]:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = await operation()
+            except Exception as e:
+                result = Result.Err(e)
+            if result.is_ok():
+                return result
+            delay = self._next_delay(attempt, started, result.get_error())
+            if delay is None:
+                return result
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def run_sync(self, operation: Callable[[], Result[T]]) -> Result[T]:
+        """Blocking variant for sync clients, only blocks the calling thread."""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = operation()
+            except Exception as e:
+                result = Result.Err(e)
+            if result.is_ok():
+                return result
+            delay = self._next_delay(attempt, started, result.get_error())
+            if delay is None:
+                return result
+            if delay > 0:
+                time.sleep(delay)
+
+    def _next_delay(
+        self, attempt: int, started: float, error: Exception
+    ) -> float | None:
+        """Seconds to wait before the next attempt, None to give up."""
+        attributes = {"policy": self.name, "error": type(error).__name__}
+        decision = self._classify(error)
+        if decision == RetryDecision.STOP:
+            logger.warning(f"[{self.name}] error is not retryable: {error}")
+            return None
+        if attempt >= self._config.attempts:
+            logger.warning(
+                f"[{self.name}] failed after {attempt} attempt(s): {error}"
+            )
+            self._exhausted_counter.add(1, attributes)
+            return None
+
+        delay = self.backoff(attempt) if decision == RetryDecision.BACKOFF else 0.0
+        elapsed = time.monotonic() - started
+        if (
+            self._config.max_elapsed is not None
+            and elapsed + delay > self._config.max_elapsed
+        ):
+            logger.warning(
+                f"[{self.name}] giving up after {elapsed:.1f}s and {attempt} attempt(s): {error}"
+            )
+            self._exhausted_counter.add(1, attributes)
+            return None
+
+        logger.warning(
+            f"[{self.name}] error on attempt {attempt}/{self._config.attempts}, "
+            f"retrying in {delay:.2f}s: {error}"
+        )
+        self._retry_counter.add(1, attributes)
+        self._backoff_histogram.record(delay, {"policy": self.name})
+        return delay
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+import pytest
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from core.logger import init_logging
+from core.result import Result
+from core.retry import RetryConfig, RetryDecision, RetryPolicy
+
+init_logging("debug")
+logger = logging.getLogger(__name__)
+
+reader = InMemoryMetricReader()
+metrics.set_meter_provider(MeterProvider(metric_readers=[reader]))
+
+
+# ---------- Helpers ----------
+
+
+class Flaky:
+    """Fails *failures* times with *error*, then returns ok."""
+
+    def __init__(self, failures: int, error: Exception | None = None):
+        self.failures = failures
+        self.error = error or RuntimeError("flaky")
+        self.calls = 0
+
+    async def __call__(self) -> Result[str]:
+        self.calls += 1
+        if self.calls <= self.failures:
+            return Result.Err(self.error)
+        return Result.Ok("done")
+
+
+def fast(**overrides: Any) -> RetryConfig:
+    return RetryConfig(
+        **{"attempts": 3, "initial_backoff": 0.01, "jitter": 0.0, **overrides}
+    )
+
+
+def metric_points(name: str, policy: str) -> list[Any]:
+    data = reader.get_metrics_data()
+    points: list[Any] = []
+    if data is None:
+        return points
+    for resource_metric in data.resource_metrics:
+        for scope_metric in resource_metric.scope_metrics:
+            for metric in scope_metric.metrics:
+                if metric.name == name:
+                    points.extend(
+                        p
+                        for p in metric.data.data_points
+                        if p.attributes.get("policy") == policy
+                    )
+    return points
+
+
+# ---------- Tests ----------
+
+
+@pytest.mark.asyncio
+class TestRetryPolicy:
+    async def test_retries_until_ok(self):
+        operation = Flaky(failures=2)
+        res = await RetryPolicy("until-ok", fast()).run(operation)
+        assert res.is_ok() and res.get_ok() == "done"
+        assert operation.calls == 3
+
+    async def test_returns_last_error_after_all_attempts(self):
+        operation = Flaky(failures=5)
+        res = await RetryPolicy("exhausted", fast()).run(operation)
+        assert res.is_error()
+        assert "flaky" in str(res.get_error())
+        assert operation.calls == 3
+
+    async def test_raised_exceptions_are_retried(self):
+        calls = 0
+
+        async def raises() -> Result[str]:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ConnectionError("reset")
+            return Result.Ok("done")
+
+        res = await RetryPolicy("raises", fast()).run(raises)
+        assert res.is_ok() and calls == 2
+
+    async def test_stop_is_not_retried(self):
+        operation = Flaky(failures=5, error=ValueError("bad request"))
+        policy = RetryPolicy(
+            "stop",
+            fast(),
+            classify=lambda e: RetryDecision.STOP
+            if isinstance(e, ValueError)
+            else RetryDecision.BACKOFF,
+        )
+        res = await policy.run(operation)
+        assert res.is_error() and operation.calls == 1
+
+    async def test_immediate_does_not_wait(self):
+        operation = Flaky(failures=2)
+        policy = RetryPolicy(
+            "immediate",
+            fast(initial_backoff=10.0),
+            classify=lambda _: RetryDecision.IMMEDIATE,
+        )
+        start = time.perf_counter()
+        res = await policy.run(operation)
+        assert res.is_ok()
+        assert time.perf_counter() - start < 1.0
+
+    async def test_max_elapsed_stops_before_the_attempts_run_out(self):
+        operation = Flaky(failures=10)
+        policy = RetryPolicy(
+            "elapsed", fast(attempts=10, initial_backoff=0.05, max_elapsed=0.12)
+        )
+        res = await policy.run(operation)
+        assert res.is_error()
+        # waits 0.05 and 0.1, the third wait of 0.2 would end after 0.12s
+        assert operation.calls == 2
+
+    async def test_backoff_grows_and_is_capped(self):
+        policy = RetryPolicy(
+            "backoff",
+            RetryConfig(initial_backoff=1.0, multiplier=2.0, max_backoff=5.0, jitter=0.5),
+        )
+        for attempt, base in ((1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (10, 5.0)):
+            for _ in range(20):
+                assert base * 0.5 <= policy.backoff(attempt) <= base
+
+    async def test_concurrent_coroutines_progress_while_one_backs_off(self):
+        operation = Flaky(failures=1)
+        policy = RetryPolicy("concurrent", fast(initial_backoff=0.5))
+        ticks: list[float] = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        try:
+            res = await policy.run(operation)
+        finally:
+            ticking.cancel()
+        backing_off = time.perf_counter() - start
+
+        assert res.is_ok() and operation.calls == 2
+        assert backing_off >= 0.5
+        # the ticker kept its pace during the whole backoff
+        assert len(ticks) >= 25
+        assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+
+    async def test_retries_and_backoff_are_recorded(self):
+        operation = Flaky(failures=2)
+        res = await RetryPolicy("metrics", fast()).run(operation)
+        assert res.is_ok()
+
+        retries = metric_points("retry.retries", "metrics")
+        assert sum(p.value for p in retries) == 2
+        backoff = metric_points("retry.backoff", "metrics")
+        assert sum(p.count for p in backoff) == 2
+        # 0.01 after the first failure, 0.02 after the second
+        assert backoff[0].sum == pytest.approx(0.03)
+
+        await RetryPolicy("metrics-exhausted", fast(attempts=1)).run(Flaky(failures=1))
+        exhausted = metric_points("retry.exhausted", "metrics-exhausted")
+        assert sum(p.value for p in exhausted) == 1
+
+
+class TestRetryPolicySync:
+    def test_run_sync_retries_until_ok(self):
+        calls = 0
+
+        def operation() -> Result[str]:
+            nonlocal calls
+            calls += 1
+            if calls < 3:
+                return Result.Err(RuntimeError("flaky"))
+            return Result.Ok("done")
+
+        res = RetryPolicy("sync", fast()).run_sync(operation)
+        assert res.is_ok() and calls == 3
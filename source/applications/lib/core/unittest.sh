@@ -4,4 +4,5 @@ pytest tests/result_tests.py
 pytest tests/enviroment_setter.py
 pytest tests/encodeing_tests.py
 pytest tests/que_tests.py
+pytest tests/retry_tests.py
 
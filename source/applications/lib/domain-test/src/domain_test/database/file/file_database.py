@@ -103,6 +103,46 @@ class TestFileDatabase(AsyncTestBase):
         # other_metadata should survive unchanged
         assert get_res.get_ok().metadata.other_metadata == f.metadata.other_metadata
 
+    async def test_update_pages(self):
+        f = self._create_test_file()
+        second_page = f.pages[0].model_copy(
+            deep=True, update={"page_number": 2}
+        )
+        second_page.fragements.append(
+            PageFragement(
+                fragement_type=FragementTypes.IMAGE,
+                fragement_number=2,
+                storage_filename="image.png",
+            )
+        )
+        f.pages.append(second_page)
+        create = await self.db.create(f)
+        assert create.is_ok()
+        file_id = create.get_ok()
+
+        # page 1 changes a fragment, page 2 loses one, page 3 is new
+        updated = f.model_copy(deep=True, update={"id": file_id})
+        updated.pages[0].fragements[0].storage_filename = "changed.md"
+        updated.pages[1].fragements.pop()
+        third_page = f.pages[0].model_copy(deep=True, update={"page_number": 3})
+        updated.pages.append(third_page)
+        assert (await self.db.update(updated)).is_ok()
+
+        stored = (await self.db.get(file_id)).get_ok()
+        assert stored is not None
+        assert [p.page_number for p in stored.pages] == [1, 2, 3]
+        assert [
+            [fragement.storage_filename for fragement in p.fragements]
+            for p in stored.pages
+        ] == [["changed.md"], ["hello.md"], ["hello.md"]]
+
+        # dropping a page removes it with its fragments
+        updated.pages = updated.pages[1:]
+        assert (await self.db.update(updated)).is_ok()
+        stored = (await self.db.get(file_id)).get_ok()
+        assert stored is not None
+        assert [p.page_number for p in stored.pages] == [2, 3]
+
     async def test_delete(self):
         f = self._create_test_file()
         create = await self.db.create(f)
@@ -134,6 +174,100 @@ class TestFileDatabase(AsyncTestBase):
         assert fetched.filepath == f.filepath
         assert fetched.metadata.other_metadata == f.metadata.other_metadata
 
+    async def test_fetch_headers_by_path(self):
+        f1 = self._create_test_file()
+        f2 = self._create_test_file().model_copy(update={"filepath": "/other/b.pdf"})
+        f3 = self._create_test_file().model_copy(update={"filepath": "/other/c.pdf"})
+        for f in (f1, f2, f3):
+            result = await self.db.create(f)
+            if result.is_error():
+                logger.error(result.get_error())
+            assert result.is_ok()
+
+        res = await self.db.fetch_header_by_path(f1.filepath)
+        assert res.is_ok()
+        header = res.get_ok()
+        assert header is not None
+        assert header.filepath == f1.filepath
+        assert header.metadata.version == f1.metadata.version
+        assert header.metadata.other_metadata == f1.metadata.other_metadata
+        assert (await self.db.fetch_header_by_path("/missing.pdf")).get_ok() is None
+
+        res = await self.db.fetch_headers_by_paths(
+            [f1.filepath, f3.filepath, "/missing.pdf"]
+        )
+        if res.is_error():
+            logger.error(res.get_error())
+        assert res.is_ok()
+        assert {f.filepath for f in res.get_ok()} == {f1.filepath, f3.filepath}
+
+    async def test_fetch_by_paths(self):
+        f1 = self._create_test_file()
+        f2 = self._create_test_file().model_copy(update={"filepath": "/other/b.pdf"})
+        for f in (f1, f2):
+            assert (await self.db.create(f)).is_ok()
+
+        res = await self.db.fetch_by_paths([f1.filepath, "/missing.pdf"])
+        if res.is_error():
+            logger.error(res.get_error())
+        assert res.is_ok()
+        assert [f.filepath for f in res.get_ok()] == [f1.filepath]
+        assert res.get_ok()[0].pages == []
+
+    async def test_headers_by_path_are_newest_first(self):
+        ids: list[str] = []
+        for version in range(3):
+            f = self._create_test_file()
+            f.metadata.version = version
+            result = await self.db.create(f)
+            assert result.is_ok()
+            ids.append(result.get_ok())
+
+        header = (await self.db.fetch_header_by_path(f.filepath)).get_ok()
+        assert header is not None
+        assert header.id == ids[-1]
+        headers = (await self.db.fetch_headers_by_paths([f.filepath])).get_ok()
+        assert [h.id for h in headers] == ids[::-1]
+
+    async def test_list_headers(self):
+        project_id = str(uuid.uuid4())
+        ids: list[str] = []
+        for version in range(5):
+            f = self._create_test_file().model_copy(
+                update={"filepath": f"/listing/{version}.pdf"}
+            )
+            f.metadata.project_id = project_id
+            f.metadata.version = version
+            result = await self.db.create(f)
+            assert result.is_ok()
+            ids.append(result.get_ok())
+        other = self._create_test_file()
+        assert (await self.db.create(other)).is_ok()
+
+        # keyset pages continue after the last id of the previous page
+        first = (await self.db.list_headers(limit=2, project_id=project_id)).get_ok()
+        rest = (
+            await self.db.list_headers(
+                after_id=first[-1].id, limit=10, project_id=project_id
+            )
+        ).get_ok()
+        assert len(first) == 2 and len(rest) == 3
+        assert sorted(h.id for h in first + rest) == sorted(ids)
+
+        below = await self.db.list_headers(project_id=project_id, below_version=2)
+        assert sorted(h.metadata.version for h in below.get_ok()) == [0, 1]
+        by_path = await self.db.list_headers(path_contains="/listing/3")
+        assert [h.filepath for h in by_path.get_ok()] == ["/listing/3.pdf"]
+
+        batches = [
+            result.get_ok()
+            async for result in self.db.iterate_headers(
+                batch_size=2, project_id=project_id
+            )
+        ]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert sorted(h.id for batch in batches for h in batch) == sorted(ids)
+
     async def test_search_by_name(self):
         f1 = self._create_test_file()
         f2 = self._create_test_file().model_copy(update={"filename": "another.pdf"})
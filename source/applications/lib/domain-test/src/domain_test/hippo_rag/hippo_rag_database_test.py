@@ -184,6 +184,78 @@ class TestDBStateStore(AsyncTestBase):
         r_empty = await self.state_store.fetch_not_existing_documents([])
         assert r_empty.is_ok() and r_empty.get_ok() == []
 
+    async def test_fetch_existing_documents(self):
+        d1, d2 = self._make_document("d1"), self._make_document("d2")
+        await self.state_store.store_openie_info(DocumentCollection(docs=[d1, d2]))
+
+        ids = ["d1", "d3"] + [f"missing-{i}" for i in range(5000)]
+        r = await self.state_store.fetch_existing_documents(ids)
+        if r.is_error():
+            logger.error(r.get_error())
+        assert r.is_ok()
+        assert r.get_ok() == {"d1"}
+
+        r_empty = await self.state_store.fetch_existing_documents([])
+        assert r_empty.is_ok() and r_empty.get_ok() == set()
+
+    async def test_bulk_lookups(self):
+        t1: Triple = ("e1", "relates", "e2")
+        t2: Triple = ("e2", "connects", "e3")
+        d1 = self._make_document("d1", triples=[t1])
+        d2 = self._make_document("d2", triples=[t1, t2])
+        result = await self.state_store.store_openie_info(
+            DocumentCollection(docs=[d1, d2])
+        )
+        if result.is_error():
+            logger.error(result.get_error())
+        assert result.is_ok()
+
+        triples = await self.state_store.triples_to_docs_bulk(
+            [t1, t2, ("x", "y", "z")]
+        )
+        if triples.is_error():
+            logger.error(triples.get_error())
+        assert triples.is_ok()
+        assert triples.get_ok() == {
+            t1: {"d1", "d2"},
+            t2: {"d2"},
+            ("x", "y", "z"): set(),
+        }
+
+        entities = await self.state_store.ent_nodes_to_chunks_bulk(
+            [compute_mdhash_id(e) for e in ["e1", "e2", "e3", "missing"]]
+        )
+        if entities.is_error():
+            logger.error(entities.get_error())
+        assert entities.is_ok()
+        assert entities.get_ok() == {
+            compute_mdhash_id("e1"): {"d1", "d2"},
+            compute_mdhash_id("e2"): {"d1", "d2"},
+            compute_mdhash_id("e3"): {"d2"},
+            compute_mdhash_id("missing"): set(),
+        }
+
+    async def test_load_openie_info_after(self):
+        docs = [self._make_document(f"d{i}") for i in range(5)]
+        result = await self.state_store.store_openie_info(DocumentCollection(docs=docs))
+        if result.is_error():
+            logger.error(result.get_error())
+        assert result.is_ok()
+
+        seen: list[str] = []
+        after: str | None = None
+        while True:
+            page = await self.state_store.load_openie_info_after(after, chunk_size=2)
+            if page.is_error():
+                logger.error(page.get_error())
+            assert page.is_ok()
+            page_docs = page.get_ok().docs
+            if not page_docs:
+                break
+            seen.extend(d.idx for d in page_docs)
+            after = page_docs[-1].idx
+        assert seen == sorted(d.idx for d in docs)
+
     async def test_fetch_chunks_by_ids(self):
         docs = [self._make_document(f"d{i}") for i in range(1, 4)]
         result = await self.state_store.store_openie_info(DocumentCollection(docs=docs))
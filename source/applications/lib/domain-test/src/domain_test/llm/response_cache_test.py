@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from domain.llm.interface import LLMResponseCacheStore
+from domain_test import AsyncTestBase
+
+logger = logging.getLogger(__name__)
+
+
+class TestLLMResponseCacheStore(AsyncTestBase):
+    """
+    Storage-agnostic tests for LLM response cache backends.
+    Subclasses must assign `self.store` in setup_method_async.
+    """
+
+    store: LLMResponseCacheStore
+
+    async def test_set_and_get(self):
+        assert (await self.store.set("key-1", "grading", '{"a": 1}', None)).is_ok()
+        result = await self.store.get("key-1")
+        assert result.is_ok()
+        assert result.get_ok() == '{"a": 1}'
+
+    async def test_missing_key(self):
+        result = await self.store.get("does-not-exist")
+        assert result.is_ok()
+        assert result.get_ok() is None
+
+    async def test_overwrite(self):
+        assert (await self.store.set("key-1", "grading", "old", None)).is_ok()
+        assert (await self.store.set("key-1", "grading", "new", None)).is_ok()
+        assert (await self.store.get("key-1")).get_ok() == "new"
+
+    async def test_expired_entries_are_not_returned(self):
+        assert (await self.store.set("short", "qa", "value", 0.2)).is_ok()
+        assert (await self.store.set("long", "qa", "value", 60)).is_ok()
+        assert (await self.store.get("short")).get_ok() == "value"
+        await asyncio.sleep(0.3)
+        assert (await self.store.get("short")).get_ok() is None
+        assert (await self.store.get("long")).get_ok() == "value"
+
+    async def test_clear_namespace(self):
+        assert (await self.store.set("a", "grading", "1", None)).is_ok()
+        assert (await self.store.set("b", "openie", "2", None)).is_ok()
+
+        assert (await self.store.clear("grading")).is_ok()
+        assert (await self.store.get("a")).get_ok() is None
+        assert (await self.store.get("b")).get_ok() == "2"
+
+        assert (await self.store.clear()).is_ok()
+        assert (await self.store.get("b")).get_ok() is None
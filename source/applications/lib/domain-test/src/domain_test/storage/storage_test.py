@@ -1,5 +1,7 @@
 # domain_test/storage/file_storage.py
 import logging
+import os
+import tempfile
 from typing import Any
 
 from core.result import Result
@@ -97,6 +99,31 @@ class TestDBFileStorage(AsyncTestBase):
         assert metadata.version == new_version
         assert metadata.db_id == db_id
 
+    def test_upload_from_path(self):
+        filename = "streamed.bin"
+        content = bytes(range(256)) * 4096
+        with tempfile.NamedTemporaryFile(delete=False) as local_file:
+            local_file.write(content)
+        try:
+            upload_result = self.storage.upload_from_path(
+                path=local_file.name,
+                filename=filename,
+                bucket=self.bucket,
+                filetype="application/octet-stream",
+                metadata=FileStorageObjectMetadata(version=3, db_id="streamed_id"),
+            )
+            self._assert_ok(upload_result)
+        finally:
+            os.remove(local_file.name)
+
+        fetch_result = self.storage.fetch_file(filename, bucket=self.bucket)
+        self._assert_ok(fetch_result)
+        file = fetch_result.get_ok()
+        assert file is not None
+        assert file.content == content
+        assert file.metadata.version == 3
+        assert file.metadata.db_id == "streamed_id"
+
     def test_does_file_exist(self):
         filename = "existence-check.txt"
         content = b"check me"
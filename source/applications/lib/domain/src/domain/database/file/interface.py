@@ -1,6 +1,8 @@
+from typing import AsyncIterator
+
 from core.result import Result
 from domain.database import BaseDatabase
-from domain.database.file.model import File, FilePage
+from domain.database.file.model import File, FileHeader, FilePage
 
 
 class FileDatabase(BaseDatabase[File]):
@@ -14,6 +16,10 @@ class FileDatabase(BaseDatabase[File]):
 
     async def search_by_path(self, path: str) -> Result[list[File]]: ...
 
+    async def fetch_by_paths(self, paths: list[str]) -> Result[list[File]]:
+        """Files stored under any of *paths*, newest first, without their pages."""
+        ...
+
     async def fetch_by_name(self, name: str) -> Result[File | None]: ...
 
     async def search_by_name(self, name: str) -> Result[list[File]]: ...
@@ -27,3 +33,51 @@ class FileDatabase(BaseDatabase[File]):
     async def fetch_file_pages_blow_a_certain_version(
         self, version: int
     ) -> Result[list[FilePage]]: ...
+
+    async def fetch_header_by_path(self, path: str) -> Result[FileHeader | None]:
+        """Header of the newest file stored under *path*."""
+        ...
+
+    async def fetch_headers_by_paths(
+        self, paths: list[str]
+    ) -> Result[list[FileHeader]]:
+        """Headers of the files stored under any of *paths*, newest first."""
+        ...
+
+    async def list_headers(
+        self,
+        after_id: str | None = None,
+        limit: int = 1000,
+        project_id: str | None = None,
+        below_version: int | None = None,
+        path_contains: str | None = None,
+    ) -> Result[list[FileHeader]]:
+        """
+        Headers ordered by id, starting after *after_id*.
+        Pass the id of the last header to get the next page.
+        """
+        ...
+
+    async def iterate_headers(
+        self,
+        batch_size: int = 1000,
+        project_id: str | None = None,
+        below_version: int | None = None,
+        path_contains: str | None = None,
+    ) -> AsyncIterator[Result[list[FileHeader]]]:
+        """Pages through all matching headers, stops after the first error."""
+        after_id: str | None = None
+        while True:
+            result = await self.list_headers(
+                after_id=after_id,
+                limit=batch_size,
+                project_id=project_id,
+                below_version=below_version,
+                path_contains=path_contains,
+            )
+            if result.is_ok() and len(result.get_ok()) == 0:
+                return
+            yield result
+            if result.is_error() or len(result.get_ok()) < batch_size:
+                return
+            after_id = result.get_ok()[-1].id
@@ -61,3 +61,23 @@ class File(BaseModel):
     def get_file_without_suffix(self) -> str:
         suffix = self.get_file_suffix()
         return self.filename.replace(f".{suffix}", "")
+
+
+class FileHeader(BaseModel):
+    """A file without its pages, enough to decide whether it needs processing."""
+
+    id: str
+    filepath: str
+    filename: str
+    bucket: str
+    metadata: FileMetadata
+
+    def to_file(self) -> File:
+        return File(
+            id=self.id,
+            filepath=self.filepath,
+            filename=self.filename,
+            bucket=self.bucket,
+            metadata=self.metadata,
+            pages=[],
+        )
@@ -1,4 +1,4 @@
-from typing import Protocol, runtime_checkable
+from typing import Iterable, Protocol, runtime_checkable
 from core.result import Result
 from domain.file_converter.model import Page, PageLite
 
@@ -7,7 +7,12 @@ from domain.file_converter.model import Page, PageLite
 class FileConverter(Protocol):
     def does_convert_filetype(self, filetype: str) -> bool: ...
 
-    def convert_file(self, file: str) -> Result[list[Page]]: ...
+    def convert_file(self, file: str) -> Result[Iterable[Page]]:
+        """
+        The pages may be produced lazily while they are iterated, the file has to
+        exist until then and errors of lazily produced pages are raised by the iteration.
+        """
+        ...
 
 
 class FileConverterServiceClient(Protocol):
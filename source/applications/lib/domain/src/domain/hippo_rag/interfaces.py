@@ -139,6 +139,7 @@ class EmbeddingStoreInterface(Protocol):
     async def insert_strings(
         self,
         texts: list[str],
+        metadata: dict[str, str | int | float] | None = None,
     ) -> Result[None]: ...
     async def is_doc_already_inserted(
         self, texts: list[str]
@@ -163,6 +164,30 @@ class EmbeddingStoreInterface(Protocol):
         self, hash_ids: list[str], collection: str
     ) -> Result[None]: ...
 
+    # --- payload filter ---
+    async def set_filter_payload(
+        self, point_metadata: dict[str, dict[str, list[str]]]
+    ) -> Result[None]: ...
+    async def replace_filter_payload(
+        self, point_metadata: dict[str, dict[str, list[str]]]
+    ) -> Result[None]: ...
+    async def ensure_payload_indexes(
+        self, collection: str | None = None
+    ) -> Result[None]: ...
+    async def is_payload_filter_ready(
+        self, collection: str | None = None
+    ) -> Result[bool]: ...
+    async def payload_filter_applies(
+        self,
+        metadata_filter: dict[str, list[str] | list[int] | list[float]] | None,
+        collection: str | None = None,
+    ) -> Result[bool]: ...
+    async def get_ids_by_metadata(
+        self,
+        metadata_filter: dict[str, list[str] | list[int] | list[float]],
+        collection: str | None = None,
+    ) -> Result[list[str]]: ...
+
     #
     async def query(
         self,
@@ -170,6 +195,7 @@ class EmbeddingStoreInterface(Protocol):
         top_k: int | None = None,
         collection: str | None = None,
         allowd__point_ids: list[str] | None = None,
+        metadata_filter: dict[str, list[str] | list[int] | list[float]] | None = None,
     ) -> Result[list[SimilarNodes]]: ...
 
     async def knn_by_ids(
@@ -179,6 +205,7 @@ class EmbeddingStoreInterface(Protocol):
         min_similarity: float = 0.0,
         allowd__point_ids: list[str] | None = None,
         collection: str | None = None,
+        metadata_filter: dict[str, list[str] | list[int] | list[float]] | None = None,
     ) -> Result[dict[str, list[SimilarNodes]]]: ...
 
 
@@ -193,13 +220,21 @@ class StateStore(Protocol):
         - stored Chunks with Metadata
         - extracted Tripel and Entities for faster Look
 
+    The *_bulk lookups answer the membership of many ids with a single query,
+    they are used by indexing and deletion instead of one call per triple or entity.
     """
 
     # triple
     async def triples_to_docs(self, triples: Triple) -> Result[list[str]]: ...
+    async def triples_to_docs_bulk(
+        self, triples: list[Triple]
+    ) -> Result[dict[Triple, set[str]]]: ...
 
     # chunks
     async def ent_node_to_chunk(self, ent_node: str) -> Result[list[str]]: ...
+    async def ent_nodes_to_chunks_bulk(
+        self, ent_nodes: list[str]
+    ) -> Result[dict[str, set[str]]]: ...
     async def ent_node_count(self) -> Result[int]: ...
 
     # chunks with openie info
@@ -207,6 +242,9 @@ class StateStore(Protocol):
     async def load_openie_info(
         self, offset: int = 0, chunk_size: int = 1024
     ) -> Result[DocumentCollection]: ...
+    async def load_openie_info_after(
+        self, after_idx: str | None = None, chunk_size: int = 1024
+    ) -> Result[DocumentCollection]: ...
     async def load_openie_info_with_metadata(
         self, metadata: dict[str, list[str] | list[int] | list[float]]
     ) -> Result[DocumentCollection]: ...
@@ -214,6 +252,9 @@ class StateStore(Protocol):
     async def fetch_not_existing_documents(
         self, hash_ids: list[str]
     ) -> Result[list[str]]: ...
+    async def fetch_existing_documents(
+        self, hash_ids: list[str]
+    ) -> Result[set[str]]: ...
     async def store_openie_info(
         self, documents: DocumentCollection
     ) -> Result[None]: ...
@@ -43,6 +43,8 @@ class SimilarNodes(BaseModel):
     id: str
     score: float
     payload: str
+    # structured fact, only set for points of the fact namespace
+    triple: Triple | None = None
 
 
 NodeType = Literal["entity", "chunk"]
@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+DEFAULT_LLM_CALLER = "default"
+
+_current_llm_caller: ContextVar[str] = ContextVar(
+    "current_llm_caller", default=DEFAULT_LLM_CALLER
+)
+
+
+def current_llm_caller() -> str:
+    """Name of the component issuing the current LLM requests, used for fair queuing."""
+    return _current_llm_caller.get()
+
+
+@contextmanager
+def llm_caller(name: str) -> Iterator[None]:
+    """
+    Tags all LLM requests issued inside the block (including spawned tasks) with the caller name.
+    Clients that share a request budget queue requests per caller and serve the callers in turn.
+    """
+    token = _current_llm_caller.set(name)
+    try:
+        yield
+    finally:
+        _current_llm_caller.reset(token)
@@ -106,3 +106,27 @@ class AsyncLLM(Protocol):
         a :class:`Result`.
         """
         ...
+
+
+@runtime_checkable
+class LLMResponseCacheStore(Protocol):
+    """Storage backend for cached LLM responses.
+
+    Entries are addressed by a request key (a hash over everything that
+    determines the response) and grouped into namespaces, which carry their own
+    time to live. Expired entries must not be returned.
+    """
+
+    async def get(self, key: str) -> Result[str | None]:
+        """Returns the cached response for ``key`` or ``None`` when missing or expired."""
+        ...
+
+    async def set(
+        self, key: str, namespace: str, response: str, ttl_seconds: float | None
+    ) -> Result[None]:
+        """Stores ``response`` under ``key``, ``ttl_seconds=None`` never expires."""
+        ...
+
+    async def clear(self, namespace: str | None = None) -> Result[None]:
+        """Removes all entries of ``namespace`` or everything when no namespace is given."""
+        ...
@@ -6,6 +6,8 @@ class Document(BaseModel):
     id: str
     content: str | list[Page]
     metadata: dict[str, int | float | str]
+    # pages of the file before the first page of content, a file indexed page by page
+    page_offset: int = 0
 
 
 class SplitNode(BaseModel):
@@ -7,6 +7,17 @@ from domain.storage.model import FileStorageObject, FileStorageObjectMetadata
 class FileStorage(Protocol):
     def upload_file(self, file: FileStorageObject) -> Result[None]: ...
 
+    def upload_from_path(
+        self,
+        path: str,
+        filename: str,
+        bucket: str,
+        filetype: str,
+        metadata: FileStorageObjectMetadata,
+    ) -> Result[None]:
+        """Uploads the local file at *path* without reading it into memory."""
+        ...
+
     def does_file_exist(self, filename: str, bucket: str) -> Result[bool]: ...
 
     def get_file_info(
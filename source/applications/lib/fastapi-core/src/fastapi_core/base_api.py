@@ -23,7 +23,7 @@ from starlette.responses import JSONResponse
 from starlette.types import StatefulLifespan, StatelessLifespan
 
 # from util import PrometheusMiddleware
-from fastapi_core.util import PrometheusOTLPMiddleware
+from fastapi_core.util import PrometheusOTLPASGIMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -100,7 +100,7 @@ class BaseAPI(ABC):
     def _register_metrics(self):
         self.prometheus = Instrumentator()
         self.prometheus.instrument(self.app).expose(self.app, endpoint="/metrics")
-        self.app.add_middleware(PrometheusOTLPMiddleware, app_name=self.title)
+        self.app.add_middleware(PrometheusOTLPASGIMiddleware, app_name=self.title)
         self.app.add_middleware(OpenTelemetryMiddleware)
         # self.app.add_route("/metrics", metrics)
         FastAPIInstrumentor.instrument_app(self.app)
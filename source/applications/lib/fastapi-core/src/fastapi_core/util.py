@@ -9,7 +9,7 @@ from starlette.requests import Request
 from starlette.responses import Response
 from starlette.routing import Match
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from prometheus_client import REGISTRY, Counter, Gauge, Histogram
 from prometheus_client.openmetrics.exposition import (
@@ -48,19 +48,25 @@ REQUESTS_IN_PROGRESS = Gauge(
 )
 
 
+TIME_TO_FIRST_BYTE = Histogram(
+    "fastapi_time_to_first_byte_seconds",
+    "Histogram of the time until the first body bytes are sent by path (in seconds)",
+    ["method", "path", "app_name"],
+)
+
+
 # ---------------------------------------------------------------------------
-# Middleware that mirrors the Prometheus metrics into OpenTelemetry metrics
+# Prometheus and OpenTelemetry instruments shared by both middlewares
 # ---------------------------------------------------------------------------
-class PrometheusOTLPMiddleware(BaseHTTPMiddleware):
-    """Middleware that updates Prometheus *and* records equivalent
-    OpenTelemetry metrics using the **same** attribute/label names.
+class _RequestMetrics:
+    """Records every request into Prometheus *and* the equivalent OpenTelemetry
+    instruments using the **same** attribute/label names.
 
-    In addition to request/response metrics, this version also exposes the
-    constant *fastapi_app_info* metric through OTel via an ObservableGauge.
+    The constant *fastapi_app_info* metric is exposed through OTel via an
+    ObservableGauge.
     """
 
-    def __init__(self, app: ASGIApp, app_name: str = "fastapi-app") -> None:
-        super().__init__(app)
+    def __init__(self, app_name: str) -> None:
         self.app_name = app_name
 
         # Prometheus one‑shot app info gauge
@@ -100,6 +106,11 @@ class PrometheusOTLPMiddleware(BaseHTTPMiddleware):
             description="Histogram of requests processing time by path (in seconds)",
             unit="s",
         )
+        self.ttfb_hist = meter.create_histogram(
+            name="fastapi_time_to_first_byte_seconds",
+            description="Histogram of the time until the first body bytes are sent by path (in seconds)",
+            unit="s",
+        )
         self.in_flight = meter.create_up_down_counter(
             name="fastapi_requests_in_progress",
             description="Gauge of requests currently being processed",
@@ -111,6 +122,73 @@ class PrometheusOTLPMiddleware(BaseHTTPMiddleware):
             unit="1",
         )
 
+    def started(self, attrs: dict[str, str]) -> None:
+        REQUESTS_IN_PROGRESS.labels(**attrs).inc()
+        self.in_flight.add(1, attrs)
+
+        REQUESTS.labels(**attrs).inc()
+        self.req_counter.add(1, attrs)
+
+    def first_byte(self, attrs: dict[str, str], seconds: float) -> None:
+        TIME_TO_FIRST_BYTE.labels(**attrs).observe(seconds)
+        self.ttfb_hist.record(seconds, attrs)
+
+    def exception(self, attrs: dict[str, str], exc: Exception) -> None:
+        exc_attrs = attrs | {"exception_type": type(exc).__name__}
+        EXCEPTIONS.labels(**exc_attrs).inc()
+        self.exc_counter.add(1, exc_attrs)
+
+    def finished(
+        self, attrs: dict[str, str], status_code: int, duration: float
+    ) -> None:
+        # Capture current span context for exemplar
+        span = trace.get_current_span()
+        span_ctx = set_span_in_context(span)
+
+        # Prometheus histogram with manual exemplar
+        REQUESTS_PROCESSING_TIME.labels(**attrs).observe(
+            duration,
+            exemplar={
+                "TraceID": trace.format_trace_id(span.get_span_context().trace_id)
+            },
+        )
+
+        # OpenTelemetry histogram – exemplar attached automatically via context
+        self.latency_hist.record(duration, attrs, context=span_ctx)
+
+        resp_attrs = attrs | {"status_code": status_code}
+        RESPONSES.labels(**resp_attrs).inc()
+        self.resp_counter.add(1, resp_attrs)
+
+        REQUESTS_IN_PROGRESS.labels(**attrs).dec()
+        self.in_flight.add(-1, attrs)
+
+
+def _matched_path(scope: Scope) -> Tuple[str, bool]:
+    """Map concrete path to templated route (/users/42 → /users/{id})."""
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return route.path, True
+    return scope["path"], False
+
+
+# ---------------------------------------------------------------------------
+# Middleware that mirrors the Prometheus metrics into OpenTelemetry metrics
+# ---------------------------------------------------------------------------
+class PrometheusOTLPMiddleware(BaseHTTPMiddleware):
+    """Middleware that updates Prometheus *and* records equivalent
+    OpenTelemetry metrics using the **same** attribute/label names.
+
+    Built on ``BaseHTTPMiddleware``, the duration of a streaming response ends
+    when its headers are sent. Prefer ``PrometheusOTLPASGIMiddleware``.
+    """
+
+    def __init__(self, app: ASGIApp, app_name: str = "fastapi-app") -> None:
+        super().__init__(app)
+        self.app_name = app_name
+        self._metrics = _RequestMetrics(app_name)
+
     # ---------------------------------------------------------------------
     # Request lifecycle
     # ---------------------------------------------------------------------
@@ -118,7 +196,7 @@ class PrometheusOTLPMiddleware(BaseHTTPMiddleware):
         self, request: Request, call_next: RequestResponseEndpoint
     ) -> Response:
         method = request.method
-        path, handled = self._matched_path(request)
+        path, handled = _matched_path(request.scope)
 
         if not handled:
             return await call_next(request)
@@ -126,11 +204,7 @@ class PrometheusOTLPMiddleware(BaseHTTPMiddleware):
         attrs = {"method": method, "path": path, "app_name": self.app_name}
 
         # ── in‑flight tracking ────────────────────────────────────────────
-        REQUESTS_IN_PROGRESS.labels(**attrs).inc()
-        self.in_flight.add(1, attrs)
-
-        REQUESTS.labels(**attrs).inc()
-        self.req_counter.add(1, attrs)
+        self._metrics.started(attrs)
 
         start = time.perf_counter()
 
@@ -140,45 +214,75 @@ class PrometheusOTLPMiddleware(BaseHTTPMiddleware):
             return response
         except Exception as exc:
             status_code = HTTP_500_INTERNAL_SERVER_ERROR
-            exc_attrs = attrs | {"exception_type": type(exc).__name__}
-            EXCEPTIONS.labels(**exc_attrs).inc()
-            self.exc_counter.add(1, exc_attrs)
+            self._metrics.exception(attrs, exc)
             raise
         finally:
-            duration = time.perf_counter() - start
+            self._metrics.finished(attrs, status_code, time.perf_counter() - start)
+
+
+# ---------------------------------------------------------------------------
+# Pure ASGI variant of the middleware
+# ---------------------------------------------------------------------------
+class PrometheusOTLPASGIMiddleware:
+    """Records the metrics of ``PrometheusOTLPMiddleware`` as a pure ASGI middleware.
 
-            # Capture current span context for exemplar
-            span = trace.get_current_span()
-            span_ctx = set_span_in_context(span)
+    The messages of the app are passed through as they are sent, no task or
+    memory stream per request, so every chunk of a streaming response reaches
+    the server without an extra hop. The request duration ends with the last
+    body chunk and the time to the first body bytes is recorded separately,
+    which makes both meaningful for server sent events.
+    """
 
-            # Prometheus histogram with manual exemplar
-            REQUESTS_PROCESSING_TIME.labels(**attrs).observe(
-                duration,
-                exemplar={
-                    "TraceID": trace.format_trace_id(span.get_span_context().trace_id)
-                },
-            )
+    def __init__(self, app: ASGIApp, app_name: str = "fastapi-app") -> None:
+        self.app = app
+        self.app_name = app_name
+        self._metrics = _RequestMetrics(app_name)
 
-            # OpenTelemetry histogram – exemplar attached automatically via context
-            self.latency_hist.record(duration, attrs, context=span_ctx)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-            resp_attrs = attrs | {"status_code": status_code}
-            RESPONSES.labels(**resp_attrs).inc()
-            self.resp_counter.add(1, resp_attrs)
+        path, handled = _matched_path(scope)
+        if not handled:
+            await self.app(scope, receive, send)
+            return
 
-            REQUESTS_IN_PROGRESS.labels(**attrs).dec()
-            self.in_flight.add(-1, attrs)
+        attrs = {"method": scope["method"], "path": path, "app_name": self.app_name}
+        self._metrics.started(attrs)
 
-    # ---------------------------------------------------------------------
-    # Helper to map concrete path to templated route (/users/42 → /users/{id})
-    # ---------------------------------------------------------------------
-    @staticmethod
-    def _matched_path(request: Request) -> Tuple[str, bool]:
-        for route in request.app.routes:
-            match, _ = route.matches(request.scope)
-            if match is Match.FULL:
-                return route.path, True
-        return request.url.path, False
+        start = time.perf_counter()
+        status_code = HTTP_500_INTERNAL_SERVER_ERROR
+        first_byte_sent = False
+        finished = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, first_byte_sent, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                if not first_byte_sent and message.get("body"):
+                    first_byte_sent = True
+                    self._metrics.first_byte(attrs, time.perf_counter() - start)
+                if not message.get("more_body", False) and not finished:
+                    await send(message)
+                    finished = True
+                    self._metrics.finished(
+                        attrs, status_code, time.perf_counter() - start
+                    )
+                    return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            status_code = HTTP_500_INTERNAL_SERVER_ERROR
+            self._metrics.exception(attrs, exc)
+            raise
+        finally:
+            # the response was aborted or never completed
+            if not finished:
+                self._metrics.finished(attrs, status_code, time.perf_counter() - start)
 
 
 # ----------------------------------------------------------------------------
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import os
+import statistics
+import time
+from typing import Any, AsyncIterator
+
+from core.logger import init_logging
+from domain_test import AsyncTestBase
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from prometheus_client import REGISTRY
+from starlette.types import ASGIApp, Message
+
+from fastapi_core.util import PrometheusOTLPASGIMiddleware, PrometheusOTLPMiddleware
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+BENCHMARK_REQUESTS = int(os.environ.get("METRICS_BENCHMARK_REQUESTS", "2000"))
+TOKENS = 200
+# pause of the stub stream before it finishes, like a model finishing its answer
+STREAM_TAIL = 0.05
+
+
+def create_app(middleware: type, app_name: str) -> tuple[FastAPI, list[float]]:
+    """Stub api, the stream records when each token was produced."""
+    app = FastAPI()
+    app.add_middleware(middleware, app_name=app_name)
+    produced: list[float] = []
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/fail")
+    async def fail() -> dict[str, str]:
+        raise RuntimeError("failed")
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def tokens() -> AsyncIterator[str]:
+            for i in range(TOKENS):
+                produced.append(time.perf_counter())
+                yield f"data: token-{i}\n\n"
+                await asyncio.sleep(0)
+            await asyncio.sleep(STREAM_TAIL)
+
+        return StreamingResponse(tokens(), media_type="text/event-stream")
+
+    return app, produced
+
+
+async def call(app: ASGIApp, path: str) -> tuple[int, list[float]]:
+    """Runs one GET request, returns the status and the arrival time of each body chunk."""
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"test")],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+    status = 0
+    arrived: list[float] = []
+    request_sent = False
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            arrived.append(time.perf_counter())
+
+    await app(scope, receive, send)
+    return status, arrived
+
+
+def sample(name: str, app_name: str, path: str, **labels: str) -> float:
+    value = REGISTRY.get_sample_value(
+        name, {"method": "GET", "path": path, "app_name": app_name, **labels}
+    )
+    return value or 0.0
+
+
+class TestMetricsMiddleware(AsyncTestBase):
+    __test__ = True
+
+    async def test_streaming_duration_and_time_to_first_byte(self):
+        app, _ = create_app(PrometheusOTLPASGIMiddleware, "asgi-stream")
+        status, arrived = await call(app, "/stream")
+        assert status == 200 and len(arrived) == TOKENS
+
+        assert sample("fastapi_requests_total", "asgi-stream", "/stream") == 1
+        assert (
+            sample(
+                "fastapi_responses_total", "asgi-stream", "/stream", status_code="200"
+            )
+            == 1
+        )
+        assert sample("fastapi_requests_in_progress", "asgi-stream", "/stream") == 0
+        duration = sample(
+            "fastapi_requests_duration_seconds_sum", "asgi-stream", "/stream"
+        )
+        first_byte = sample(
+            "fastapi_time_to_first_byte_seconds_sum", "asgi-stream", "/stream"
+        )
+        # the duration covers the whole stream, the first byte only its start
+        assert duration >= STREAM_TAIL
+        assert 0 < first_byte < STREAM_TAIL
+
+    async def test_base_middleware_ends_with_the_headers(self):
+        app, _ = create_app(PrometheusOTLPMiddleware, "base-stream")
+        await call(app, "/stream")
+        duration = sample(
+            "fastapi_requests_duration_seconds_sum", "base-stream", "/stream"
+        )
+        assert duration < STREAM_TAIL
+
+    async def test_exceptions_and_unmatched_paths(self):
+        app, _ = create_app(PrometheusOTLPASGIMiddleware, "asgi-errors")
+        status, _ = await call(app, "/missing")
+        assert status == 404
+        assert sample("fastapi_requests_total", "asgi-errors", "/missing") == 0
+
+        try:
+            await call(app, "/fail")
+            raise AssertionError("the exception should reach the server")
+        except RuntimeError:
+            pass
+        assert (
+            sample(
+                "fastapi_exceptions_total",
+                "asgi-errors",
+                "/fail",
+                exception_type="RuntimeError",
+            )
+            == 1
+        )
+        assert (
+            sample("fastapi_responses_total", "asgi-errors", "/fail", status_code="500")
+            == 1
+        )
+        assert sample("fastapi_requests_in_progress", "asgi-errors", "/fail") == 0
+
+    async def test_benchmark_against_base_middleware(self):
+        """Requests per second and per token latency of a stub stream."""
+        measured: dict[str, tuple[float, float]] = {}
+        for name, middleware in (
+            ("before", PrometheusOTLPMiddleware),
+            ("after", PrometheusOTLPASGIMiddleware),
+        ):
+            app, produced = create_app(middleware, f"benchmark-{name}")
+            for _ in range(50):
+                await call(app, "/ping")
+
+            start = time.perf_counter()
+            for _ in range(BENCHMARK_REQUESTS):
+                status, _ = await call(app, "/ping")
+                assert status == 200
+            requests_per_second = BENCHMARK_REQUESTS / (time.perf_counter() - start)
+
+            latencies: list[float] = []
+            for _ in range(10):
+                produced.clear()
+                _, arrived = await call(app, "/stream")
+                latencies.extend(a - p for p, a in zip(produced, arrived))
+            measured[name] = (requests_per_second, statistics.median(latencies))
+
+        before_rps, before_latency = measured["before"]
+        after_rps, after_latency = measured["after"]
+        logger.info(
+            f"before {before_rps:.0f} requests/s, {before_latency * 1e6:.0f} µs per token, "
+            f"after {after_rps:.0f} requests/s, {after_latency * 1e6:.0f} µs per token"
+        )
+        assert after_rps > before_rps
+        assert after_latency < before_latency
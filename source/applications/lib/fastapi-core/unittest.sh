@@ -0,0 +1 @@
+pytest tests/metrics_middleware_test.py
@@ -1,6 +1,11 @@
 import logging
+import time
+from typing import Any
+
 from core.result import Result
+from core.retry import RetryConfig, RetryDecision, RetryPolicy
 from domain.http_client.async_client import AsyncHttpClient
+from domain.http_client.model import HttpResponse
 from domain.file_converter.model import PageLite
 from domain.file_converter.interface import FileConverterServiceClient
 from pydantic import BaseModel
@@ -12,6 +17,34 @@ logger = logging.getLogger(__name__)
 
 class FileConverterConfig(BaseModel):
     host: str
+    # seconds the API holds a status request open while the job is running,
+    # must stay below the timeout of the http client
+    poll_wait_seconds: float = 20
+    # a submission refused with 429 (too many jobs) is retried with backoff
+    retries: int = 5
+    max_retry_seconds: float | None = 120
+    # the job is given up after this many seconds, None polls until it finished
+    max_conversion_seconds: float | None = 30 * 60
+
+
+class FileConverterHttpError(RuntimeError):
+    def __init__(self, status_code: int, body: Any):
+        super().__init__(f"File converter HTTP {status_code}: {body}")
+        self.status_code = status_code
+
+
+def classify_file_converter_error(error: Exception) -> RetryDecision:
+    """Only a full job queue (429) goes away by waiting."""
+    if isinstance(error, FileConverterHttpError) and error.status_code == 429:
+        return RetryDecision.BACKOFF
+    return RetryDecision.STOP
+
+
+class _ConversionJob(BaseModel):
+    id: str
+    status: str
+    pages: list[PageLite] | None = None
+    error: str | None = None
 
 
 class FileConverterServiceClientImpl(FileConverterServiceClient):
@@ -20,8 +53,33 @@ class FileConverterServiceClientImpl(FileConverterServiceClient):
     def __init__(self, config: FileConverterConfig, http_client: AsyncHttpClient):
         self._config = config
         self._http = http_client
-        self._url = f"{self._config.host}/convert"
+        self._url = f"{self._config.host}/jobs"
         self.tracer = trace.get_tracer("File-Converter-Client")
+        self._retry = RetryPolicy(
+            name="file_converter_submit",
+            config=RetryConfig(
+                attempts=config.retries, max_elapsed=config.max_retry_seconds
+            ),
+            classify=classify_file_converter_error,
+        )
+
+    async def _submit(self, json_payload: dict[str, Any]) -> Result[_ConversionJob]:
+        result = await self._http.post(self._url, header={}, json=json_payload)
+        return self._parse_job(result)
+
+    def _parse_job(self, result: Result[HttpResponse]) -> Result[_ConversionJob]:
+        if result.is_error():
+            return result.propagate_exception()
+        response = result.get_ok()
+        if response.status_code >= 400:
+            return Result.Err(FileConverterHttpError(response.status_code, response.body))
+        try:
+            return Result.Ok(_ConversionJob.model_validate(response.body))
+        except Exception as parse_error:
+            logger.error(
+                f"Failed to parse job result: {parse_error} original body: {response.body}"
+            )
+            return Result.Err(parse_error)
 
     async def convert_file(self, filename: str, bucket: str) -> Result[list[PageLite]]:
         with self.tracer.start_as_current_span(f"convert-file-{filename}-in-{bucket}"):
@@ -30,17 +88,36 @@ class FileConverterServiceClientImpl(FileConverterServiceClient):
                 "source_bucket": bucket,
                 "destination_bucket": bucket,
             }
+            started = time.monotonic()
+            result = await self._retry.run(lambda: self._submit(json_payload))
+            while True:
+                if result.is_error():
+                    logger.error(f"File conversion of {filename} failed: {result.get_error()}")
+                    return result.propagate_exception()
+
+                job = result.get_ok()
+                if job.status == "DONE":
+                    return Result.Ok(job.pages or [])
+                if job.status == "FAILED":
+                    return Result.Err(Exception(job.error))
+
+                wait = self._config.poll_wait_seconds
+                if self._config.max_conversion_seconds is not None:
+                    remaining = self._config.max_conversion_seconds - (
+                        time.monotonic() - started
+                    )
+                    if remaining <= 0:
+                        logger.error(
+                            f"File conversion of {filename} did not finish within {self._config.max_conversion_seconds}s"
+                        )
+                        return Result.Err(
+                            TimeoutError(
+                                f"conversion of {filename} did not finish within {self._config.max_conversion_seconds}s"
+                            )
+                        )
+                    wait = min(wait, remaining)
 
-            result = await self._http.put(self._url, header={}, json=json_payload)
-
-            if result.is_ok():
-                response = result.get_ok()
-                try:
-                    parsed = [PageLite(**page) for page in response.body]
-                    return Result.Ok(parsed)
-                except Exception as parse_error:
-                    logger.error(f"Failed to parse page result: {parse_error} original body: {response.body}")
-                    return Result.Err(parse_error)
-            else:
-                logger.error(f"File conversion failed: {result.get_error()}")
-                return Result.Err(result.get_error())
+                # long poll, the api answers as soon as the job finished
+                result = self._parse_job(
+                    await self._http.get(f"{self._url}/{job.id}?wait={wait}", header={})
+                )
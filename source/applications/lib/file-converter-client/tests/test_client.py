@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from typing import Any, List
 
@@ -18,12 +19,37 @@ from file_converter_client.async_client import (
 class MockSuccessHttpClient(AsyncHttpClient):
     """Return a well‑formed response body that matches the latest DTOs."""
 
-    async def put(  # type: ignore[override]
+    def __init__(self):
+        self.polls = 0
+
+    async def post(  # type: ignore[override]
         self,
         url: str,
         header: dict[str, str],
         json: dict[str, Any] | None = None,
     ) -> Result[HttpResponse]:
+        return Result.Ok(
+            HttpResponse(
+                status_code=202,
+                headers={"content-type": "application/json"},
+                body={"id": "job-1", "status": "PENDING"},
+            )
+        )
+
+    async def get(  # type: ignore[override]
+        self, url: str, header: dict[str, str]
+    ) -> Result[HttpResponse]:
+        assert url.startswith("http://mock/jobs/job-1?wait=")
+        self.polls += 1
+        if self.polls < 2:
+            return Result.Ok(
+                HttpResponse(
+                    status_code=200,
+                    headers={"content-type": "application/json"},
+                    body={"id": "job-1", "status": "RUNNING"},
+                )
+            )
+
         # Two pages – first with two fragments (image + text), second empty
         body: List[dict[str, Any]] = [
             {
@@ -51,16 +77,13 @@ class MockSuccessHttpClient(AsyncHttpClient):
             HttpResponse(
                 status_code=200,
                 headers={"content-type": "application/json"},
-                body=body,
+                body={"id": "job-1", "status": "DONE", "pages": body},
             )
         )
 
     # The remaining HTTP verbs are unused in this client – keep them as stubs
 
-    async def get(self, url: str, header: dict[str, str]):  # type: ignore[override]
-        ...
-
-    async def post(  # type: ignore[override]
+    async def put(  # type: ignore[override]
         self,
         url: str,
         header: dict[str, str],
@@ -74,7 +97,7 @@ class MockSuccessHttpClient(AsyncHttpClient):
 class MockFailureHttpClient(AsyncHttpClient):
     """Simulate an upstream failure (e.g. network / 5xx error)."""
 
-    async def put(  # type: ignore[override]
+    async def post(  # type: ignore[override]
         self,
         url: str,
         header: dict[str, str],
@@ -85,7 +108,7 @@ class MockFailureHttpClient(AsyncHttpClient):
     async def get(self, url: str, header: dict[str, str]):  # type: ignore[override]
         ...
 
-    async def post(  # type: ignore[override]
+    async def put(  # type: ignore[override]
         self,
         url: str,
         header: dict[str, str],
@@ -99,7 +122,7 @@ class MockFailureHttpClient(AsyncHttpClient):
 class MockInvalidBodyHttpClient(AsyncHttpClient):
     """Return a 200 but with a body that **cannot** be parsed into PageLite."""
 
-    async def put(  # type: ignore[override]
+    async def post(  # type: ignore[override]
         self,
         url: str,
         header: dict[str, str],
@@ -116,7 +139,7 @@ class MockInvalidBodyHttpClient(AsyncHttpClient):
     async def get(self, url: str, header: dict[str, str]):  # type: ignore[override]
         ...
 
-    async def post(  # type: ignore[override]
+    async def put(  # type: ignore[override]
         self,
         url: str,
         header: dict[str, str],
@@ -127,6 +150,49 @@ class MockInvalidBodyHttpClient(AsyncHttpClient):
         ...
 
 
+class MockBusyHttpClient(MockSuccessHttpClient):
+    """Refuse the first submissions with 429 like a full job queue, then accept."""
+
+    def __init__(self, refusals: int):
+        super().__init__()
+        self.refusals = refusals
+        self.submissions = 0
+
+    async def post(  # type: ignore[override]
+        self,
+        url: str,
+        header: dict[str, str],
+        json: dict[str, Any] | None = None,
+    ) -> Result[HttpResponse]:
+        self.submissions += 1
+        if self.submissions <= self.refusals:
+            return Result.Ok(
+                HttpResponse(
+                    status_code=429,
+                    headers={"content-type": "application/json"},
+                    body={"detail": "too many conversion jobs"},
+                )
+            )
+        return await super().post(url, header, json)
+
+
+class MockStuckHttpClient(MockSuccessHttpClient):
+    """The job never finishes, every long poll answers RUNNING."""
+
+    async def get(  # type: ignore[override]
+        self, url: str, header: dict[str, str]
+    ) -> Result[HttpResponse]:
+        self.polls += 1
+        await asyncio.sleep(float(url.split("wait=")[1]))
+        return Result.Ok(
+            HttpResponse(
+                status_code=200,
+                headers={"content-type": "application/json"},
+                body={"id": "job-1", "status": "RUNNING"},
+            )
+        )
+
+
 # ---------------------------------------------------------------------------
 # Test‑suite
 # ---------------------------------------------------------------------------
@@ -157,4 +223,45 @@ class TestFileConverterServiceClientImpl(TestFileConverterServiceClient):
             )
             return
 
+        if test_name in (
+            "test_rate_limited_submission_is_retried",
+            "test_rate_limit_gives_up_after_retries",
+            "test_polling_stops_at_deadline",
+        ):
+            # these tests build their own client
+            return
+
         raise Exception(f"No Client implementation for {test_name}")
+
+    async def test_rate_limited_submission_is_retried(self):
+        http = MockBusyHttpClient(refusals=1)
+        client = FileConverterServiceClientImpl(
+            FileConverterConfig(host="http://mock"), http
+        )
+        result = await client.convert_file("file.pdf", "bucket")
+        assert result.is_ok()
+        assert http.submissions == 2
+        assert len(result.get_ok()) == 2
+
+    async def test_rate_limit_gives_up_after_retries(self):
+        http = MockBusyHttpClient(refusals=10)
+        client = FileConverterServiceClientImpl(
+            FileConverterConfig(host="http://mock", retries=1), http
+        )
+        result = await client.convert_file("file.pdf", "bucket")
+        assert result.is_error()
+        assert http.submissions == 1
+        assert http.polls == 0
+
+    async def test_polling_stops_at_deadline(self):
+        http = MockStuckHttpClient()
+        client = FileConverterServiceClientImpl(
+            FileConverterConfig(
+                host="http://mock", poll_wait_seconds=0.05, max_conversion_seconds=0.2
+            ),
+            http,
+        )
+        result = await asyncio.wait_for(client.convert_file("file.pdf", "bucket"), 5)
+        assert result.is_error()
+        assert isinstance(result.get_error(), TimeoutError)
+        assert 2 <= http.polls <= 5
@@ -1,2 +1,3 @@
 pytest tests/integration_test.py
-
+pytest tests/update_benchmark_test.py
+pytest tests/listing_benchmark_test.py
@@ -1,15 +1,19 @@
 import logging
-from typing import List
+from datetime import datetime
+from typing import Any, List
 from uuid import UUID, uuid4
 
 from opentelemetry import trace
-from tortoise import transactions
+from tortoise import timezone, transactions
+
+from core.model import NotFoundException
 
 from core.result import Result
 from database.session import BaseDatabase
 from domain.database.file.interface import FileDatabase
 from domain.database.file.model import (
     File as DomainFile,
+    FileHeader as DomainFileHeader,
     FileMetadata as DomainFileMetadata,
     FilePage as DomainFilePage,
     PageFragement as DomainFragment,
@@ -77,43 +81,123 @@ class PostgresFileDatabase(FileDatabase):
                 result = await self._pg_db_file.create(db_obj)
                 if result.is_error():
                     raise result.get_error()
-                pages: list[FilePageDB] = [
-                    _domain_page_to_db(p, db_obj) for p in obj.pages
-                ]
-                for page in pages:
-                    result = await self._pg_db_page.create(page)
-                    if result.is_error():
-                        raise result.get_error()
-                for index, page in enumerate(obj.pages):
-                    page_db: FilePageDB = pages[index]
-                    fragments: list[FragmentDB] = [
-                        _domain_fragment_to_db(fragement, page_db)
-                        for fragement in page.fragements
-                    ]
-                    result = await self._pg_db_page_fragement.create_list(fragments)
-                    if result.is_error():
-                        raise result.get_error()
+                created = await self._create_pages(obj.pages, db_obj.id)
+                if created.is_error():
+                    raise created.get_error()
             return Result.Ok(str(db_obj.id))
         except Exception as exc:  # pragma: no cover – defensive
             logger.exception("create-file failed")
             return Result.Err(exc)
 
     async def update(self, obj: DomainFile) -> Result[None]:
-        """Full upsert – deletes existing related entities before re-inserting."""
+        """
+        Diff based update, pages are matched by page number and fragments by
+        fragment number. Only rows whose values changed are written, new pages
+        and fragments are inserted in bulk and missing ones deleted in one statement.
+        """
         try:
-            # Purge & re-insert instead of patching nested relations – simpler & safe
-            async with transactions.in_transaction():  # type: ignore
-                purge = await self._pg_db_file.delete(obj.id)
-                if purge.is_error():
-                    return purge.propagate_exception()
-                result = await self.create(obj)
-                if result.is_error():
-                    raise result.get_error()
-                return Result.Ok()
+            with self._tracer.start_as_current_span("update-file"):
+                async with transactions.in_transaction():  # type: ignore
+                    rows = await FileDB.filter(id=obj.id).values("id", *_FILE_FIELDS)
+                    if not rows:
+                        return Result.Err(
+                            NotFoundException(f"not object with the id:{obj.id} exists")
+                        )
+                    file_id = rows[0]["id"]
+                    changed = _changed_fields(rows[0], _file_values(obj))
+                    if changed:
+                        await FileDB.filter(id=file_id).update(**changed)
+
+                    result = await self._update_pages(obj.pages, file_id)
+                    if result.is_error():
+                        raise result.get_error()
+                    return Result.Ok()
         except Exception as exc:  # pragma: no cover
             logger.exception("update-file failed")
             return Result.Err(exc)
 
+    async def _update_pages(
+        self, pages: list[DomainFilePage], file_id: Any
+    ) -> Result[None]:
+        # plain rows, building model instances for every page costs more than the query
+        db_pages = await FilePageDB.filter(file_id=file_id).values(
+            "id", "page_number", *_PAGE_FIELDS
+        )
+        db_fragments = await FragmentDB.filter(page__file_id=file_id).values(
+            "id", "page_id", "fragement_number", *_FRAGMENT_FIELDS
+        )
+        fragments_of_page: dict[Any, dict[int, dict[str, Any]]] = {}
+        removed_fragments: list[Any] = []
+        for row in db_fragments:
+            page_fragments = fragments_of_page.setdefault(row["page_id"], {})
+            if row["fragement_number"] in page_fragments:
+                removed_fragments.append(row["id"])
+            else:
+                page_fragments[row["fragement_number"]] = row
+
+        existing_pages: dict[int, dict[str, Any]] = {}
+        removed_pages: list[Any] = []
+        for row in db_pages:
+            if row["page_number"] in existing_pages:
+                removed_pages.append(row["id"])
+            else:
+                existing_pages[row["page_number"]] = row
+
+        new_pages: list[DomainFilePage] = []
+        new_fragments: list[FragmentDB] = []
+        for page in pages:
+            row = existing_pages.pop(page.page_number, None)
+            if row is None:
+                new_pages.append(page)
+                continue
+            changed = _changed_fields(row, _page_values(page))
+            if changed:
+                await FilePageDB.filter(id=row["id"]).update(**changed)
+
+            existing_fragments = fragments_of_page.pop(row["id"], {})
+            for fragment in page.fragements:
+                fragment_row = existing_fragments.pop(fragment.fragement_number, None)
+                if fragment_row is None:
+                    new_fragments.append(_domain_fragment_to_db(fragment, row["id"]))
+                    continue
+                changed = _changed_fields(fragment_row, _fragment_values(fragment))
+                if changed:
+                    await FragmentDB.filter(id=fragment_row["id"]).update(**changed)
+            removed_fragments.extend(f["id"] for f in existing_fragments.values())
+        removed_pages.extend(row["id"] for row in existing_pages.values())
+
+        # fragments of removed pages are deleted by the cascade of the foreign key
+        if removed_pages:
+            await FilePageDB.filter(id__in=removed_pages).delete()
+        if removed_fragments:
+            await FragmentDB.filter(id__in=removed_fragments).delete()
+        if new_fragments:
+            result = await self._pg_db_page_fragement.create_list(new_fragments)
+            if result.is_error():
+                return result.propagate_exception()
+        return await self._create_pages(new_pages, file_id)
+
+    async def _create_pages(
+        self, pages: list[DomainFilePage], file_id: Any
+    ) -> Result[None]:
+        """Inserts the pages in one statement and their fragments in a second one."""
+        if not pages:
+            return Result.Ok()
+        db_pages = [_domain_page_to_db(page, file_id) for page in pages]
+        result = await self._pg_db_page.create_list(db_pages)
+        if result.is_error():
+            return result.propagate_exception()
+        fragments = [
+            _domain_fragment_to_db(fragment, db_page.id)
+            for page, db_page in zip(pages, db_pages)
+            for fragment in page.fragements
+        ]
+        if fragments:
+            result = await self._pg_db_page_fragement.create_list(fragments)
+            if result.is_error():
+                return result.propagate_exception()
+        return Result.Ok()
+
     async def delete(self, id: str) -> Result[None]:
         return await self._pg_db_file.delete(id)
 
@@ -122,15 +206,7 @@ class PostgresFileDatabase(FileDatabase):
         if file is None:
             return Result.Ok(None)
 
-        file_domain = _db_to_domain(file)
-        for page in file.pages:
-            domain_page = _db_page_to_domain(page)
-            domain_page.fragements = [
-                _db_fragement_to_domain(f) for f in page.fragments
-            ]
-            file_domain.pages.append(domain_page)
-
-        return Result.Ok(file_domain)
+        return Result.Ok(_db_to_domain_with_pages(file))
 
     async def get_all(self) -> Result[List[DomainFile]]:
         res = await self._pg_db_file.get_all()
@@ -149,6 +225,16 @@ class PostgresFileDatabase(FileDatabase):
         with self._tracer.start_as_current_span("search-by-path"):
             return await self._fetch_many({"filepath__icontains": path})
 
+    async def fetch_by_paths(self, paths: list[str]) -> Result[List[DomainFile]]:
+        with self._tracer.start_as_current_span("fetch-by-paths"):
+            # one query per batch of paths, the pages are not needed to compare versions
+            files_result = await self._pg_db_file.run_query(
+                query={"filepath__in": paths}
+            )
+            if files_result.is_error():
+                return files_result.propagate_exception()
+            return Result.Ok([_db_to_domain(file) for file in files_result.get_ok()])
+
     async def fetch_by_name(self, name: str) -> Result[DomainFile | None]:
         with self._tracer.start_as_current_span("fetch-by-name"):
             return await self._fetch_first({"filename": name})
@@ -192,6 +278,64 @@ class PostgresFileDatabase(FileDatabase):
             logger.exception("fetch-file-pages-below-version failed")
             return Result.Err(exc)
 
+    # ------------------------------------------------------------------
+    # Headers, projections without pages and fragments
+    # ------------------------------------------------------------------
+    async def fetch_header_by_path(
+        self, path: str
+    ) -> Result[DomainFileHeader | None]:
+        with self._tracer.start_as_current_span("fetch-header-by-path"):
+            headers_result = await self._fetch_headers(
+                {"filepath": path}, order_by="-created_at", limit=1
+            )
+            if headers_result.is_error():
+                return headers_result.propagate_exception()
+            headers = headers_result.get_ok()
+            return Result.Ok(headers[0] if headers else None)
+
+    async def fetch_headers_by_paths(
+        self, paths: list[str]
+    ) -> Result[List[DomainFileHeader]]:
+        with self._tracer.start_as_current_span("fetch-headers-by-paths"):
+            return await self._fetch_headers(
+                {"filepath__in": paths}, order_by="-created_at"
+            )
+
+    async def list_headers(
+        self,
+        after_id: str | None = None,
+        limit: int = 1000,
+        project_id: str | None = None,
+        below_version: int | None = None,
+        path_contains: str | None = None,
+    ) -> Result[List[DomainFileHeader]]:
+        query: dict[str, object] = {}
+        if after_id is not None:
+            query["id__gt"] = after_id
+        if project_id is not None:
+            query["metadata_project_id"] = project_id
+        if below_version is not None:
+            query["metadata_version__lt"] = below_version
+        if path_contains is not None:
+            query["filepath__icontains"] = path_contains
+        with self._tracer.start_as_current_span("list-headers"):
+            # keyset pagination, the id of the last row starts the next page
+            return await self._fetch_headers(query, order_by="id", limit=limit)
+
+    async def _fetch_headers(
+        self, query: dict[str, object], order_by: str, limit: int | None = None
+    ) -> Result[List[DomainFileHeader]]:
+        """Reads only the file columns as plain rows, no model instances."""
+        try:
+            rows = FileDB.filter(**query).order_by(order_by)
+            if limit is not None:
+                rows = rows.limit(limit)
+            values = await rows.values("id", *_FILE_FIELDS)
+            return Result.Ok([_row_to_header(row) for row in values])
+        except Exception as exc:
+            logger.exception("fetch-headers failed")
+            return Result.Err(exc)
+
     async def _fetch_first(self, query: dict[str, object]) -> Result[DomainFile | None]:
         """Return *exactly one* record (or ``None``) for *query* wrapped in Result."""
         file_result = await self._pg_db_file.run_query_first(
@@ -204,15 +348,7 @@ class PostgresFileDatabase(FileDatabase):
             return Result.Ok(None)
         file = file_option
 
-        file_domain = _db_to_domain(file)
-        for page in file.pages:
-            domain_page = _db_page_to_domain(page)
-            domain_page.fragements = [
-                _db_fragement_to_domain(f) for f in page.fragments
-            ]
-            file_domain.pages.append(domain_page)
-
-        return Result.Ok(file_domain)
+        return Result.Ok(_db_to_domain_with_pages(file))
 
     async def _fetch_many(self, query: dict[str, object]):
         files_result = await self._pg_db_file.run_query(
@@ -223,17 +359,51 @@ class PostgresFileDatabase(FileDatabase):
         files = files_result.get_ok()
         domain_files: list[DomainFile] = []
         for file in files:
-            file_domain = _db_to_domain(file)
-            for page in file.pages:
-                domain_page = _db_page_to_domain(page)
-                domain_page.fragements = [
-                    _db_fragement_to_domain(f) for f in page.fragments
-                ]
-                file_domain.pages.append(domain_page)
-            domain_files.append(file_domain)
+            domain_files.append(_db_to_domain_with_pages(file))
         return Result.Ok(domain_files)
 
 
+_FILE_FIELDS = (
+    "filepath",
+    "filename",
+    "bucket",
+    "metadata_project_id",
+    "metadata_project_year",
+    "metadata_file_creation",
+    "metadata_file_updated",
+    "metadata_version",
+    "metatdata_other",
+)
+_PAGE_FIELDS = (
+    "bucket",
+    "metadata__project_id",
+    "metadata__project_year",
+    "metadata__file_creation",
+    "metadata__file_updated",
+    "metadata__version",
+)
+_FRAGMENT_FIELDS = ("fragement_type", "storage_filename")
+
+
+def _same_value(current: Any, target: Any) -> bool:
+    # naive datetimes are stored in the timezone of tortoise and read back aware
+    if isinstance(current, datetime) and isinstance(target, datetime):
+        if timezone.is_naive(current):
+            current = timezone.make_aware(current, timezone.get_timezone())
+        if timezone.is_naive(target):
+            target = timezone.make_aware(target, timezone.get_timezone())
+    return current == target
+
+
+def _changed_fields(row: dict[str, Any], target: dict[str, Any]) -> dict[str, Any]:
+    """Values of *target* that differ from the stored *row*."""
+    return {
+        name: value
+        for name, value in target.items()
+        if not _same_value(row[name], value)
+    }
+
+
 def _domain_to_db(domain: DomainFile) -> FileDB:
     try:
         file_id = UUID(domain.id)
@@ -242,43 +412,61 @@ def _domain_to_db(domain: DomainFile) -> FileDB:
 
     db_file = FileDB(
         id=file_id,  # type: ignore[arg-type] – Tortoise expects UUID | str
-        filepath=domain.filepath,
-        filename=domain.filename,
-        bucket=domain.bucket,
-        metadata_project_id=domain.metadata.project_id,
-        metadata_project_year=domain.metadata.project_year,
-        metadata_file_creation=domain.metadata.file_creation,
-        metadata_file_updated=domain.metadata.file_updated,
-        metadata_version=domain.metadata.version,
-        metatdata_other=domain.metadata.other_metadata,
+        **_file_values(domain),
     )
 
     return db_file
 
 
-def _domain_fragment_to_db(f: DomainFragment, parent_page: FilePageDB) -> FragmentDB:
+def _file_values(domain: DomainFile) -> dict[str, Any]:
+    return {
+        "filepath": domain.filepath,
+        "filename": domain.filename,
+        "bucket": domain.bucket,
+        "metadata_project_id": domain.metadata.project_id,
+        "metadata_project_year": domain.metadata.project_year,
+        "metadata_file_creation": domain.metadata.file_creation,
+        "metadata_file_updated": domain.metadata.file_updated,
+        "metadata_version": domain.metadata.version,
+        "metatdata_other": domain.metadata.other_metadata,
+    }
+
+
+def _domain_fragment_to_db(f: DomainFragment, page_id: Any) -> FragmentDB:
     return FragmentDB(
-        page=parent_page,
-        fragement_type=f.fragement_type.value,
-        storage_filename=f.storage_filename,
+        page_id=page_id,
         fragement_number=f.fragement_number,
+        **_fragment_values(f),
     )
 
 
-def _domain_page_to_db(page: DomainFilePage, parent_file: FileDB) -> FilePageDB:
+def _fragment_values(f: DomainFragment) -> dict[str, Any]:
+    return {
+        "fragement_type": f.fragement_type.value,
+        "storage_filename": f.storage_filename,
+    }
+
+
+def _domain_page_to_db(page: DomainFilePage, file_id: Any) -> FilePageDB:
     db_page = FilePageDB(
-        file=parent_file,
-        bucket=page.bucket,
+        file_id=file_id,
         page_number=page.page_number,
-        metadata__project_id=page.metadata.project_id,
-        metadata__project_year=page.metadata.project_year,
-        metadata__file_creation=page.metadata.file_creation,
-        metadata__file_updated=page.metadata.file_updated,
-        metadata__version=page.metadata.version,
+        **_page_values(page),
     )
     return db_page
 
 
+def _page_values(page: DomainFilePage) -> dict[str, Any]:
+    return {
+        "bucket": page.bucket,
+        "metadata__project_id": page.metadata.project_id,
+        "metadata__project_year": page.metadata.project_year,
+        "metadata__file_creation": page.metadata.file_creation,
+        "metadata__file_updated": page.metadata.file_updated,
+        "metadata__version": page.metadata.version,
+    }
+
+
 def _db_to_domain(db_obj: FileDB) -> DomainFile:
     return DomainFile(
         id=str(db_obj.id),
@@ -299,6 +487,36 @@ def _db_to_domain(db_obj: FileDB) -> DomainFile:
     )
 
 
+def _db_to_domain_with_pages(db_obj: FileDB) -> DomainFile:
+    # rows are not stored in page order once pages were updated in place
+    file_domain = _db_to_domain(db_obj)
+    for page in sorted(db_obj.pages, key=lambda p: p.page_number):
+        domain_page = _db_page_to_domain(page)
+        domain_page.fragements = [
+            _db_fragement_to_domain(f)
+            for f in sorted(page.fragments, key=lambda f: f.fragement_number)
+        ]
+        file_domain.pages.append(domain_page)
+    return file_domain
+
+
+def _row_to_header(row: dict[str, Any]) -> DomainFileHeader:
+    return DomainFileHeader(
+        id=str(row["id"]),
+        filepath=row["filepath"],
+        filename=row["filename"],
+        bucket=row["bucket"],
+        metadata=DomainFileMetadata(
+            project_id=row["metadata_project_id"],
+            project_year=row["metadata_project_year"],
+            version=row["metadata_version"],
+            file_creation=row["metadata_file_creation"],
+            file_updated=row["metadata_file_updated"],
+            other_metadata=row["metatdata_other"],
+        ),
+    )
+
+
 def _db_page_to_domain(db_page: FilePageDB) -> DomainFilePage:
     return DomainFilePage(
         bucket=db_page.bucket,
@@ -0,0 +1,127 @@
+import logging
+import os
+import time
+import tracemalloc
+
+from domain_test import AsyncTestBase
+from domain_test.enviroment import test_containers
+from testcontainers.postgres import PostgresContainer
+
+from core.logger import init_logging
+from core.singelton import SingletonMeta
+from database.session import DatabaseConfig, PostgresSession
+from file_database.file_db_implementation import (
+    PostgresFileDatabase,
+    _domain_fragment_to_db,
+    _domain_page_to_db,
+    _domain_to_db,
+)
+import file_database.model as file_model
+
+from tests.update_benchmark_test import build_file
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+BENCHMARK_FILES = int(os.environ.get("FILE_LISTING_BENCHMARK_FILES", "100000"))
+INSERT_BATCH = 5000
+APPLICATION_VERSION = 2
+
+
+async def insert_files(count: int):
+    """Bulk inserts *count* files of one page each, every second file is outdated."""
+    template = build_file(pages=1)
+    for start in range(0, count, INSERT_BATCH):
+        files, pages, fragments = [], [], []
+        for number in range(start, min(start + INSERT_BATCH, count)):
+            file = template.model_copy(
+                update={"filepath": f"/benchmark/{number}.pdf", "filename": f"{number}.pdf"}
+            )
+            file.metadata = file.metadata.model_copy(
+                update={"version": APPLICATION_VERSION - number % 2}
+            )
+            db_file = _domain_to_db(file)
+            files.append(db_file)
+            for page in file.pages:
+                db_page = _domain_page_to_db(page, db_file.id)
+                pages.append(db_page)
+                fragments.extend(
+                    _domain_fragment_to_db(f, db_page.id) for f in page.fragements
+                )
+        await file_model.File.bulk_create(files)
+        await file_model.FilePage.bulk_create(pages)
+        await file_model.PageFragement.bulk_create(fragments)
+
+
+class TestFileListingBenchmark(AsyncTestBase):
+    __test__ = True
+    db: PostgresFileDatabase
+    session: PostgresSession
+    container: PostgresContainer
+    cfg: DatabaseConfig
+
+    def setup_method_sync(self, test_name: str):
+        self.container = PostgresContainer(
+            image=test_containers.POSTGRES_VERSION,
+            username="test",
+            password="test",
+            dbname="test_db",
+        ).start()
+
+        self.cfg = DatabaseConfig(
+            host=self.container.get_container_host_ip(),
+            port=str(self.container.get_exposed_port(self.container.port)),
+            database_name="test_db",
+            username="test",
+            password="test",
+        )
+
+    async def setup_method_async(self, test_name: str):
+        self.session = PostgresSession.create(  # type: ignore[assignment]
+            config=self.cfg,
+            models=[file_model],
+        )
+        await self.session.start()
+        await self.session.migrations()
+        self.db = PostgresFileDatabase()
+
+    def teardown_method_sync(self, test_name: str):
+        self.container.stop()
+        SingletonMeta.clear_all()
+
+    async def teardown_method_async(self, test_name: str):
+        await self.session.shutdown()
+
+    async def test_benchmark_outdated_files(self):
+        """Memory and time to find the outdated files, full files against headers."""
+        await insert_files(BENCHMARK_FILES)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        files = (
+            await self.db.fetch_files_blow_a_certain_version(APPLICATION_VERSION)
+        ).get_ok()
+        before_ids = {file.id for file in files}
+        before_time = time.perf_counter() - start
+        _, before_peak = tracemalloc.get_traced_memory()
+        del files
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        after_ids: set[str] = set()
+        async for result in self.db.iterate_headers(below_version=APPLICATION_VERSION):
+            after_ids.update(header.id for header in result.get_ok())
+        after_time = time.perf_counter() - start
+        _, after_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        logger.info(
+            f"{BENCHMARK_FILES} files, {len(after_ids)} outdated: "
+            f"before {before_time * 1000:.0f} ms, peak {before_peak / 2**20:.1f} MiB, "
+            f"after {after_time * 1000:.0f} ms, peak {after_peak / 2**20:.1f} MiB"
+        )
+        assert after_ids == before_ids
+        assert len(after_ids) == BENCHMARK_FILES // 2
+        assert after_peak < before_peak
+        assert after_time < before_time
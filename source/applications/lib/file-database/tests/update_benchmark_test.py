@@ -0,0 +1,198 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+from domain_test import AsyncTestBase
+from domain_test.enviroment import test_containers
+from testcontainers.postgres import PostgresContainer
+from tortoise import transactions
+
+from core.logger import init_logging
+from core.result import Result
+from core.singelton import SingletonMeta
+from database.session import DatabaseConfig, PostgresSession
+from domain.database.file.model import (
+    File,
+    FileMetadata,
+    FilePage,
+    FragementTypes,
+    PageFragement,
+    PageMetadata,
+)
+from file_database.file_db_implementation import (
+    PostgresFileDatabase,
+    _domain_fragment_to_db,
+    _domain_page_to_db,
+    _domain_to_db,
+)
+import file_database.model as file_model
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+BENCHMARK_PAGES = int(os.environ.get("FILE_UPDATE_BENCHMARK_PAGES", "500"))
+FRAGMENTS_PER_PAGE = 4
+
+
+def build_file(pages: int) -> File:
+    now = datetime.now()
+    page_metadata = PageMetadata(
+        project_id="project",
+        project_year=2024,
+        version=1,
+        file_creation=now,
+        file_updated=now,
+    )
+    return File(
+        id="",
+        filepath="/benchmark/large.pdf",
+        filename="large.pdf",
+        bucket="bucket",
+        metadata=FileMetadata(
+            project_id="project",
+            project_year=2024,
+            version=1,
+            file_creation=now,
+            file_updated=now,
+            other_metadata={},
+        ),
+        pages=[
+            FilePage(
+                bucket="bucket",
+                page_number=page_number,
+                metadata=page_metadata,
+                fragements=[
+                    PageFragement(
+                        fragement_type=FragementTypes.TEXT,
+                        fragement_number=number,
+                        storage_filename=f"large_page_{page_number}_fragement_{number}.md",
+                    )
+                    for number in range(FRAGMENTS_PER_PAGE)
+                ],
+            )
+            for page_number in range(pages)
+        ],
+    )
+
+
+def change_one_percent(file: File) -> File:
+    changed = file.model_copy(deep=True)
+    for page in changed.pages[:: 100]:
+        page.fragements[0].storage_filename += ".v2"
+    return changed
+
+
+async def legacy_update(db: PostgresFileDatabase, obj: File) -> Result[None]:
+    """The update as it was, purge the file and insert it page by page."""
+    async with transactions.in_transaction():  # type: ignore
+        purge = await db._pg_db_file.delete(obj.id)
+        if purge.is_error():
+            return purge.propagate_exception()
+        db_obj = _domain_to_db(obj)
+        await db_obj.save(force_create=True)
+        pages = [_domain_page_to_db(p, db_obj.id) for p in obj.pages]
+        for page in pages:
+            await page.save(force_create=True)
+        for page, page_db in zip(obj.pages, pages):
+            await file_model.PageFragement.bulk_create(
+                [_domain_fragment_to_db(f, page_db.id) for f in page.fragements]
+            )
+    return Result.Ok()
+
+
+class _StatementCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.statements = 0
+
+    def emit(self, record: logging.LogRecord):
+        self.statements += 1
+
+
+@contextmanager
+def count_statements() -> Iterator[_StatementCounter]:
+    """Counts the statements tortoise sends, every query is logged by its db client."""
+    db_logger = logging.getLogger("tortoise.db_client")
+    counter = _StatementCounter()
+    level = db_logger.level
+    db_logger.addHandler(counter)
+    db_logger.setLevel(logging.DEBUG)
+    try:
+        yield counter
+    finally:
+        db_logger.removeHandler(counter)
+        db_logger.setLevel(level)
+
+
+class TestFileUpdateBenchmark(AsyncTestBase):
+    __test__ = True
+    db: PostgresFileDatabase
+    session: PostgresSession
+    container: PostgresContainer
+    cfg: DatabaseConfig
+
+    def setup_method_sync(self, test_name: str):
+        self.container = PostgresContainer(
+            image=test_containers.POSTGRES_VERSION,
+            username="test",
+            password="test",
+            dbname="test_db",
+        ).start()
+
+        self.cfg = DatabaseConfig(
+            host=self.container.get_container_host_ip(),
+            port=str(self.container.get_exposed_port(self.container.port)),
+            database_name="test_db",
+            username="test",
+            password="test",
+        )
+
+    async def setup_method_async(self, test_name: str):
+        self.session = PostgresSession.create(  # type: ignore[assignment]
+            config=self.cfg,
+            models=[file_model],
+        )
+        await self.session.start()
+        await self.session.migrations()
+        self.db = PostgresFileDatabase()
+
+    def teardown_method_sync(self, test_name: str):
+        self.container.stop()
+        SingletonMeta.clear_all()
+
+    async def teardown_method_async(self, test_name: str):
+        await self.session.shutdown()
+
+    async def test_benchmark_one_percent_changed(self):
+        """Statements and time to update a large file with 1% changed pages."""
+        original = build_file(BENCHMARK_PAGES)
+        original.id = (await self.db.create(original)).get_ok()
+        changed = change_one_percent(original)
+
+        with count_statements() as before:
+            start = time.perf_counter()
+            assert (await legacy_update(self.db, changed)).is_ok()
+            before_time = time.perf_counter() - start
+
+        # back to the original content, then the same change with the diff
+        assert (await self.db.update(original)).is_ok()
+        with count_statements() as after:
+            start = time.perf_counter()
+            assert (await self.db.update(changed)).is_ok()
+            after_time = time.perf_counter() - start
+
+        logger.info(
+            f"{BENCHMARK_PAGES} pages, 1% changed: "
+            f"before {before.statements} statements in {before_time * 1000:.0f} ms, "
+            f"after {after.statements} statements in {after_time * 1000:.0f} ms"
+        )
+        stored = (await self.db.get(original.id)).get_ok()
+        assert stored is not None
+        assert [
+            [f.storage_filename for f in page.fragements] for page in stored.pages
+        ] == [[f.storage_filename for f in page.fragements] for page in changed.pages]
+        assert after.statements < before.statements
+        assert after_time < before_time
@@ -6,13 +6,13 @@ from tortoise.contrib.postgres.indexes import GinIndex
 
 
 class TripleToDocDB(DatabaseBaseModel):
-    triple = fields.CharField(max_length=1024)  # ["s","p","o"]
-    doc_id = fields.CharField(max_length=255)
+    triple = fields.CharField(max_length=1024, db_index=True)  # ["s","p","o"]
+    doc_id = fields.CharField(max_length=255, db_index=True)
 
 
 class EntNodeChunkDB(DatabaseBaseModel):
     ent_node = fields.CharField(max_length=255, db_index=True)
-    chunk_id = fields.CharField(max_length=255)
+    chunk_id = fields.CharField(max_length=255, db_index=True)
 
 
 class OpenIEDocumentDB(DatabaseBaseModel):
@@ -1,12 +1,11 @@
 from __future__ import annotations
 from core.hash import compute_mdhash_id
-from copy import deepcopy
-import asyncio
 import operator
 from functools import reduce
 from tortoise.expressions import Q
 
 import logging
+from typing import Iterator, TypeVar
 
 from opentelemetry import trace
 
@@ -25,6 +24,13 @@ from hippo_rag_database.model import (
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# ids per IN clause, stays well below the postgres bind parameter limit
+_IN_CLAUSE_SIZE = 10_000
+# rows per bulk insert, every row binds one parameter per column
+_BULK_INSERT_SIZE = 2_000
+
 
 class _InternPostgresDBTripleToDoc(BaseDatabase[TripleToDocDB]):
     def __init__(self):
@@ -81,45 +87,50 @@ class PostgresDBStateStore(StateStore):
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
 
-    async def _delete_entity_in_chunk(
-        self, ent_node: str, chunk_id: str
-    ) -> Result[None]:
-        with self.tracer.start_as_current_span("ent-node-to-chunk"):
+    async def triples_to_docs_bulk(
+        self, triples: list[Triple]
+    ) -> Result[dict[Triple, set[str]]]:
+        with self.tracer.start_as_current_span("triples-to-docs-bulk"):
             try:
-                result = await self._db_ent_node_chunk.run_query(
-                    query={
-                        "ent_node": compute_mdhash_id(ent_node),
-                        "chunk_id": chunk_id,
-                    }
+                hash_to_triple = {compute_mdhash_id(str(t)): t for t in triples}
+                mapping = await self._triple_hashes_to_docs(list(hash_to_triple))
+                return Result.Ok(
+                    {hash_to_triple[h]: doc_ids for h, doc_ids in mapping.items()}
                 )
-                if result.is_error():
-                    return result.propagate_exception()
-                rows = result.get_ok()
-                if len(rows) > 0:
-                    return await self._db_ent_node_chunk.delete(str(rows[0].id))
-                return Result.Ok(None)
             except Exception as e:
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
 
-    async def _delete_triple_in_chunk(
-        self, triple: Triple, chunk_id: str
-    ) -> Result[None]:
-        with self.tracer.start_as_current_span("ent-node-to-chunk"):
+    async def ent_nodes_to_chunks_bulk(
+        self, ent_nodes: list[str]
+    ) -> Result[dict[str, set[str]]]:
+        with self.tracer.start_as_current_span("ent-nodes-to-chunks-bulk"):
             try:
-                result = await self._db_triple_to_doc.run_query(
-                    query={"triple": compute_mdhash_id(str(triple)), "doc_id": chunk_id}
-                )
-                if result.is_error():
-                    return result.propagate_exception()
-                rows = result.get_ok()
-                if len(rows) > 0:
-                    return await self._db_triple_to_doc.delete(str(rows[0].id))
-                return Result.Ok(None)
+                return Result.Ok(await self._ent_hashes_to_chunks(ent_nodes))
             except Exception as e:
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
 
+    async def _triple_hashes_to_docs(self, hashes: list[str]) -> dict[str, set[str]]:
+        mapping: dict[str, set[str]] = {h: set() for h in hashes}
+        for ids in _chunked(list(mapping), _IN_CLAUSE_SIZE):
+            rows = await TripleToDocDB.filter(triple__in=ids).values_list(
+                "triple", "doc_id"
+            )
+            for triple, doc_id in rows:
+                mapping[triple].add(doc_id)
+        return mapping
+
+    async def _ent_hashes_to_chunks(self, hashes: list[str]) -> dict[str, set[str]]:
+        mapping: dict[str, set[str]] = {h: set() for h in hashes}
+        for ids in _chunked(list(mapping), _IN_CLAUSE_SIZE):
+            rows = await EntNodeChunkDB.filter(ent_node__in=ids).values_list(
+                "ent_node", "chunk_id"
+            )
+            for ent_node, chunk_id in rows:
+                mapping[ent_node].add(chunk_id)
+        return mapping
+
     async def ent_node_count(self) -> Result[int]:
         with self.tracer.start_as_current_span("ent-node-count"):
             try:
@@ -134,52 +145,40 @@ class PostgresDBStateStore(StateStore):
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
 
-    async def _add_chunks_to_triple(
-        self, triple: Triple, chunk_ids: list[str]
+    async def _add_missing_links(
+        self,
+        triple_links: set[tuple[str, str]],
+        entity_links: set[tuple[str, str]],
     ) -> Result[None]:
-        with self.tracer.start_as_current_span("add-chunks-to-node"):
+        """
+        Creates the triple -> chunk and entity -> chunk mappings that do not exist yet.
+        Links are (hash, chunk_id) pairs, existing ones are looked up with one query per key type.
+        """
+        with self.tracer.start_as_current_span("add-missing-links"):
             try:
-                # Avoid duplicates: fetch existing mappings
-                existing_result = await self.triples_to_docs(triple)
-                if existing_result.is_error():
-                    return existing_result.propagate_exception()
-                existing_chunks = set(existing_result.get_ok() or [])
-                new_chunks = [cid for cid in chunk_ids if cid not in existing_chunks]
-
-                if not new_chunks:
-                    return Result.Ok(None)
-
-                # Optional: swap for bulk_create if your BaseDatabase exposes it
-                for cid in new_chunks:
-                    await self._db_triple_to_doc.create(
-                        TripleToDocDB(triple=compute_mdhash_id(str(triple)), doc_id=cid)
-                    )
-                return Result.Ok(None)
-            except Exception as e:
-                logger.error(e, exc_info=True)
-                return Result.Err(e)
-
-    async def _add_chunks_to_node(
-        self, ent_node: str, chunk_ids: list[str]
-    ) -> Result[None]:
-        with self.tracer.start_as_current_span("add-chunks-to-node"):
-            try:
-                # Avoid duplicates: fetch existing mappings
-                hash = compute_mdhash_id(ent_node)
-                existing_result = await self.ent_node_to_chunk(hash)
-                if existing_result.is_error():
-                    return existing_result.propagate_exception()
-                existing_chunks = set(existing_result.get_ok() or [])
-                new_chunks = [cid for cid in chunk_ids if cid not in existing_chunks]
-
-                if not new_chunks:
-                    return Result.Ok(None)
-
-                # Optional: swap for bulk_create if your BaseDatabase exposes it
-                for cid in new_chunks:
-                    result = await self._db_ent_node_chunk.create(
-                        EntNodeChunkDB(ent_node=hash, chunk_id=cid)
-                    )
+                existing_triples = await self._triple_hashes_to_docs(
+                    list({h for h, _ in triple_links})
+                )
+                new_triples = [
+                    TripleToDocDB(triple=h, doc_id=chunk_id)
+                    for h, chunk_id in sorted(triple_links)
+                    if chunk_id not in existing_triples[h]
+                ]
+                existing_entities = await self._ent_hashes_to_chunks(
+                    list({h for h, _ in entity_links})
+                )
+                new_entities = [
+                    EntNodeChunkDB(ent_node=h, chunk_id=chunk_id)
+                    for h, chunk_id in sorted(entity_links)
+                    if chunk_id not in existing_entities[h]
+                ]
+
+                for rows in _chunked(new_triples, _BULK_INSERT_SIZE):
+                    result = await self._db_triple_to_doc.create_list(rows)
+                    if result.is_error():
+                        return result.propagate_exception()
+                for rows in _chunked(new_entities, _BULK_INSERT_SIZE):
+                    result = await self._db_ent_node_chunk.create_list(rows)
                     if result.is_error():
                         return result.propagate_exception()
                 return Result.Ok(None)
@@ -242,29 +241,47 @@ class PostgresDBStateStore(StateStore):
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
 
+    async def load_openie_info_after(
+        self, after_idx: str | None = None, chunk_size: int = 1024
+    ) -> Result[DocumentCollection]:
+        """
+        Keyset pagination over the unique chunk idx,
+        every page costs the same independent of how deep it is.
+        """
+        with self.tracer.start_as_current_span("load-openie-info-after"):
+            try:
+                qs = OpenIEDocumentDB.all()
+                if after_idx is not None:
+                    qs = qs.filter(idx__gt=after_idx)
+                docs_db = await qs.order_by("idx").limit(chunk_size)
+                docs_domain = [db_to_document(doc) for doc in docs_db]
+                return Result.Ok(DocumentCollection(docs=docs_domain))
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
+
     async def fetch_not_existing_documents(
         self, hash_ids: list[str]
     ) -> Result[list[str]]:
         with self.tracer.start_as_current_span("fetch-not-existing-ids"):
-            try:
-                if not hash_ids:
-                    return Result.Ok(([]))
-
-                missing = deepcopy(hash_ids)
+            result = await self.fetch_existing_documents(hash_ids)
+            if result.is_error():
+                return result.propagate_exception()
+            existing = result.get_ok()
+            return Result.Ok([id for id in hash_ids if id not in existing])
 
-                # Chunk the IN clause for very large inputs
-                for ids in _chunked(hash_ids, 10):
-                    results = await asyncio.gather(
-                        *[self._db_openie.run_query_first({"idx": id}) for id in ids]
+    async def fetch_existing_documents(
+        self, hash_ids: list[str]
+    ) -> Result[set[str]]:
+        with self.tracer.start_as_current_span("fetch-existing-ids"):
+            try:
+                existing: set[str] = set()
+                for ids in _chunked(list(set(hash_ids)), _IN_CLAUSE_SIZE):
+                    rows = await OpenIEDocumentDB.filter(idx__in=ids).values_list(
+                        "idx", flat=True
                     )
-                    for result in results:
-                        if result.is_error():
-                            return result.propagate_exception()
-                        document = result.get_ok()
-                        if document:
-                            missing.remove(document.idx)
-
-                return Result.Ok(missing)
+                    existing.update(rows)  # type: ignore
+                return Result.Ok(existing)
             except Exception as e:
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
@@ -279,6 +296,8 @@ class PostgresDBStateStore(StateStore):
                     return result.propagate_exception()
                 found_doc = result.get_ok()
                 map_hash_id_to_db = {doc.idx: doc.id for doc in found_doc}
+                triple_links: set[tuple[str, str]] = set()
+                entity_links: set[tuple[str, str]] = set()
 
                 for doc in documents.docs:
                     db_obj = document_to_db(doc)
@@ -292,24 +311,11 @@ class PostgresDBStateStore(StateStore):
                         return result.propagate_exception()
 
                     for triple in doc.extracted_triples:
-                        result_triple = self._add_chunks_to_triple(
-                            triple=triple, chunk_ids=[doc.idx]
-                        )
-                        if result.is_error():
-                            return result.propagate_exception()
-                        entities = [triple[0], triple[2]]
-                        results = await asyncio.gather(
-                            *[
-                                self._add_chunks_to_node(ent, [doc.idx])
-                                for ent in entities
-                            ],
-                            result_triple,
-                        )
-                        for result in results:
-                            if result.is_error():
-                                return result.propagate_exception()
+                        triple_links.add((compute_mdhash_id(str(triple)), doc.idx))
+                        entity_links.add((compute_mdhash_id(triple[0]), doc.idx))
+                        entity_links.add((compute_mdhash_id(triple[2]), doc.idx))
 
-                return Result.Ok(None)
+                return await self._add_missing_links(triple_links, entity_links)
             except Exception as e:
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
@@ -317,35 +323,11 @@ class PostgresDBStateStore(StateStore):
     async def delete_chunks(self, hash_ids: list[str]) -> Result[None]:
         with self.tracer.start_as_current_span("delete-chunks"):
             try:
-                result = await self._fetch_chunks_by_ids(hash_ids=hash_ids)
-                if result.is_error():
-                    return result.propagate_exception()
-                found_chunks = result.get_ok()
-                for doc in found_chunks:
-                    result = await self._db_openie.delete(str(doc.id))
-                    if result.is_error():
-                        return result.propagate_exception()
-
-                    for triple in doc.extracted_triples:
-                        assert len(triple) == 3
-                        result_triple = self._delete_triple_in_chunk(
-                            triple=(triple[0], triple[1], triple[2]),
-                            chunk_id=doc.idx,
-                        )
-                        if result.is_error():
-                            return result.propagate_exception()
-                        entities = [triple[0], triple[2]]
-                        results = await asyncio.gather(
-                            *[
-                                self._delete_entity_in_chunk(ent, doc.idx)
-                                for ent in entities
-                            ],
-                            result_triple,
-                        )
-                        for result in results:
-                            if result.is_error():
-                                return result.propagate_exception()
-
+                # the mappings of a chunk are exactly the rows carrying its id
+                for ids in _chunked(list(set(hash_ids)), _IN_CLAUSE_SIZE):
+                    await TripleToDocDB.filter(doc_id__in=ids).delete()
+                    await EntNodeChunkDB.filter(chunk_id__in=ids).delete()
+                    await OpenIEDocumentDB.filter(idx__in=ids).delete()
                 return Result.Ok(None)
             except Exception as e:
                 logger.error(e, exc_info=True)
@@ -384,6 +366,6 @@ class PostgresDBStateStore(StateStore):
                 return Result.Err(e)
 
 
-def _chunked(seq: list[str], size: int):
+def _chunked(seq: list[T], size: int) -> Iterator[list[T]]:
     for i in range(0, len(seq), size):
         yield seq[i : i + size]
@@ -1,13 +1,16 @@
 from __future__ import annotations
+import asyncio
+import time
+from ast import literal_eval
 from core.singelton import BaseSingleton
 from domain.text_embedding.model import EmbeddingResponseDto
 from qdrant_client.conversions.common_types import PointId
 import logging
-from domain.text_embedding.interface import EmbeddClient
+from domain.text_embedding.interface import AsyncEmbeddClient, EmbeddClient
 from opentelemetry import trace
 
 import uuid
-from typing import List, Literal
+from typing import Any, List, Literal
 
 from core.result import Result
 from qdrant_client import AsyncQdrantClient, models
@@ -16,7 +19,10 @@ from qdrant_client.models import HasIdCondition, RecommendInput, RecommendQuery
 # from qdrant_client.grpc import HasIdCondition
 from qdrant_client.models import (
     Distance,
+    FieldCondition,
     Filter,
+    MatchAny,
+    PayloadSchemaType,
     PointStruct,
     VectorParams,
 )
@@ -26,6 +32,7 @@ from pydantic import BaseModel
 from domain.hippo_rag.model import (
     Row,
     SimilarNodes,
+    Triple,
 )  # expects: Row(hash_id: str, content: str, ...)
 from domain.hippo_rag.interfaces import EmbeddingStoreInterface
 
@@ -34,12 +41,17 @@ from core.hash import compute_mdhash_id
 logger = logging.getLogger(__name__)
 
 Namespace = Literal["entity", "facts", "chunk"]
+PayloadFilterMode = Literal["auto", "always", "never"]
+MetadataFilter = dict[str, list[str] | list[int] | list[float]]
 
 TEXT_PAYLOAD_KEY: str = "text"
 HASH_PAYLOAD_KEY: str = "hash_id"
+# [subject, predicate, object] of the points in the facts namespace
+FACT_PAYLOAD_KEY: str = "fact"
 
 
 class QdrantConfig(BaseModel):
+    location: str | None = None
     url: str | None = None
     host: str | None = None
     port: int | None = None
@@ -57,6 +69,18 @@ class QdrantEmbeddingStoreConfig(BaseModel):
     dim: int
     distance: Distance = Distance.COSINE
     default_top_k: int = 10
+    # metadata keys stored as indexed payload fields to restrict queries.
+    # Shared facts and entities carry the merged values of all owning chunks per key,
+    # the link between the keys is lost: project=A AND doc_id=y also matches
+    # a point owned by a chunk (A, x) and a chunk (B, y).
+    payload_filter_keys: list[str] = ["project", "doc_id"]
+    # auto: use payload filters once the collection has indexes for the keys
+    # always: trust the payload (embedded mode has no payload indexes)
+    # never: always send the explicit id list
+    payload_filter_mode: PayloadFilterMode = "auto"
+    # in auto mode a collection without indexes is checked again after this time,
+    # it may have been migrated by another process
+    payload_filter_recheck_seconds: float = 60.0
 
 
 class HippoRAGVectorStoreSession(BaseSingleton):
@@ -69,6 +93,7 @@ class HippoRAGVectorStoreSession(BaseSingleton):
 
     def _init_once(self, config: QdrantConfig):
         self._aclient = AsyncQdrantClient(
+            location=config.location,
             url=config.url,
             host=config.host,
             port=config.port,
@@ -94,11 +119,20 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
         self,
         config: QdrantEmbeddingStoreConfig,
         embedder: EmbeddClient,
+        async_embedder: AsyncEmbeddClient | None = None,
     ):
+        """
+        Without async_embedder the sync embedder runs in a worker thread,
+        so embedding never blocks the event loop.
+        """
         self.tracer = trace.get_tracer("QdrantEmbeddingStore")
         self._config = config
         self.embedder = embedder
+        self.async_embedder = async_embedder
         self.client = HippoRAGVectorStoreSession.Instance().get_qdrant_client()
+        self._payload_filter_ready: dict[str, bool] = {}
+        self._payload_filter_checked: dict[str, float] = {}
+        self._payload_lock = asyncio.Lock()
 
     def _collection_name(self, collection: str | None = None) -> str:
         return f"{self._config.namespace}-{collection or self._config.collection}"
@@ -115,11 +149,347 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
                         size=self._config.dim, distance=self._config.distance
                     ),
                 )
+                # a new collection receives the filter payload with every insert
+                await self._create_payload_indexes(collection)
             except Exception as e:
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
         return Result.Ok()
 
+    # ---------- payload filters ----------
+    async def _create_payload_indexes(self, collection: str) -> None:
+        for key in self._config.payload_filter_keys:
+            await self.client.create_payload_index(
+                collection_name=collection,
+                field_name=key,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
+        self._payload_filter_ready[collection] = True
+
+    async def ensure_payload_indexes(self, collection: str | None = None) -> Result[None]:
+        """
+        Creates the keyword indexes for the payload filter keys.
+        Has to be called after the filter payload of an existing collection was migrated,
+        from then on queries are restricted by payload instead of id lists.
+        """
+        with self.tracer.start_as_current_span("ensure-payload-indexes"):
+            try:
+                collection_name = self._collection_name(collection)
+                result = await self.ensure_collection(collection_name)
+                if result.is_error():
+                    return result.propagate_exception()
+                await self._create_payload_indexes(collection_name)
+                return Result.Ok()
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
+
+    async def _is_payload_filter_ready(self, collection: str) -> bool:
+        if self._config.payload_filter_mode == "always":
+            return True
+        if self._config.payload_filter_mode == "never":
+            return False
+        if self._payload_filter_ready.get(collection):
+            return True
+        checked = self._payload_filter_checked.get(collection)
+        if (
+            checked is not None
+            and time.monotonic() - checked < self._config.payload_filter_recheck_seconds
+        ):
+            return False
+        info = await self.client.get_collection(collection)
+        ready = all(
+            key in info.payload_schema for key in self._config.payload_filter_keys
+        )
+        self._payload_filter_ready[collection] = ready
+        self._payload_filter_checked[collection] = time.monotonic()
+        return ready
+
+    async def _checked_payload_filter_ready(self, collection: str) -> Result[bool]:
+        # the collection is only looked up until its state is cached,
+        # creating it or ensure_payload_indexes refreshes the cache
+        if (
+            self._config.payload_filter_mode == "auto"
+            and collection not in self._payload_filter_ready
+        ):
+            result = await self.ensure_collection(collection)
+            if result.is_error():
+                return result.propagate_exception()
+        return Result.Ok(await self._is_payload_filter_ready(collection))
+
+    def _filter_payload(
+        self, metadata: dict[str, Any] | None
+    ) -> dict[str, list[str]]:
+        if not metadata:
+            return {}
+        payload: dict[str, list[str]] = {}
+        for key in self._config.payload_filter_keys:
+            if key not in metadata:
+                continue
+            value = metadata[key]
+            values = value if isinstance(value, (list, set, tuple)) else [value]
+            payload[key] = sorted({str(v) for v in values})  # type: ignore
+        return payload
+
+    @staticmethod
+    def _payload_filter(metadata_filter: MetadataFilter) -> Filter:
+        return Filter(
+            must=[
+                FieldCondition(key=key, match=MatchAny(any=[str(v) for v in values]))
+                for key, values in metadata_filter.items()
+            ]
+        )  # type: ignore
+
+    def _payload_filter_keys_match(self, metadata_filter: MetadataFilter | None) -> bool:
+        # keys without values do not restrict anything, same as in the state store
+        keys = [k for k, v in (metadata_filter or {}).items() if v]
+        return len(keys) > 0 and all(
+            key in self._config.payload_filter_keys for key in keys
+        )
+
+    async def _payload_filter_applies(
+        self, collection: str, metadata_filter: MetadataFilter | None
+    ) -> bool:
+        return self._payload_filter_keys_match(
+            metadata_filter
+        ) and await self._is_payload_filter_ready(collection)
+
+    async def is_payload_filter_ready(
+        self, collection: str | None = None
+    ) -> Result[bool]:
+        """
+        Whether queries of the collection are restricted by the payload,
+        false for collections that were created before and not migrated yet.
+        """
+        try:
+            return await self._checked_payload_filter_ready(
+                self._collection_name(collection)
+            )
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return Result.Err(e)
+
+    async def payload_filter_applies(
+        self, metadata_filter: MetadataFilter | None, collection: str | None = None
+    ) -> Result[bool]:
+        """
+        Whether queries with this metadata_filter are restricted by the payload alone.
+        If so callers do not have to derive allowd__point_ids.
+        """
+        try:
+            if not self._payload_filter_keys_match(metadata_filter):
+                return Result.Ok(False)
+            return await self._checked_payload_filter_ready(
+                self._collection_name(collection)
+            )
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return Result.Err(e)
+
+    async def _build_filter(
+        self,
+        collection: str,
+        allowd__point_ids: list[str] | None,
+        metadata_filter: MetadataFilter | None,
+    ) -> Filter | None:
+        """
+        Prefers a payload filter over the explicit id list.
+        The payload is only used if every filter key is a payload filter key,
+        otherwise the semantics of the id list derived by the caller would change.
+        """
+        if metadata_filter and await self._payload_filter_applies(
+            collection, metadata_filter
+        ):
+            return self._payload_filter({k: v for k, v in metadata_filter.items() if v})
+        if allowd__point_ids:
+            return Filter(
+                must=[
+                    HasIdCondition(
+                        has_id=[self._normalize_id(id) for id in allowd__point_ids]
+                    )
+                ]
+            )  # type: ignore
+        return None
+
+    async def _merge_filter_payload(
+        self,
+        collection: str,
+        point_payloads: dict[str, dict[str, list[str]]],
+    ) -> None:
+        """
+        Adds filter values to already existing points.
+        Qdrant has no array append, so the values are read, merged and written back.
+        Points that end up with the same payload are updated in one operation.
+        """
+        point_payloads = {k: v for k, v in point_payloads.items() if v}
+        if not point_payloads:
+            return
+        async with self._payload_lock:
+            existing = await self.client.retrieve(
+                collection_name=collection,
+                ids=[self._normalize_id(id) for id in point_payloads.keys()],
+                with_payload=[HASH_PAYLOAD_KEY, *self._config.payload_filter_keys],
+                with_vectors=False,
+            )
+            groups: dict[str, tuple[dict[str, list[str]], list[str]]] = {}
+            for point in existing:
+                if not point.payload:
+                    continue
+                hash_id = point.payload.get(HASH_PAYLOAD_KEY, "")
+                merged: dict[str, list[str]] = {}
+                changed = False
+                for key, values in point_payloads.get(hash_id, {}).items():
+                    current = point.payload.get(key) or []
+                    union = sorted({*current, *values})
+                    changed = changed or len(union) != len(current)
+                    merged[key] = union
+                if not changed:
+                    continue
+                group_key = repr(sorted(merged.items()))
+                if group_key not in groups:
+                    groups[group_key] = (merged, [])
+                groups[group_key][1].append(str(point.id))
+
+            if not groups:
+                return
+            await self.client.batch_update_points(
+                collection_name=collection,
+                update_operations=[
+                    models.SetPayloadOperation(
+                        set_payload=models.SetPayload(
+                            payload=payload,
+                            points=point_ids,  # type: ignore
+                        )
+                    )
+                    for payload, point_ids in groups.values()
+                ],
+            )
+
+    async def _replace_filter_payload(
+        self,
+        collection: str,
+        point_payloads: dict[str, dict[str, list[str]]],
+    ) -> None:
+        """
+        Overwrites the filter values of already existing points,
+        keys without values are set to an empty list so the point no longer matches them.
+        """
+        if not point_payloads:
+            return
+        async with self._payload_lock:
+            existing = await self.client.retrieve(
+                collection_name=collection,
+                ids=[self._normalize_id(id) for id in point_payloads.keys()],
+                with_payload=[HASH_PAYLOAD_KEY],
+                with_vectors=False,
+            )
+            groups: dict[str, tuple[dict[str, list[str]], list[str]]] = {}
+            for point in existing:
+                if not point.payload:
+                    continue
+                values = point_payloads.get(point.payload.get(HASH_PAYLOAD_KEY, ""), {})
+                payload = {
+                    key: values.get(key, []) for key in self._config.payload_filter_keys
+                }
+                group_key = repr(sorted(payload.items()))
+                if group_key not in groups:
+                    groups[group_key] = (payload, [])
+                groups[group_key][1].append(str(point.id))
+
+            if not groups:
+                return
+            await self.client.batch_update_points(
+                collection_name=collection,
+                update_operations=[
+                    models.SetPayloadOperation(
+                        set_payload=models.SetPayload(
+                            payload=payload,
+                            points=point_ids,  # type: ignore
+                        )
+                    )
+                    for payload, point_ids in groups.values()
+                ],
+            )
+
+    async def replace_filter_payload(
+        self, point_metadata: dict[str, dict[str, list[str]]]
+    ) -> Result[None]:
+        """
+        Replaces the metadata filter values (hash_id -> key -> values) of existing points.
+        Used after deleting chunks, so shared points only keep the values of their remaining owners.
+        """
+        with self.tracer.start_as_current_span("replace-filter-payload"):
+            try:
+                await self._replace_filter_payload(
+                    self._collection_name(),
+                    {
+                        hash_id: self._filter_payload(metadata)
+                        for hash_id, metadata in point_metadata.items()
+                    },
+                )
+                return Result.Ok()
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
+
+    async def set_filter_payload(
+        self, point_metadata: dict[str, dict[str, list[str]]]
+    ) -> Result[None]:
+        """
+        Adds metadata filter values (hash_id -> key -> values) to existing points.
+        Used when migrating collections that were created without filter payload.
+        """
+        with self.tracer.start_as_current_span("set-filter-payload"):
+            try:
+                collection_name = self._collection_name()
+                await self._merge_filter_payload(
+                    collection_name,
+                    {
+                        hash_id: self._filter_payload(metadata)
+                        for hash_id, metadata in point_metadata.items()
+                    },
+                )
+                return Result.Ok()
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
+
+    def _fact_payload(self, text: str) -> dict[str, list[str]]:
+        """
+        Facts are inserted as str(triple), the triple is parsed once here
+        and stored as payload field so queries do not have to parse it again.
+        """
+        if self._config.namespace != "facts":
+            return {}
+        try:
+            triple = literal_eval(text)
+        except (ValueError, SyntaxError):
+            return {}
+        if not isinstance(triple, tuple) or len(triple) != 3:
+            return {}
+        return {FACT_PAYLOAD_KEY: [str(part) for part in triple]}
+
+    @staticmethod
+    def _triple(payload: dict[str, Any]) -> Triple | None:
+        fact = payload.get(FACT_PAYLOAD_KEY)
+        if not fact:
+            return None
+        return (fact[0], fact[1], fact[2])
+
+    async def _embed_doc(
+        self, texts: list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        if self.async_embedder:
+            return await self.async_embedder.embed_doc(texts)
+        return await asyncio.to_thread(self.embedder.embed_doc, texts)
+
+    async def _embed_query(
+        self, query: str
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        if self.async_embedder:
+            return await self.async_embedder.embed_query(query)
+        return await asyncio.to_thread(self.embedder.embed_query, query)
+
     @staticmethod
     def _normalize_id(val: str) -> str:
         return str(uuid.uuid5(uuid.NAMESPACE_DNS, val))
@@ -135,7 +505,7 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
 
                 # Dedup by text and compute ids
                 unique_texts = list(dict.fromkeys(texts))
-                ids = [compute_mdhash_id(t) for t in texts]
+                ids = [compute_mdhash_id(t) for t in unique_texts]
                 ids_db = [self._normalize_id(id) for id in ids]
 
                 # Find which are missing
@@ -162,6 +532,7 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
     async def insert_strings(
         self,
         texts: list[str],
+        metadata: dict[str, str | int | float] | None = None,
     ) -> Result[None]:
         with self.tracer.start_as_current_span("insert-strings"):
             try:
@@ -176,9 +547,16 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
                 to_add = result.get_ok()
                 new_ids = [i for i in to_add.keys()]
                 new_texts = [t for t in to_add.values()]
+
+                filter_payload = self._filter_payload(metadata)
+                if filter_payload:
+                    existing_ids = {compute_mdhash_id(t) for t in texts} - set(new_ids)
+                    await self._merge_filter_payload(
+                        collection_name, {id: filter_payload for id in existing_ids}
+                    )
                 if len(new_texts) == 0:
                     return Result.Ok()
-                res = self.embedder.embed_doc(new_texts)
+                res = await self._embed_doc(new_texts)
                 if res.is_error():
                     return res.propagate_exception()
                 vectores = res.get_ok()
@@ -191,6 +569,8 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
                         payload={
                             TEXT_PAYLOAD_KEY: txt,
                             HASH_PAYLOAD_KEY: pid,
+                            **self._fact_payload(txt),
+                            **filter_payload,
                         },
                     )
                     for pid, txt, vec in zip(new_ids, new_texts, vectores)
@@ -326,6 +706,46 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
                 logger.error(e, exc_info=True)
                 return Result.Err(e)
 
+    async def get_ids_by_metadata(
+        self, metadata_filter: MetadataFilter, collection: str | None = None
+    ) -> Result[list[str]]:
+        """
+        Ids of all points matching the metadata_filter by payload.
+        Only valid if payload_filter_applies is true for the filter.
+        """
+        with self.tracer.start_as_current_span("get-ids-by-metadata"):
+            try:
+                collection_name = self._collection_name(collection)
+                if not await self._payload_filter_applies(
+                    collection_name, metadata_filter
+                ):
+                    return Result.Err(
+                        ValueError(
+                            f"metadata filter {list(metadata_filter.keys())} can not be answered by the payload"
+                        )
+                    )
+                flt = self._payload_filter(
+                    {k: v for k, v in metadata_filter.items() if v}
+                )
+                out: List[str] = []
+                next_page = None
+                while True:
+                    points, next_page = await self.client.scroll(
+                        collection_name=collection_name,
+                        scroll_filter=flt,
+                        with_payload=[HASH_PAYLOAD_KEY],
+                        with_vectors=False,
+                        limit=1024,
+                        offset=next_page,
+                    )
+                    out.extend(p.payload[HASH_PAYLOAD_KEY] for p in points if p.payload)
+                    if next_page is None or not points:
+                        break
+                return Result.Ok(out)
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
+
     async def get_all_id_to_rows(
         self, collection: str | None = None
     ) -> Result[dict[str, Row]]:
@@ -429,26 +849,21 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
         top_k: int | None = None,
         collection: str | None = None,
         allowd__point_ids: list[str] | None = None,
+        metadata_filter: MetadataFilter | None = None,
     ) -> Result[list[SimilarNodes]]:
         with self.tracer.start_as_current_span("query"):
             try:
                 """
                 Vector search by raw query string. Uses the configured embedder.
                 Returns list of dicts with id, score, and payload.
+                If metadata_filter can be answered by the indexed payload it replaces allowd__point_ids.
                 """
-                flt: Filter | None = None
-                if allowd__point_ids:
-                    # ids = [GRPCPointID(id) for id in allowd__point_ids]
-                    flt = Filter(
-                        must=[
-                            HasIdCondition(
-                                has_id=[
-                                    self._normalize_id(id) for id in allowd__point_ids
-                                ]
-                            )
-                        ]
-                    )  # type: ignore
-                result = self.embedder.embed_query(query)
+                flt = await self._build_filter(
+                    self._collection_name(collection),
+                    allowd__point_ids,
+                    metadata_filter,
+                )
+                result = await self._embed_query(query)
                 if result.is_error():
                     return result.propagate_exception()
                 qvec = result.get_ok()
@@ -468,6 +883,7 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
                             id=h.payload["hash_id"],
                             score=h.score,
                             payload=h.payload["text"],
+                            triple=self._triple(h.payload),
                         )
                         for h in hits.points
                         if h.payload
@@ -534,23 +950,18 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
         min_similarity: float = 0.0,
         allowd__point_ids: list[str] | None = None,
         collection: str | None = None,
+        metadata_filter: MetadataFilter | None = None,
     ) -> Result[dict[str, list[SimilarNodes]]]:
         with self.tracer.start_as_current_span("knn-by-id"):
             try:
                 out: dict[str, list[SimilarNodes]] = {}
                 if not query_ids:
                     return Result.Ok({})
-                flt: Filter | None = None
-                if allowd__point_ids:
-                    flt = Filter(
-                        must=[
-                            HasIdCondition(
-                                has_id=[
-                                    self._normalize_id(id) for id in allowd__point_ids
-                                ]
-                            )
-                        ]
-                    )  # type: ignore
+                flt = await self._build_filter(
+                    self._collection_name(collection=collection),
+                    allowd__point_ids,
+                    metadata_filter,
+                )
 
                 for qid in query_ids:
                     hits = await self.client.query_points(
@@ -576,6 +987,7 @@ class QdrantEmbeddingStore(EmbeddingStoreInterface):
                             id=h.payload[HASH_PAYLOAD_KEY],
                             score=h.score,
                             payload=h.payload[TEXT_PAYLOAD_KEY],
+                            triple=self._triple(h.payload),
                         )
                         for h in hits.points
                         if h.payload
@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+from core.hash import compute_mdhash_id
+from core.logger import BaseSingleton, init_logging
+from core.result import Result
+from domain.text_embedding.interface import EmbeddClient
+from domain.text_embedding.model import EmbeddingRequestDto, EmbeddingResponseDto
+from domain_test import AsyncTestBase
+from qdrant_client.models import Distance, VectorParams
+
+from hippo_rag_vectore_store.vector_store import (
+    HippoRAGVectorStoreSession,
+    QdrantConfig,
+    QdrantEmbeddingStore,
+    QdrantEmbeddingStoreConfig,
+)
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+DIM = 8
+ALLOWED_IDS = 100_000
+
+
+class HashEmbedder(EmbeddClient):
+    """Deterministic fake embedder, texts sharing a prefix end up close to each other."""
+
+    def _vector(self, text: str) -> list[float]:
+        return [float(ord(c)) for c in text.ljust(DIM)[:DIM]]
+
+    def embed(
+        self, request: EmbeddingRequestDto
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        if isinstance(request.inputs, str):
+            return Result.Ok(EmbeddingResponseDto(root=self._vector(request.inputs)))
+        return Result.Ok([self._vector(t) for t in request.inputs])
+
+    def embed_doc(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return self.embed(self._request(text))
+
+    def embed_query(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return self.embed(self._request(text))
+
+    @staticmethod
+    def _request(text: str | list[str]) -> EmbeddingRequestDto:
+        return EmbeddingRequestDto(
+            inputs=text,
+            normalize=False,
+            prompt_name=None,
+            truncate=False,
+            truncation_direction="right",
+        )
+
+
+class BlockingEmbedder(HashEmbedder):
+    """Blocks the calling thread like the sync grpc client does."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def embed(
+        self, request: EmbeddingRequestDto
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.active -= 1
+        return super().embed(request)
+
+
+class TestPayloadFilter(AsyncTestBase):
+    __test__ = True
+
+    store: QdrantEmbeddingStore
+
+    async def setup_method_async(self, test_name: str):
+        BaseSingleton.clear_all()
+        HippoRAGVectorStoreSession.create(config=QdrantConfig(location=":memory:"))
+        self.store = self._store("always")
+
+    def _store(self, mode: str) -> QdrantEmbeddingStore:
+        return QdrantEmbeddingStore(
+            QdrantEmbeddingStoreConfig(
+                namespace="chunk",
+                collection=f"test_{uuid.uuid4().hex[:8]}",
+                dim=DIM,
+                distance=Distance.COSINE,
+                payload_filter_mode=mode,  # type: ignore
+            ),
+            embedder=HashEmbedder(),
+        )
+
+    async def teardown_method_async(self, test_name: str):
+        await HippoRAGVectorStoreSession.Instance().close()
+        BaseSingleton.clear_all()
+
+    async def test_query_restricted_by_payload(self):
+        assert (
+            await self.store.insert_strings(["alpha one", "alpha two"], {"project": "a"})
+        ).is_ok()
+        assert (
+            await self.store.insert_strings(["alpha three"], {"project": "b"})
+        ).is_ok()
+
+        result = await self.store.query("alpha", metadata_filter={"project": ["b"]})
+        assert result.is_ok()
+        assert [hit.payload for hit in result.get_ok()] == ["alpha three"]
+
+        result = await self.store.query("alpha", metadata_filter={"project": ["a"]})
+        assert {hit.payload for hit in result.get_ok()} == {"alpha one", "alpha two"}
+
+    async def test_shared_point_is_visible_for_all_owners(self):
+        assert (await self.store.insert_strings(["shared"], {"project": "a"})).is_ok()
+        assert (await self.store.insert_strings(["shared"], {"project": "b"})).is_ok()
+
+        for project in ["a", "b"]:
+            result = await self.store.query(
+                "shared", metadata_filter={"project": [project]}
+            )
+            assert [hit.payload for hit in result.get_ok()] == ["shared"]
+
+        all_ids = await self.store.get_all_ids()
+        assert len(all_ids.get_ok()) == 1
+
+    async def test_unknown_filter_keys_fall_back_to_ids(self):
+        assert (
+            await self.store.insert_strings(["alpha one", "alpha two"], {"project": "a"})
+        ).is_ok()
+        result = await self.store.query(
+            "alpha",
+            allowd__point_ids=[compute_mdhash_id("alpha two")],
+            metadata_filter={"page": ["1"]},
+        )
+        assert [hit.payload for hit in result.get_ok()] == ["alpha two"]
+
+    async def test_empty_filter_values_do_not_restrict(self):
+        assert (
+            await self.store.insert_strings(["alpha one"], {"project": "a"})
+        ).is_ok()
+        result = await self.store.query(
+            "alpha", metadata_filter={"project": ["a"], "doc_id": []}
+        )
+        assert [hit.payload for hit in result.get_ok()] == ["alpha one"]
+
+        collection = self.store._collection_name()
+        assert await self.store._build_filter(collection, None, {"project": []}) is None
+        applies = await self.store.payload_filter_applies({"project": []})
+        assert applies.get_ok() is False
+
+    async def test_get_ids_by_metadata(self):
+        assert (
+            await self.store.insert_strings(["alpha one", "alpha two"], {"project": "a"})
+        ).is_ok()
+        assert (await self.store.insert_strings(["beta"], {"project": "b"})).is_ok()
+
+        result = await self.store.get_ids_by_metadata({"project": ["a"]})
+        assert sorted(result.get_ok()) == sorted(
+            [compute_mdhash_id("alpha one"), compute_mdhash_id("alpha two")]
+        )
+        assert (await self.store.get_ids_by_metadata({"page": ["1"]})).is_error()
+
+    async def test_replace_filter_payload_removes_values(self):
+        assert (
+            await self.store.insert_strings(["shared"], {"project": "a", "doc_id": "1"})
+        ).is_ok()
+        assert (
+            await self.store.insert_strings(["shared"], {"project": "a", "doc_id": "2"})
+        ).is_ok()
+        hash_id = compute_mdhash_id("shared")
+
+        assert (
+            await self.store.replace_filter_payload(
+                {hash_id: {"doc_id": ["2"]}, compute_mdhash_id("missing"): {}}
+            )
+        ).is_ok()
+
+        for doc_id, expected in [("1", []), ("2", ["shared"])]:
+            result = await self.store.query(
+                "shared", metadata_filter={"doc_id": [doc_id]}
+            )
+            assert [hit.payload for hit in result.get_ok()] == expected
+        result = await self.store.query("shared", metadata_filter={"project": ["a"]})
+        assert result.get_ok() == []
+        all_ids = await self.store.get_all_ids()
+        assert all_ids.get_ok() == [hash_id]
+
+    async def test_auto_mode_uses_ids_until_indexes_exist(self):
+        store = self._store("auto")
+        collection = store._collection_name()
+        # a collection created before payload filters existed has no indexes
+        await store.client.create_collection(
+            collection_name=collection,
+            vectors_config=VectorParams(size=DIM, distance=Distance.COSINE),
+        )
+        flt = await store._build_filter(collection, ["x"], {"project": ["a"]})
+        assert flt is not None
+        assert "has_id" in flt.model_dump_json(exclude_none=True)
+
+        assert (await store.is_payload_filter_ready()).get_ok() is False
+        assert (await store.ensure_payload_indexes()).is_ok()
+        assert (await store.is_payload_filter_ready()).get_ok() is True
+        flt = await store._build_filter(collection, ["x"], {"project": ["a"]})
+        assert flt is not None
+        assert "has_id" not in flt.model_dump_json(exclude_none=True)
+
+    async def test_readiness_is_cached_per_collection(self):
+        store = self._store("auto")
+        assert (await store.insert_strings(["alpha"], {"project": "a"})).is_ok()
+        calls = 0
+        get_collection = store.client.get_collection
+
+        async def counting_get_collection(*args, **kwargs):  # type: ignore
+            nonlocal calls
+            calls += 1
+            return await get_collection(*args, **kwargs)
+
+        store.client.get_collection = counting_get_collection  # type: ignore
+        for _ in range(5):
+            applies = await store.payload_filter_applies({"project": ["a"]})
+            assert applies.get_ok() is True
+            assert (await store.query("alpha", metadata_filter={"project": ["a"]})).is_ok()
+        assert calls == 0
+
+    async def test_unindexed_collection_is_rechecked(self):
+        store = self._store("auto")
+        collection = store._collection_name()
+        await store.client.create_collection(
+            collection_name=collection,
+            vectors_config=VectorParams(size=DIM, distance=Distance.COSINE),
+        )
+        assert (await store.is_payload_filter_ready()).get_ok() is False
+
+        # another process migrates the collection,
+        # embedded qdrant does not report payload indexes so the schema is faked
+        async def migrated_collection(*args, **kwargs):  # type: ignore
+            return SimpleNamespace(
+                payload_schema={key: None for key in store._config.payload_filter_keys}
+            )
+
+        store.client.get_collection = migrated_collection  # type: ignore
+        assert (await store.is_payload_filter_ready()).get_ok() is False
+
+        store._config.payload_filter_recheck_seconds = 0
+        assert (await store.is_payload_filter_ready()).get_ok() is True
+
+    async def test_migration_adds_payload_to_existing_points(self):
+        assert (await self.store.insert_strings(["legacy point"])).is_ok()
+        result = await self.store.query(
+            "legacy", metadata_filter={"project": ["a"]}
+        )
+        assert result.get_ok() == []
+
+        hash_id = compute_mdhash_id("legacy point")
+        assert (
+            await self.store.set_filter_payload(
+                {hash_id: {"project": ["a"], "page": ["3"]}}
+            )
+        ).is_ok()
+        assert (await self.store.ensure_payload_indexes()).is_ok()
+
+        result = await self.store.query(
+            "legacy", metadata_filter={"project": ["a"]}
+        )
+        assert [hit.payload for hit in result.get_ok()] == ["legacy point"]
+        points = await self.store.client.retrieve(
+            self.store._collection_name(),
+            ids=[self.store._normalize_id(hash_id)],
+            with_payload=True,
+        )
+        assert points[0].payload is not None
+        assert "page" not in points[0].payload
+
+    async def test_facts_are_stored_as_structured_payload(self):
+        store = QdrantEmbeddingStore(
+            QdrantEmbeddingStoreConfig(
+                namespace="facts",
+                collection=f"test_{uuid.uuid4().hex[:8]}",
+                dim=DIM,
+                distance=Distance.COSINE,
+                payload_filter_mode="always",
+            ),
+            embedder=HashEmbedder(),
+        )
+        fact = ("alice", "knows", "bob's sister")
+        assert (await store.insert_strings([str(fact)])).is_ok()
+        result = await store.query(str(fact))
+        assert [(hit.payload, hit.triple) for hit in result.get_ok()] == [
+            (str(fact), fact)
+        ]
+
+        # chunks are not parsed
+        assert (await self.store.insert_strings([str(fact)])).is_ok()
+        result = await self.store.query(str(fact))
+        assert [hit.triple for hit in result.get_ok()] == [None]
+
+    async def test_blocking_embedder_does_not_block_the_event_loop(self):
+        embedder = BlockingEmbedder(seconds=0.1)
+        stores = [
+            QdrantEmbeddingStore(
+                QdrantEmbeddingStoreConfig(
+                    namespace=namespace,  # type: ignore
+                    collection=f"test_{uuid.uuid4().hex[:8]}",
+                    dim=DIM,
+                    distance=Distance.COSINE,
+                    payload_filter_mode="always",
+                ),
+                embedder=embedder,
+            )
+            for namespace in ("chunk", "entity", "facts")
+        ]
+        ticks = 0
+        done = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def insert_all():
+            try:
+                return await asyncio.gather(
+                    *(store.insert_strings([f"text {i}"]) for i, store in enumerate(stores))
+                )
+            finally:
+                done.set()
+
+        _, results = await asyncio.gather(heartbeat(), insert_all())
+        assert all(result.is_ok() for result in results)
+        # the three inserts embed at the same time and the loop keeps running meanwhile
+        assert embedder.peak == 3
+        assert ticks > 3
+
+    async def test_benchmark_payload_filter_vs_id_list(self):
+        """
+        Compares the filter sent to qdrant and the query latency
+        for a restriction to 100k allowed point ids.
+        """
+        texts = [f"text {i}" for i in range(2_000)]
+        assert (await self.store.insert_strings(texts, {"project": "a"})).is_ok()
+        allowed = [compute_mdhash_id(f"text {i}") for i in range(ALLOWED_IDS)]
+        collection = self.store._collection_name()
+
+        id_filter = await self.store._build_filter(collection, allowed, None)
+        payload_filter = await self.store._build_filter(
+            collection, allowed, {"project": ["a"]}
+        )
+        assert id_filter is not None and payload_filter is not None
+        id_filter_bytes = len(id_filter.model_dump_json(exclude_none=True))
+        payload_filter_bytes = len(payload_filter.model_dump_json(exclude_none=True))
+
+        start = time.perf_counter()
+        id_result = await self.store.query("text 1", allowd__point_ids=allowed)
+        id_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        payload_result = await self.store.query(
+            "text 1", allowd__point_ids=allowed, metadata_filter={"project": ["a"]}
+        )
+        payload_seconds = time.perf_counter() - start
+
+        logger.info(
+            f"{ALLOWED_IDS} allowed ids: id filter {id_filter_bytes} bytes / {id_seconds * 1000:.1f} ms, "
+            f"payload filter {payload_filter_bytes} bytes / {payload_seconds * 1000:.1f} ms"
+        )
+        assert [h.id for h in id_result.get_ok()] == [
+            h.id for h in payload_result.get_ok()
+        ]
+        assert payload_filter_bytes * 1000 < id_filter_bytes
+        assert payload_seconds < id_seconds
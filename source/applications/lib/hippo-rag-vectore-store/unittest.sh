@@ -0,0 +1,2 @@
+set -e 
+pytest tests/payload_filter_tests.py
@@ -4,10 +4,12 @@ import json
 import logging
 import re
 from copy import deepcopy
+from typing import Literal
 
 from core.result import Result
 from domain.hippo_rag.interfaces import LLMReranker
 from domain.hippo_rag.model import ConfidenceCheck, Triple
+from domain.llm.caller import llm_caller
 from domain.llm.interface import AsyncLLM
 from domain.llm.model import TextChatMessage
 from opentelemetry import trace
@@ -17,6 +19,8 @@ from hippo_rag.template.dspyfilter_default_prompts import (
     DSPY_DEFAULT_ONE_INPUT_TEMPLATE,
     DSPY_DEFAULT_ONE_OUTPUT_TEMPLATE,
     DSPY_DEMOS_DEFAULT,
+    DSPY_INDICES_INPUT_TEMPLATE,
+    DSPY_INDICES_SYSTEM_PROMPT_DEFAULT,
     DSPY_SYSTEM_PROMPT_DEFAULT,
 )
 
@@ -29,17 +33,44 @@ class _Fact(BaseModel):
     )
 
 
+class _FactIndices(BaseModel):
+    indices: list[int] = Field(
+        description="Numbers of the relevant candidate facts, most relevant first"
+    )
+
+
+FilterMode = Literal["indices", "facts"]
+
+# connection and timeout errors of the llm clients (openai, httpx), matched by name so no client is imported
+_TRANSPORT_ERRORS = {"APIConnectionError", "APITimeoutError", "TransportError"}
+
+
+def _is_transport_error(error: Exception) -> bool:
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in _TRANSPORT_ERRORS for cls in type(error).__mro__)
+
+
 class DSPyFilterConfig(BaseModel):
+    # indices: candidates are numbered, the model answers with the numbers as structured output
+    # facts: the model repeats the facts as text, they are fuzzy matched to the candidates
+    mode: FilterMode = "indices"
     one_input_template: str = DSPY_DEFAULT_ONE_INPUT_TEMPLATE
     one_output_template: str = DSPY_DEFAULT_ONE_OUTPUT_TEMPLATE
     system_prompt: str = DSPY_SYSTEM_PROMPT_DEFAULT
+    indices_input_template: str = DSPY_INDICES_INPUT_TEMPLATE
+    indices_system_prompt: str = DSPY_INDICES_SYSTEM_PROMPT_DEFAULT
     demos: list[dict[str, str | bool]] = DSPY_DEMOS_DEFAULT
 
 
 class DSPyFilter(LLMReranker):
     def __init__(self, llm_model: AsyncLLM, config: DSPyFilterConfig):
         self._config = config
-        self.message_template = self._make_template()
+        self.message_template = (
+            self._make_indices_template()
+            if config.mode == "indices"
+            else self._make_template()
+        )
         self.llm = llm_model
         self.default_gen_kwargs = {}
         self.tracer = trace.get_tracer("DSPyFilter")
@@ -78,6 +109,41 @@ class DSPyFilter(LLMReranker):
 
         return message_template
 
+    @staticmethod
+    def _numbered(facts: list[list[str]] | list[Triple]) -> str:
+        return "\n".join(
+            f"{i}: {json.dumps(list(fact), ensure_ascii=False)}"
+            for i, fact in enumerate(facts)
+        )
+
+    def _make_indices_template(self):
+        """The demos are converted once from facts to the numbered candidate format."""
+        message_template: list[TextChatMessage] = [
+            TextChatMessage(role="system", content=self._config.indices_system_prompt)
+        ]
+        for demo in self._config.demos:
+            question = demo["question"]
+            assert isinstance(question, str)
+            before: list[list[str]] = json.loads(demo["fact_before_filter"])["fact"]  # type: ignore
+            after: list[list[str]] = json.loads(demo["fact_after_filter"])["fact"]  # type: ignore
+            message_template.append(
+                TextChatMessage(
+                    role="user",
+                    content=self._config.indices_input_template.format(
+                        question=question, candidate_facts=self._numbered(before)
+                    ),
+                )
+            )
+            message_template.append(
+                TextChatMessage(
+                    role="assistant",
+                    content=_FactIndices(
+                        indices=[before.index(fact) for fact in after if fact in before]
+                    ).model_dump_json(),
+                )
+            )
+        return message_template
+
     def _parse_filter(self, response: str):
         with self.tracer.start_as_current_span("parse-filter"):
             sections: list[tuple[str | None, list[str]]] = [(None, [])]
@@ -113,7 +179,7 @@ class DSPyFilter(LLMReranker):
     async def _llm_call(
         self, question: str, fact_before_filter: str, model: str | None = None
     ) -> Result[str]:
-        with self.tracer.start_as_current_span("llm-call"):
+        with self.tracer.start_as_current_span("llm-call"), llm_caller("dspy_filter"):
             # make prompt
             messages = deepcopy(self.message_template)
             messages.append(
@@ -129,6 +195,68 @@ class DSPyFilter(LLMReranker):
             # self.default_gen_kwargs["max_completion_tokens"] = 512
             return await self.llm.chat(messages, llm_model=model)
 
+    async def _select_indices(
+        self, query: str, candidate_items: list[Triple], model: str | None = None
+    ) -> Result[list[int]]:
+        with self.tracer.start_as_current_span("llm-call"), llm_caller("dspy_filter"):
+            messages = deepcopy(self.message_template)
+            messages.append(
+                TextChatMessage(
+                    role="user",
+                    content=self._config.indices_input_template.format(
+                        question=query, candidate_facts=self._numbered(candidate_items)
+                    ),
+                )
+            )
+            response = await self.llm.chat_structured_output(
+                messages, _FactIndices, llm_model=model
+            )
+            if response.is_error():
+                error = response.get_error()
+                if _is_transport_error(error):
+                    return response.propagate_exception()
+                # unsupported or invalid structured output, retrieve keeps the retrieval order
+                logger.error(f"fact selection failed, no facts selected: {error}")
+                return Result.Ok([])
+
+        # numbers outside of the candidate list and repetitions are dropped
+        seen: set[int] = set()
+        result_indices: list[int] = []
+        for i in response.get_ok().indices:
+            if 0 <= i < len(candidate_items) and i not in seen:
+                seen.add(i)
+                result_indices.append(i)
+        return Result.Ok(result_indices)
+
+    async def _match_facts(
+        self, query: str, candidate_items: list[Triple], model: str | None = None
+    ) -> Result[list[int]]:
+        fact_before_filter = {
+            "fact": [list(candidate_item) for candidate_item in candidate_items]
+        }
+        try:
+            # prediction = self.program(question=query, fact_before_filter=json.dumps(fact_before_filter))
+            response = await self._llm_call(query, json.dumps(fact_before_filter), model)
+            if response.is_error():
+                return response.propagate_exception()
+
+            generated_facts = self._parse_filter(response.get_ok())
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            generated_facts = []
+
+        candidate_strings = [str(i) for i in candidate_items]
+        result_indices: list[int] = []
+        for generated_fact in generated_facts:
+            closest_matched_fact = difflib.get_close_matches(
+                str(generated_fact),
+                candidate_strings,
+                n=1,
+                cutoff=0.0,
+            )[0]
+            result_indices.append(candidate_strings.index(closest_matched_fact))
+        return Result.Ok(result_indices)
+
     def __call__(
         self,
         query: str,
@@ -152,37 +280,15 @@ class DSPyFilter(LLMReranker):
         model: str | None = None,
     ) -> Result[tuple[list[int], list[Triple], ConfidenceCheck]]:
         with self.tracer.start_as_current_span("llm-rerank"):
-            fact_before_filter = {
-                "fact": [list(candidate_item) for candidate_item in candidate_items]
-            }
-            try:
-                # prediction = self.program(question=query, fact_before_filter=json.dumps(fact_before_filter))
-                response = await self._llm_call(
-                    query, json.dumps(fact_before_filter), model
-                )
-                if response.is_error():
-                    return response.propagate_exception()
-
-                generated_facts = self._parse_filter(response.get_ok())
-            except Exception as e:
-                logger.error(e, exc_info=True)
-                generated_facts = []
-
-            result_indices: list[int] = []
-
-            for generated_fact in generated_facts:
-                closest_matched_fact = difflib.get_close_matches(
-                    str(generated_fact),
-                    [str(i) for i in candidate_items],
-                    n=1,
-                    cutoff=0.0,
-                )[0]
-                try:
-                    result_indices.append(
-                        candidate_items.index(eval(closest_matched_fact))
-                    )
-                except Exception as e:
-                    logger.error(e, exc_info=True)
+            if not candidate_items:
+                return Result.Ok(([], [], ConfidenceCheck(confidence=None)))
+            if self._config.mode == "indices":
+                result = await self._select_indices(query, candidate_items, model)
+            else:
+                result = await self._match_facts(query, candidate_items, model)
+            if result.is_error():
+                return result.propagate_exception()
+            result_indices = result.get_ok()
 
             sorted_candidate_indices: list[int] = [
                 candidate_indices[i] for i in result_indices
@@ -19,6 +19,7 @@ from domain.hippo_rag.interfaces import (
     StateStore,
 )
 from domain.hippo_rag.model import Chunk, QuerySolution, RerankLog, Triple
+from domain.llm.caller import llm_caller
 from domain.llm.interface import AsyncLLM
 from domain.llm.model import TextChatMessage
 from opentelemetry import trace
@@ -30,6 +31,7 @@ from tqdm import tqdm
 from hippo_rag.indexer import CollectionFilterAttribute
 from hippo_rag.template.rag_system_prompts import DEFAULT_RAG_QA_SYSTEM
 from hippo_rag.utils.misc_utils import (
+    drop_empty_filter_values,
     flatten_facts,
     min_max_normalize,
 )
@@ -128,9 +130,10 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
                 ),
                 TextChatMessage(role="user", content=prompt_user),
             ]
-            result = await self._llm.stream_chat(
-                all_qa_messages, llm_model=conversation.model
-            )
+            with llm_caller("qa"):
+                result = await self._llm.stream_chat(
+                    all_qa_messages, llm_model=conversation.model
+                )
             if result.is_error():
                 return result.propagate_exception()
 
@@ -153,13 +156,20 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
 
 
     async def _search_passages(
-        self, query: str, k: int, allowed_chunks: list[str] | None = None
+        self,
+        query: str,
+        k: int,
+        allowed_chunks: list[str] | None = None,
+        metadata: dict[str, list[str] | list[int] | list[float]] | None = None,
     ) -> Result[dict[str, float]]:
         with self.tracer.start_as_current_span("dense chunk retrival"):
             try:
                 if hasattr(self._vector_store_chunk, "query"):
                     res = await self._vector_store_chunk.query(
-                        query=query, top_k=k, allowd__point_ids=allowed_chunks
+                        query=query,
+                        top_k=k,
+                        allowd__point_ids=allowed_chunks,
+                        metadata_filter=metadata,
                     )
                     if res.is_error():
                         return res.propagate_exception()
@@ -220,6 +230,7 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
         passage_node_weight: float = 0.05,
         allowed_entities: list[str] | None = None,
         allowed_chunks: list[str] | None = None,
+        metadata: dict[str, list[str] | list[int] | list[float]] | None = None,
     ) -> Result[dict[str, float]]:
         with self.tracer.start_as_current_span("graph-search-with-fact-entitis"):
             if allowed_entities is None:
@@ -314,6 +325,7 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
                 dpr_res = await self._vector_store_chunk.query(
                     query=query,
                     allowd__point_ids=allowed_chunks,
+                    metadata_filter=metadata,
                     top_k=chunks_to_retrieve_ppr_seed,
                 )
                 if dpr_res.is_error():
@@ -372,6 +384,40 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
         keep = {h for h, _ in items}
         return {h: (w if h in keep else 0.0) for h, w in weights.items()}
 
+    async def _payload_filter_applies(
+        self,
+        metadata: dict[str, list[str] | list[int] | list[float]] | None,
+        stores: list[EmbeddingStoreInterface],
+    ) -> Result[bool]:
+        """
+        True if all stores can restrict their queries by the metadata payload,
+        then the allowed ids do not have to be loaded from the state store.
+        """
+        if metadata is None:
+            return Result.Ok(False)
+        for store in stores:
+            result = await store.payload_filter_applies(metadata)
+            if result.is_error():
+                return result.propagate_exception()
+            if not result.get_ok():
+                return Result.Ok(False)
+        return Result.Ok(True)
+
+    async def _allowed_graph_ids(
+        self, metadata: dict[str, list[str] | list[int] | list[float]]
+    ) -> Result[tuple[list[str], list[str]]]:
+        """
+        The graph has no payload, the chunks and entities matching the metadata
+        are read from the payload indexes of the vector stores.
+        """
+        chunks = await self._vector_store_chunk.get_ids_by_metadata(metadata)
+        if chunks.is_error():
+            return chunks.propagate_exception()
+        entities = await self._vector_store_entity.get_ids_by_metadata(metadata)
+        if entities.is_error():
+            return entities.propagate_exception()
+        return Result.Ok((chunks.get_ok(), entities.get_ok()))
+
     # ------------------------------- retrieval: full pipeline
     async def retrieve(
         self,
@@ -387,7 +433,20 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
             triple_ids: list[str] | None = None
             entitie_ids: list[str] | None = None
 
-            if metadata is not None:
+            metadata = drop_empty_filter_values(metadata)
+            result = await self._payload_filter_applies(
+                metadata,
+                [
+                    self._vector_store_fact,
+                    self._vector_store_chunk,
+                    self._vector_store_entity,
+                ],
+            )
+            if result.is_error():
+                return result.propagate_exception()
+            payload_filter_applies = result.get_ok()
+
+            if metadata is not None and not payload_filter_applies:
                 result = await self._state_store.load_openie_info_with_metadata(
                     metadata=metadata
                 )
@@ -427,7 +486,10 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
 
             for query in tqdm(queries, desc="Retrieving", total=len(queries)):
                 query_result = await self._vector_store_fact.query(
-                    query, allowd__point_ids=triple_ids, top_k=num_to_retrieve
+                    query,
+                    allowd__point_ids=triple_ids,
+                    metadata_filter=metadata,
+                    top_k=num_to_retrieve,
                 )
                 if query_result.is_error():
                     return query_result.propagate_exception()
@@ -446,12 +508,22 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
                     # pure DPR fallback
                     logger.warning("No facts after rerank; using DPR results.")
                     dpr = await self._search_passages(
-                        query, k=num_to_retrieve, allowed_chunks=ids_chunks
+                        query,
+                        k=num_to_retrieve,
+                        allowed_chunks=ids_chunks,
+                        metadata=metadata,
                     )
                     if dpr.is_error():
                         return dpr.propagate_exception()
                     id_and_scores = dpr.get_ok()
                 else:
+                    if payload_filter_applies and ids_chunks is None:
+                        assert metadata is not None
+                        # loaded once for all queries and only if the graph is searched
+                        allowed = await self._allowed_graph_ids(metadata)
+                        if allowed.is_error():
+                            return allowed.propagate_exception()
+                        ids_chunks, entitie_ids = allowed.get_ok()
                     # graph path (currently DPR-shaped shim)
                     gs = await self._graph_search_with_fact_entities(
                         query=query,
@@ -465,11 +537,16 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
                         passage_node_weight=passage_node_weight,
                         allowed_chunks=ids_chunks,
                         allowed_entities=entitie_ids,
+                        metadata=metadata,
                     )
                     if gs.is_error():
                         return gs.propagate_exception()
                     id_and_scores = gs.get_ok()
 
+                if len(id_and_scores) == 0 and payload_filter_applies:
+                    # no chunk matches the metadata, same as an empty state store result
+                    retrieval_results.append(QuerySolution(question=query, docs=[]))
+                    continue
                 if len(id_and_scores) == 0:
                     return Result.Err(Exception("Failed to retrieve Any Chunks"))
                 result = await self._state_store.fetch_chunks_by_ids(
@@ -513,7 +590,14 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
 
             ids_chunks: list[str] | None = None
 
-            if metadata is not None:
+            metadata = drop_empty_filter_values(metadata)
+            result = await self._payload_filter_applies(
+                metadata, [self._vector_store_chunk]
+            )
+            if result.is_error():
+                return result.propagate_exception()
+
+            if metadata is not None and not result.get_ok():
                 result = await self._state_store.load_openie_info_with_metadata(
                     metadata=metadata
                 )
@@ -526,7 +610,10 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
             out: list[QuerySolution] = []
             for query in tqdm(queries, desc="Retrieving (DPR)", total=len(queries)):
                 dpr = await self._search_passages(
-                    query, k=num_to_retrieve, allowed_chunks=ids_chunks
+                    query,
+                    k=num_to_retrieve,
+                    allowed_chunks=ids_chunks,
+                    metadata=metadata,
                 )
                 if dpr.is_error():
                     return dpr.propagate_exception()
@@ -597,7 +684,7 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
     async def _qa(
         self, queries: list[QuerySolution]
     ) -> Result[tuple[list[QuerySolution], list[str]]]:
-        with self.tracer.start_as_current_span("QA-Call"):
+        with self.tracer.start_as_current_span("QA-Call"), llm_caller("qa"):
             all_qa_messages: list[list[TextChatMessage]] = []
 
             for query_solution in tqdm(queries, desc="Collecting QA prompts"):
@@ -665,14 +752,23 @@ class HippoRAG(HippoRAGInterface, RAGLLM):
                 :link_top_k
             ]
 
-            # parse triples from payloads
+            # the fact store returns the triples as structured payload,
+            # only points written before that have to be parsed
             candidate_facts: list[Triple] = []
+            parsed_hits: list[SimilarNodes] = []
             for h in hits:
+                if h.triple is not None:
+                    candidate_facts.append(h.triple)
+                    parsed_hits.append(h)
+                    continue
                 try:
                     triple = literal_eval(h.payload)
                     candidate_facts.append(triple)
+                    parsed_hits.append(h)
                 except Exception as e:
                     logger.warning(f"Could not parse triple for fact {h.id}: {e}")
+            # the rerank indices refer to the parsed facts
+            hits = parsed_hits
 
             logger.debug("facts for retrival")
             for fact in candidate_facts:
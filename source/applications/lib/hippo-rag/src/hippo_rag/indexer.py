@@ -1,5 +1,8 @@
+import asyncio
 import logging
-from typing import cast
+import os
+import time
+from typing import Any, Coroutine, cast
 from collections import defaultdict
 from core.que_runner import index_with_queue
 from domain.rag.indexer.interface import (
@@ -32,6 +35,8 @@ from pydantic import BaseModel
 from tqdm import tqdm
 
 from hippo_rag.utils.misc_utils import (
+    collect_point_metadata,
+    drop_empty_filter_values,
     extract_entity_nodes,
     flatten_facts,
     reformat_openie_results,
@@ -46,6 +51,51 @@ class IndexerConfig(BaseModel):
     synonymy_edge_topk: int
     synonymy_edge_sim_threshold: float
     number_of_parallel_requests: int
+    rebuild_checkpoint_path: str | None = None
+
+
+class RebuildCheckpoint(BaseModel):
+    last_idx: str | None = None
+    chunks: int = 0
+    triples: int = 0
+
+
+class RebuildStats(BaseModel):
+    chunks: int
+    triples: int
+    seconds: float
+
+    @property
+    def triples_per_second(self) -> float:
+        return self.triples / self.seconds if self.seconds > 0 else 0.0
+
+
+async def _run_stages(
+    stages: list[Coroutine[Any, Any, Result[None]]],
+) -> Result[None]:
+    """
+    Runs connected pipeline stages concurrently.
+    The first failing stage cancels all others, so no stage stays blocked on a queue.
+    """
+    tasks = [asyncio.create_task(stage) for stage in stages]
+    try:
+        pending: set[asyncio.Task[Result[None]]] = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result = task.result()
+                if result.is_error():
+                    return result
+        return Result.Ok()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return Result.Err(e)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 CollectionFilterAttribute = "project"
@@ -140,7 +190,17 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
                 metadata = {}
             metadata[CollectionFilterAttribute] = [collection]
 
+        metadata = drop_empty_filter_values(metadata)
         if metadata:
+            result = await self._vector_store_chunk.payload_filter_applies(metadata)
+            if result.is_error():
+                return result.propagate_exception()
+            payload_filter_applies = result.get_ok()
+        else:
+            payload_filter_applies = False
+
+        # the id list is only needed if the payload can not restrict the query
+        if metadata and not payload_filter_applies:
             result = await self._state_store.load_openie_info_with_metadata(
                 metadata=metadata
             )
@@ -150,7 +210,7 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
             if len(allowed_chunks) == 0:
                 return Result.Err(Exception("No Nodes found"))
         result = await self._vector_store_chunk.query(
-            query=query, allowd__point_ids=allowed_chunks
+            query=query, allowd__point_ids=allowed_chunks, metadata_filter=metadata
         )
         if result.is_error():
             return result.propagate_exception()
@@ -199,53 +259,117 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
         result = await self._index(docs, metadata, collection=collection)
         return result
 
-    async def rebuild_graph_and_vector_stor(self):
-        with self.tracer.start_as_current_span("index"):
-            logger.info("Indexing Documents")
-            offset = 0
-            chunk_size = 5000
-            while True:
-                result = await self._state_store.load_openie_info(
-                    offset=offset, chunk_size=chunk_size
+    async def rebuild_graph_and_vector_stor(
+        self, chunk_size: int = 5000, prefetch: int = 2
+    ) -> Result[RebuildStats]:
+        """
+        Rebuilds the vector stores and the graph from the OpenIE information in the state store.
+
+        The state store is read with keyset pagination and streamed through three stages
+        (load -> embed and upsert -> graph write) connected by bounded queues,
+        so loading and embedding of the next pages overlap with the graph write of the current one.
+        Pages are completed in order and after every graph write a checkpoint is stored
+        (if rebuild_checkpoint_path is configured), an interrupted rebuild resumes after the last completed page.
+        All stages are idempotent, a page that was partly processed before the interruption is simply redone.
+        """
+        with self.tracer.start_as_current_span("rebuild-graph-and-vector-store"):
+            checkpoint = self._load_rebuild_checkpoint()
+            if checkpoint.last_idx is not None:
+                logger.info(
+                    f"Resuming rebuild after {checkpoint.last_idx} ({checkpoint.chunks} chunks done)"
                 )
-                if result.is_error():
-                    result.propagate_exception()
+            stats = RebuildStats(chunks=0, triples=0, seconds=0.0)
+            loaded: asyncio.Queue[list[Document] | None] = asyncio.Queue(
+                maxsize=prefetch
+            )
+            embedded: asyncio.Queue[list[Document] | None] = asyncio.Queue(
+                maxsize=prefetch
+            )
 
-                chunks = result.get_ok().docs
+            start = time.perf_counter()
+            result = await _run_stages(
+                [
+                    self._rebuild_load(checkpoint.last_idx, chunk_size, loaded),
+                    self._rebuild_embed(loaded, embedded),
+                    self._rebuild_graph(embedded, checkpoint, stats),
+                ]
+            )
+            stats.seconds = time.perf_counter() - start
+            if result.is_error():
+                return result.propagate_exception()
 
-                if len(chunks) == 0:
-                    break
+            self._clear_rebuild_checkpoint()
+            logger.info(
+                f"Rebuild finished {stats.chunks} chunks, {stats.triples} triples in {stats.seconds:.1f}s "
+                f"({stats.triples_per_second:.0f} triples/s)"
+            )
+            return Result.Ok(stats)
+
+    async def _rebuild_load(
+        self,
+        after_idx: str | None,
+        chunk_size: int,
+        out: asyncio.Queue[list[Document] | None],
+    ) -> Result[None]:
+        while True:
+            result = await self._state_store.load_openie_info_after(
+                after_idx=after_idx, chunk_size=chunk_size
+            )
+            if result.is_error():
+                return result.propagate_exception()
+            chunks = result.get_ok().docs
+            if len(chunks) == 0:
+                break
+            await out.put(chunks)
+            after_idx = chunks[-1].idx
+        await out.put(None)
+        return Result.Ok()
 
-                result = await self._vector_store_chunk.insert_strings(
-                    [chunk.passage for chunk in chunks]
+    async def _rebuild_embed(
+        self,
+        inp: asyncio.Queue[list[Document] | None],
+        out: asyncio.Queue[list[Document] | None],
+    ) -> Result[None]:
+        while (chunks := await inp.get()) is not None:
+            with self.tracer.start_as_current_span("rebuild-embed"):
+                chunk_triples = [chunk.extracted_triples for chunk in chunks]
+                facts = flatten_facts(chunk_triples)
+                entity_nodes, _ = extract_entity_nodes(chunk_triples)
+                logger.info(
+                    f"Encoding {len(chunks)} chunks, {len(entity_nodes)} entities and {len(facts)} facts"
                 )
+                # the three namespaces are independent collections
+                results = await asyncio.gather(
+                    self._vector_store_chunk.insert_strings(
+                        [chunk.passage for chunk in chunks]
+                    ),
+                    self._vector_store_entity.insert_strings(entity_nodes),
+                    self._vector_store_fact.insert_strings([str(fact) for fact in facts]),
+                )
+                for result in results:
+                    if result.is_error():
+                        return result.propagate_exception()
+
+                result = await self._set_filter_payload(chunks)
                 if result.is_error():
                     return result.propagate_exception()
+            await out.put(chunks)
+        await out.put(None)
+        return Result.Ok()
 
+    async def _rebuild_graph(
+        self,
+        inp: asyncio.Queue[list[Document] | None],
+        checkpoint: RebuildCheckpoint,
+        stats: RebuildStats,
+    ) -> Result[None]:
+        while (chunks := await inp.get()) is not None:
+            with self.tracer.start_as_current_span("rebuild-graph"):
                 chunk_ids = [chunk.idx for chunk in chunks]
-                new_chunks_with_id = {k.idx: k.passage for k in chunks}
-
-                # clean triple
                 chunk_triples = [chunk.extracted_triples for chunk in chunks]
-                facts = flatten_facts(chunk_triples)
                 entity_nodes, chunk_triple_entities = extract_entity_nodes(
                     chunk_triples
                 )
-                logger.debug(facts)
-                logger.debug(entity_nodes)
-                logger.info(f"found facts {len(facts)}")
-                logger.info(f"found entities {len(entity_nodes)}")
-                logger.info("Encoding Entities")
-
-                result = await self._vector_store_entity.insert_strings(entity_nodes)
-                if result.is_error():
-                    return result.propagate_exception()
-                logger.info("Encoding Facts")
-                result = await self._vector_store_fact.insert_strings(
-                    [str(fact) for fact in facts]
-                )
-                if result.is_error():
-                    return result.propagate_exception()
 
                 logger.info("Constructing Graph")
                 node_to_node_stats: dict[tuple[str, str], float] = {}
@@ -261,7 +385,6 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
                 )
                 if result.is_error():
                     return result.propagate_exception()
-
                 num_new_chunks, node_to_node_stats = result.get_ok()
                 logger.info(f"Found {num_new_chunks} new chunks to save into graph.")
 
@@ -272,22 +395,111 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
                     return node_to_node_stats_result.propagate_exception()
                 node_to_node_stats = node_to_node_stats_result.get_ok()
 
-                entities_to_create = {
-                    compute_mdhash_id(entity): entity for entity in entity_nodes
-                }
-
                 node_to_node_stats_result = await self._augment_graph(
                     node_to_node_stats,
-                    chunks=new_chunks_with_id,
-                    entities=entities_to_create,
+                    chunks={chunk.idx: chunk.passage for chunk in chunks},
+                    entities={
+                        compute_mdhash_id(entity): entity for entity in entity_nodes
+                    },
                 )
                 if node_to_node_stats_result.is_error():
                     return node_to_node_stats_result.propagate_exception()
 
-                offset = offset + chunk_size
-                logger.info(f"Proccessed {offset}")
+            num_triples = sum(len(triples) for triples in chunk_triples)
+            stats.chunks += len(chunks)
+            stats.triples += num_triples
+            checkpoint.last_idx = chunk_ids[-1]
+            checkpoint.chunks += len(chunks)
+            checkpoint.triples += num_triples
+            self._store_rebuild_checkpoint(checkpoint)
+            logger.info(f"Processed {checkpoint.chunks} chunks")
+        return Result.Ok()
+
+    def _load_rebuild_checkpoint(self) -> RebuildCheckpoint:
+        path = self._config.rebuild_checkpoint_path
+        if path is None or not os.path.exists(path):
+            return RebuildCheckpoint()
+        with open(path, "r", encoding="utf-8") as f:
+            return RebuildCheckpoint.model_validate_json(f.read())
+
+    def _store_rebuild_checkpoint(self, checkpoint: RebuildCheckpoint) -> None:
+        path = self._config.rebuild_checkpoint_path
+        if path is None:
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(checkpoint.model_dump_json())
+        os.replace(tmp_path, path)
+
+    def _clear_rebuild_checkpoint(self) -> None:
+        path = self._config.rebuild_checkpoint_path
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+    async def _set_filter_payload(self, chunks: list[Document]) -> Result[None]:
+        chunk_metadata, fact_metadata, entity_metadata = collect_point_metadata(chunks)
+        results = await asyncio.gather(
+            self._vector_store_chunk.set_filter_payload(chunk_metadata),
+            self._vector_store_fact.set_filter_payload(fact_metadata),
+            self._vector_store_entity.set_filter_payload(entity_metadata),
+        )
+        for result in results:
+            if result.is_error():
+                return result.propagate_exception()
         return Result.Ok()
 
+    async def migrate_payload_filters(
+        self, chunk_size: int = 5000, force: bool = False
+    ) -> Result[bool]:
+        """
+        Migrates collections created before metadata was stored as payload.
+        Writes the metadata of all chunks in the state store onto the chunk, fact and entity points
+        and creates the payload indexes afterwards, so queries only switch to payload filters
+        once the payload is complete.
+        The state store is read with keyset pagination like the rebuild.
+        Without force nothing is done if all collections already have their payload indexes,
+        so it can run on every startup. Returns whether the payload was migrated.
+        """
+        with self.tracer.start_as_current_span("migrate-payload-filters"):
+            stores = (
+                self._vector_store_chunk,
+                self._vector_store_fact,
+                self._vector_store_entity,
+            )
+            if not force:
+                ready = True
+                for store in stores:
+                    result = await store.is_payload_filter_ready()
+                    if result.is_error():
+                        return result.propagate_exception()
+                    ready = ready and result.get_ok()
+                if ready:
+                    return Result.Ok(False)
+
+            after_idx: str | None = None
+            migrated = 0
+            while True:
+                result = await self._state_store.load_openie_info_after(
+                    after_idx=after_idx, chunk_size=chunk_size
+                )
+                if result.is_error():
+                    return result.propagate_exception()
+                chunks = result.get_ok().docs
+                if len(chunks) == 0:
+                    break
+                result = await self._set_filter_payload(chunks)
+                if result.is_error():
+                    return result.propagate_exception()
+                after_idx = chunks[-1].idx
+                migrated += len(chunks)
+                logger.info(f"Migrated filter payload of {migrated} chunks")
+
+            for store in stores:
+                result = await store.ensure_payload_indexes()
+                if result.is_error():
+                    return result.propagate_exception()
+            return Result.Ok(True)
+
     async def _index(
         self,
         docs: list[str],
@@ -298,7 +510,7 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
             logger.info("Indexing Documents")
 
             # 1. instert chunks
-            result = await self._vector_store_chunk.insert_strings(docs)
+            result = await self._vector_store_chunk.insert_strings(docs, metadata)
             if result.is_error():
                 return result.propagate_exception()
 
@@ -359,12 +571,14 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
             logger.info(f"found entities {len(entity_nodes)}")
             logger.info("Encoding Entities")
 
-            result = await self._vector_store_entity.insert_strings(entity_nodes)
+            result = await self._vector_store_entity.insert_strings(
+                entity_nodes, metadata
+            )
             if result.is_error():
                 return result.propagate_exception()
             logger.info("Encoding Facts")
             result = await self._vector_store_fact.insert_strings(
-                [str(fact) for fact in facts]
+                [str(fact) for fact in facts], metadata
             )
             if result.is_error():
                 return result.propagate_exception()
@@ -445,48 +659,70 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
                 [doc.extracted_triples for doc in chunks.docs]
             )
 
-            true_triples_to_delete: list[Triple] = []
-
-            for triple in triples_to_delete_flattend:
-                proc_triple = text_processing(triple)
-
-                result = await self._state_store.triples_to_docs(proc_triple)
-                if result.is_error():
-                    return result.propagate_exception()
-                doc_ids = set(result.get_ok())
+            # triples and entities shared with chunks that are kept stay in place
+            proc_triples = {
+                triple: text_processing(triple) for triple in triples_to_delete_flattend
+            }
+            result = await self._state_store.triples_to_docs_bulk(
+                list(set(proc_triples.values()))
+            )
+            if result.is_error():
+                return result.propagate_exception()
+            triple_to_docs = result.get_ok()
 
-                non_deleted_docs = doc_ids.difference(chunk_ids_to_delete)
+            true_triples_to_delete: list[Triple] = [
+                triple
+                for triple, proc_triple in proc_triples.items()
+                if not triple_to_docs.get(proc_triple, set()).difference(
+                    chunk_ids_to_delete
+                )
+            ]
 
-                if len(non_deleted_docs) == 0:
-                    true_triples_to_delete.append(triple)
-
-            processed_true_triples_to_delete = true_triples_to_delete
-            entities_to_delete, _ = extract_entity_nodes(
-                [processed_true_triples_to_delete]
-            )
-            processed_true_triples_to_delete = flatten_facts(
-                [processed_true_triples_to_delete]
-            )
+            entities_to_delete, _ = extract_entity_nodes([true_triples_to_delete])
+            processed_true_triples_to_delete = flatten_facts([true_triples_to_delete])
 
             triple_ids_to_delete: set[str] = set()
             for triple in processed_true_triples_to_delete:
-                triple_ids_to_delete.update(compute_mdhash_id(str(triple)))
+                triple_ids_to_delete.add(compute_mdhash_id(str(triple)))
 
-            # Filter out entities that appear in unaltered chunks
-            ent_ids_to_delete: list[str] = []
-            for ent in entities_to_delete:
-                ent_ids_to_delete.append(compute_mdhash_id(ent))
+            ent_ids_to_delete = list(
+                dict.fromkeys(compute_mdhash_id(ent) for ent in entities_to_delete)
+            )
+            # the entities of kept triples are looked up as well, their payload is rewritten
+            all_entities, _ = extract_entity_nodes([triples_to_delete_flattend])
+            ent_ids = list(
+                dict.fromkeys(
+                    [*ent_ids_to_delete, *(compute_mdhash_id(ent) for ent in all_entities)]
+                )
+            )
+            result = await self._state_store.ent_nodes_to_chunks_bulk(ent_ids)
+            if result.is_error():
+                return result.propagate_exception()
+            ent_to_chunks = result.get_ok()
 
-            filtered_ent_ids_to_delete: list[str] = []
+            filtered_ent_ids_to_delete: list[str] = [
+                ent_node
+                for ent_node in ent_ids_to_delete
+                if not ent_to_chunks.get(ent_node, set()).difference(
+                    chunk_ids_to_delete
+                )
+            ]
 
-            for ent_node in ent_ids_to_delete:
-                result = await self._state_store.ent_node_to_chunk(ent_node)
-                if result.is_error():
-                    result.propagate_exception()
-                doc_ids: set[str] = set(result.get_ok())
-                non_deleted_docs = doc_ids.difference(chunk_ids_to_delete)
-                if len(non_deleted_docs) == 0:
-                    filtered_ent_ids_to_delete.append(ent_node)
+            # facts and entities that stay keep the filter values of their remaining chunks only
+            kept_fact_owners: dict[str, set[str]] = {}
+            for triple, proc_triple in proc_triples.items():
+                owners = triple_to_docs.get(proc_triple, set()).difference(
+                    chunk_ids_to_delete
+                )
+                if owners:
+                    kept_fact_owners[compute_mdhash_id(str(triple))] = owners
+            kept_entity_owners: dict[str, set[str]] = {}
+            for ent_node in ent_ids:
+                owners = ent_to_chunks.get(ent_node, set()).difference(
+                    chunk_ids_to_delete
+                )
+                if owners:
+                    kept_entity_owners[ent_node] = owners
 
             logger.info(f"Deleting {len(chunk_ids_to_delete)} Chunks")
             logger.info(f"Deleting {len(triple_ids_to_delete)} Triples")
@@ -502,6 +738,12 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
             if result.is_error():
                 return result.propagate_exception()
 
+            result = await self._replace_filter_payload(
+                kept_fact_owners, kept_entity_owners
+            )
+            if result.is_error():
+                return result.propagate_exception()
+
             # Delete Nodes from Graph
             result = await self._graph.delete_vertices(
                 list(filtered_ent_ids_to_delete) + list(chunk_ids_to_delete)
@@ -511,6 +753,37 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
 
             return await self._state_store.delete_chunks(list(chunk_ids_to_delete))
 
+    async def _replace_filter_payload(
+        self,
+        fact_owners: dict[str, set[str]],
+        entity_owners: dict[str, set[str]],
+    ) -> Result[None]:
+        """
+        Rewrites the filter payload of shared facts and entities from the chunks that still own them,
+        otherwise the values of a deleted document would keep matching them.
+        """
+        owner_ids = set().union(*fact_owners.values(), *entity_owners.values())
+        if not owner_ids:
+            return Result.Ok()
+        result = await self._state_store.fetch_chunks_by_ids(hash_ids=list(owner_ids))
+        if result.is_error():
+            return result.propagate_exception()
+        owners = [doc for doc in result.get_ok().docs if doc.idx in owner_ids]
+        _, fact_metadata, entity_metadata = collect_point_metadata(owners)
+
+        results = await asyncio.gather(
+            self._vector_store_fact.replace_filter_payload(
+                {hash_id: fact_metadata.get(hash_id, {}) for hash_id in fact_owners}
+            ),
+            self._vector_store_entity.replace_filter_payload(
+                {hash_id: entity_metadata.get(hash_id, {}) for hash_id in entity_owners}
+            ),
+        )
+        for result in results:
+            if result.is_error():
+                return result.propagate_exception()
+        return Result.Ok()
+
     def _merge_openie_results(
         self,
         chunks_to_save: dict[str, str],
@@ -719,6 +992,9 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
             )
 
             entitie_ids: list[str] | None = None
+            metadata_filter: dict[str, list[str] | list[int] | list[float]] | None = (
+                {CollectionFilterAttribute: [collection]} if collection else None
+            )
             if collection:
                 result = await self._state_store.load_openie_info_with_metadata(
                     metadata={CollectionFilterAttribute: [collection]}
@@ -746,6 +1022,7 @@ class HippoRAGIndexer(IndexerInterface, AsyncDocumentIndexer):
                     top_k=self._config.synonymy_edge_topk,
                     min_similarity=self._config.synonymy_edge_sim_threshold,
                     allowd__point_ids=entitie_ids,
+                    metadata_filter=metadata_filter,
                 )
             )
             if query_node_key2knn_node_keys_result.is_error():
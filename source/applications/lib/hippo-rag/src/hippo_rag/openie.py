@@ -12,6 +12,7 @@ from domain.hippo_rag.model import (
     OpenIEResult,
     TripleRawOutput,
 )
+from domain.llm.caller import llm_caller
 from domain.llm.interface import AsyncLLM
 from domain.llm.model import TextChatMessage
 from pydantic import BaseModel, Field
@@ -77,7 +78,8 @@ class AsyncOpenIE(OpenIEInterface):
             )
         logger.info("extracting ner")
         for i in range(self._config.retries):
-            so_res = await self.llm.chat_structured_output(messages, _NerSO)
+            with llm_caller("openie"):
+                so_res = await self.llm.chat_structured_output(messages, _NerSO)
             if so_res.is_error():
                 return so_res.propagate_exception()
 
@@ -142,7 +144,8 @@ class AsyncOpenIE(OpenIEInterface):
 
         logger.info("extract triple")
         for i in range(self._config.retries):
-            so_res = await self.llm.chat_structured_output(messages, _TriplesSO)
+            with llm_caller("openie"):
+                so_res = await self.llm.chat_structured_output(messages, _TriplesSO)
             if so_res.is_error():
                 return so_res.propagate_exception()
 
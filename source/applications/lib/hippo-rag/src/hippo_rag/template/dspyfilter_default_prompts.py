@@ -90,3 +90,14 @@ Respond with the corresponding output fields, starting with the field `[[ ## fac
 DSPY_DEFAULT_ONE_OUTPUT_TEMPLATE = (
     """[[ ## fact_after_filter ## ]]\n{fact_after_filter}\n\n[[ ## completed ## ]]"""
 )
+
+# index based filtering: the candidates are numbered and the model answers with the numbers
+DSPY_INDICES_SYSTEM_PROMPT_DEFAULT = """You are a critical component of a high-stakes question-answering system used by top researchers and decision-makers worldwide. Your task is to filter facts based on their relevance to a given query, ensuring that the most crucial information is presented to these stakeholders. The query requires careful analysis and possibly multi-hop reasoning to connect different pieces of information.
+
+You receive the question and a numbered list of candidate facts, one fact per line as `<number>: [subject, predicate, object]`. Select up to 4 facts from the list that have a strong connection to the query, aiding in reasoning and providing an accurate answer. Answer with the numbers of the selected facts, most relevant first, e.g. {"indices": [3, 0]}. If no facts are relevant, answer {"indices": []}. You must only use numbers from the candidate list."""
+
+DSPY_INDICES_INPUT_TEMPLATE = """[[ ## question ## ]]
+{question}
+
+[[ ## candidate_facts ## ]]
+{candidate_facts}"""
@@ -2,6 +2,7 @@ import logging
 from argparse import ArgumentTypeError
 import regex
 
+from core.hash import compute_mdhash_id
 from domain.hippo_rag.model import NerRawOutput, TripleRawOutput
 from domain.hippo_rag.model import Document, Triple
 from hippo_rag.utils.llm_utils import filter_invalid_triples
@@ -89,6 +90,55 @@ def flatten_facts(chunk_triples: list[list[Triple]]) -> list[Triple]:
     return graph_triples
 
 
+PointMetadata = dict[str, dict[str, list[str]]]
+
+
+def collect_point_metadata(
+    docs: list[Document],
+) -> tuple[PointMetadata, PointMetadata, PointMetadata]:
+    """
+    Maps the metadata of chunks onto the vector store points derived from them.
+    Facts and entities are shared between chunks, so every value of every owning chunk is collected.
+
+    Returns:
+        (chunk_metadata, fact_metadata, entity_metadata) as hash_id -> key -> values
+    """
+    chunk_metadata: PointMetadata = {}
+    fact_metadata: PointMetadata = {}
+    entity_metadata: PointMetadata = {}
+
+    def _add(target: PointMetadata, hash_id: str, metadata: dict[str, str]) -> None:
+        point = target.setdefault(hash_id, {})
+        for key, value in metadata.items():
+            values = point.setdefault(key, [])
+            if value not in values:
+                values.append(value)
+
+    for doc in docs:
+        metadata = {key: str(value) for key, value in doc.metadata.items()}
+        _add(chunk_metadata, doc.idx, metadata)
+        for triple in doc.extracted_triples:
+            _add(fact_metadata, compute_mdhash_id(str(triple)), metadata)
+            if len(triple) == 3:
+                _add(entity_metadata, compute_mdhash_id(triple[0]), metadata)
+                _add(entity_metadata, compute_mdhash_id(triple[2]), metadata)
+    return chunk_metadata, fact_metadata, entity_metadata
+
+
+MetadataFilter = dict[str, list[str] | list[int] | list[float]]
+
+
+def drop_empty_filter_values(metadata: MetadataFilter | None) -> MetadataFilter | None:
+    """
+    Keys without values do not restrict anything, the state store skips them as well.
+    Returns None if no key is left.
+    """
+    if not metadata:
+        return None
+    metadata = {key: values for key, values in metadata.items() if values}
+    return metadata or None
+
+
 def min_max_normalize(scores: list[float]) -> list[float]:
     if not scores:
         return []
@@ -0,0 +1,150 @@
+import json
+import logging
+import random
+import time
+from typing import Type, TypeVar
+
+from core.logger import init_logging
+from core.result import Result
+from domain.hippo_rag.model import Triple
+from domain.llm.model import TextChatMessage
+from domain_test import AsyncTestBase
+from pydantic import BaseModel
+
+from hippo_rag.dspyfilter import DSPyFilter, DSPyFilterConfig
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class FakeFilterLLM:
+    """Answers instantly with the configured selection, in both output formats."""
+
+    def __init__(self, selected: list[int]):
+        self.selected = selected
+        self.requests: list[list[TextChatMessage]] = []
+
+    async def chat(
+        self, chat: list[TextChatMessage], llm_model: str | None = None
+    ) -> Result[str]:
+        self.requests.append(chat)
+        section = chat[-1].content.split("[[ ## fact_before_filter ## ]]")[1]
+        facts = json.loads(section.strip().split("\n\n")[0])["fact"]
+        # the model does not repeat the facts byte for byte
+        after = {"fact": [[part.upper() for part in facts[i]] for i in self.selected]}
+        return Result.Ok(
+            f"[[ ## fact_after_filter ## ]]\n{json.dumps(after)}\n\n[[ ## completed ## ]]"
+        )
+
+    async def chat_structured_output(
+        self, chat: list[TextChatMessage], model: Type[T], llm_model: str | None = None
+    ) -> Result[T]:
+        self.requests.append(chat)
+        return Result.Ok(model.model_validate({"indices": self.selected}))
+
+
+class FailingFilterLLM:
+    """Returns the configured error for every structured output request."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def chat_structured_output(
+        self, chat: list[TextChatMessage], model: Type[T], llm_model: str | None = None
+    ) -> Result[T]:
+        return Result.Err(self.error)
+
+
+class APIConnectionError(Exception):
+    """Stands in for openai.APIConnectionError."""
+
+
+def candidate_facts(count: int) -> list[Triple]:
+    rng = random.Random(count)
+    words = ["river", "film", "director", "born on", "located in", "city", "1943", "music"]
+    return [
+        (
+            f"{rng.choice(words)} {i}",
+            rng.choice(words),
+            " ".join(rng.choice(words) for _ in range(4)),
+        )
+        for i in range(count)
+    ]
+
+
+class TestDSPyFilter(AsyncTestBase):
+    __test__ = True
+
+    async def test_indices_mode(self):
+        llm = FakeFilterLLM(selected=[2, 7, 0, 2, -1])
+        sut = DSPyFilter(llm, DSPyFilterConfig())
+        facts = candidate_facts(5)
+
+        result = await sut.rerank("query", facts, [10, 11, 12, 13, 14], len_after_rerank=4)
+        indices, items, _ = result.get_ok()
+        # out of range and repeated numbers are dropped
+        assert indices == [12, 10]
+        assert items == [facts[2], facts[0]]
+
+        prompt = llm.requests[0][-1].content
+        assert f'4: {json.dumps(list(facts[4]))}' in prompt
+        # the demos are numbered as well
+        assert llm.requests[0][2].content == '{"indices":[0,1,3]}'
+
+    async def test_facts_mode(self):
+        llm = FakeFilterLLM(selected=[3, 1])
+        sut = DSPyFilter(llm, DSPyFilterConfig(mode="facts"))
+        facts = candidate_facts(5)
+
+        result = await sut.rerank("query", facts, [10, 11, 12, 13, 14])
+        indices, items, _ = result.get_ok()
+        assert indices == [13, 11]
+        assert items == [facts[3], facts[1]]
+
+    async def test_invalid_structured_output_selects_nothing(self):
+        sut = DSPyFilter(
+            FailingFilterLLM(ValueError("response is not valid json")),
+            DSPyFilterConfig(),
+        )
+        result = await sut.rerank("query", candidate_facts(3), [10, 11, 12])
+        assert result.get_ok()[:2] == ([], [])
+
+    async def test_transport_errors_propagate(self):
+        for error in [APIConnectionError("connection refused"), TimeoutError()]:
+            sut = DSPyFilter(FailingFilterLLM(error), DSPyFilterConfig())
+            result = await sut.rerank("query", candidate_facts(3), [10, 11, 12])
+            assert result.is_error()
+            assert result.get_error() is error
+
+    async def test_no_candidates(self):
+        llm = FakeFilterLLM(selected=[0])
+        sut = DSPyFilter(llm, DSPyFilterConfig())
+        assert (await sut.rerank("query", [], [])).get_ok()[:2] == ([], [])
+        assert llm.requests == []
+
+    async def test_benchmark_rerank_without_llm(self):
+        """Rerank latency with an instant LLM, the time spent building the prompt and mapping the answer."""
+        repetitions = 5
+        for count in [5, 50, 500]:
+            facts = candidate_facts(count)
+            selected = list(range(0, count, max(1, count // 4)))[:4]
+            timings: dict[str, float] = {}
+            for mode in ["facts", "indices"]:
+                sut = DSPyFilter(
+                    FakeFilterLLM(selected), DSPyFilterConfig(mode=mode)  # type: ignore
+                )
+                start = time.perf_counter()
+                for _ in range(repetitions):
+                    result = await sut.rerank(
+                        "query", facts, list(range(count)), len_after_rerank=4
+                    )
+                    assert result.get_ok()[1] == [facts[i] for i in selected]
+                timings[mode] = (time.perf_counter() - start) / repetitions
+            logger.info(
+                f"rerank of {count} facts without llm: "
+                f"fuzzy matching {timings['facts'] * 1000:.2f} ms, "
+                f"indices {timings['indices'] * 1000:.2f} ms"
+            )
+            assert timings["indices"] < timings["facts"]
@@ -13,7 +13,10 @@ from hippo_rag.utils.misc_utils import (
     flatten_facts,
     min_max_normalize,
     string_to_bool,
+    collect_point_metadata,
+    drop_empty_filter_values,
 )
+from core.hash import compute_mdhash_id
 from domain.hippo_rag.model import Document
 from domain_test import AsyncTestBase
 
@@ -196,6 +199,60 @@ class TestFlattenFacts(AsyncTestBase):
         assert result == [("apple", "is", "fruit")]
 
 
+# =========================== collect_point_metadata ===========================
+
+
+class TestCollectPointMetadata(AsyncTestBase):
+    __test__ = True
+
+    def test_shared_points_collect_all_values(self):
+        docs = [
+            Document(
+                idx="c1",
+                passage="p1",
+                extracted_entities=[],
+                extracted_triples=[("apple", "is", "fruit")],
+                metadata={"project": "a", "doc_id": "d1"},
+            ),
+            Document(
+                idx="c2",
+                passage="p2",
+                extracted_entities=[],
+                extracted_triples=[("apple", "is", "fruit"), ("fruit", "is", "food")],
+                metadata={"project": "b", "doc_id": 2},
+            ),
+        ]
+
+        chunks, facts, entities = collect_point_metadata(docs)
+
+        assert chunks["c1"] == {"project": ["a"], "doc_id": ["d1"]}
+        assert chunks["c2"] == {"project": ["b"], "doc_id": ["2"]}
+        shared_fact = compute_mdhash_id(str(("apple", "is", "fruit")))
+        assert facts[shared_fact]["project"] == ["a", "b"]
+        assert facts[compute_mdhash_id(str(("fruit", "is", "food")))]["project"] == [
+            "b"
+        ]
+        assert entities[compute_mdhash_id("fruit")]["project"] == ["a", "b"]
+        assert entities[compute_mdhash_id("food")]["doc_id"] == ["2"]
+
+    def test_empty(self):
+        assert collect_point_metadata([]) == ({}, {}, {})
+
+
+class TestDropEmptyFilterValues(AsyncTestBase):
+    __test__ = True
+
+    def test_keys_without_values_are_dropped(self):
+        assert drop_empty_filter_values({"project": ["a"], "doc_id": []}) == {
+            "project": ["a"]
+        }
+
+    def test_no_restriction_left(self):
+        assert drop_empty_filter_values({"project": []}) is None
+        assert drop_empty_filter_values({}) is None
+        assert drop_empty_filter_values(None) is None
+
+
 # ============================== min_max_normalize =============================
 
 
@@ -11,8 +11,8 @@ from domain_test import AsyncTestBase
 
 
 # Helpers to make tiny, typed-ish structs without pulling your whole domain in
-def sim_node(id, score, payload):
-    return SimpleNamespace(id=id, score=score, payload=payload)
+def sim_node(id, score, payload, triple=None):
+    return SimpleNamespace(id=id, score=score, payload=payload, triple=triple)
 
 
 def chunk_row(idx, passage, metadata=None):
@@ -36,6 +36,8 @@ class TestHippoRAG(AsyncTestBase):
         self.graph = AsyncMock()
         self.reranker = AsyncMock()
         self.state = AsyncMock()
+        for vs in (self.vs_entity, self.vs_chunk, self.vs_fact):
+            vs.payload_filter_applies.return_value = Result.Ok(False)
 
         self.cfg = HippoRAGConfig(
             retrieval_top_k=5,
@@ -87,6 +89,21 @@ class TestHippoRAG(AsyncTestBase):
         assert top_facts == [("E", "r", "F"), ("A", "r", "B")]
         self.reranker.rerank.assert_awaited()
 
+    async def test_rerank_facts_uses_structured_payload(self):
+        hits = [
+            sim_node("h1", 0.3, "('A','r','B')", triple=("A", "r", "B")),
+            sim_node("h2", 0.9, "not a triple"),
+            sim_node("h3", 0.7, "('E','r','F')"),
+        ]
+        self.reranker.rerank.return_value = Result.Ok(
+            ([1, 0], [("A", "r", "B"), ("E", "r", "F")], SimpleNamespace())
+        )
+
+        top_ids, top_facts, log = (await self.sut._rerank_facts("query", hits)).get_ok()
+        # the unparsable hit is dropped, the indices refer to the remaining facts
+        assert log.facts_before_rerank == [("E", "r", "F"), ("A", "r", "B")]
+        assert [t.id for t in top_ids] == ["h1", "h3"]
+
     async def test_retrieve_dpr_fallback_when_no_facts(self):
         with (
             patch(
@@ -191,6 +208,107 @@ class TestHippoRAG(AsyncTestBase):
         assert [d.id for d in sol.docs] == ["ch2", "ch1"]
         self.graph.personalized_pagerank.assert_awaited()
 
+    def _use_payload_filter(self):
+        for vs in (self.vs_entity, self.vs_chunk, self.vs_fact):
+            vs.payload_filter_applies.return_value = Result.Ok(True)
+
+    async def test_retrieve_with_payload_filter_skips_state_store(self):
+        self._use_payload_filter()
+        self.vs_fact.query.return_value = Result.Ok([])
+        self.vs_chunk.query.return_value = Result.Ok(
+            [SimpleNamespace(id="ch1", score=0.6)]
+        )
+        self.state.fetch_chunks_by_ids.return_value = Result.Ok(
+            SimpleNamespace(docs=[chunk_row("ch1", "P1")])
+        )
+
+        res = await self.sut.retrieve(queries=["who"], metadata={"project": ["a"]})
+        assert res.is_ok(), res
+        assert [d.id for d in res.get_ok()[0].docs] == ["ch1"]
+        self.state.load_openie_info_with_metadata.assert_not_awaited()
+        # the dpr fallback does not need the graph ids
+        self.vs_chunk.get_ids_by_metadata.assert_not_awaited()
+        assert self.vs_fact.query.await_args.kwargs["allowd__point_ids"] is None
+        assert self.vs_fact.query.await_args.kwargs["metadata_filter"] == {
+            "project": ["a"]
+        }
+
+    @patch("hippo_rag.implementation.compute_mdhash_id", side_effect=lambda s: f"h:{s}")
+    async def test_retrieve_graph_path_loads_allowed_ids_from_payload(self, _):
+        self._use_payload_filter()
+        self.vs_fact.query.return_value = Result.Ok(
+            [sim_node("t1", 0.9, "('Alice','knows','Bob')")]
+        )
+        self.reranker.rerank.return_value = Result.Ok(
+            ([0], [("Alice", "knows", "Bob")], SimpleNamespace())
+        )
+        self.vs_chunk.get_ids_by_metadata.return_value = Result.Ok(["ch1"])
+        self.vs_entity.get_ids_by_metadata.return_value = Result.Ok(
+            ["h:alice", "h:bob"]
+        )
+        self.graph.get_node_by_hash.side_effect = lambda hash_id: Result.Ok(
+            SimpleNamespace(hash_id=hash_id)
+        )
+        self.graph.get_chunk_node_connection_for_entity.return_value = Result.Ok(
+            [SimpleNamespace(hash_id="ch1")]
+        )
+        self.vs_chunk.query.return_value = Result.Ok(
+            [SimpleNamespace(id="ch1", score=0.6)]
+        )
+        self.graph.personalized_pagerank.return_value = Result.Ok({"ch1": 0.8})
+        self.state.fetch_chunks_by_ids.return_value = Result.Ok(
+            SimpleNamespace(docs=[chunk_row("ch1", "P1")])
+        )
+
+        res = await self.sut.retrieve(
+            queries=["where", "who"], metadata={"project": ["a"]}
+        )
+        assert res.is_ok(), res
+        assert [[d.id for d in sol.docs] for sol in res.get_ok()] == [["ch1"], ["ch1"]]
+        self.state.load_openie_info_with_metadata.assert_not_awaited()
+        # loaded once for all queries
+        self.vs_chunk.get_ids_by_metadata.assert_awaited_once_with({"project": ["a"]})
+        self.vs_entity.get_ids_by_metadata.assert_awaited_once_with({"project": ["a"]})
+        assert self.graph.personalized_pagerank.await_args.kwargs[
+            "allowed_hash_ids"
+        ] == ["ch1", "h:alice", "h:bob"]
+
+    async def test_retrieve_with_payload_filter_and_no_matches_is_empty(self):
+        self._use_payload_filter()
+        self.vs_fact.query.return_value = Result.Ok([])
+        self.vs_chunk.query.return_value = Result.Ok([])
+
+        res = await self.sut.retrieve(queries=["who"], metadata={"project": ["x"]})
+        assert res.is_ok(), res
+        assert res.get_ok()[0].docs == []
+        self.state.fetch_chunks_by_ids.assert_not_awaited()
+
+    async def test_retrieve_dpr_with_payload_filter_skips_state_store(self):
+        self.vs_chunk.payload_filter_applies.return_value = Result.Ok(True)
+        self.vs_chunk.query.return_value = Result.Ok(
+            [SimpleNamespace(id="ch1", score=0.6)]
+        )
+        self.state.fetch_chunks_by_ids.return_value = Result.Ok(
+            SimpleNamespace(docs=[chunk_row("ch1", "P1")])
+        )
+
+        res = await self.sut.retrieve_dpr(queries=["who"], metadata={"doc_id": ["d"]})
+        assert res.is_ok(), res
+        assert [d.id for d in res.get_ok()[0].docs] == ["ch1"]
+        self.state.load_openie_info_with_metadata.assert_not_awaited()
+        assert self.vs_chunk.query.await_args.kwargs["allowd__point_ids"] is None
+
+    async def test_retrieve_dpr_ignores_empty_filter_values(self):
+        self.vs_chunk.query.return_value = Result.Ok([])
+        self.state.fetch_chunks_by_ids.return_value = Result.Ok(
+            SimpleNamespace(docs=[])
+        )
+
+        res = await self.sut.retrieve_dpr(queries=["who"], metadata={"project": []})
+        assert res.is_ok(), res
+        self.state.load_openie_info_with_metadata.assert_not_awaited()
+        assert self.vs_chunk.query.await_args.kwargs["metadata_filter"] is None
+
     @patch("hippo_rag.implementation.DEFAULT_RAG_QA_SYSTEM", "SYS")
     async def test_request_single_message_happy_path(self):
         from domain.rag.model import Node, Message
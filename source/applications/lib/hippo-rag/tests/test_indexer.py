@@ -1,6 +1,10 @@
+import asyncio
+from collections import defaultdict
 import logging
+import os
 from unittest.mock import Mock, patch, AsyncMock
 
+from core.hash import compute_mdhash_id
 from core.logger import init_logging
 
 from core.result import Result
@@ -22,7 +26,7 @@ from domain.hippo_rag.interfaces import (
 from domain.rag.indexer.interface import DocumentSplitter
 from domain.rag.indexer.model import SplitNode
 
-from hippo_rag.indexer import HippoRAGIndexer, IndexerConfig
+from hippo_rag.indexer import HippoRAGIndexer, IndexerConfig, RebuildCheckpoint
 from domain_test import AsyncTestBase
 
 init_logging("debug")
@@ -73,6 +77,8 @@ def _make_common_mocks():
     # state store defaults
     state.ent_node_to_chunk.return_value = Result.Ok([])
     state.triples_to_docs.return_value = Result.Ok([])
+    state.ent_nodes_to_chunks_bulk.return_value = Result.Ok({})
+    state.triples_to_docs_bulk.return_value = Result.Ok({})
     state.load_openie_info_with_metadata.return_value = Result.Ok(
         DocumentCollection(docs=[])
     )
@@ -86,6 +92,12 @@ def _make_common_mocks():
     vs_entity.delete.return_value = Result.Ok(None)
     vs_fact.delete.return_value = Result.Ok(None)
     vs_chunk.delete.return_value = Result.Ok(None)
+    for vs in (vs_entity, vs_chunk, vs_fact):
+        vs.replace_filter_payload.return_value = Result.Ok(None)
+        vs.set_filter_payload.return_value = Result.Ok(None)
+        vs.ensure_payload_indexes.return_value = Result.Ok(None)
+        vs.is_payload_filter_ready.return_value = Result.Ok(True)
+        vs.payload_filter_applies.return_value = Result.Ok(False)
 
     return vs_entity, vs_chunk, vs_fact, state, openie, graph
 
@@ -299,7 +311,7 @@ class TestHippoRAGIndex(AsyncTestBase):
         assert result.is_ok()
 
         self.mock_vector_store_chunk.insert_strings.assert_awaited_once_with(
-            self.test_docs
+            self.test_docs, None
         )
         self.mock_openie.batch_openie.assert_awaited_once()
         self.hippo_rag._merge_openie_results.assert_called_once()
@@ -473,6 +485,22 @@ class TestHippoRAGAsyncDocumentIndexer(AsyncTestBase):
         )
         self.hippo_rag.delete.assert_awaited_once_with(docs=["test content"])
 
+    async def test_find_similar_nodes_with_payload_filter_skips_state_store(self):
+        self.mock_vector_store_chunk.payload_filter_applies.return_value = Result.Ok(
+            True
+        )
+        self.mock_vector_store_chunk.query.return_value = Result.Ok([])
+
+        result = await self.hippo_rag.find_similar_nodes(
+            "query", metadata={"doc_id": ["d"], "project": []}
+        )
+        assert result.is_error()  # nothing indexed
+
+        self.mock_state_store.load_openie_info_with_metadata.assert_not_awaited()
+        self.mock_vector_store_chunk.query.assert_awaited_once_with(
+            query="query", allowd__point_ids=None, metadata_filter={"doc_id": ["d"]}
+        )
+
     async def test_does_object_with_metadata_exist(self):
         metadata = {"key": "value"}
         collection = "test_collection"
@@ -571,8 +599,12 @@ class TestHippoRAGDelete(AsyncTestBase):
             DocumentCollection(docs=[openie_doc])
         )
 
-        self.mock_state_store.triples_to_docs.return_value = Result.Ok(["chunk-1"])
-        self.mock_state_store.ent_node_to_chunk.return_value = Result.Ok(["chunk-1"])
+        self.mock_state_store.triples_to_docs_bulk.return_value = Result.Ok(
+            {("entity1", "is", "test"): {"chunk-1"}}
+        )
+        self.mock_state_store.ent_nodes_to_chunks_bulk.return_value = Result.Ok(
+            {"entity-1": {"chunk-1"}}
+        )
 
         mock_text_processing.side_effect = lambda x: x
         mock_flatten_facts.return_value = [("entity1", "is", "test")]
@@ -614,6 +646,327 @@ class TestHippoRAGDelete(AsyncTestBase):
         self.mock_vector_store_chunk.delete.assert_awaited_once()
         self.mock_graph.delete_vertices.assert_awaited_once()
 
+    async def test_delete_uses_whole_triple_ids(self):
+        """
+        Regression: the fact ids were added with set.update(str),
+        which stored every character of the hash instead of the hash.
+        """
+        kept = ("shared", "is", "kept")
+        removed = ("alone", "is", "removed")
+        doc = Document(
+            idx=compute_mdhash_id("Document 1 content"),
+            passage="Document 1 content",
+            extracted_entities=["shared", "kept", "alone", "removed"],
+            extracted_triples=[kept, removed],
+            metadata={},
+        )
+        self.mock_state_store.fetch_chunks_by_ids.return_value = Result.Ok(
+            DocumentCollection(docs=[doc])
+        )
+        self.mock_state_store.triples_to_docs_bulk.return_value = Result.Ok(
+            {kept: {doc.idx, "other-chunk"}, removed: {doc.idx}}
+        )
+        self.mock_state_store.ent_nodes_to_chunks_bulk.return_value = Result.Ok(
+            {
+                compute_mdhash_id("alone"): {doc.idx},
+                compute_mdhash_id("removed"): {doc.idx, "other-chunk"},
+            }
+        )
+
+        result = await self.hippo_rag.delete(["Document 1 content"])
+        assert result.is_ok()
+
+        self.mock_vector_store_fact.delete.assert_awaited_once_with(
+            [compute_mdhash_id(str(removed))]
+        )
+        self.mock_vector_store_entity.delete.assert_awaited_once_with(
+            [compute_mdhash_id("alone")]
+        )
+
+    async def test_delete_rewrites_payload_of_shared_points(self):
+        shared = ("alice", "knows", "bob")
+        removed = ("alice", "visits", "rome")
+        deleted = Document(
+            idx=compute_mdhash_id("doc a chunk"),
+            passage="doc a chunk",
+            extracted_entities=[],
+            extracted_triples=[shared, removed],
+            metadata={"doc_id": "a", "project": "p"},
+        )
+        kept = Document(
+            idx=compute_mdhash_id("doc b chunk"),
+            passage="doc b chunk",
+            extracted_entities=[],
+            extracted_triples=[shared],
+            metadata={"doc_id": "b", "project": "p"},
+        )
+        self.mock_state_store.fetch_chunks_by_ids.side_effect = lambda hash_ids: (
+            Result.Ok(
+                DocumentCollection(
+                    docs=[d for d in (deleted, kept) if d.idx in hash_ids]
+                )
+            )
+        )
+        self.mock_state_store.triples_to_docs_bulk.return_value = Result.Ok(
+            {shared: {deleted.idx, kept.idx}, removed: {deleted.idx}}
+        )
+        self.mock_state_store.ent_nodes_to_chunks_bulk.return_value = Result.Ok(
+            {
+                compute_mdhash_id("alice"): {deleted.idx, kept.idx},
+                compute_mdhash_id("bob"): {deleted.idx, kept.idx},
+                compute_mdhash_id("rome"): {deleted.idx},
+            }
+        )
+
+        result = await self.hippo_rag.delete(["doc a chunk"])
+        assert result.is_ok(), result
+
+        self.mock_vector_store_fact.delete.assert_awaited_once_with(
+            [compute_mdhash_id(str(removed))]
+        )
+        self.mock_vector_store_entity.delete.assert_awaited_once_with(
+            [compute_mdhash_id("rome")]
+        )
+        remaining = {"doc_id": ["b"], "project": ["p"]}
+        self.mock_vector_store_fact.replace_filter_payload.assert_awaited_once_with(
+            {compute_mdhash_id(str(shared)): remaining}
+        )
+        self.mock_vector_store_entity.replace_filter_payload.assert_awaited_once_with(
+            {
+                compute_mdhash_id("alice"): remaining,
+                compute_mdhash_id("bob"): remaining,
+            }
+        )
+
+    async def test_delete_issues_constant_number_of_lookups(self):
+        triples = [(f"s{i}", "rel", f"o{i}") for i in range(5000)]
+        doc = Document(
+            idx=compute_mdhash_id("large document"),
+            passage="large document",
+            extracted_entities=[],
+            extracted_triples=triples,
+            metadata={},
+        )
+        self.mock_state_store.fetch_chunks_by_ids.return_value = Result.Ok(
+            DocumentCollection(docs=[doc])
+        )
+        self.mock_state_store.triples_to_docs_bulk.return_value = Result.Ok(
+            {t: {doc.idx} for t in triples}
+        )
+
+        result = await self.hippo_rag.delete(["large document"])
+        assert result.is_ok()
+
+        self.mock_state_store.triples_to_docs_bulk.assert_awaited_once()
+        self.mock_state_store.ent_nodes_to_chunks_bulk.assert_awaited_once()
+        self.mock_state_store.triples_to_docs.assert_not_awaited()
+        self.mock_state_store.ent_node_to_chunk.assert_not_awaited()
+        deleted_facts = self.mock_vector_store_fact.delete.await_args.args[0]
+        assert len(deleted_facts) == 5000
+
+
+class _SyntheticStore:
+    """
+    Synthetic OpenIE state with simulated I/O latency for the rebuild pipeline.
+    Every chunk carries triples_per_chunk triples over a shared entity vocabulary.
+    """
+
+    def __init__(
+        self, num_chunks: int, triples_per_chunk: int, latency: float = 0.0
+    ) -> None:
+        self.latency = latency
+        self.docs = sorted(
+            [
+                Document(
+                    idx=compute_mdhash_id(f"chunk {c}"),
+                    passage=f"chunk {c}",
+                    extracted_entities=[],
+                    extracted_triples=[
+                        (f"e{(c * triples_per_chunk + t) % 5000}", "rel", f"e{t}")
+                        for t in range(triples_per_chunk)
+                    ],
+                    metadata={"project": "bench"},
+                )
+                for c in range(num_chunks)
+            ],
+            key=lambda d: d.idx,
+        )
+        self.after_calls: list[str | None] = []
+        self.graph_nodes: set[str] = set()
+        self.fail_on_graph_write: int | None = None
+        self.graph_writes = 0
+        # stages with in flight calls and the pairs of stages seen running at the same time
+        self.active: dict[str, int] = defaultdict(int)
+        self.overlaps: set[frozenset[str]] = set()
+
+    async def _stage(self, name: str) -> None:
+        self.overlaps.update(
+            frozenset((name, other))
+            for other, count in self.active.items()
+            if count and other != name
+        )
+        self.active[name] += 1
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active[name] -= 1
+
+    async def load_openie_info_after(
+        self, after_idx: str | None = None, chunk_size: int = 1024
+    ) -> Result[DocumentCollection]:
+        self.after_calls.append(after_idx)
+        await self._stage("load")
+        docs = [d for d in self.docs if after_idx is None or d.idx > after_idx]
+        return Result.Ok(DocumentCollection(docs=docs[:chunk_size]))
+
+    async def io(self, *args, **kwargs) -> Result[None]:
+        await self._stage("embed")
+        return Result.Ok(None)
+
+    async def get_not_existing_nodes(self, ids: list[str]) -> Result[list[str]]:
+        return Result.Ok([i for i in ids if i not in self.graph_nodes])
+
+    async def get_values_from_attributes(self, key: str) -> Result[list[str]]:
+        return Result.Ok(list(self.graph_nodes))
+
+    async def add_nodes(self, nodes: list[Node]) -> Result[None]:
+        self.graph_writes += 1
+        if self.graph_writes == self.fail_on_graph_write:
+            return Result.Err(Exception("graph unavailable"))
+        await self._stage("graph")
+        self.graph_nodes.update(n.hash_id for n in nodes)
+        return Result.Ok(None)
+
+
+class TestHippoRAGRebuild(AsyncTestBase):
+    __test__ = True
+
+    def _indexer(
+        self, store: _SyntheticStore, checkpoint_path: str | None = None
+    ) -> HippoRAGIndexer:
+        vs_entity, vs_chunk, vs_fact, state, openie, graph = _make_common_mocks()
+        state.load_openie_info_after.side_effect = store.load_openie_info_after
+        for vs in (vs_entity, vs_chunk, vs_fact):
+            vs.insert_strings.side_effect = store.io
+            vs.set_filter_payload.side_effect = store.io
+        vs_entity.knn_by_ids.return_value = Result.Ok({})
+        graph.get_node_by_hash.return_value = Result.Ok(None)
+        graph.get_not_existing_nodes.side_effect = store.get_not_existing_nodes
+        graph.get_values_from_attributes.side_effect = store.get_values_from_attributes
+        graph.add_nodes.side_effect = store.add_nodes
+        config = _default_config()
+        config.rebuild_checkpoint_path = checkpoint_path
+        return HippoRAGIndexer(
+            vector_store_entity=vs_entity,
+            vector_store_chunk=vs_chunk,
+            vector_store_fact=vs_fact,
+            graph=graph,
+            state_store=state,
+            openie=openie,
+            config=config,
+            text_splitter=DocumentSplitterDummy(),
+        )
+
+    async def test_rebuild_uses_keyset_pages(self):
+        store = _SyntheticStore(num_chunks=25, triples_per_chunk=2)
+        result = await self._indexer(store).rebuild_graph_and_vector_stor(chunk_size=10)
+        assert result.is_ok()
+        stats = result.get_ok()
+        assert stats.chunks == 25
+        assert stats.triples == 50
+        assert store.after_calls == [
+            None,
+            store.docs[9].idx,
+            store.docs[19].idx,
+            store.docs[24].idx,
+        ]
+        assert {d.idx for d in store.docs} <= store.graph_nodes
+
+    async def test_rebuild_resumes_from_checkpoint(self, tmp_path):
+        checkpoint_path = str(tmp_path / "rebuild.json")
+        store = _SyntheticStore(num_chunks=30, triples_per_chunk=2)
+        store.fail_on_graph_write = 2
+
+        result = await self._indexer(store, checkpoint_path).rebuild_graph_and_vector_stor(
+            chunk_size=10
+        )
+        assert result.is_error()
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = RebuildCheckpoint.model_validate_json(f.read())
+        assert checkpoint.last_idx == store.docs[9].idx
+        assert checkpoint.chunks == 10
+
+        store.fail_on_graph_write = None
+        store.after_calls.clear()
+        result = await self._indexer(store, checkpoint_path).rebuild_graph_and_vector_stor(
+            chunk_size=10
+        )
+        assert result.is_ok()
+        assert store.after_calls[0] == store.docs[9].idx
+        assert result.get_ok().chunks == 20
+        assert {d.idx for d in store.docs} <= store.graph_nodes
+        assert not os.path.exists(checkpoint_path)
+
+    async def test_migration_uses_keyset_pages(self):
+        store = _SyntheticStore(num_chunks=25, triples_per_chunk=2)
+        indexer = self._indexer(store)
+        indexer._vector_store_chunk.is_payload_filter_ready.return_value = Result.Ok(  # type: ignore
+            False
+        )
+        result = await indexer.migrate_payload_filters(chunk_size=10)
+        assert result.is_ok()
+        assert result.get_ok() is True
+        assert store.after_calls == [
+            None,
+            store.docs[9].idx,
+            store.docs[19].idx,
+            store.docs[24].idx,
+        ]
+        indexer._state_store.load_openie_info.assert_not_awaited()  # type: ignore
+        indexer._vector_store_chunk.ensure_payload_indexes.assert_awaited_once()  # type: ignore
+
+    async def test_migration_skipped_when_indexes_exist(self):
+        store = _SyntheticStore(num_chunks=5, triples_per_chunk=2)
+        indexer = self._indexer(store)
+        result = await indexer.migrate_payload_filters()
+        assert result.is_ok()
+        assert result.get_ok() is False
+        assert store.after_calls == []
+
+        result = await indexer.migrate_payload_filters(force=True)
+        assert result.get_ok() is True
+        assert store.after_calls == [None, store.docs[4].idx]
+
+    async def test_rebuild_overlaps_stages(self):
+        latency = 0.02
+        pages = 10
+        store = _SyntheticStore(num_chunks=pages * 5, triples_per_chunk=2, latency=latency)
+        result = await self._indexer(store).rebuild_graph_and_vector_stor(chunk_size=5)
+        assert result.is_ok()
+        logger.info(
+            f"pipelined {result.get_ok().seconds:.3f}s, overlapping stages {store.overlaps}"
+        )
+        # the graph write of a page runs while the next pages are loaded and embedded
+        assert frozenset(("graph", "embed")) in store.overlaps
+        assert frozenset(("graph", "load")) in store.overlaps
+        assert {d.idx for d in store.docs} <= store.graph_nodes
+
+    async def test_rebuild_throughput(self):
+        """
+        Synthetic throughput report, scale with REBUILD_BENCHMARK_TRIPLES (e.g. 1000000).
+        """
+        triples = int(os.environ.get("REBUILD_BENCHMARK_TRIPLES", "20000"))
+        store = _SyntheticStore(num_chunks=triples // 20, triples_per_chunk=20)
+        logging.getLogger("hippo_rag.indexer").setLevel(logging.INFO)
+        result = await self._indexer(store).rebuild_graph_and_vector_stor()
+        assert result.is_ok()
+        stats = result.get_ok()
+        logger.info(
+            f"rebuild of {stats.triples} triples: {stats.seconds:.1f}s, "
+            f"{stats.triples_per_second:.0f} triples/s"
+        )
+        assert stats.triples == triples
+
 
 class TestHippoRAGGraphBuilding(AsyncTestBase):
     __test__ = True
@@ -970,7 +1323,9 @@ class TestHippoRAGIntegration(AsyncTestBase):
             logger.error(result.get_error())
         assert result.is_ok()
 
-        self.mock_vector_store_chunk.insert_strings.assert_awaited_once_with(test_docs)
+        self.mock_vector_store_chunk.insert_strings.assert_awaited_once_with(
+            test_docs, None
+        )
         self.mock_openie.batch_openie.assert_awaited_once()
         self.hippo_rag._merge_openie_results.assert_called_once()
         self.hippo_rag._save_openie_results.assert_awaited_once()
@@ -10,6 +10,10 @@ from llama_index.core.vector_stores.types import (
     BasePydanticVectorStore,
 )
 from llama_index.vector_stores.qdrant import QdrantVectorStore
+from llama_index.vector_stores.qdrant.utils import (
+    SparseEncoderCallable,
+    fastembed_sparse_encoder,
+)
 
 from llama_index.vector_stores.qdrant.base import VectorStoreQueryResult
 from qdrant_client import AsyncQdrantClient, QdrantClient
@@ -37,12 +41,14 @@ class LlamaIndexRAGConfig(BaseModel):
 
 
 class LLamaIndexHolder(BaseSingleton):
-    _indexes: dict[str, VectorStoreIndex]
+    # (collection, id of the embedding model) -> (embedding model, index)
+    _indexes: dict[tuple[str, int], tuple[BaseEmbedding, VectorStoreIndex]]
     _default_index_key = "default"
     _config: LlamaIndexRAGConfig
 
     def _init_once(self, config: LlamaIndexRAGConfig):
         self._config = config
+        self._indexes = {}
 
     def get_index(
         self,
@@ -52,16 +58,34 @@ class LLamaIndexHolder(BaseSingleton):
         top_k_dense: int,
         collection: str | None = None,
     ) -> VectorStoreIndex:
-        return VectorStoreIndex.from_vector_store(  # type: ignore
-            vector_store=LlamaIndexVectorStoreSession.Instance().get_database(
-                collection=collection,
-                sparse_model=sparse_model,
-                top_k_dense=top_k_dense,
-                top_k_sparse=top_k_sparse,
-            ),
-            embed_model=embedding_model or self._embedding_model,
+        """
+        Returns the index of `collection` for the embedding model.
+        The index is cached as long as the session returns the same vector store,
+        an invalidated collection gets a new index with the next request.
+        """
+        session = LlamaIndexVectorStoreSession.Instance()
+        vector_store = session.get_database(
+            collection=collection,
+            sparse_model=sparse_model,
+            top_k_dense=top_k_dense,
+            top_k_sparse=top_k_sparse,
+        )
+        key = (collection or session.get_config().collection, id(embedding_model))
+        cached = self._indexes.get(key)
+        if (
+            cached is not None
+            and cached[0] is embedding_model
+            and cached[1].vector_store is vector_store
+        ):
+            return cached[1]
+
+        index = VectorStoreIndex.from_vector_store(  # type: ignore
+            vector_store=vector_store,
+            embed_model=embedding_model,
             use_async=True,
         )
+        self._indexes[key] = (embedding_model, index)
+        return index
 
     def get_custom_reranker(
         self, reranker: AsyncRerankerClient, top_n_count_reranker: int
@@ -88,7 +112,10 @@ class LlamaIndexVectorStoreSession(BaseSingleton):
     """
 
     _instance = None
+    # one vector store per collection, built on first use
     _vector_stores: dict[str, QdrantVectorStore]
+    # loaded fastembed sparse models by name, shared by all collections
+    _sparse_encoders: dict[str, SparseEncoderCallable]
     _config: LlamaIndexVectorStoreSessionConfig | None = None
     _client: QdrantClient | None = None
     _aclient: AsyncQdrantClient | None = None
@@ -102,8 +129,20 @@ class LlamaIndexVectorStoreSession(BaseSingleton):
             host=config.qdrant_host, port=config.qdrant_port
         )
         self._vector_stores = {}
+        self._sparse_encoders = {}
         self._config = config
 
+    def _get_sparse_encoder(self, sparse_model: str) -> SparseEncoderCallable:
+        """
+        Loading a fastembed model is expensive, each model is loaded once
+        and used for documents and queries of every collection.
+        """
+        encoder = self._sparse_encoders.get(sparse_model)
+        if encoder is None:
+            encoder = fastembed_sparse_encoder(model_name=sparse_model)
+            self._sparse_encoders[sparse_model] = encoder
+        return encoder
+
     def _build_vector_store(
         self, collection: str, sparse_model: str, top_k_sparse: int, top_k_dense: int
     ) -> QdrantVectorStore:
@@ -207,12 +246,15 @@ class LlamaIndexVectorStoreSession(BaseSingleton):
                 ids=[x[1].node_id for x in fused_similarities],
             )
 
+        sparse_encoder = self._get_sparse_encoder(sparse_model)
         return QdrantVectorStore(
             collection,
             client=self._client,
             aclient=self._aclient,
             enable_hybrid=True,
             fastembed_sparse_model=sparse_model,
+            sparse_doc_fn=sparse_encoder,
+            sparse_query_fn=sparse_encoder,
             batch_size=self._config.batch_size,
             # hybrid_fusion_fn=relative_score_fusion,  # type: ignore
             use_async=True,
@@ -235,6 +277,8 @@ class LlamaIndexVectorStoreSession(BaseSingleton):
         * If `collection` is omitted, the default collection from the config
           is returned (preserves original behaviour).
         * If `collection` has never been requested before, it is created and cached.
+        * A collection that was deleted or recreated outside of the session
+          has to be invalidated, see `invalidate`.
         """
         if collection is None:
             assert self._config is not None, (
@@ -242,12 +286,34 @@ class LlamaIndexVectorStoreSession(BaseSingleton):
             )
             collection = self._config.collection
 
-        return self._build_vector_store(
-            collection=collection,
-            sparse_model=sparse_model,
-            top_k_sparse=top_k_sparse,
-            top_k_dense=top_k_dense,
-        )
+        vector_store = self._vector_stores.get(collection)
+        if vector_store is None or vector_store.fastembed_sparse_model != sparse_model:
+            vector_store = self._build_vector_store(
+                collection=collection,
+                sparse_model=sparse_model,
+                top_k_sparse=top_k_sparse,
+                top_k_dense=top_k_dense,
+            )
+            self._vector_stores[collection] = vector_store
+        return vector_store
+
+    def invalidate(self, collection: str | None = None) -> None:
+        """
+        Drops the cached vector store of `collection`, of all collections if omitted.
+        The cached store remembers whether its collection exists,
+        it has to be rebuilt after the collection was deleted or recreated.
+        """
+        if collection is None:
+            self._vector_stores.clear()
+        else:
+            self._vector_stores.pop(collection, None)
+
+    async def delete_collection(self, collection: str | None = None) -> None:
+        assert self._aclient is not None, "Database is not initialized."
+        assert self._config is not None, "Database is not initialized."
+        collection = collection or self._config.collection
+        await self._aclient.delete_collection(collection_name=collection)
+        self.invalidate(collection)
 
     def is_database_init(self, collection: str | None = None) -> bool:
         assert self._config
@@ -1,19 +1,91 @@
+import asyncio
 import logging
-from domain.text_embedding.interface import EmbeddClient
+from typing import Any, Coroutine, Optional
+
+from core.result import Result
+from domain.text_embedding.interface import AsyncEmbeddClient, EmbeddClient
+from domain.text_embedding.model import EmbeddingResponseDto
 from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
 
 from llama_index.core.callbacks import CBEventType, EventPayload
 from pydantic import PrivateAttr
 
+from llama_index_extension.sync_bridge import SyncBridge
+
 logger = logging.getLogger(__name__)
 
+EmbeddingResult = Result[EmbeddingResponseDto | list[list[float]]]
+
 
 class CustomEmbedding(BaseEmbedding):
-    _client: EmbeddClient = PrivateAttr()
+    """
+    LlamaIndex embedding backed by the text-embedding clients.
+    The async methods await the async client on the caller's loop,
+    the sync methods use the sync client or, if there is none, the shared SyncBridge.
+    Without an async client the async methods run the sync client in a worker thread.
+    """
 
-    def __init__(self, client: EmbeddClient):
+    _client: Optional[EmbeddClient] = PrivateAttr()
+    _aclient: Optional[AsyncEmbeddClient] = PrivateAttr()
+    _bridge: Optional[SyncBridge] = PrivateAttr()
+
+    def __init__(
+        self,
+        client: EmbeddClient | None = None,
+        async_client: AsyncEmbeddClient | None = None,
+        bridge: SyncBridge | None = None,
+    ):
+        assert client or async_client, "Provide either client or async_client"
         super().__init__()
         self._client = client
+        self._aclient = async_client
+        self._bridge = bridge
+
+    @staticmethod
+    def _unwrap(result: EmbeddingResult) -> Any:
+        if result.is_error():
+            logger.error(result.get_error(), exc_info=True)
+            raise result.get_error()
+        response = result.get_ok()
+        if isinstance(response, EmbeddingResponseDto):
+            return response.root
+        return [r.root if isinstance(r, EmbeddingResponseDto) else r for r in response]
+
+    def _run_sync(self, coro: Coroutine[Any, Any, EmbeddingResult]) -> EmbeddingResult:
+        bridge = self._bridge or SyncBridge()
+        return bridge.run(coro)
+
+    def _embed_query(self, query: str | list[str]) -> EmbeddingResult:
+        if self._client:
+            return self._client.embed_query(query)
+        assert self._aclient
+        return self._run_sync(self._aclient.embed_query(query))
+
+    def _embed_doc(self, text: str | list[str]) -> EmbeddingResult:
+        if self._client:
+            return self._client.embed_doc(text)
+        assert self._aclient
+        return self._run_sync(self._aclient.embed_doc(text))
+
+    async def _aembed_query(self, query: str | list[str]) -> EmbeddingResult:
+        if self._aclient:
+            return await self._aclient.embed_query(query)
+        assert self._client
+        return await asyncio.to_thread(self._client.embed_query, query)
+
+    async def _aembed_doc(self, text: str | list[str]) -> EmbeddingResult:
+        if self._aclient:
+            return await self._aclient.embed_doc(text)
+        assert self._client
+        return await asyncio.to_thread(self._client.embed_doc, text)
+
+    def _text_event(self, text: str | list[str]):
+        self.callback_manager.event(
+            CBEventType.EMBEDDING,
+            payload={
+                EventPayload.QUERY_STR: text,
+            },
+        )
 
     def _get_query_embedding(self, query: str) -> Embedding:
         """
@@ -22,18 +94,10 @@ class CustomEmbedding(BaseEmbedding):
         Subclasses should implement this method. Reference get_query_embedding's
         docstring for more information.
         """
-        result = self._client.embed_query(query)
-
-        if result.is_error():
-            logger.error(result.get_error(), exc_info=True)
-            raise result.get_error()
-        return result.get_ok().root
+        return self._unwrap(self._embed_query(query))
 
     async def _aget_query_embedding(self, query: str) -> Embedding:
-        return self._get_query_embedding(query=query)
-
-    async def _aget_text_embedding(self, text: str) -> Embedding:
-        return self._get_text_embedding(text)
+        return self._unwrap(await self._aembed_query(query))
 
     def _get_text_embedding(self, text: str) -> Embedding:
         """
@@ -42,16 +106,22 @@ class CustomEmbedding(BaseEmbedding):
         Subclasses should implement this method. Reference get_text_embedding's
         docstring for more information.
         """
-        result = self._client.embed_doc(text)
+        result = self._embed_doc(text)
+        self._text_event(text)
+        return self._unwrap(result)
 
-        self.callback_manager.event(
-            CBEventType.EMBEDDING,
-            payload={
-                EventPayload.QUERY_STR: text,
-            },
-        )
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        result = await self._aembed_doc(text)
+        self._text_event(text)
+        return self._unwrap(result)
 
-        if result.is_error():
-            logger.error(result.get_error(), exc_info=True)
-            raise result.get_error()
-        return result.get_ok().root
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        """Embeds a batch with one client call instead of one call per text."""
+        result = self._embed_doc(texts)
+        self._text_event(texts)
+        return self._unwrap(result)
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        result = await self._aembed_doc(texts)
+        self._text_event(texts)
+        return self._unwrap(result)
@@ -15,6 +15,8 @@ from llama_index.core.instrumentation.events.rerank import (
     ReRankStartEvent,
 )
 
+from llama_index_extension.sync_bridge import SyncBridge
+
 
 logger = logging.getLogger(__name__)
 
@@ -22,22 +24,29 @@ dispatcher = get_dispatcher(__name__)
 
 
 class CustomRerankerClient(BaseNodePostprocessor):
-    """Custom reranker client for reranking nodes."""
+    """
+    Custom reranker client for reranking nodes.
+    The async path awaits the async client on the caller's loop,
+    sync callers without a sync client go through the shared SyncBridge.
+    """
 
     top_n: int = Field(description="Number of nodes to return sorted by score.")
     _client: Optional[RerankerClient] = PrivateAttr()
     _aclient: Optional[AsyncRerankerClient] = PrivateAttr()
+    _bridge: Optional[SyncBridge] = PrivateAttr()
 
     def __init__(
         self,
         client: RerankerClient | None = None,
         async_client: AsyncRerankerClient | None = None,
         top_n: int = 5,
+        bridge: SyncBridge | None = None,
     ):
         assert client or async_client, "Provide either client or async_client"
         super().__init__(top_n=top_n)
         self._client = client
         self._aclient = async_client
+        self._bridge = bridge
 
     @classmethod
     def class_name(cls) -> str:
@@ -45,36 +54,6 @@ class CustomRerankerClient(BaseNodePostprocessor):
 
     # ---------- utilities ----------
 
-    @staticmethod
-    def _run_coro_sync(coro):
-        """Run an async coroutine from a sync context safely."""
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-
-        if loop and loop.is_running():
-            # Running inside an event loop (rare for sync path); create a new loop in a thread
-            import threading
-
-            result_container = {}
-
-            def _runner():
-                new_loop = asyncio.new_event_loop()
-                try:
-                    asyncio.set_event_loop(new_loop)
-                    result_container["value"] = new_loop.run_until_complete(coro)
-                finally:
-                    new_loop.close()
-
-            t = threading.Thread(target=_runner, daemon=True)
-            t.start()
-            t.join()
-            return result_container["value"]
-        else:
-            # No loop running: safe to create/run one here
-            return asyncio.run(coro)
-
     @staticmethod
     def _extract_texts(nodes: list[NodeWithScore]) -> list[str]:
         return [
@@ -137,7 +116,8 @@ class CustomRerankerClient(BaseNodePostprocessor):
 
         # Fallback: no sync client but async client is available
         if self._aclient:
-            return self._run_coro_sync(self._acalculate_sim(query, nodes))
+            bridge = self._bridge or SyncBridge()
+            return bridge.run(self._acalculate_sim(query, nodes))
 
         raise Exception("No available reranker client (sync or async).")
 
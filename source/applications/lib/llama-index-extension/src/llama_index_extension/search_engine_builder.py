@@ -7,7 +7,7 @@ import logging
 from domain.rag.model import (
     AsyncRerankerClient,
 )
-from domain.text_embedding.interface import EmbeddClient
+from domain.text_embedding.interface import AsyncEmbeddClient, EmbeddClient
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.llms.function_calling import FunctionCallingLLM
 from llama_index.core.postprocessor.types import BaseNodePostprocessor
@@ -36,6 +36,7 @@ class LlamaIndexSearchEngineConfig:
     top_n_count_sparse: int
 
     sparse_model: str = "Qdrant/bm25"
+    async_embedding: AsyncEmbeddClient | None = None
 
 
 class LlamaIndexSearchEngine:
@@ -51,7 +52,9 @@ class LlamaIndexSearchEngine:
             )
         else:
             self.reranker = None
-        self.embedding = CustomEmbedding(self.config.embedding)
+        self.embedding = CustomEmbedding(
+            self.config.embedding, async_client=self.config.async_embedding
+        )
 
     async def query(
         self,
@@ -3,7 +3,7 @@ import logging
 from domain.rag.model import (
     AsyncRerankerClient,
 )
-from domain.text_embedding.interface import EmbeddClient
+from domain.text_embedding.interface import AsyncEmbeddClient, EmbeddClient
 from llama_index.core import (
     ChatPromptTemplate,
     PromptTemplate,
@@ -57,6 +57,7 @@ class LlamaIndexSimpleBuilderConfig:
     system_prompt: str = DEFAULT_SYSTEM_PROMPT
     query_wrapper_prompt: str = DEFAULT_TEXT_WRAPPER_TMPL
     condense_question_prompt: str = DEFAULT_CONDENSE_TEMPLATE
+    async_embedding: AsyncEmbeddClient | None = None
 
 
 class LlamaIndexSimpleBuilder:
@@ -69,7 +70,9 @@ class LlamaIndexSimpleBuilder:
         self.reranker = LLamaIndexHolder.Instance().get_custom_reranker(
             self.config.reranker, self.config.top_n_count_reranker
         )
-        self.embedding = CustomEmbedding(self.config.embedding)
+        self.embedding = CustomEmbedding(
+            self.config.embedding, async_client=self.config.async_embedding
+        )
         self.llm = LLamaIndexHolder.Instance().get_llm(
             self.config.llm_model, self.config.temperatur, self.config.context_window
         )
@@ -4,6 +4,7 @@ from domain.rag.model import (
     AsyncRerankerClient,
     EmbeddClient,
 )
+from domain.text_embedding.interface import AsyncEmbeddClient
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.base.llms.base import BaseLLM
 from llama_index.core.chat_engine import CondenseQuestionChatEngine
@@ -69,6 +70,7 @@ class LlamaIndexSubQuestionBuilderConfig:
     qa_prompt: str = DEFAULT_TEXT_QA_PROMPT_TMPL
     query_wrapper_prompt: str = DEFAULT_TEXT_WRAPPER_TMPL
     system_prompt: str = DEFAULT_SYSTEM_PROMPT
+    async_embedding: AsyncEmbeddClient | None = None
 
 
 class LlamaIndexSubQuestionBuilder:
@@ -81,7 +83,9 @@ class LlamaIndexSubQuestionBuilder:
         self.reranker = LLamaIndexHolder.Instance().get_custom_reranker(
             self.config.reranker, self.config.top_n_count_reranker
         )
-        self.embedding = CustomEmbedding(self.config.embedding)
+        self.embedding = CustomEmbedding(
+            self.config.embedding, async_client=self.config.async_embedding
+        )
         self.llm = LLamaIndexHolder.Instance().get_llm(
             self.config.llm_model, self.config.temperatur, self.config.context_window
         )
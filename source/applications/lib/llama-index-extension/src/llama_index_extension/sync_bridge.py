@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, TypeVar
+
+from core.singelton import BaseSingleton
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SyncBridgeConfig(BaseModel):
+    max_in_flight: int = 32
+    timeout: float | None = None
+
+
+class SyncBridge(BaseSingleton):
+    """
+    Runs coroutines of async clients for synchronous LlamaIndex callers.
+    All coroutines share one event loop on a single daemon thread, which is started lazily,
+    instead of a new thread and loop per call.
+    At most max_in_flight calls are submitted at once, further sync callers block until a slot is free.
+    """
+
+    _config: SyncBridgeConfig
+    _loop: asyncio.AbstractEventLoop | None
+    _thread: threading.Thread | None
+
+    def _init_once(self, config: SyncBridgeConfig | None = None):
+        self._config = config or SyncBridgeConfig()
+        self._slots = threading.BoundedSemaphore(self._config.max_in_flight)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+    def _reset(self, *args, **kwargs):  # type: ignore
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join()
+            self._loop = None
+            self._thread = None
+        super()._reset()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop, args=(loop,), name="sync-bridge", daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Blocks the calling thread until the coroutine finished on the bridge loop."""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("SyncBridge.run must not be called from the bridge loop")
+        with self._slots:
+            future: Future[T] = asyncio.run_coroutine_threadsafe(coro, loop)
+            try:
+                return future.result(timeout=self._config.timeout)
+            except TimeoutError:
+                future.cancel()
+                raise
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.logger import init_logging
+from core.result import Result
+from core.singelton import BaseSingleton
+from domain.text_embedding.model import (
+    EmbeddingRequestDto,
+    EmbeddingResponseDto,
+    RerankRequestDto,
+    RerankResponseDto,
+    RerankResponseElement,
+)
+from domain_test import AsyncTestBase
+from llama_index.core import QueryBundle
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from llama_index_extension.embedding import CustomEmbedding
+from llama_index_extension.reranker import CustomRerankerClient
+from llama_index_extension.sync_bridge import SyncBridge, SyncBridgeConfig
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+LATENCY = 0.05
+QUERIES = 100
+
+
+class InFlight:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def wait(self):
+        self.current += 1
+        self.calls += 1
+        self.peak = max(self.peak, self.current)
+        try:
+            await asyncio.sleep(LATENCY)
+        finally:
+            self.current -= 1
+
+
+class FakeAsyncReranker(InFlight):
+    """Scores the texts in reverse order after a fixed network latency."""
+
+    async def rerank(self, request: RerankRequestDto) -> Result[RerankResponseDto]:
+        await self.wait()
+        return Result.Ok(
+            RerankResponseDto(
+                root=[
+                    RerankResponseElement(index=i, score=float(i), text="")
+                    for i in range(len(request.texts))
+                ]
+            )
+        )
+
+
+class FakeAsyncEmbedder(InFlight):
+    async def embed(
+        self, request: EmbeddingRequestDto
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        await self.wait()
+        if isinstance(request.inputs, str):
+            return Result.Ok(EmbeddingResponseDto(root=[float(len(request.inputs))]))
+        return Result.Ok([[float(len(text))] for text in request.inputs])
+
+    async def embed_doc(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return await self.embed(self._request(text))
+
+    async def embed_query(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return await self.embed(self._request(text))
+
+    @staticmethod
+    def _request(text: str | list[str]) -> EmbeddingRequestDto:
+        return EmbeddingRequestDto(
+            inputs=text,
+            normalize=True,
+            prompt_name=None,
+            truncate=True,
+            truncation_direction="right",
+        )
+
+
+def nodes() -> list[NodeWithScore]:
+    return [
+        NodeWithScore(node=TextNode(text=f"node {i}"), score=0.5) for i in range(4)
+    ]
+
+
+class TestAsyncClients(AsyncTestBase):
+    __test__ = True
+
+    async def setup_method_async(self, test_name: str):
+        BaseSingleton.clear_all()
+        self.bridge = SyncBridge.create(SyncBridgeConfig(max_in_flight=8))
+        self.reranker = FakeAsyncReranker()
+        self.embedder = FakeAsyncEmbedder()
+
+    async def teardown_method_async(self, test_name: str):
+        SyncBridge.restart()
+
+    async def test_parallel_queries_share_the_loop(self):
+        postprocessor = CustomRerankerClient(async_client=self.reranker, top_n=2)
+        embedding = CustomEmbedding(async_client=self.embedder)
+        threads = threading.active_count()
+        peak_threads = threads
+        done = False
+
+        async def sample_threads():
+            nonlocal peak_threads
+            while not done:
+                peak_threads = max(peak_threads, threading.active_count())
+                await asyncio.sleep(0.005)
+
+        async def query(i: int) -> list[NodeWithScore]:
+            vector = await embedding.aget_query_embedding(f"question {i}")
+            assert vector == [float(len(f"question {i}"))]
+            return await postprocessor.apostprocess_nodes(
+                nodes(), query_bundle=QueryBundle(f"question {i}")
+            )
+
+        sampler = asyncio.create_task(sample_threads())
+        start = time.perf_counter()
+        results = await asyncio.gather(*[query(i) for i in range(QUERIES)])
+        elapsed = time.perf_counter() - start
+        done = True
+        await sampler
+
+        logger.info(
+            f"{QUERIES} parallel queries: {elapsed * 1000:.0f} ms, "
+            f"threads {threads} -> peak {peak_threads}, "
+            f"peak in flight embedding {self.embedder.peak}, reranker {self.reranker.peak}"
+        )
+        assert [n.node.get_content() for n in results[0]] == ["node 3", "node 2"]
+        assert peak_threads == threads
+        # one embedding and one rerank round trip, not one per query
+        assert elapsed < 10 * LATENCY
+        assert self.embedder.peak == QUERIES
+        assert self.reranker.peak == QUERIES
+
+    async def test_batch_embedding_is_one_call(self):
+        embedding = CustomEmbedding(async_client=self.embedder)
+        texts = [f"text {i}" for i in range(20)]
+        vectors = await embedding.aget_text_embedding_batch(texts)
+        assert vectors == [[float(len(t))] for t in texts]
+        # one call per embed_batch_size texts instead of one per text
+        assert self.embedder.calls == len(texts) // embedding.embed_batch_size
+
+    def test_sync_facade_is_bounded(self):
+        postprocessor = CustomRerankerClient(async_client=self.reranker, top_n=2)
+        embedding = CustomEmbedding(async_client=self.embedder)
+
+        def legacy_query(i: int) -> int:
+            embedding.get_query_embedding(f"question {i}")
+            return len(
+                postprocessor.postprocess_nodes(
+                    nodes(), query_bundle=QueryBundle(f"question {i}")
+                )
+            )
+
+        with ThreadPoolExecutor(max_workers=QUERIES) as pool:
+            list(pool.map(legacy_query, range(QUERIES)))
+            # the callers are up, the bridge loop is the only additional thread
+            threads = threading.active_count()
+            start = time.perf_counter()
+            results = list(pool.map(legacy_query, range(QUERIES)))
+            elapsed = time.perf_counter() - start
+            assert threading.active_count() == threads
+
+        logger.info(
+            f"{QUERIES} legacy sync queries through the bridge: {elapsed * 1000:.0f} ms, "
+            f"peak in flight embedding {self.embedder.peak}, reranker {self.reranker.peak}"
+        )
+        assert results == [2] * QUERIES
+        assert self.bridge._thread is not None and self.bridge._thread.is_alive()
+        assert self.embedder.peak + self.reranker.peak <= 2 * 8
+        assert self.embedder.peak <= 8 and self.reranker.peak <= 8
+        # 100 queries of two round trips each with 8 in flight
+        assert elapsed < 2 * QUERIES / 8 * LATENCY * 2
+
+    async def test_bridge_refuses_calls_from_its_own_loop(self):
+        async def nested() -> int:
+            return self.bridge.run(asyncio.sleep(0, result=1))
+
+        with pytest.raises(RuntimeError):
+            self.bridge.run(nested())
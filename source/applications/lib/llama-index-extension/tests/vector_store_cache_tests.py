@@ -0,0 +1,193 @@
+import logging
+import time
+import tracemalloc
+from typing import Callable
+
+import pytest
+from core.logger import init_logging
+from core.singelton import BaseSingleton
+from domain_test import AsyncTestBase
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+import llama_index.vector_stores.qdrant.base as qdrant_base
+import llama_index_extension.build_components as build_components
+from llama_index_extension.build_components import (
+    LLamaIndexHolder,
+    LlamaIndexRAGConfig,
+    LlamaIndexVectorStoreSession,
+)
+from llama_index_extension.vector_store_session import (
+    LlamaIndexVectorStoreSessionConfig,
+)
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+COLLECTION = "documents"
+SPARSE_MODEL = "Qdrant/bm25"
+
+
+class FakeSparseModelLoader:
+    """
+    Stands in for fastembed_sparse_encoder, the models can not be downloaded in tests.
+    Every load builds a vocabulary of the size of a sparse model vocabulary.
+    """
+
+    def __init__(self, vocabulary_size: int = 30_000):
+        self.vocabulary_size = vocabulary_size
+        self.loads = 0
+
+    def __call__(self, model_name: str = "", **kwargs) -> Callable:
+        self.loads += 1
+        vocabulary = {f"{model_name}-token-{i}": i for i in range(self.vocabulary_size)}
+
+        def encode(texts: list[str]) -> tuple[list[list[int]], list[list[float]]]:
+            indices = [[vocabulary.get(t, 0) for t in text.split()] for text in texts]
+            return indices, [[1.0] * len(i) for i in indices]
+
+        return encode
+
+
+class TestVectorStoreCache(AsyncTestBase):
+    __test__ = True
+
+    @pytest.fixture(autouse=True)
+    def _fake_sparse_models(self, monkeypatch: pytest.MonkeyPatch):
+        self.loader = FakeSparseModelLoader()
+        monkeypatch.setattr(build_components, "fastembed_sparse_encoder", self.loader)
+        monkeypatch.setattr(qdrant_base, "fastembed_sparse_encoder", self.loader)
+
+    async def setup_method_async(self, test_name: str):
+        BaseSingleton.clear_all()
+        LlamaIndexVectorStoreSession.create(  # type: ignore
+            config=LlamaIndexVectorStoreSessionConfig(
+                qdrant_host="localhost",
+                qdrant_port=6333,
+                qdrant_api_key=None,
+                collection=COLLECTION,
+                batch_size=20,
+            )
+        )
+        self.session = LlamaIndexVectorStoreSession.Instance()
+        self.session._client = QdrantClient(location=":memory:")
+        self.session._aclient = AsyncQdrantClient(location=":memory:")
+        self.session._client.create_collection(
+            COLLECTION,
+            vectors_config={
+                "text-dense": models.VectorParams(size=8, distance=models.Distance.COSINE)
+            },
+            sparse_vectors_config={"text-sparse-new": models.SparseVectorParams()},
+        )
+        LLamaIndexHolder.create(config=LlamaIndexRAGConfig())  # type: ignore
+        self.embedding = MockEmbedding(embed_dim=8)
+
+    async def teardown_method_async(self, test_name: str):
+        BaseSingleton.clear_all()
+
+    def _get_index(
+        self,
+        embedding: MockEmbedding | None = None,
+        collection: str | None = None,
+        sparse_model: str = SPARSE_MODEL,
+    ) -> VectorStoreIndex:
+        return LLamaIndexHolder.Instance().get_index(
+            embedding_model=embedding or self.embedding,
+            sparse_model=sparse_model,
+            top_k_sparse=5,
+            top_k_dense=5,
+            collection=collection,
+        )
+
+    async def test_vector_store_and_index_are_reused(self):
+        index = self._get_index()
+        assert self._get_index() is index
+        assert self.session.get_database(SPARSE_MODEL, 5, 5) is index.vector_store
+        assert self.session.is_database_init()
+
+        other_embedding = self._get_index(embedding=MockEmbedding(embed_dim=8))
+        assert other_embedding is not index
+        assert other_embedding.vector_store is index.vector_store
+
+        # one sparse model for documents, queries and all collections
+        self._get_index(collection="other")
+        assert self.loader.loads == 1
+
+    async def test_other_sparse_model_rebuilds_the_store(self):
+        index = self._get_index()
+        rebuilt = self._get_index(sparse_model="prithivida/Splade_PP_en_v1")
+        assert rebuilt.vector_store is not index.vector_store
+        assert self.loader.loads == 2
+
+    async def test_recreated_collection_is_invalidated(self):
+        index = self._get_index(collection="other")
+        assert not self.session.is_database_init("other")
+
+        self.session.invalidate("other")
+        assert self._get_index(collection="other") is not index
+        assert self._get_index() is self._get_index()
+
+        index = self._get_index()
+        # the in memory async client has its own collections
+        aclient = self.session.get_qdrant_client()
+        await aclient.create_collection(
+            COLLECTION,
+            vectors_config=models.VectorParams(size=8, distance=models.Distance.COSINE),
+        )
+        await self.session.delete_collection()
+        assert not await aclient.collection_exists(COLLECTION)
+        assert self._get_index() is not index
+        # the sparse model survives the invalidation
+        assert self.loader.loads == 1
+
+    async def test_benchmark_per_request_construction(self):
+        """
+        Construction cost per request and memory held by 20 concurrent requests,
+        before: a new hybrid store and index for every request, after: the cached ones.
+        """
+        requests = 20
+
+        def uncached_index() -> VectorStoreIndex:
+            vector_store = QdrantVectorStore(
+                COLLECTION,
+                client=self.session._client,
+                aclient=self.session._aclient,
+                enable_hybrid=True,
+                fastembed_sparse_model=SPARSE_MODEL,
+                batch_size=20,
+                use_async=True,
+            )
+            return VectorStoreIndex.from_vector_store(  # type: ignore
+                vector_store=vector_store, embed_model=self.embedding, use_async=True
+            )
+
+        results: dict[str, tuple[float, float, int]] = {}
+        for name, build in [("before", uncached_index), ("after", self._get_index)]:
+            self.session.invalidate()
+            loads = self.loader.loads
+            start = time.perf_counter()
+            for _ in range(requests):
+                build()
+            seconds = (time.perf_counter() - start) / requests
+            loads = self.loader.loads - loads
+
+            self.session.invalidate()
+            self.session._sparse_encoders.clear()
+            tracemalloc.start()
+            in_flight = [build() for _ in range(requests)]
+            held, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del in_flight
+            results[name] = (seconds, held / 1024 / 1024, loads)
+
+        for name, (seconds, mib, loads) in results.items():
+            logger.info(
+                f"{name}: {seconds * 1000:.2f} ms per request, "
+                f"{mib:.1f} MiB held by {requests} requests, {loads} sparse model loads"
+            )
+        assert results["before"][2] == 2 * requests
+        assert results["after"][2] == 1
+        assert results["after"][0] < results["before"][0]
+        assert results["after"][1] < results["before"][1]
@@ -1 +1,3 @@
-
+set -e 
+pytest tests/vector_store_cache_tests.py
+pytest tests/async_client_tests.py
@@ -0,0 +1,2 @@
+set -e 
+pytest tests/llm_cache_db_test.py
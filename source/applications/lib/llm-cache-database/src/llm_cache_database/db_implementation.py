@@ -0,0 +1,86 @@
+import logging
+from datetime import timedelta
+
+from core.result import Result
+from domain.llm.interface import LLMResponseCacheStore
+from opentelemetry import trace
+from tortoise import timezone
+
+from llm_cache_database.model import LLMResponseCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresLLMResponseCache(LLMResponseCacheStore):
+    """
+    LLM response cache store shared by all services using the same database.
+    Expired entries are ignored on read and removed by purge_expired.
+    """
+
+    def __init__(self) -> None:
+        self.tracer = trace.get_tracer("PostgresLLMResponseCache")
+
+    async def get(self, key: str) -> Result[str | None]:
+        with self.tracer.start_as_current_span("llm-cache-get"):
+            try:
+                entry = await LLMResponseCacheEntry.filter(key=key).first()
+                if entry is None:
+                    return Result.Ok(None)
+                if entry.expires_at is not None and entry.expires_at <= timezone.now():
+                    await entry.delete()
+                    return Result.Ok(None)
+                return Result.Ok(entry.response)
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
+
+    async def set(
+        self, key: str, namespace: str, response: str, ttl_seconds: float | None
+    ) -> Result[None]:
+        with self.tracer.start_as_current_span("llm-cache-set"):
+            try:
+                expires_at = (
+                    timezone.now() + timedelta(seconds=ttl_seconds)
+                    if ttl_seconds is not None
+                    else None
+                )
+                # upsert, concurrent writers of the same request must not fail on the unique key
+                await LLMResponseCacheEntry.bulk_create(
+                    [
+                        LLMResponseCacheEntry(
+                            key=key,
+                            namespace=namespace,
+                            response=response,
+                            expires_at=expires_at,
+                        )
+                    ],
+                    on_conflict=["key"],
+                    update_fields=["namespace", "response", "expires_at", "updated_at"],
+                )
+                return Result.Ok()
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
+
+    async def clear(self, namespace: str | None = None) -> Result[None]:
+        with self.tracer.start_as_current_span("llm-cache-clear"):
+            try:
+                if namespace is None:
+                    await LLMResponseCacheEntry.all().delete()
+                else:
+                    await LLMResponseCacheEntry.filter(namespace=namespace).delete()
+                return Result.Ok()
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
+
+    async def purge_expired(self) -> Result[int]:
+        with self.tracer.start_as_current_span("llm-cache-purge"):
+            try:
+                deleted = await LLMResponseCacheEntry.filter(
+                    expires_at__lte=timezone.now()
+                ).delete()
+                return Result.Ok(deleted)
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return Result.Err(e)
@@ -0,0 +1,9 @@
+from tortoise import fields
+from database.session import DatabaseBaseModel
+
+
+class LLMResponseCacheEntry(DatabaseBaseModel):
+    key = fields.CharField(max_length=64, unique=True)  # sha256 of the request
+    namespace = fields.CharField(max_length=128, db_index=True)
+    response = fields.TextField()
+    expires_at = fields.DatetimeField(null=True, db_index=True)
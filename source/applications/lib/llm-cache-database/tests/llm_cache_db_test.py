@@ -0,0 +1,76 @@
+import logging
+
+from core.logger import init_logging
+from core.singelton import SingletonMeta
+from database.session import DatabaseConfig, PostgresSession
+from domain_test.enviroment import test_containers
+from domain_test.llm.response_cache_test import TestLLMResponseCacheStore
+from testcontainers.postgres import PostgresContainer
+
+import llm_cache_database.model as llm_cache_models
+from llm_cache_database.db_implementation import PostgresLLMResponseCache
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+
+class TestPostgresLLMResponseCache(TestLLMResponseCacheStore):
+    """
+    Concrete runner: spins up Postgres and runs the generic llm response cache suite.
+    """
+
+    __test__ = True
+
+    session: PostgresSession
+    container: PostgresContainer
+    cfg: DatabaseConfig
+
+    # ----------------------------- lifecycle ----------------------------- #
+    def setup_method_sync(self, test_name: str):
+        self.container = PostgresContainer(
+            image=test_containers.POSTGRES_VERSION,
+            username="test",
+            password="test",
+            dbname="test_db",
+        )
+        self.container.start()
+
+        self.cfg = DatabaseConfig(
+            host=self.container.get_container_host_ip(),
+            port=str(self.container.get_exposed_port(self.container.port)),
+            database_name="test_db",
+            username="test",
+            password="test",
+        )
+
+    async def setup_method_async(self, test_name: str):
+        # Ensure a clean session singleton between tests
+        PostgresSession._instances = {}  # type: ignore[attr-defined]
+
+        self.session = PostgresSession.create(  # type: ignore[assignment]
+            config=self.cfg,
+            models=[llm_cache_models],
+        )
+        await self.session.start()
+        await self.session.migrations()
+
+        # System under test
+        self.store = PostgresLLMResponseCache()
+
+    def teardown_method_sync(self, test_name: str):
+        try:
+            self.container.stop()
+        finally:
+            # Clear app-level singletons so the next test run is clean
+            SingletonMeta.clear_all()
+
+    async def teardown_method_async(self, test_name: str):
+        await self.session.shutdown()
+
+    async def test_purge_expired(self):
+        assert (await self.store.set("old", "qa", "1", 0)).is_ok()
+        assert (await self.store.set("new", "qa", "2", None)).is_ok()
+        assert isinstance(self.store, PostgresLLMResponseCache)
+        result = await self.store.purge_expired()
+        assert result.get_ok() == 1
+        assert (await self.store.get("new")).get_ok() == "2"
@@ -5,11 +5,13 @@ import asyncio
 import logging
 from typing import Any, AsyncGenerator, Callable, Iterable, Type, TypeVar
 
+from domain.llm.caller import current_llm_caller
 from domain.llm.model import TextChatMessage
 from opentelemetry import trace
 from pydantic import BaseModel
 
 from core.result import Result
+from core.retry import RetryConfig, RetryDecision, RetryPolicy
 from domain.llm.interface import AsyncLLM, T
 from openai import (
     AsyncOpenAI,
@@ -19,6 +21,10 @@ from openai import (
 )
 from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 
+from openai_client.governor import LLMGovernor, LLMGovernorConfig
+from openai_client.response_cache import LLMResponseCache, request_key
+from openai_client.token_budget import TokenBudgetFitter
+
 logger = logging.getLogger(__name__)
 
 R = TypeVar("R")
@@ -38,10 +44,17 @@ class ConfigOpenAI(BaseModel):
     temperature: float = 0.7
     timeout: float = 60.0
     context_cutoff: int = 128_000
+    # chat, chat_structured_output and stream_chat drop the oldest turns to fit context_cutoff,
+    # off by default so conversations are sent as the caller built them
+    fit_chat_to_context: bool = False
     tokinzer_model: str = "cl100k_base"
     base_url: str | None = None  # for self-hosted / Azure endpoints
     retries: int = 3  # attempts = initial try + (retries-1) retries
+    # no retry is started after this many seconds, None waits for all attempts
+    max_retry_seconds: float | None = 300
     does_support_structured_output: bool = True
+    # shared by all users of the client instance
+    governor: LLMGovernorConfig = LLMGovernorConfig()
 
 
 # ---------------------------------------------------------------------------
@@ -61,19 +74,34 @@ class OpenAIAsyncLLM(AsyncLLM):
       **JSON mode** or **tool-calling strict mode** (see *mode* arg).
     """
 
-    def __init__(self, config: ConfigOpenAI):
+    def __init__(
+        self, config: ConfigOpenAI, response_cache: LLMResponseCache | None = None
+    ):
         # Normalise retries value (at least 1 attempt).
         config.retries = max(config.retries, 1)
         self.config = config
 
         # Lazily-initialized OpenAI client (keeps httpx Client under the hood).
+        # Retries are done by _chat_with_retries, so every attempt passes the governor.
         self.client = AsyncOpenAI(
             api_key=config.api_key,
             timeout=config.timeout,
             base_url=config.base_url,
+            max_retries=0,
+        )
+        self.governor = LLMGovernor(config.governor)
+        self._retry = RetryPolicy(
+            name="openai_chat",
+            config=RetryConfig(
+                attempts=config.retries, max_elapsed=config.max_retry_seconds
+            ),
+            classify=classify_openai_error,
         )
+        # opt-in, streams are never cached
+        self.response_cache = response_cache
         self.tracer = trace.get_tracer("OpenAIAsyncLLM")
         self._enc = tiktoken.get_encoding(self.config.tokinzer_model)
+        self._fitter = TokenBudgetFitter(self._enc)
 
     async def aclose(self) -> None:
         """
@@ -86,32 +114,33 @@ class OpenAIAsyncLLM(AsyncLLM):
             logger.debug("Ignoring error during OpenAIAsyncLLM.aclose()", exc_info=True)
 
     def _count_tokens_str(self, s: str) -> int:
-        return len(self._enc.encode(s))
+        return self._fitter.count(s)
 
     def _shrink_to_fit(self, text: str) -> tuple[str, int]:
-        original_tokens = self._count_tokens_str(text)
-        tokens_cut = 0
-
-        if original_tokens <= self.config.context_cutoff:
-            return text, 0
-
-        current_tokens = original_tokens
-        # 1) Drop oldest turns from 'rest' (i.e., from the beginning of 'rest')
-        while current_tokens > self.config.context_cutoff:
-            current_tokens = self._count_tokens_str(text)
-            ids = self._enc.encode(text)
-            keep = ids[-self.config.context_cutoff :]
-            text = self._enc.decode(keep)
-
-            tokens_cut = original_tokens - len(keep)
-            if tokens_cut > 0:
-                logger.warning(
-                    "[openai] text trimmed: cut %d tokens (from %d → %d).",
-                    tokens_cut,
-                    original_tokens,
-                    len(keep),
-                )
-        return text, tokens_cut
+        return self._fitter.shrink(text, self.config.context_cutoff)
+
+    def _fit_messages(
+        self, messages: list[ChatCompletionMessageParam]
+    ) -> Result[list[ChatCompletionMessageParam]]:
+        if not self.config.fit_chat_to_context:
+            return Result.Ok(messages)
+        result = self._fitter.fit_messages(messages, self.config.context_cutoff)
+        if result.is_error():
+            return result.propagate_exception()
+        return Result.Ok(result.get_ok()[0])
+
+    def _request_tokens(self, messages: Iterable[ChatCompletionMessageParam]) -> int:
+        """Expected usage of a request for the tokens-per-minute budget: prompt + max completion."""
+        prompt_tokens = 0
+        for m in messages:
+            content = m.get("content")
+            if isinstance(content, str):
+                prompt_tokens += self._count_tokens_str(content)
+            elif isinstance(content, list):
+                for part in content:
+                    if part.get("type") == "text":
+                        prompt_tokens += self._count_tokens_str(part["text"])  # type: ignore
+        return prompt_tokens + self.config.max_tokens
 
     # ------------------------------------------------------------------
     # Public helpers ----------------------------------------------------
@@ -208,84 +237,94 @@ class OpenAIAsyncLLM(AsyncLLM):
         llm_model: str | None = None,
         **create_kwargs: Any,
     ) -> Result[R]:
-        """Centralised retry loop with exponential back-off.
+        """Centralised retry loop, see :func:`classify_openai_error`.
 
         ``create_kwargs`` are forwarded verbatim to
         :py:meth:`openai.AsyncOpenAI.chat.completions.create` – this is how we
         pass *response_format*, *tools*, etc. from the public helpers above.
         """
-        backoff = 1.0
-        attempted = 0
-        last_err: Exception | Result[Any] | None = None
+        messages = list(messages)
+        requested_tokens = self._request_tokens(messages)
+        model_name = llm_model if llm_model else self.config.model
+
+        cache_key: str | None = None
+        namespace = current_llm_caller()
+        if self.response_cache and self.response_cache.is_cacheable(
+            self.config.temperature
+        ):
+            cache_key = request_key(
+                model=model_name,
+                messages=messages,
+                response_schema=response_format.model_json_schema()
+                if response_format
+                else None,
+                sampling={
+                    "temperature": self.config.temperature,
+                    "max_tokens": self.config.max_tokens,
+                    **create_kwargs,
+                },
+            )
+            cached = await self.response_cache.lookup(namespace, cache_key)
+            if cached is not None:
+                try:
+                    return Result.Ok(
+                        parser(ChatCompletion.model_validate_json(cached))
+                    )
+                except Exception as e:
+                    logger.warning(f"cached llm response unusable, requesting: {e}")
+                    self.response_cache.invalidate_hit()
 
-        while attempted < self.config.retries:
-            attempted += 1
+        async def attempt() -> Result[R]:
             try:
                 with self.tracer.start_as_current_span("openai-chat"):
-                    if response_format:
-                        response = await self.client.chat.completions.parse(
-                            model=llm_model if llm_model else self.config.model,
-                            messages=list(messages),  # convert iterable once per retry
-                            max_tokens=self.config.max_tokens,
-                            temperature=self.config.temperature,
-                            response_format=response_format,
-                            **create_kwargs,
-                        )
-
-                    else:
-                        response = await self.client.chat.completions.create(  # type: ignore
-                            model=llm_model if llm_model else self.config.model,
-                            messages=list(messages),  # convert iterable once per retry
-                            max_tokens=self.config.max_tokens,
-                            temperature=self.config.temperature,
-                            **create_kwargs,
-                        )
+                    async with self.governor.slot(requested_tokens) as lease:
+                        if response_format:
+                            response = await self.client.chat.completions.parse(
+                                model=model_name,
+                                messages=messages,
+                                max_tokens=self.config.max_tokens,
+                                temperature=self.config.temperature,
+                                response_format=response_format,
+                                **create_kwargs,
+                            )
+
+                        else:
+                            response = await self.client.chat.completions.create(  # type: ignore
+                                model=model_name,
+                                messages=messages,
+                                max_tokens=self.config.max_tokens,
+                                temperature=self.config.temperature,
+                                **create_kwargs,
+                            )
+                        if response.usage is not None:
+                            lease.settle(response.usage.total_tokens)
 
                     parsed = parser(response)  # type: ignore
                     if parsed is None or (
                         isinstance(parsed, str) and not parsed.strip()
                     ):
                         raise ValueError("Empty response from LLM")
+                    if self.response_cache and cache_key:
+                        await self.response_cache.store(
+                            namespace, cache_key, response.model_dump_json()
+                        )
                     return Result.Ok(parsed)
-
-            # ------------------------------------------------------------
-            # Error handling & retry policy ------------------------------
-            # ------------------------------------------------------------
-            except (RateLimitError, APIError) as exc:
-                # *Recoverable* errors → back-off & retry.
-                logger.warning(
-                    "[openai] recoverable error on attempt %d/%d: %s",
-                    attempted,
-                    self.config.retries,
-                    exc,
-                )
-                last_err = exc
-            except BadRequestError as exc:
-                # 4xx schema/param errors – do *not* retry.
+            except RateLimitError as exc:
+                # the governor pauses all callers, the retry waits for its slot there
+                self.governor.report_rate_limited(_retry_after(exc))
                 return Result.Err(exc)
-            except Exception as exc:  # catch network hiccups etc.
-                logger.warning(
-                    "[openai] transport error on attempt %d/%d: %s",
-                    attempted,
-                    self.config.retries,
-                    exc,
-                )
-                last_err = exc
-
-            if attempted < self.config.retries:
-                await asyncio.sleep(backoff)
-                backoff *= 2  # exponential back-off
-
-        # Exhausted all retries → bubble last error out via Result.Err.
-        return Result.Err(last_err or RuntimeError("Unknown OpenAI error"))
+
+        return await self._retry.run(attempt)
 
     async def chat(
         self, chat: list["TextChatMessage"], llm_model: str | None = None
     ) -> Result[str]:
         """Multi-turn chat → raw text."""
-        messages = _to_openai_messages(chat)
+        fitted = self._fit_messages(_to_openai_messages(chat))
+        if fitted.is_error():
+            return fitted.propagate_exception()
         return await self._chat_with_retries(
-            messages,
+            fitted.get_ok(),
             parser=lambda r: r.choices[0].message.content or "",
             llm_model=llm_model,
         )
@@ -297,7 +336,10 @@ class OpenAIAsyncLLM(AsyncLLM):
         llm_model: str | None = None,
     ) -> Result[T]:
         """Multi-turn chat → validated pydantic model."""
-        messages = _to_openai_messages(chat)
+        fitted = self._fit_messages(_to_openai_messages(chat))
+        if fitted.is_error():
+            return fitted.propagate_exception()
+        messages = fitted.get_ok()
         response_format: Type[T] | None = None
         if self.config.does_support_structured_output:
             response_format = model
@@ -318,7 +360,7 @@ class OpenAIAsyncLLM(AsyncLLM):
     async def batch_chat(
         self, batch_chat: list[list[TextChatMessage]], llm_model: str | None = None
     ) -> Result[list[dict[str, Any]]]:
-        """Run multiple chats concurrently, return list of {'response': str}."""
+        """Run multiple chats concurrently (bounded by the governor), return list of {'response': str}."""
 
         async def _single(seq: list["TextChatMessage"]) -> Result[dict[str, Any]]:
             res = await self.chat(
@@ -344,11 +386,27 @@ class OpenAIAsyncLLM(AsyncLLM):
         - If the stream fails *before* any bytes are emitted, we back off and retry.
         - If it fails *after* emitting something, we stop and propagate the error
           (restarting would duplicate partial output).
-        """
 
-        messages: list[ChatCompletionMessageParam] = _to_openai_messages(chat)
+        The governor slot is held while the model generates, not until the consumer
+        read the stream, the chunks are buffered in between.
+        """
 
-        async def _generator() -> AsyncGenerator[str, None]:
+        fitted = self._fit_messages(_to_openai_messages(chat))
+        if fitted.is_error():
+            return fitted.propagate_exception()
+        messages: list[ChatCompletionMessageParam] = fitted.get_ok()
+        requested_tokens = self._request_tokens(messages)
+        # the generator runs in the consumer's context, keep the caller of stream_chat
+        caller = current_llm_caller()
+
+        # chunks of the response, then None at the end or the exception that ended it
+        chunks: asyncio.Queue[str | BaseException | None] = asyncio.Queue()
+
+        async def _receive() -> None:
+            """
+            Reads the response into chunks while holding the governor slot.
+            The slot is released once the model finished, however slowly the stream is consumed.
+            """
             backoff = 1.0
             attempted = 0
             emitted_any = False
@@ -357,24 +415,26 @@ class OpenAIAsyncLLM(AsyncLLM):
                 attempted += 1
                 stream = None
                 try:
-                    with self.tracer.start_as_current_span("openai-chat-stream"):
-                        stream = await self.client.chat.completions.create(
-                            model=llm_model if llm_model else self.config.model,
-                            messages=messages,
-                            temperature=self.config.temperature,
-                            max_tokens=self.config.max_tokens,
-                            stream=True,
-                        )
-
-                    async for chunk in stream:
-                        # Each chunk is a ChatCompletionChunk; collect deltas.
-                        for choice in chunk.choices:
-                            delta = getattr(choice, "delta", None)
-                            if delta and getattr(delta, "content", None):
-                                emitted_any = True
-                                yield delta.content
+                    async with self.governor.slot(requested_tokens, caller=caller):
+                        with self.tracer.start_as_current_span("openai-chat-stream"):
+                            stream = await self.client.chat.completions.create(
+                                model=llm_model if llm_model else self.config.model,
+                                messages=messages,
+                                temperature=self.config.temperature,
+                                max_tokens=self.config.max_tokens,
+                                stream=True,
+                            )
+
+                        async for chunk in stream:
+                            # Each chunk is a ChatCompletionChunk; collect deltas.
+                            for choice in chunk.choices:
+                                delta = getattr(choice, "delta", None)
+                                if delta and getattr(delta, "content", None):
+                                    emitted_any = True
+                                    chunks.put_nowait(delta.content)
 
                     # Completed normally
+                    chunks.put_nowait(None)
                     return
 
                 except (RateLimitError, APIError) as exc:
@@ -384,9 +444,12 @@ class OpenAIAsyncLLM(AsyncLLM):
                         self.config.retries,
                         exc,
                     )
+                    if isinstance(exc, RateLimitError):
+                        self.governor.report_rate_limited(_retry_after(exc))
                     if emitted_any or attempted >= self.config.retries:
                         # Don't retry mid-stream; surface the error
-                        raise
+                        chunks.put_nowait(exc)
+                        return
                     await asyncio.sleep(backoff)
                     backoff *= 2
                     continue
@@ -399,7 +462,8 @@ class OpenAIAsyncLLM(AsyncLLM):
                         exc,
                     )
                     if emitted_any or attempted >= self.config.retries:
-                        raise
+                        chunks.put_nowait(exc)
+                        return
                     await asyncio.sleep(backoff)
                     backoff *= 2
                     continue
@@ -412,6 +476,20 @@ class OpenAIAsyncLLM(AsyncLLM):
                     except Exception:
                         pass
 
+        async def _generator() -> AsyncGenerator[str, None]:
+            receiver = asyncio.create_task(_receive())
+            try:
+                while True:
+                    chunk = await chunks.get()
+                    if chunk is None:
+                        return
+                    if isinstance(chunk, BaseException):
+                        raise chunk
+                    yield chunk
+            finally:
+                # a closed or collected stream stops the request and frees its slot
+                receiver.cancel()
+
         try:
             gen = _generator()
             return Result.Ok(gen)
@@ -419,6 +497,28 @@ class OpenAIAsyncLLM(AsyncLLM):
             return Result.Err(exc)
 
 
+def classify_openai_error(error: Exception) -> RetryDecision:
+    """
+    4xx schema/param errors are not retried.
+    Rate limits are retried right away, the governor paces the next attempt.
+    Everything else (server errors, network hiccups) backs off.
+    """
+    if isinstance(error, BadRequestError):
+        return RetryDecision.STOP
+    if isinstance(error, RateLimitError):
+        return RetryDecision.IMMEDIATE
+    return RetryDecision.BACKOFF
+
+
+def _retry_after(exc: RateLimitError) -> float | None:
+    """Pause requested by the server, from the retry-after header (seconds)."""
+    try:
+        value = exc.response.headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (AttributeError, ValueError):
+        return None
+
+
 # Optional tiny helper to convert your domain messages to OpenAI params
 def _to_openai_messages(
     chat: list[TextChatMessage],
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from domain.llm.caller import current_llm_caller
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class LLMGovernorConfig(BaseModel):
+    max_concurrency: int = 16
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    # pause applied to all callers after a 429 without retry-after header
+    rate_limit_pause: float = 1.0
+
+
+class LLMGovernorStats(BaseModel):
+    in_flight: int
+    queue_depth: int
+    queue_depth_by_caller: dict[str, int]
+    granted: int
+    rate_limited: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.wait_seconds_total / self.granted if self.granted > 0 else 0.0
+
+
+class _TokenBucket:
+    """Continuously refilled budget, holds at most one minute worth of capacity."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self._rate = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def delay(self, amount: int, now: float) -> float:
+        self._refill(now)
+        # requests larger than the whole budget are let through on a full bucket
+        missing = min(float(amount), self.capacity) - self.level
+        return max(missing / self._rate, 0.0)
+
+    def take(self, amount: int) -> None:
+        self.level -= amount
+
+    def give_back(self, amount: int) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    def __init__(self, tokens: int, future: asyncio.Future[None]):
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class GovernorLease:
+    """Granted request slot, settle corrects the token reservation once the usage is known."""
+
+    def __init__(self, governor: LLMGovernor, tokens: int):
+        self._governor = governor
+        self.tokens = tokens
+
+    def settle(self, used_tokens: int) -> None:
+        if used_tokens < self.tokens:
+            self._governor._refund(self.tokens - used_tokens)
+        self.tokens = used_tokens
+
+
+class LLMGovernor:
+    """
+    Coordinates the requests of all users of one LLM client.
+
+    Enforces a maximum number of requests in flight plus requests-per-minute and tokens-per-minute budgets.
+    Waiting requests are queued per caller (see domain.llm.caller.llm_caller) and the callers are served
+    round robin, so a large batch of one component does not starve the others.
+    A reported rate limit pauses all callers instead of letting every request run into its own 429.
+    """
+
+    def __init__(self, config: LLMGovernorConfig | None = None):
+        self._config = config or LLMGovernorConfig()
+        self._requests = (
+            _TokenBucket(self._config.requests_per_minute)
+            if self._config.requests_per_minute
+            else None
+        )
+        self._tokens = (
+            _TokenBucket(self._config.tokens_per_minute)
+            if self._config.tokens_per_minute
+            else None
+        )
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+        self._granted = 0
+        self._rate_limited = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        meter = metrics.get_meter("llm_governor")
+        self._wait_histogram = meter.create_histogram(
+            name="llm.governor.wait",
+            unit="s",
+            description="Time LLM requests waited for a slot",
+        )
+        self._rate_limit_counter = meter.create_counter(
+            name="llm.governor.rate_limited",
+            unit="1",
+            description="Rate limit responses reported by the LLM endpoint",
+        )
+        meter.create_observable_gauge(
+            name="llm.governor.queue_depth",
+            callbacks=[self._observe_queue_depth],
+            unit="1",
+            description="LLM requests waiting for a slot",
+        )
+        meter.create_observable_gauge(
+            name="llm.governor.in_flight",
+            callbacks=[self._observe_in_flight],
+            unit="1",
+            description="LLM requests currently running",
+        )
+
+    # ---------- metrics ----------
+    def _observe_queue_depth(self, options: CallbackOptions) -> list[Observation]:
+        return [
+            Observation(len(queue), {"caller": caller})
+            for caller, queue in self._queues.items()
+        ]
+
+    def _observe_in_flight(self, options: CallbackOptions) -> list[Observation]:
+        return [Observation(self._in_flight)]
+
+    def stats(self) -> LLMGovernorStats:
+        by_caller = {caller: len(queue) for caller, queue in self._queues.items()}
+        return LLMGovernorStats(
+            in_flight=self._in_flight,
+            queue_depth=sum(by_caller.values()),
+            queue_depth_by_caller=by_caller,
+            granted=self._granted,
+            rate_limited=self._rate_limited,
+            wait_seconds_total=self._wait_total,
+            wait_seconds_max=self._wait_max,
+        )
+
+    # ---------- slots ----------
+    @asynccontextmanager
+    async def slot(
+        self, tokens: int = 0, caller: str | None = None
+    ) -> AsyncIterator[GovernorLease]:
+        """
+        Waits until the request may be sent and holds the slot for the duration of the block.
+        tokens is the expected usage of the request (prompt + completion),
+        caller defaults to the caller of the current context.
+        """
+        await self._acquire(caller or current_llm_caller(), tokens)
+        try:
+            yield GovernorLease(self, tokens)
+        finally:
+            self._release()
+
+    def report_rate_limited(self, retry_after: float | None = None) -> None:
+        pause = retry_after if retry_after is not None else self._config.rate_limit_pause
+        self._rate_limited += 1
+        self._rate_limit_counter.add(1)
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.warning(f"[openai] rate limited, pausing requests for {pause:.2f}s")
+
+    async def _acquire(self, caller: str, tokens: int) -> None:
+        waiter = _Waiter(tokens, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(caller, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # granted and cancelled at the same time
+                self._release()
+            else:
+                self._remove(caller, waiter)
+            raise
+
+    def _refund(self, tokens: int) -> None:
+        if self._tokens is not None:
+            self._tokens.give_back(tokens)
+            self._dispatch()
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _remove(self, caller: str, waiter: _Waiter) -> None:
+        queue = self._queues.get(caller)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[caller]
+        self._dispatch()
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self) -> None:
+        """Grants slots round robin over the callers while concurrency and budgets allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queues and self._in_flight < self._config.max_concurrency:
+            now = time.monotonic()
+            if now < self._paused_until:
+                self._schedule(self._paused_until - now)
+                return
+            caller, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            if waiter.future.done():
+                self._drop_head(caller, queue)
+                continue
+            delay = max(
+                self._requests.delay(1, now) if self._requests else 0.0,
+                self._tokens.delay(waiter.tokens, now) if self._tokens else 0.0,
+            )
+            if delay > 0:
+                self._schedule(delay)
+                return
+            if self._requests:
+                self._requests.take(1)
+            if self._tokens:
+                self._tokens.take(waiter.tokens)
+            self._drop_head(caller, queue)
+            self._in_flight += 1
+            self._granted += 1
+            waited = now - waiter.enqueued_at
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._wait_histogram.record(waited, {"caller": caller})
+            waiter.future.set_result(None)
+
+    def _drop_head(self, caller: str, queue: deque[_Waiter]) -> None:
+        queue.popleft()
+        if queue:
+            # next turn goes to the next caller
+            self._queues.move_to_end(caller)
+        else:
+            del self._queues[caller]
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from core.result import Result
+from domain.llm.interface import LLMResponseCacheStore
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCacheConfig(BaseModel):
+    default_ttl_seconds: float | None = 7 * 24 * 3600
+    # ttl per namespace (the llm caller, e.g. "grading"), None never expires
+    namespace_ttl_seconds: dict[str, float | None] = {}
+    # only requests at temperature 0 are cached
+    only_deterministic: bool = True
+
+
+class LLMResponseCacheStats(BaseModel):
+    hits: int
+    misses: int
+    stored: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    @property
+    def calls_saved(self) -> int:
+        return self.hits
+
+
+def request_key(
+    model: str,
+    messages: list[Any],
+    response_schema: dict[str, Any] | None,
+    sampling: dict[str, Any],
+) -> str:
+    """Hash over everything that determines the response of a chat completion request."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "response_schema": response_schema,
+            "sampling": sampling,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InMemoryLLMResponseCache(LLMResponseCacheStore):
+    """LRU cache store bounded by the number of entries, lives as long as the process."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self._max_entries = max_entries
+        # key -> (namespace, response, expires_at)
+        self._entries: OrderedDict[str, tuple[str, str, float | None]] = OrderedDict()
+
+    async def get(self, key: str) -> Result[str | None]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return Result.Ok(None)
+        _, response, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            return Result.Ok(None)
+        self._entries.move_to_end(key)
+        return Result.Ok(response)
+
+    async def set(
+        self, key: str, namespace: str, response: str, ttl_seconds: float | None
+    ) -> Result[None]:
+        expires_at = time.time() + ttl_seconds if ttl_seconds is not None else None
+        self._entries[key] = (namespace, response, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return Result.Ok()
+
+    async def clear(self, namespace: str | None = None) -> Result[None]:
+        if namespace is None:
+            self._entries.clear()
+        else:
+            for key in [k for k, v in self._entries.items() if v[0] == namespace]:
+                del self._entries[key]
+        return Result.Ok()
+
+
+class SqliteLLMResponseCache(LLMResponseCacheStore):
+    """
+    On disk cache store, survives restarts and can be shared between runs on one machine.
+    sqlite is blocking, the queries run in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, "
+                "response TEXT NOT NULL, expires_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS llm_response_cache_namespace "
+                "ON llm_response_cache (namespace)"
+            )
+            self._conn.commit()
+
+    def _get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM llm_response_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            response, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute(
+                    "DELETE FROM llm_response_cache WHERE key = ?", (key,)
+                )
+                self._conn.commit()
+                return None
+            return response
+
+    def _set(
+        self, key: str, namespace: str, response: str, ttl_seconds: float | None
+    ) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache "
+                "(key, namespace, response, expires_at) VALUES (?, ?, ?, ?)",
+                (key, namespace, response, expires_at),
+            )
+            self._conn.commit()
+
+    def _clear(self, namespace: str | None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM llm_response_cache")
+            else:
+                self._conn.execute(
+                    "DELETE FROM llm_response_cache WHERE namespace = ?", (namespace,)
+                )
+            self._conn.commit()
+
+    async def get(self, key: str) -> Result[str | None]:
+        try:
+            return Result.Ok(await asyncio.to_thread(self._get, key))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return Result.Err(e)
+
+    async def set(
+        self, key: str, namespace: str, response: str, ttl_seconds: float | None
+    ) -> Result[None]:
+        try:
+            await asyncio.to_thread(self._set, key, namespace, response, ttl_seconds)
+            return Result.Ok()
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return Result.Err(e)
+
+    async def clear(self, namespace: str | None = None) -> Result[None]:
+        try:
+            await asyncio.to_thread(self._clear, namespace)
+            return Result.Ok()
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return Result.Err(e)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """
+    Opt-in response cache for OpenAIAsyncLLM.
+
+    Responses are stored per namespace (the llm caller, see domain.llm.caller) with the ttl of the namespace.
+    A failing store never fails a request, the request is sent to the LLM instead.
+    """
+
+    def __init__(
+        self,
+        store: LLMResponseCacheStore,
+        config: LLMResponseCacheConfig | None = None,
+    ):
+        self._store = store
+        self._config = config or LLMResponseCacheConfig()
+        self._hits = 0
+        self._misses = 0
+        self._stored = 0
+
+        meter = metrics.get_meter("llm_response_cache")
+        self._hit_counter = meter.create_counter(
+            name="llm.response_cache.hits",
+            unit="1",
+            description="LLM responses served from the cache",
+        )
+        self._miss_counter = meter.create_counter(
+            name="llm.response_cache.misses",
+            unit="1",
+            description="Cacheable LLM requests that had to be sent",
+        )
+        meter.create_observable_gauge(
+            name="llm.response_cache.hit_ratio",
+            callbacks=[self._observe_hit_ratio],
+            unit="1",
+            description="Share of cacheable LLM requests served from the cache",
+        )
+
+    def _observe_hit_ratio(self, options: CallbackOptions) -> list[Observation]:
+        return [Observation(self.stats().hit_ratio)]
+
+    def stats(self) -> LLMResponseCacheStats:
+        return LLMResponseCacheStats(
+            hits=self._hits, misses=self._misses, stored=self._stored
+        )
+
+    def is_cacheable(self, temperature: float) -> bool:
+        return not self._config.only_deterministic or temperature == 0
+
+    def ttl(self, namespace: str) -> float | None:
+        if namespace in self._config.namespace_ttl_seconds:
+            return self._config.namespace_ttl_seconds[namespace]
+        return self._config.default_ttl_seconds
+
+    async def lookup(self, namespace: str, key: str) -> str | None:
+        result = await self._store.get(key)
+        if result.is_error():
+            logger.warning(f"llm response cache lookup failed: {result.get_error()}")
+            cached = None
+        else:
+            cached = result.get_ok()
+        if cached is None:
+            self._misses += 1
+            self._miss_counter.add(1, {"namespace": namespace})
+        else:
+            self._hits += 1
+            self._hit_counter.add(1, {"namespace": namespace})
+        return cached
+
+    def invalidate_hit(self) -> None:
+        """A cached response could not be used (e.g. the schema changed), count it as miss."""
+        self._hits -= 1
+        self._misses += 1
+
+    async def store(self, namespace: str, key: str, response: str) -> None:
+        result = await self._store.set(key, namespace, response, self.ttl(namespace))
+        if result.is_error():
+            logger.warning(f"llm response cache store failed: {result.get_error()}")
+            return
+        self._stored += 1
+
+    async def clear(self, namespace: str | None = None) -> Result[None]:
+        return await self._store.clear(namespace)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+
+import tiktoken
+from core.result import Result
+from openai.types.chat import ChatCompletionMessageParam
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBudgetFitter:
+    """
+    Fits prompts and chat messages into a token budget.
+
+    Every message content is encoded once, the encodings are kept in a LRU cache keyed by content
+    (bounded by the number of cached tokens), so system prompts, retries and repeated contexts are not re-encoded.
+    Text is trimmed from the front (the end of a prompt carries the question),
+    chat messages are dropped oldest first while system messages are always kept.
+    """
+
+    def __init__(self, encoding: tiktoken.Encoding, max_cached_tokens: int = 1_000_000):
+        self._enc = encoding
+        self._max_cached_tokens = max_cached_tokens
+        self._cache: OrderedDict[str, list[int]] = OrderedDict()
+        self._cached_tokens = 0
+        self._lock = threading.Lock()
+
+    def encode(self, text: str) -> list[int]:
+        with self._lock:
+            ids = self._cache.get(text)
+            if ids is not None:
+                self._cache.move_to_end(text)
+                return ids
+        ids = self._enc.encode(text)
+        if len(ids) > self._max_cached_tokens:
+            return ids
+        with self._lock:
+            if text not in self._cache:
+                self._cache[text] = ids
+                self._cached_tokens += len(ids)
+            while self._cached_tokens > self._max_cached_tokens:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_tokens -= len(evicted)
+        return ids
+
+    def count(self, text: str) -> int:
+        return len(self.encode(text))
+
+    def shrink(self, text: str, budget: int) -> tuple[str, int]:
+        """
+        Keeps the last `budget` tokens of text and returns the text and the number of tokens cut.
+        Decoding can merge tokens at the cut, so the decoded text can take more tokens than were kept.
+        Then the longest suffix that fits is found by a binary search over the number of kept tokens.
+        """
+        original_tokens = self.count(text)
+        if original_tokens <= budget:
+            return text, 0
+
+        ids = self.encode(text)
+
+        def cut(keep: int) -> tuple[str, int]:
+            # bytes of a character split by the cut are dropped
+            kept = ids[-keep:] if keep > 0 else []
+            fitted = self._enc.decode_bytes(kept).decode("utf-8", errors="ignore")
+            return fitted, len(self._enc.encode(fitted))
+
+        text, tokens = cut(budget)
+        if tokens > budget:
+            # cut(low) fits, cut(high) does not
+            low, high = 0, budget
+            text, tokens = "", 0
+            while high - low > 1:
+                middle = (low + high) // 2
+                candidate, candidate_tokens = cut(middle)
+                if candidate_tokens <= budget:
+                    low, text, tokens = middle, candidate, candidate_tokens
+                else:
+                    high = middle
+        tokens_cut = original_tokens - tokens
+        logger.warning(
+            "[openai] text trimmed: cut %d tokens (from %d → %d).",
+            tokens_cut,
+            original_tokens,
+            tokens,
+        )
+        return text, tokens_cut
+
+    def fit_messages(
+        self, messages: list[ChatCompletionMessageParam], budget: int
+    ) -> Result[tuple[list[ChatCompletionMessageParam], int]]:
+        """
+        Drops the oldest non system messages until the conversation fits the budget,
+        the oldest kept message is trimmed to the remaining tokens.
+        Returns the fitted messages and the number of tokens cut, or an error
+        if the system messages leave no room for the newest message.
+        """
+        counts = [self._count_message(m) for m in messages]
+        total = sum(counts)
+        if total <= budget:
+            return Result.Ok((messages, 0))
+
+        system_tokens = sum(
+            c for m, c in zip(messages, counts) if m.get("role") == "system"
+        )
+        remaining = budget - system_tokens
+        others = [i for i, m in enumerate(messages) if m.get("role") != "system"]
+        if remaining <= 0:
+            return Result.Err(
+                ValueError(
+                    f"the system messages take {system_tokens} tokens "
+                    f"of the budget of {budget}, no room is left for the conversation"
+                )
+            )
+
+        # suffix_tokens[k] = tokens of others[k:], decreasing in k
+        suffix_tokens = [0] * (len(others) + 1)
+        for k in range(len(others) - 1, -1, -1):
+            suffix_tokens[k] = suffix_tokens[k + 1] + counts[others[k]]
+        # first k whose suffix fits, found by binary search over the token offsets
+        first_kept = bisect.bisect_left([-t for t in suffix_tokens], -remaining)
+
+        fitted: dict[int, ChatCompletionMessageParam] = {
+            i: messages[i] for i in others[first_kept:]
+        }
+        left_over = remaining - suffix_tokens[first_kept]
+        if first_kept > 0 and left_over > 0:
+            # trim the newest dropped message into the remaining budget
+            partial = others[first_kept - 1]
+            fitted[partial] = self._shrink_message(messages[partial], left_over)
+        elif first_kept == len(others):
+            # not even the newest message fits on its own
+            last = others[-1]
+            fitted[last] = self._shrink_message(messages[last], remaining)
+
+        result = [
+            m if m.get("role") == "system" else fitted[i]
+            for i, m in enumerate(messages)
+            if m.get("role") == "system" or i in fitted
+        ]
+        tokens_cut = total - sum(self._count_message(m) for m in result)
+        logger.warning(
+            "[openai] chat trimmed: dropped %d messages, cut %d tokens (budget %d).",
+            len(messages) - len(result),
+            tokens_cut,
+            budget,
+        )
+        return Result.Ok((result, tokens_cut))
+
+    def _count_message(self, message: ChatCompletionMessageParam) -> int:
+        content = message.get("content")
+        return self.count(content) if isinstance(content, str) else 0
+
+    def _shrink_message(
+        self, message: ChatCompletionMessageParam, budget: int
+    ) -> ChatCompletionMessageParam:
+        content = message.get("content")
+        if not isinstance(content, str):
+            return message
+        text, _ = self.shrink(content, budget)
+        return {**message, "content": text}  # type: ignore
@@ -0,0 +1,23 @@
+import string
+
+import tiktoken
+
+_PAT = r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]++[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+"""
+
+
+def _encoding() -> tiktoken.Encoding:
+    """
+    Small byte level BPE so the tests run without downloading the cl100k ranks.
+    Letter pairs are merged, multi byte characters stay split into single bytes.
+    """
+    ranks: dict[bytes, int] = {bytes([b]): b for b in range(256)}
+    alphabet = string.ascii_lowercase + " "
+    for a in alphabet:
+        for b in alphabet:
+            ranks.setdefault((a + b).encode(), len(ranks))
+    return tiktoken.Encoding(
+        name="test_bpe", pat_str=_PAT, mergeable_ranks=ranks, special_tokens={}
+    )
+
+
+ENC = _encoding()
@@ -0,0 +1,116 @@
+import asyncio
+import json
+from typing import Any, Callable
+
+import httpx
+from openai import AsyncOpenAI
+
+from openai_client.async_openai import ConfigOpenAI, OpenAIAsyncLLM
+from openai_client.response_cache import LLMResponseCache
+
+
+class FakeOpenAIServer:
+    """
+    OpenAI compatible chat completion endpoint,
+    answers 429 as soon as more than max_parallel requests are in flight.
+    respond builds the answer content from the request body.
+    """
+
+    def __init__(
+        self,
+        max_parallel: int,
+        latency: float = 0.05,
+        respond: Callable[[dict[str, Any]], str] | None = None,
+        chunk_delay: float = 0.0,
+    ):
+        self.max_parallel = max_parallel
+        self.latency = latency
+        # streams send one word per chunk with this delay in between
+        self.chunk_delay = chunk_delay
+        self.respond = respond or (lambda body: "answer")
+        self.in_flight = 0
+        self.ok = 0
+        self.rate_limited = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.in_flight >= self.max_parallel:
+            self.rate_limited += 1
+            return httpx.Response(
+                429, json={"error": {"message": "rate limited", "type": "rate_limit"}}
+            )
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        self.ok += 1
+        body = json.loads(request.content)
+        if body.get("stream"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                stream=_EventStream(body, self.respond(body), self.chunk_delay),
+            )
+        return httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": self.respond(body),
+                        },
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 10,
+                    "completion_tokens": 5,
+                    "total_tokens": 15,
+                },
+            },
+        )
+
+
+class _EventStream(httpx.AsyncByteStream):
+    def __init__(self, body: dict[str, Any], content: str, delay: float):
+        self._body = body
+        self._words = [f"{word} " for word in content.split(" ")]
+        self._delay = delay
+
+    async def __aiter__(self):
+        for word in self._words:
+            if self._delay > 0:
+                await asyncio.sleep(self._delay)
+            chunk = {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": self._body["model"],
+                "choices": [
+                    {"index": 0, "delta": {"content": word}, "finish_reason": None}
+                ],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+
+def fake_llm(
+    server: FakeOpenAIServer,
+    config: ConfigOpenAI,
+    response_cache: LLMResponseCache | None = None,
+) -> OpenAIAsyncLLM:
+    """OpenAIAsyncLLM that sends its requests to the fake server, tiktoken has to be patched."""
+    llm = OpenAIAsyncLLM(config, response_cache=response_cache)
+    llm.client = AsyncOpenAI(
+        api_key="test",
+        base_url="http://fake-llm/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(server.handle)),
+    )
+    return llm
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import time
+
+import pytest
+import tiktoken
+from core.logger import init_logging
+from domain.llm.caller import llm_caller
+from domain.llm.model import TextChatMessage
+from domain_test import AsyncTestBase
+
+from openai_client.async_openai import ConfigOpenAI, OpenAIAsyncLLM
+from openai_client.governor import LLMGovernor, LLMGovernorConfig
+from tests.fake_encoding import ENC
+from tests.fake_openai_server import FakeOpenAIServer, fake_llm
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+
+class TestLLMGovernor(AsyncTestBase):
+    __test__ = True
+
+    async def test_max_concurrency(self):
+        governor = LLMGovernor(LLMGovernorConfig(max_concurrency=3))
+        running = 0
+        peak = 0
+
+        async def request():
+            nonlocal running, peak
+            async with governor.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*[request() for _ in range(20)])
+        assert peak == 3
+        stats = governor.stats()
+        assert stats.granted == 20
+        assert stats.in_flight == 0
+        assert stats.queue_depth == 0
+
+    async def test_callers_are_served_in_turn(self):
+        governor = LLMGovernor(LLMGovernorConfig(max_concurrency=1))
+        order: list[str] = []
+
+        async def request(caller: str):
+            with llm_caller(caller):
+                async with governor.slot():
+                    order.append(caller)
+                    await asyncio.sleep(0.001)
+
+        tasks = [asyncio.create_task(request("openie")) for _ in range(20)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(request("qa")) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert governor.stats().queue_depth_by_caller == {"openie": 19, "qa": 2}
+
+        await asyncio.gather(*tasks)
+        # qa does not wait behind the whole openie batch
+        assert [i for i, c in enumerate(order) if c == "qa"] == [2, 4]
+        assert governor.stats().wait_seconds_max > 0
+
+    async def test_requests_per_minute(self):
+        # 600 rpm = one request every 100ms once the burst budget is used
+        governor = LLMGovernor(LLMGovernorConfig(requests_per_minute=600))
+        assert governor._requests is not None
+        governor._requests.level = 2
+
+        start = time.perf_counter()
+        for _ in range(4):
+            async with governor.slot():
+                pass
+        elapsed = time.perf_counter() - start
+        assert 0.15 < elapsed < 0.5
+
+    async def test_tokens_per_minute_and_settle(self):
+        # 60k tpm = 1000 tokens per second
+        governor = LLMGovernor(LLMGovernorConfig(tokens_per_minute=60_000))
+        assert governor._tokens is not None
+        governor._tokens.level = 1_000
+
+        start = time.perf_counter()
+        async with governor.slot(1_000) as lease:
+            # only 100 of the reserved tokens were used
+            lease.settle(100)
+        async with governor.slot(900):
+            pass
+        assert time.perf_counter() - start < 0.1
+
+        async with governor.slot(200):
+            pass
+        assert time.perf_counter() - start > 0.15
+
+    async def test_rate_limit_pauses_all_callers(self):
+        governor = LLMGovernor()
+        governor.report_rate_limited(retry_after=0.2)
+        start = time.perf_counter()
+        async with governor.slot():
+            pass
+        assert time.perf_counter() - start >= 0.19
+        assert governor.stats().rate_limited == 1
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        governor = LLMGovernor(LLMGovernorConfig(max_concurrency=1))
+        release = asyncio.Event()
+
+        async def holder():
+            async with governor.slot():
+                await release.wait()
+
+        async def waiter():
+            async with governor.slot():
+                pass
+
+        holding = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        assert governor.stats().queue_depth == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert governor.stats().queue_depth == 0
+
+        release.set()
+        await holding
+        async with governor.slot():
+            assert governor.stats().in_flight == 1
+
+
+class TestGovernedClient(AsyncTestBase):
+    __test__ = True
+
+    @pytest.fixture(autouse=True)
+    def _offline_tokenizer(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(tiktoken, "get_encoding", lambda name: ENC)
+
+    async def _run_batch(
+        self, governor: LLMGovernorConfig, requests: int
+    ) -> tuple[FakeOpenAIServer, int, float]:
+        server = FakeOpenAIServer(max_parallel=4)
+        llm = fake_llm(
+            server,
+            ConfigOpenAI(
+                api_key="test",
+                model="test-model",
+                max_tokens=64,
+                retries=5,
+                governor=governor,
+            ),
+        )
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[
+                llm.chat([TextChatMessage(role="user", content=f"question {i}")])
+                for i in range(requests)
+            ]
+        )
+        elapsed = time.perf_counter() - start
+        await llm.aclose()
+        return server, sum(r.is_ok() for r in results), elapsed
+
+    async def test_governor_reduces_rate_limits(self):
+        requests = 40
+        unbounded, unbounded_ok, unbounded_seconds = await self._run_batch(
+            LLMGovernorConfig(max_concurrency=1_000, rate_limit_pause=0.1), requests
+        )
+        governed, governed_ok, governed_seconds = await self._run_batch(
+            LLMGovernorConfig(max_concurrency=4, rate_limit_pause=0.1), requests
+        )
+        logger.info(
+            f"{requests} requests, server limit 4 in flight: "
+            f"unbounded {unbounded.rate_limited} x 429, {unbounded_ok} ok, "
+            f"{unbounded_ok / unbounded_seconds:.1f} ok/s; "
+            f"governed {governed.rate_limited} x 429, {governed_ok} ok, "
+            f"{governed_ok / governed_seconds:.1f} ok/s"
+        )
+        assert governed_ok == requests
+        assert governed.rate_limited == 0
+        assert unbounded.rate_limited > 0
+        assert governed_ok / governed_seconds > unbounded_ok / unbounded_seconds
+
+    def _stream_llm(self, server: FakeOpenAIServer) -> OpenAIAsyncLLM:
+        return fake_llm(
+            server,
+            ConfigOpenAI(
+                api_key="test",
+                model="test-model",
+                governor=LLMGovernorConfig(max_concurrency=1),
+            ),
+        )
+
+    async def _wait_for_free_slot(self, llm: OpenAIAsyncLLM, timeout: float = 2.0):
+        start = time.perf_counter()
+        while llm.governor.stats().in_flight > 0:
+            assert time.perf_counter() - start < timeout, "the stream keeps its slot"
+            await asyncio.sleep(0.005)
+
+    async def test_abandoned_stream_releases_its_slot(self):
+        server = FakeOpenAIServer(
+            max_parallel=4, latency=0.0, respond=lambda body: "one two three four"
+        )
+        llm = self._stream_llm(server)
+        stream = (
+            await llm.stream_chat([TextChatMessage(role="user", content="question")])
+        ).get_ok()
+        assert await stream.__anext__() == "one "
+
+        # the consumer stops reading but keeps the stream, the slot is free once the model finished
+        await self._wait_for_free_slot(llm)
+        assert (
+            await llm.chat([TextChatMessage(role="user", content="next question")])
+        ).is_ok()
+        # the rest of the answer is still there for a late reader
+        assert [chunk async for chunk in stream] == ["two ", "three ", "four "]
+        await llm.aclose()
+
+    async def test_closed_stream_releases_its_slot(self):
+        server = FakeOpenAIServer(
+            max_parallel=4,
+            latency=0.0,
+            respond=lambda body: " ".join(["word"] * 1000),
+            chunk_delay=0.01,
+        )
+        llm = self._stream_llm(server)
+        stream = (
+            await llm.stream_chat([TextChatMessage(role="user", content="question")])
+        ).get_ok()
+        assert await stream.__anext__() == "word "
+        assert llm.governor.stats().in_flight == 1
+
+        # the model would need ten seconds, closing the stream stops it
+        await stream.aclose()
+        await self._wait_for_free_slot(llm, timeout=0.5)
+        await llm.aclose()
@@ -0,0 +1,218 @@
+import json
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import pytest
+import tiktoken
+from core.logger import init_logging
+from core.result import Result
+from domain.llm.caller import llm_caller
+from domain.llm.model import TextChatMessage
+from domain_test import AsyncTestBase
+from domain_test.llm.response_cache_test import TestLLMResponseCacheStore
+from pydantic import BaseModel
+
+from openai_client.async_openai import ConfigOpenAI
+from openai_client.response_cache import (
+    InMemoryLLMResponseCache,
+    LLMResponseCache,
+    LLMResponseCacheConfig,
+    SqliteLLMResponseCache,
+)
+from tests.fake_encoding import ENC
+from tests.fake_openai_server import FakeOpenAIServer, fake_llm
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+
+class FactCheck(BaseModel):
+    is_fact_in_response: bool
+
+
+def _grading_answer(body: dict[str, Any]) -> str:
+    if "response_format" in body:
+        return json.dumps({"is_fact_in_response": True})
+    return "answer"
+
+
+class TestInMemoryLLMResponseCache(TestLLMResponseCacheStore):
+    __test__ = True
+
+    async def setup_method_async(self, test_name: str):
+        self.store = InMemoryLLMResponseCache()
+
+    async def test_lru_bound(self):
+        store = InMemoryLLMResponseCache(max_entries=2)
+        await store.set("a", "qa", "1", None)
+        await store.set("b", "qa", "2", None)
+        await store.get("a")
+        await store.set("c", "qa", "3", None)
+        assert (await store.get("a")).get_ok() == "1"
+        assert (await store.get("b")).get_ok() is None
+
+
+class TestSqliteLLMResponseCache(TestLLMResponseCacheStore):
+    __test__ = True
+
+    def setup_method_sync(self, test_name: str):
+        self.directory = tempfile.mkdtemp()
+        self.path = str(Path(self.directory) / "cache" / "llm.sqlite")
+
+    async def setup_method_async(self, test_name: str):
+        self.store = SqliteLLMResponseCache(self.path)
+
+    async def teardown_method_async(self, test_name: str):
+        self.store.close()  # type: ignore
+
+    def teardown_method_sync(self, test_name: str):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def test_survives_restart(self):
+        assert (await self.store.set("a", "grading", "1", None)).is_ok()
+        self.store.close()  # type: ignore
+        self.store = SqliteLLMResponseCache(self.path)
+        assert (await self.store.get("a")).get_ok() == "1"
+
+
+class FailingStore(InMemoryLLMResponseCache):
+    async def get(self, key: str) -> Result[str | None]:
+        return Result.Err(ConnectionError("cache down"))
+
+    async def set(
+        self, key: str, namespace: str, response: str, ttl_seconds: float | None
+    ) -> Result[None]:
+        return Result.Err(ConnectionError("cache down"))
+
+
+class TestCachedClient(AsyncTestBase):
+    __test__ = True
+
+    @pytest.fixture(autouse=True)
+    def _offline_tokenizer(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(tiktoken, "get_encoding", lambda name: ENC)
+
+    def _llm(
+        self,
+        server: FakeOpenAIServer,
+        cache: LLMResponseCache | None,
+        temperature: float = 0.0,
+    ):
+        return fake_llm(
+            server,
+            ConfigOpenAI(
+                api_key="test", model="test-model", temperature=temperature
+            ),
+            response_cache=cache,
+        )
+
+    async def _evaluation_suite(self, llm: Any, samples: int) -> None:
+        """Grading style workload: one structured fact check and one free text answer per sample."""
+        with llm_caller("grading"):
+            for i in range(samples):
+                fact = await llm.get_structured_output(
+                    "check the fact",
+                    prompt=f"Fact: {i}\nContext: sample {i}",
+                    model=FactCheck,
+                )
+                assert fact.get_ok().is_fact_in_response
+                answer = await llm.chat(
+                    [TextChatMessage(role="user", content=f"question {i}")]
+                )
+                assert answer.get_ok() == "answer"
+
+    async def test_rerun_of_evaluation_suite_is_served_from_cache(self):
+        samples = 25
+        server = FakeOpenAIServer(max_parallel=100, latency=0.0, respond=_grading_answer)
+        cache = LLMResponseCache(InMemoryLLMResponseCache())
+        llm = self._llm(server, cache)
+
+        await self._evaluation_suite(llm, samples)
+        first_run_calls = server.ok
+        await self._evaluation_suite(llm, samples)
+        stats = cache.stats()
+        logger.info(
+            f"evaluation suite of {samples} samples run twice: {server.ok} llm calls, "
+            f"{stats.calls_saved} calls saved, hit ratio {stats.hit_ratio:.2f}"
+        )
+        assert first_run_calls == 2 * samples
+        assert server.ok == first_run_calls
+        assert stats.calls_saved == 2 * samples
+        assert stats.hit_ratio == 0.5
+        await llm.aclose()
+
+    async def test_key_covers_schema_model_and_messages(self):
+        server = FakeOpenAIServer(max_parallel=100, latency=0.0, respond=_grading_answer)
+        llm = self._llm(server, LLMResponseCache(InMemoryLLMResponseCache()))
+
+        class OtherFactCheck(BaseModel):
+            is_fact_in_response: bool
+            reason: str = ""
+
+        await llm.get_structured_output("s", prompt="p", model=FactCheck)
+        await llm.get_structured_output("s", prompt="p", model=OtherFactCheck)
+        await llm.get_structured_output("s", prompt="p", model=FactCheck, llm_model="other")
+        await llm.get_structured_output("s", prompt="q", model=FactCheck)
+        assert server.ok == 4
+        await llm.get_structured_output("s", prompt="p", model=FactCheck)
+        assert server.ok == 4
+        await llm.aclose()
+
+    async def test_sampling_requests_are_not_cached(self):
+        server = FakeOpenAIServer(max_parallel=100, latency=0.0)
+        cache = LLMResponseCache(InMemoryLLMResponseCache())
+        llm = self._llm(server, cache, temperature=0.7)
+        for _ in range(2):
+            await llm.chat([TextChatMessage(role="user", content="hello")])
+        assert server.ok == 2
+        assert cache.stats().hits + cache.stats().misses == 0
+        await llm.aclose()
+
+    async def test_namespace_ttl(self):
+        server = FakeOpenAIServer(max_parallel=100, latency=0.0)
+        store = InMemoryLLMResponseCache()
+        cache = LLMResponseCache(
+            store,
+            LLMResponseCacheConfig(namespace_ttl_seconds={"qa": 0, "grading": None}),
+        )
+        llm = self._llm(server, cache)
+        message = [TextChatMessage(role="user", content="hello")]
+        with llm_caller("qa"):
+            await llm.chat(message)
+            await llm.chat(message)
+        assert server.ok == 2
+        with llm_caller("grading"):
+            await llm.chat(message)
+            await llm.chat(message)
+        assert server.ok == 3
+        assert store._entries[next(iter(store._entries))][2] is None
+        await llm.aclose()
+
+    async def test_streams_bypass_cache(self):
+        server = FakeOpenAIServer(max_parallel=100, latency=0.0)
+        cache = LLMResponseCache(InMemoryLLMResponseCache())
+        llm = self._llm(server, cache)
+        message = [TextChatMessage(role="user", content="hello")]
+        assert (await llm.chat(message)).is_ok()
+        result = await llm.stream_chat(message)
+        assert result.is_ok()
+        # the fake server answers streams with a plain completion, the request is what matters
+        try:
+            async for _ in result.get_ok():
+                pass
+        except Exception:
+            pass
+        assert server.ok == 2
+        assert cache.stats().hits == 0
+        await llm.aclose()
+
+    async def test_failing_store_falls_back_to_llm(self):
+        server = FakeOpenAIServer(max_parallel=100, latency=0.0)
+        llm = self._llm(server, LLMResponseCache(FailingStore()))
+        result = await llm.chat([TextChatMessage(role="user", content="hello")])
+        assert result.get_ok() == "answer"
+        assert server.ok == 1
+        await llm.aclose()
@@ -0,0 +1,226 @@
+import logging
+import random
+import time
+
+import pytest
+from core.logger import init_logging
+from openai.types.chat import ChatCompletionMessageParam
+
+from openai_client.token_budget import TokenBudgetFitter
+from tests.fake_encoding import ENC
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+
+def _legacy_shrink(text: str, context_cutoff: int) -> tuple[str, int] | None:
+    """
+    Previous OpenAIAsyncLLM._shrink_to_fit, kept as regression reference.
+    Returns None where the previous loop never terminates.
+    """
+    original_tokens = len(ENC.encode(text))
+    tokens_cut = 0
+    if original_tokens <= context_cutoff:
+        return text, 0
+    current_tokens = original_tokens
+    for _ in range(50):
+        if current_tokens <= context_cutoff:
+            return text, tokens_cut
+        current_tokens = len(ENC.encode(text))
+        ids = ENC.encode(text)
+        keep = ids[-context_cutoff:]
+        text = ENC.decode(keep)
+        tokens_cut = original_tokens - len(keep)
+    return None
+
+
+def _random_text(rng: random.Random, words: int) -> str:
+    vocabulary = [
+        "the",
+        "excavation",
+        "site",
+        "Grabung",
+        "Fundstück",
+        "über",
+        "straße",
+        "🦴",
+        "1987",
+        "—",
+        "naïve",
+        "\n",
+    ]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def _text_with_tokens(tokens: int) -> str:
+    rng = random.Random(tokens)
+    text = _random_text(rng, tokens // 6)
+    while len(ENC.encode(text)) < tokens:
+        text += " " + _random_text(rng, tokens // 100 + 1)
+    return text
+
+
+class TestTokenBudgetFitter:
+    @pytest.mark.parametrize("seed", range(40))
+    def test_shrink_matches_previous_behaviour(self, seed: int):
+        rng = random.Random(seed)
+        text = _random_text(rng, rng.randint(1, 400))
+        budget = rng.randint(1, 300)
+        fitter = TokenBudgetFitter(ENC)
+        fitted = fitter.shrink(text, budget)
+        assert fitter.count(fitted[0]) <= budget
+        legacy = _legacy_shrink(text, budget)
+        if legacy is not None:
+            assert fitted == legacy
+
+    def test_shrink_terminates_on_cut_inside_character(self):
+        # the previous loop cycled forever on this cut
+        rng = random.Random(0)
+        text = _random_text(rng, rng.randint(1, 400))
+        assert _legacy_shrink(text, 93) is None
+        fitter = TokenBudgetFitter(ENC)
+        fitted, cut = fitter.shrink(text, 93)
+        assert fitter.count(fitted) <= 93
+        assert "\ufffd" not in fitted
+        assert cut == fitter.count(text) - fitter.count(fitted)
+
+    def test_shrink_keeps_text_within_budget(self):
+        fitter = TokenBudgetFitter(ENC)
+        text, cut = fitter.shrink("über " * 500, 101)
+        assert fitter.count(text) <= 101
+        assert cut > 0
+        assert fitter.shrink("short", 100) == ("short", 0)
+
+    def test_encodings_are_cached_per_content(self):
+        calls = 0
+
+        class CountingEncoding:
+            def encode(self, text: str) -> list[int]:
+                nonlocal calls
+                calls += 1
+                return ENC.encode(text)
+
+            def decode(self, ids: list[int]) -> str:
+                return ENC.decode(ids)
+
+        fitter = TokenBudgetFitter(CountingEncoding())  # type: ignore
+        fitter.count("system prompt")
+        fitter.count("system prompt")
+        assert calls == 1
+
+    def test_cache_is_bounded_by_tokens(self):
+        fitter = TokenBudgetFitter(ENC, max_cached_tokens=50)
+        for i in range(20):
+            fitter.count(f"text number {i} " * 3)
+        assert fitter._cached_tokens <= 50
+
+    def test_fit_messages_under_budget_is_unchanged(self):
+        fitter = TokenBudgetFitter(ENC)
+        messages: list[ChatCompletionMessageParam] = [
+            {"role": "system", "content": "be helpful"},
+            {"role": "user", "content": "hello"},
+        ]
+        assert fitter.fit_messages(messages, 1000).get_ok() == (messages, 0)
+
+    def test_fit_messages_drops_oldest_and_keeps_system(self):
+        fitter = TokenBudgetFitter(ENC)
+        system = "be helpful " * 10
+        turns = [f"turn {i} " + "word " * 50 for i in range(10)]
+        messages: list[ChatCompletionMessageParam] = [
+            {"role": "system", "content": system}
+        ] + [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": t}
+            for i, t in enumerate(turns)
+        ]
+        budget = fitter.count(system) + fitter.count(turns[-1]) * 2 + 5
+
+        fitted, cut = fitter.fit_messages(messages, budget).get_ok()
+
+        assert fitted[0] == messages[0]
+        assert fitted[-1] == messages[-1]
+        assert fitted[-2] == messages[-2]
+        # the third newest turn is trimmed into the 5 remaining tokens
+        assert len(fitted) == 4
+        assert fitter.count(fitted[1]["content"]) <= 5  # type: ignore
+        total = sum(fitter.count(m["content"]) for m in fitted)  # type: ignore
+        assert total <= budget
+        assert cut == sum(fitter.count(m["content"]) for m in messages) - total  # type: ignore
+
+    def test_fit_messages_trims_single_oversized_message(self):
+        fitter = TokenBudgetFitter(ENC)
+        messages: list[ChatCompletionMessageParam] = [
+            {"role": "system", "content": "be helpful"},
+            {"role": "user", "content": "question " * 1000},
+        ]
+        budget = 200
+        fitted, _ = fitter.fit_messages(messages, budget).get_ok()
+        assert len(fitted) == 2
+        assert fitted[0] == messages[0]
+        assert fitter.count(fitted[1]["content"]) <= budget - fitter.count("be helpful")  # type: ignore
+
+    def test_fit_messages_keeps_the_newest_turn_or_fails(self):
+        fitter = TokenBudgetFitter(ENC)
+        system = "be helpful " * 20
+        messages: list[ChatCompletionMessageParam] = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": "first question " * 20},
+            {"role": "user", "content": "second question " * 20},
+        ]
+        fitted, _ = fitter.fit_messages(messages, fitter.count(system) + 3).get_ok()
+        assert [m["role"] for m in fitted] == ["system", "user"]
+        assert messages[2]["content"].endswith(fitted[1]["content"])  # type: ignore
+
+        # the system prompt alone fills the budget, no user message would be left
+        result = fitter.fit_messages(messages, fitter.count(system))
+        assert result.is_error()
+        assert isinstance(result.get_error(), ValueError)
+
+    def test_shrink_searches_the_longest_fitting_suffix(self):
+        calls = 0
+
+        class CountingEncoding:
+            def encode(self, text: str) -> list[int]:
+                nonlocal calls
+                calls += 1
+                return ENC.encode(text)
+
+            def decode_bytes(self, ids: list[int]) -> bytes:
+                return ENC.decode_bytes(ids)
+
+        rng = random.Random(0)
+        text = _random_text(rng, 2_000)
+        half = len(ENC.encode(text)) // 2
+        for budget in range(half, half + 50):
+            calls = 0
+            fitter = TokenBudgetFitter(CountingEncoding())  # type: ignore
+            fitted, _ = fitter.shrink(text, budget)
+            assert fitter.count(fitted) <= budget
+            # whole text, first cut and a binary search over the budget
+            assert calls <= 3 + budget.bit_length()
+
+    @pytest.mark.parametrize("tokens", [32_000, 128_000, 512_000])
+    def test_benchmark_fit(self, tokens: int):
+        text = _text_with_tokens(tokens)
+        budget = tokens // 2
+
+        start = time.perf_counter()
+        legacy = _legacy_shrink(text, budget)
+        legacy_seconds = time.perf_counter() - start
+
+        fitter = TokenBudgetFitter(ENC)
+        start = time.perf_counter()
+        fitted = fitter.shrink(text, budget)
+        cold_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fitter.shrink(text, budget)
+        warm_seconds = time.perf_counter() - start
+
+        assert legacy is not None
+        logger.info(
+            f"{tokens} tokens: previous {legacy_seconds * 1000:.1f} ms, "
+            f"fitter {cold_seconds * 1000:.1f} ms, cached {warm_seconds * 1000:.1f} ms"
+        )
+        assert fitted == legacy
+        assert cold_seconds < legacy_seconds
+        assert warm_seconds < cold_seconds
@@ -0,0 +1,4 @@
+set -e 
+pytest tests/token_budget_tests.py
+pytest tests/governor_tests.py
+pytest tests/response_cache_tests.py
@@ -192,3 +192,29 @@ class MinioFileStorage(FileStorage):
                 return Result.Ok()
             except Exception as e:
                 return Result.Err(e)
+
+    def upload_from_path(
+        self,
+        path: str,
+        filename: str,
+        bucket: str,
+        filetype: str,
+        metadata: FileStorageObjectMetadata,
+    ) -> Result[None]:
+        with self.tracer.start_as_current_span("upload-file-from-path"):
+            logger.info(f"upload file:{filename} from {path}")
+            try:
+                bucket_name = self._create_valid_bucket_name(bucket)
+                if not self.__minio.bucket_exists(bucket_name):
+                    self.__minio.make_bucket(bucket_name)
+                # streams the file in parts instead of loading it into memory
+                self.__minio.fput_object(
+                    bucket_name=bucket_name,
+                    object_name=filename,
+                    file_path=path,
+                    content_type=filetype,
+                    metadata=metadata.model_dump(),  # type: ignore
+                )
+                return Result.Ok()
+            except Exception as e:
+                return Result.Err(e)
@@ -1,13 +1,13 @@
 from __future__ import annotations
 import json
 
-import asyncio
 from urllib.parse import urljoin
 import logging
 from typing import Any, List
 from domain.http_client.async_client import AsyncHttpClient
 
 from core.result import Result
+from core.retry import RetryConfig, RetryDecision, RetryPolicy
 from opentelemetry import trace
 from pydantic import BaseModel, Field
 
@@ -28,6 +28,21 @@ logger = logging.getLogger(__name__)
 class CohereRerankerConfig(BaseModel):
     model: str = Field(default="BAAI/bge-reranker-base")
     retries: int = 3
+    max_retry_seconds: float | None = 60
+
+
+class RerankHttpError(RuntimeError):
+    def __init__(self, status_code: int, body: Any):
+        super().__init__(f"Rerank HTTP {status_code}: {body}")
+        self.status_code = status_code
+
+
+def classify_rerank_error(error: Exception) -> RetryDecision:
+    """Client errors are not retried, except timeouts and rate limits."""
+    if isinstance(error, RerankHttpError) and 400 <= error.status_code < 500:
+        if error.status_code not in (408, 429):
+            return RetryDecision.STOP
+    return RetryDecision.BACKOFF
 
 
 def _auth_headers(api_key: str, extra: dict[str, str] | None = None) -> dict[str, str]:
@@ -71,6 +86,13 @@ class CohereHttpRerankerClient(AsyncRerankerClient):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.tracer = trace.get_tracer("CohereHttpRerankerClient")
+        self._retry = RetryPolicy(
+            name="cohere_rerank",
+            config=RetryConfig(
+                attempts=config.retries, max_elapsed=config.max_retry_seconds
+            ),
+            classify=classify_rerank_error,
+        )
 
     async def _rerank_once(
         self, query: str, docs: List[str], return_documents: bool
@@ -92,7 +114,7 @@ class CohereHttpRerankerClient(AsyncRerankerClient):
         resp = res.get_ok()
         if resp.status_code < 200 or resp.status_code >= 300:
             body = _ensure_json(resp.body)
-            return Result.Err(RuntimeError(f"Rerank HTTP {resp.status_code}: {body}"))
+            return Result.Err(RerankHttpError(resp.status_code, body))
 
         body = _ensure_json(resp.body)
 
@@ -125,27 +147,9 @@ class CohereHttpRerankerClient(AsyncRerankerClient):
 
             return_docs = request.return_text
 
-            backoff = 1.0
-            last_err: Exception | None = None
-            for attempt in range(1, self._config.retries + 1):
-                logger.info(f"elements to rerank {len(request.texts)}")
-                rv = await self._rerank_once(
+            logger.info(f"elements to rerank {len(request.texts)}")
+            return await self._retry.run(
+                lambda: self._rerank_once(
                     request.query, list(request.texts), return_docs
                 )
-                if rv.is_ok():
-                    return rv
-                last_err = rv.get_error()
-                assert last_err
-                logger.warning(
-                    "[rerank] error on attempt %d/%d: %s",
-                    attempt,
-                    self._config.retries,
-                    last_err,
-                    exc_info=True,
-                )
-                if attempt < self._config.retries:
-                    await asyncio.sleep(backoff)
-                    backoff *= 2.0
-
-            assert isinstance(last_err, Exception)
-            return Result.Err(last_err)
+            )
@@ -1,10 +1,16 @@
+import asyncio
 import logging
-import time
 from opentelemetry import trace
 from typing import Any
 from core.result import Result
-from domain.text_embedding.interface import EmbeddClient, RerankerClient
+from core.retry import RetryConfig, RetryDecision, RetryPolicy
+from domain.text_embedding.interface import (
+    AsyncEmbeddClient,
+    EmbeddClient,
+    RerankerClient,
+)
 import grpc
+import grpc.aio
 from pydantic import BaseModel
 
 from text_embedding.proto.tei_pb2 import (
@@ -42,6 +48,35 @@ class EmbeddingClientConfig(BaseModel):
     truncate: bool
     truncate_direction: str
     reties: int = 3
+    max_retry_seconds: float | None = 60
+
+
+# the request itself is wrong, sending it again gives the same answer
+_NOT_RETRYABLE_CODES = {
+    grpc.StatusCode.INVALID_ARGUMENT,
+    grpc.StatusCode.NOT_FOUND,
+    grpc.StatusCode.PERMISSION_DENIED,
+    grpc.StatusCode.UNAUTHENTICATED,
+    grpc.StatusCode.FAILED_PRECONDITION,
+    grpc.StatusCode.OUT_OF_RANGE,
+    grpc.StatusCode.UNIMPLEMENTED,
+}
+
+
+def classify_grpc_error(error: Exception) -> RetryDecision:
+    code = getattr(error, "code", None)
+    if isinstance(error, grpc.RpcError) and callable(code):
+        if code() in _NOT_RETRYABLE_CODES:
+            return RetryDecision.STOP
+    return RetryDecision.BACKOFF
+
+
+def embedding_retry_policy(config: EmbeddingClientConfig) -> RetryPolicy:
+    return RetryPolicy(
+        name="grpc_embedding",
+        config=RetryConfig(attempts=config.reties, max_elapsed=config.max_retry_seconds),
+        classify=classify_grpc_error,
+    )
 
 
 class GrpcEmbeddClient(EmbeddClient):
@@ -60,10 +95,10 @@ class GrpcEmbeddClient(EmbeddClient):
         self.stub = EmbedStub(self.channel)  # type: ignore
         self.tracer = trace.get_tracer("GrpcEmbeddClient")
         self._config = config
+        self._retry = embedding_retry_policy(config)
 
     def _embed(self, input: EmbeddingRequestDto) -> Result[EmbeddingResponseDto]:
         with self.tracer.start_as_current_span("embed-input"):
-            backoff = 1
             try:
                 grpc_request = EmbedRequest(  # type: ignore
                     inputs=input.inputs,
@@ -77,32 +112,16 @@ class GrpcEmbeddClient(EmbeddClient):
                 logger.error(exc, exc_info=True)
                 return Result.Err(exc)
 
-            last_err: Exception | None = None
-            for attempt in range(1, self._config.reties + 1):
-                try:
-                    if input.prompt_name:
-                        grpc_request.prompt_name = input.prompt_name
-
-                    grpc_response = self.stub.Embed(grpc_request)  # type: ignore
-                    return Result.Ok(
-                        EmbeddingResponseDto(root=grpc_response.embeddings)  # type: ignore
-                    )  # type: ignore
-                except Exception as exc:
-                    logger.warning(
-                        "[embedding] error on attempt %d/%d: %s",
-                        attempt,
-                        self._config.reties,
-                        exc,
-                        exc_info=True,
-                    )
-                    last_err = exc
-                if attempt < self._config.reties:
-                    time.sleep(backoff)
-                    backoff *= 2
-
-            assert last_err, "This should never happen"
-
-            return Result.Err(last_err)  # type: ignore[arg-type]
+            if input.prompt_name:
+                grpc_request.prompt_name = input.prompt_name
+
+            def embed_once() -> Result[EmbeddingResponseDto]:
+                grpc_response = self.stub.Embed(grpc_request)  # type: ignore
+                return Result.Ok(
+                    EmbeddingResponseDto(root=grpc_response.embeddings)  # type: ignore
+                )
+
+            return self._retry.run_sync(embed_once)
 
     def embed(
         self, request: EmbeddingRequestDto
@@ -160,6 +179,125 @@ class GrpcEmbeddClient(EmbeddClient):
         self.channel.close()
 
 
+class GrpcAsyncEmbeddClient(AsyncEmbeddClient):
+    """
+    Async counterpart of GrpcEmbeddClient.
+    A grpc.aio channel belongs to the event loop it was created on,
+    the client opens one channel per loop so a single instance can be shared
+    between the application loop and the loop of a sync bridge.
+    """
+
+    tracer: trace.Tracer
+
+    def __init__(
+        self,
+        config: EmbeddingClientConfig,
+        address: str = "localhost:50051",
+        is_secure: bool = False,
+    ):
+        self._address = address
+        self._is_secure = is_secure
+        self._config = config
+        self._retry = embedding_retry_policy(config)
+        self._stubs: dict[asyncio.AbstractEventLoop, tuple[grpc.aio.Channel, EmbedStub]] = {}
+        self.tracer = trace.get_tracer("GrpcAsyncEmbeddClient")
+
+    def _stub(self) -> EmbedStub:
+        loop = asyncio.get_running_loop()
+        entry = self._stubs.get(loop)
+        if entry is None:
+            for closed in [l for l in self._stubs if l.is_closed()]:
+                del self._stubs[closed]
+            if self._is_secure:
+                channel = grpc.aio.secure_channel(
+                    self._address, grpc.ssl_channel_credentials()
+                )
+            else:
+                channel = grpc.aio.insecure_channel(self._address)
+            entry = (channel, EmbedStub(channel))  # type: ignore
+            self._stubs[loop] = entry
+        return entry[1]
+
+    async def _embed(self, input: EmbeddingRequestDto) -> Result[EmbeddingResponseDto]:
+        with self.tracer.start_as_current_span("embed-input"):
+            try:
+                grpc_request = EmbedRequest(  # type: ignore
+                    inputs=input.inputs,
+                    normalize=input.normalize,
+                    truncate=input.truncate,
+                    truncation_direction=map_truncation_direction(
+                        input.truncation_direction
+                    ),
+                )
+                if input.prompt_name:
+                    grpc_request.prompt_name = input.prompt_name
+            except Exception as exc:
+                logger.error(exc, exc_info=True)
+                return Result.Err(exc)
+
+            async def embed_once() -> Result[EmbeddingResponseDto]:
+                grpc_response = await self._stub().Embed(grpc_request)  # type: ignore
+                return Result.Ok(
+                    EmbeddingResponseDto(root=grpc_response.embeddings)  # type: ignore
+                )
+
+            return await self._retry.run(embed_once)
+
+    async def embed(
+        self, request: EmbeddingRequestDto
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        with self.tracer.start_as_current_span("embed-inputs"):
+            if isinstance(request.inputs, str):
+                return await self._embed(request)  # type: ignore
+            # the inputs are multiplexed over the channel instead of sent one after another
+            results = await asyncio.gather(
+                *[
+                    self._embed(request.model_copy(update={"inputs": input}))
+                    for input in request.inputs
+                ]
+            )
+            responses: list[list[float]] = []
+            for result in results:
+                if result.is_error():
+                    return result.propagate_exception()
+                responses.append(result.get_ok().root)
+            return Result.Ok(responses)
+
+    async def embed_doc(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        with self.tracer.start_as_current_span("embed-doc"):
+            return await self.embed(
+                EmbeddingRequestDto(
+                    inputs=text,
+                    normalize=self._config.normalize,
+                    prompt_name=self._config.prompt_name_doc,
+                    truncate=self._config.truncate,
+                    truncation_direction=self._config.truncate_direction,
+                )
+            )
+
+    async def embed_query(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        with self.tracer.start_as_current_span("embed-query"):
+            return await self.embed(
+                EmbeddingRequestDto(
+                    inputs=text,
+                    normalize=self._config.normalize,
+                    prompt_name=self._config.prompt_name_query,
+                    truncate=self._config.truncate,
+                    truncation_direction=self._config.truncate_direction,
+                )
+            )
+
+    async def close(self) -> None:
+        """Closes the channel of the running loop."""
+        entry = self._stubs.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].close()
+
+
 class GrpcRerankerClient(RerankerClient):
     def __init__(self, address: str = "localhost:50051", is_secure: bool = False):
         if is_secure:
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.result import Result
+from core.singelton import BaseSingleton
+from domain.text_embedding.interface import AsyncEmbeddClient, EmbeddClient
+from domain.text_embedding.model import EmbeddingRequestDto, EmbeddingResponseDto
+from opentelemetry import metrics, trace
+from opentelemetry.metrics import CallbackOptions, Observation
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# rough per entry overhead (tuple key, list object, OrderedDict node)
+_ENTRY_OVERHEAD_BYTES = 200
+_FLOAT_BYTES = 8
+
+
+class QueryEmbeddingCacheConfig(BaseModel):
+    max_entries: int = 10_000
+    max_bytes: int = 256 * 1024 * 1024
+    persist_path: str | None = None
+
+
+class QueryEmbeddingCacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+@dataclass
+class QueryEmbeddingLookup:
+    """
+    Result of a cache lookup for one query or a batch of queries,
+    vectors holds None for every query that still has to be embedded.
+    """
+
+    text: str | list[str]
+    vectors: list[list[float] | None]
+
+    def missing(self) -> str | list[str] | None:
+        """The input for the embedding client, None if everything was cached."""
+        if isinstance(self.text, str):
+            return self.text if self.vectors[0] is None else None
+        missing = [t for t, v in zip(self.text, self.vectors) if v is None]
+        return missing or None
+
+    def response(self) -> EmbeddingResponseDto | list[list[float]]:
+        if isinstance(self.text, str):
+            assert self.vectors[0] is not None
+            return EmbeddingResponseDto(root=self.vectors[0])
+        return [v for v in self.vectors if v is not None]
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalizes a query so that trivially different spellings
+    (unicode composition, surrounding or repeated whitespace) share one entry.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class QueryEmbeddingCache(BaseSingleton):
+    """
+    Process wide, size aware LRU cache for query embeddings.
+    Entries are keyed by (model_id, normalized query text).
+    Eviction happens as soon as either the entry limit or the byte budget is exceeded.
+    If a persist_path is configured the cache is loaded on creation and written back on exit.
+    """
+
+    _config: QueryEmbeddingCacheConfig
+    _entries: OrderedDict[tuple[str, str], list[float]]
+
+    def _init_once(self, config: QueryEmbeddingCacheConfig | None = None):
+        self._config = config or QueryEmbeddingCacheConfig()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        meter = metrics.get_meter("query_embedding_cache")
+        self._hit_counter = meter.create_counter(
+            name="embedding.query_cache.hits",
+            unit="1",
+            description="Query embeddings served from the cache",
+        )
+        self._miss_counter = meter.create_counter(
+            name="embedding.query_cache.misses",
+            unit="1",
+            description="Query embeddings that had to be computed",
+        )
+        self._eviction_counter = meter.create_counter(
+            name="embedding.query_cache.evictions",
+            unit="1",
+            description="Query embeddings evicted from the cache",
+        )
+        meter.create_observable_gauge(
+            name="embedding.query_cache.hit_ratio",
+            callbacks=[self._observe_hit_ratio],
+            unit="1",
+            description="Share of query embedding lookups served from the cache",
+        )
+        meter.create_observable_gauge(
+            name="embedding.query_cache.size",
+            callbacks=[self._observe_size],
+            unit="By",
+            description="Estimated memory used by cached query embeddings",
+        )
+
+        if self._config.persist_path:
+            result = self.load(self._config.persist_path)
+            if result.is_error():
+                logger.warning(
+                    f"could not load query embedding cache: {result.get_error()}"
+                )
+            atexit.register(self.save, self._config.persist_path)
+
+    def _reset(self, *args, **kwargs):  # type: ignore
+        if self._config.persist_path:
+            atexit.unregister(self.save)
+        super()._reset()
+
+    # ---------- metrics ----------
+    def _observe_hit_ratio(self, options: CallbackOptions) -> list[Observation]:
+        return [Observation(self.stats().hit_ratio)]
+
+    def _observe_size(self, options: CallbackOptions) -> list[Observation]:
+        return [Observation(self._size_bytes)]
+
+    def stats(self) -> QueryEmbeddingCacheStats:
+        with self._lock:
+            return QueryEmbeddingCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+    # ---------- lookup ----------
+    @staticmethod
+    def _entry_size(key: tuple[str, str], vector: list[float]) -> int:
+        return (
+            len(key[0])
+            + len(key[1].encode("utf-8"))
+            + len(vector) * _FLOAT_BYTES
+            + _ENTRY_OVERHEAD_BYTES
+        )
+
+    def get(self, model_id: str, text: str) -> list[float] | None:
+        key = (model_id, normalize_query(text))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self._misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self._hits += 1
+        if vector is None:
+            self._miss_counter.add(1, {"model": model_id})
+        else:
+            self._hit_counter.add(1, {"model": model_id})
+        return vector
+
+    def put(self, model_id: str, text: str, vector: list[float]) -> None:
+        key = (model_id, normalize_query(text))
+        size = self._entry_size(key, vector)
+        if size > self._config.max_bytes or self._config.max_entries < 1:
+            return
+        evicted = 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size_bytes -= self._entry_size(key, old)
+            self._entries[key] = list(vector)
+            self._size_bytes += size
+            while (
+                len(self._entries) > self._config.max_entries
+                or self._size_bytes > self._config.max_bytes
+            ):
+                old_key, old_vector = self._entries.popitem(last=False)
+                self._size_bytes -= self._entry_size(old_key, old_vector)
+                evicted += 1
+            self._evictions += evicted
+        if evicted:
+            self._eviction_counter.add(evicted, {"model": model_id})
+
+    def lookup(self, model_id: str, text: str | list[str]) -> QueryEmbeddingLookup:
+        texts = [text] if isinstance(text, str) else text
+        return QueryEmbeddingLookup(
+            text=text, vectors=[self.get(model_id, t) for t in texts]
+        )
+
+    def store(
+        self,
+        model_id: str,
+        lookup: QueryEmbeddingLookup,
+        computed: EmbeddingResponseDto | list[list[float]],
+    ) -> EmbeddingResponseDto | list[list[float]]:
+        """
+        Caches the vectors computed for lookup.missing() and returns the complete response.
+        """
+        if isinstance(computed, EmbeddingResponseDto):
+            computed = [computed.root]
+        computed_iter = iter(computed)
+        texts = [lookup.text] if isinstance(lookup.text, str) else lookup.text
+        for i, (t, v) in enumerate(zip(texts, lookup.vectors)):
+            if v is None:
+                vector = next(computed_iter)
+                self.put(model_id, t, vector)
+                lookup.vectors[i] = vector
+        return lookup.response()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    # ---------- persistence ----------
+    def save(self, path: str | None = None) -> Result[None]:
+        target = path or self._config.persist_path
+        if not target:
+            return Result.Err(ValueError("no persist path configured"))
+        try:
+            with self._lock:
+                rows = [
+                    {"model_id": model_id, "text": text, "vector": vector}
+                    for (model_id, text), vector in self._entries.items()
+                ]
+            file = Path(target)
+            file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = file.with_suffix(file.suffix + ".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row))
+                    f.write("\n")
+            os.replace(tmp_file, file)
+            logger.info(f"stored {len(rows)} query embeddings to {target}")
+            return Result.Ok()
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return Result.Err(e)
+
+    def load(self, path: str | None = None) -> Result[int]:
+        source = path or self._config.persist_path
+        if not source:
+            return Result.Err(ValueError("no persist path configured"))
+        if not os.path.exists(source):
+            return Result.Ok(0)
+        try:
+            loaded = 0
+            with open(source, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    self.put(row["model_id"], row["text"], row["vector"])
+                    loaded += 1
+            logger.info(f"loaded {loaded} query embeddings from {source}")
+            return Result.Ok(loaded)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return Result.Err(e)
+
+
+class CachedEmbeddClient(EmbeddClient):
+    """
+    EmbeddClient decorator that answers embed_query from the QueryEmbeddingCache.
+    Document embeddings are passed through unchanged.
+    model_id has to identify everything that changes the query vector
+    (model, query prompt, normalization), e.g. the embedding config id.
+    """
+
+    def __init__(
+        self,
+        client: EmbeddClient,
+        model_id: str,
+        cache: QueryEmbeddingCache | None = None,
+    ):
+        self._client = client
+        self._model_id = model_id
+        self._cache = cache or QueryEmbeddingCache()
+        self.tracer = trace.get_tracer("CachedEmbeddClient")
+
+    def embed(
+        self, request: EmbeddingRequestDto
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return self._client.embed(request)
+
+    def embed_doc(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return self._client.embed_doc(text)
+
+    def embed_query(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        with self.tracer.start_as_current_span("cached-embed-query"):
+            lookup = self._cache.lookup(self._model_id, text)
+            missing = lookup.missing()
+            if missing is None:
+                return Result.Ok(lookup.response())
+            result = self._client.embed_query(missing)
+            if result.is_error():
+                return result.propagate_exception()
+            return Result.Ok(self._cache.store(self._model_id, lookup, result.get_ok()))
+
+
+class CachedAsyncEmbeddClient(AsyncEmbeddClient):
+    """
+    AsyncEmbeddClient counterpart of CachedEmbeddClient,
+    both share the process wide QueryEmbeddingCache.
+    """
+
+    def __init__(
+        self,
+        client: AsyncEmbeddClient,
+        model_id: str,
+        cache: QueryEmbeddingCache | None = None,
+    ):
+        self._client = client
+        self._model_id = model_id
+        self._cache = cache or QueryEmbeddingCache()
+        self.tracer = trace.get_tracer("CachedAsyncEmbeddClient")
+
+    async def embed(
+        self, request: EmbeddingRequestDto
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return await self._client.embed(request)
+
+    async def embed_doc(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return await self._client.embed_doc(text)
+
+    async def embed_query(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        with self.tracer.start_as_current_span("cached-embed-query"):
+            lookup = self._cache.lookup(self._model_id, text)
+            missing = lookup.missing()
+            if missing is None:
+                return Result.Ok(lookup.response())
+            result = await self._client.embed_query(missing)
+            if result.is_error():
+                return result.propagate_exception()
+            return Result.Ok(self._cache.store(self._model_id, lookup, result.get_ok()))
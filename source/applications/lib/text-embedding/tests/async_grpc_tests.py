@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+import time
+
+import grpc.aio
+from core.logger import init_logging
+from domain_test import AsyncTestBase
+
+from text_embedding.proto import EmbeddingClientConfig, GrpcAsyncEmbeddClient
+from text_embedding.proto.tei_pb2 import EmbedResponse  # type: ignore
+from text_embedding.proto.tei_pb2_grpc import (
+    EmbedServicer,
+    add_EmbedServicer_to_server,
+)
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+LATENCY = 0.05
+
+
+class FakeEmbedServicer(EmbedServicer):
+    def __init__(self):
+        self.prompt_names: list[str] = []
+
+    async def Embed(self, request, context):  # type: ignore
+        self.prompt_names.append(request.prompt_name)
+        await asyncio.sleep(LATENCY)
+        return EmbedResponse(embeddings=[float(len(request.inputs))])
+
+
+class TestGrpcAsyncEmbeddClient(AsyncTestBase):
+    __test__ = True
+
+    async def setup_method_async(self, test_name: str):
+        self.servicer = FakeEmbedServicer()
+        self.server = grpc.aio.server()
+        add_EmbedServicer_to_server(self.servicer, self.server)
+        port = self.server.add_insecure_port("localhost:0")
+        await self.server.start()
+        self.client = GrpcAsyncEmbeddClient(
+            address=f"localhost:{port}",
+            config=EmbeddingClientConfig(
+                normalize=True,
+                prompt_name_query="query",
+                prompt_name_doc=None,
+                truncate=True,
+                truncate_direction="right",
+            ),
+        )
+
+    async def teardown_method_async(self, test_name: str):
+        await self.client.close()
+        await self.server.stop(None)
+
+    async def test_embed_query_and_doc(self):
+        query = await self.client.embed_query("four")
+        assert query.get_ok().root == [4.0]  # type: ignore
+        docs = await self.client.embed_doc(["a", "bb", "ccc"])
+        assert docs.get_ok() == [[1.0], [2.0], [3.0]]
+        assert self.servicer.prompt_names == ["query", "", "", ""]
+
+    async def test_parallel_queries_share_one_channel(self):
+        threads = threading.active_count()
+        await self.client.embed_query("warm up")
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[self.client.embed_query(f"question {i}") for i in range(100)]
+        )
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"100 parallel embed_query calls: {elapsed * 1000:.0f} ms, "
+            f"threads {threads} -> {threading.active_count()}"
+        )
+        assert all(r.is_ok() for r in results)
+        assert len(self.client._stubs) == 1
+        assert elapsed < 20 * LATENCY
+
+    async def test_unreachable_host(self):
+        client = GrpcAsyncEmbeddClient(
+            address="localhost:1",
+            config=EmbeddingClientConfig(
+                normalize=True,
+                prompt_name_query=None,
+                prompt_name_doc=None,
+                truncate=True,
+                truncate_direction="right",
+                reties=1,
+            ),
+        )
+        assert (await client.embed_query("text")).is_error()
+        await client.close()
@@ -0,0 +1,195 @@
+import logging
+
+import pytest
+from core.logger import init_logging
+from core.result import Result
+from domain.text_embedding.interface import EmbeddClient
+from domain.text_embedding.model import EmbeddingRequestDto, EmbeddingResponseDto
+
+from text_embedding.query_cache import (
+    CachedEmbeddClient,
+    QueryEmbeddingCache,
+    QueryEmbeddingCacheConfig,
+)
+
+init_logging("debug")
+logger = logging.getLogger(__name__)
+
+
+class FakeEmbedder(EmbeddClient):
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.query_calls = 0
+        self.embedded_texts = 0
+
+    def _vector(self, text: str) -> list[float]:
+        return [float((hash(text) + i) % 97) for i in range(self.dim)]
+
+    def embed(
+        self, request: EmbeddingRequestDto
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        if isinstance(request.inputs, str):
+            self.embedded_texts += 1
+            return Result.Ok(EmbeddingResponseDto(root=self._vector(request.inputs)))
+        self.embedded_texts += len(request.inputs)
+        return Result.Ok([self._vector(t) for t in request.inputs])
+
+    def embed_doc(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        return self.embed(self._request(text))
+
+    def embed_query(
+        self, text: str | list[str]
+    ) -> Result[EmbeddingResponseDto | list[list[float]]]:
+        self.query_calls += 1
+        return self.embed(self._request(text))
+
+    @staticmethod
+    def _request(text: str | list[str]) -> EmbeddingRequestDto:
+        return EmbeddingRequestDto(
+            inputs=text,
+            normalize=True,
+            prompt_name=None,
+            truncate=True,
+            truncation_direction="right",
+        )
+
+
+def _restart_cache(config: QueryEmbeddingCacheConfig) -> QueryEmbeddingCache:
+    try:
+        QueryEmbeddingCache.restart()
+    except RuntimeError:
+        pass
+    return QueryEmbeddingCache(config)
+
+
+class TestQueryEmbeddingCache:
+    def test_hit_after_miss_and_normalization(self):
+        cache = _restart_cache(QueryEmbeddingCacheConfig())
+        fake = FakeEmbedder()
+        client = CachedEmbeddClient(fake, model_id="model-a", cache=cache)
+
+        first = client.embed_query("Who  excavated the site? ")
+        second = client.embed_query("Who excavated the site?")
+        assert first.get_ok() == second.get_ok()
+        assert fake.query_calls == 1
+        stats = cache.stats()
+        assert stats.hits == 1
+        assert stats.misses == 1
+
+    def test_model_id_is_part_of_the_key(self):
+        cache = _restart_cache(QueryEmbeddingCacheConfig())
+        fake = FakeEmbedder()
+        CachedEmbeddClient(fake, model_id="model-a", cache=cache).embed_query("q")
+        CachedEmbeddClient(fake, model_id="model-b", cache=cache).embed_query("q")
+        assert fake.query_calls == 2
+
+    def test_process_wide_instance_is_shared(self):
+        cache = _restart_cache(QueryEmbeddingCacheConfig())
+        fake = FakeEmbedder()
+        CachedEmbeddClient(fake, model_id="model-a").embed_query("q")
+        CachedEmbeddClient(fake, model_id="model-a").embed_query("q")
+        assert fake.query_calls == 1
+        assert QueryEmbeddingCache() is cache
+
+    def test_batch_only_embeds_missing(self):
+        cache = _restart_cache(QueryEmbeddingCacheConfig())
+        fake = FakeEmbedder()
+        client = CachedEmbeddClient(fake, model_id="model-a", cache=cache)
+        client.embed_query("a")
+        result = client.embed_query(["a", "b", "c"])
+        vectors = result.get_ok()
+        assert isinstance(vectors, list)
+        assert len(vectors) == 3
+        assert vectors[0] == fake._vector("a")
+        assert vectors[2] == fake._vector("c")
+        assert fake.embedded_texts == 3
+
+    def test_lookup_and_store_fill_partial_misses(self):
+        cache = _restart_cache(QueryEmbeddingCacheConfig())
+        cache.put("m", "b", [2.0])
+
+        lookup = cache.lookup("m", ["a", "b", "c"])
+        assert lookup.missing() == ["a", "c"]
+        assert cache.store("m", lookup, [[1.0], [3.0]]) == [[1.0], [2.0], [3.0]]
+        assert cache.lookup("m", ["a", "b", "c"]).missing() is None
+
+        lookup = cache.lookup("m", "d")
+        assert lookup.missing() == "d"
+        response = cache.store("m", lookup, EmbeddingResponseDto(root=[4.0]))
+        assert response == EmbeddingResponseDto(root=[4.0])
+        assert cache.lookup("m", "d").response() == response
+
+    def test_doc_embeddings_are_not_cached(self):
+        cache = _restart_cache(QueryEmbeddingCacheConfig())
+        fake = FakeEmbedder()
+        client = CachedEmbeddClient(fake, model_id="model-a", cache=cache)
+        client.embed_doc("a")
+        client.embed_doc("a")
+        assert fake.embedded_texts == 2
+        assert cache.stats().entries == 0
+
+    def test_lru_eviction_by_entries(self):
+        cache = _restart_cache(QueryEmbeddingCacheConfig(max_entries=2))
+        cache.put("m", "a", [1.0])
+        cache.put("m", "b", [2.0])
+        assert cache.get("m", "a") == [1.0]
+        cache.put("m", "c", [3.0])
+        assert cache.get("m", "b") is None
+        assert cache.get("m", "a") == [1.0]
+        assert cache.stats().evictions == 1
+
+    def test_lru_eviction_by_bytes(self):
+        cache = _restart_cache(QueryEmbeddingCacheConfig(max_bytes=4096))
+        for i in range(20):
+            cache.put("m", f"q{i}", [0.0] * 128)
+        stats = cache.stats()
+        assert stats.size_bytes <= 4096
+        assert 0 < stats.entries < 20
+        assert cache.get("m", "q19") is not None
+        assert cache.get("m", "q0") is None
+
+    def test_persistence_roundtrip(self, tmp_path):
+        path = str(tmp_path / "query_cache.jsonl")
+        cache = _restart_cache(QueryEmbeddingCacheConfig(persist_path=path))
+        cache.put("m", "persisted question", [0.5, 0.25])
+        assert cache.save().is_ok()
+
+        reloaded = _restart_cache(QueryEmbeddingCacheConfig(persist_path=path))
+        assert reloaded.stats().entries == 1
+        assert reloaded.get("m", "persisted question") == [0.5, 0.25]
+
+    @pytest.mark.parametrize("configs", [1, 3])
+    def test_repeated_evaluation_run_saves_embedding_calls(self, configs: int):
+        """
+        Simulates an evaluation run: every question is asked once per config and
+        HippoRAG embeds it against the fact, chunk and dpr namespaces.
+        """
+        questions = [f"question number {i}" for i in range(50)]
+        namespaces = ["facts", "chunk", "dpr"]
+
+        uncached = FakeEmbedder()
+        for _ in range(configs):
+            for question in questions:
+                for _ in namespaces:
+                    uncached.embed_query(question)
+
+        cache = _restart_cache(QueryEmbeddingCacheConfig())
+        fake = FakeEmbedder()
+        client = CachedEmbeddClient(fake, model_id="embedding-config", cache=cache)
+        for _ in range(configs):
+            for question in questions:
+                for _ in namespaces:
+                    client.embed_query(question)
+
+        saved = uncached.query_calls - fake.query_calls
+        stats = cache.stats()
+        logger.info(
+            f"configs={configs} calls without cache={uncached.query_calls} "
+            f"with cache={fake.query_calls} saved={saved} "
+            f"hit ratio={stats.hit_ratio:.2f}"
+        )
+        assert fake.query_calls == len(questions)
+        assert saved == len(questions) * (len(namespaces) * configs - 1)
+        assert stats.hit_ratio == pytest.approx(1 - 1 / (len(namespaces) * configs))
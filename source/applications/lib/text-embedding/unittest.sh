@@ -0,0 +1,3 @@
+set -e 
+pytest tests/query_cache_tests.py
+pytest tests/async_grpc_tests.py
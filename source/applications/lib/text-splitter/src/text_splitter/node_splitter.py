@@ -434,7 +434,7 @@ class AdvancedSentenceSplitter(DocumentSplitter):
 
             text_buf = []
 
-        for p_idx, page in enumerate(pages):
+        for p_idx, page in enumerate(pages, start=doc.page_offset):
             page_number = p_idx + 1
             frags = page.document_fragements
 
@@ -155,6 +155,17 @@ class TestAdvancedSentenceSplitter(AsyncTestBase):
         assert "B" in nodes[0].content
         assert "r1c1" in nodes[0].content
 
+    def test_page_offset_numbers_pages_of_the_file(self):
+        page = Page(
+            document_fragements=[TextFragement(text="Page three of the file.")],
+        )
+        doc = Document(id="doc6", content=[page], metadata={}, page_offset=2)
+
+        nodes = self.splitter.split_documents(doc)
+
+        assert len(nodes) == 1
+        assert nodes[0].metadata["pages"] == "3"
+
     def test_ids_change_when_content_changes(self):
         text1 = "Alpha. Beta."
         text2 = "Alpha. Beta changed."
@@ -1,21 +1,24 @@
+import asyncio
 from dataclasses import dataclass
 from typing import cast
 from core.hash import compute_mdhash_id
 
 from llama_index.vector_stores.qdrant.base import MetadataFilters
+from domain.text_embedding.interface import AsyncEmbeddClient
 from llama_index_extension.embedding import CustomEmbedding, EmbeddClient
 from opentelemetry import trace
 import logging
 
 from domain.rag.model import Node
 from domain.rag.indexer.model import Document
-from llama_index.core.schema import NodeRelationship, TextNode
+from llama_index.core.schema import MetadataMode, NodeRelationship, TextNode
+from llama_index.vector_stores.qdrant import QdrantVectorStore
 from llama_index.core.vector_stores.types import (
     FilterCondition,
     FilterOperator,
     MetadataFilter,
 )
-from llama_index.core import Document as Response, VectorStoreIndex
+from llama_index.core import Document as Response
 from qdrant_client.http import models
 
 from core.result import Result
@@ -39,6 +42,10 @@ class LlamaIndexVectorStoreConfig:
     top_n_count_sparse: int
     top_n_count_reranker: int
     sparse_model: str = "Qdrant/bm25"
+    async_embedding: AsyncEmbeddClient | None = None
+    ingest_batch_size: int = 256
+    ingest_concurrency: int = 4
+    hash_lookup_batch_size: int = 1024
 
 
 class LlamaIndexVectorStore(AsyncDocumentIndexer):
@@ -53,7 +60,9 @@ class LlamaIndexVectorStore(AsyncDocumentIndexer):
     ):
         self._note_splitter = note_splitter
         self._config = config
-        self.embedding = CustomEmbedding(self._config.embedding)
+        self.embedding = CustomEmbedding(
+            self._config.embedding, async_client=self._config.async_embedding
+        )
         self.reranker = LLamaIndexHolder.Instance().get_custom_reranker(
             self._config.reranker, self._config.top_n_count_reranker
         )
@@ -65,27 +74,18 @@ class LlamaIndexVectorStore(AsyncDocumentIndexer):
         with self.tracer.start_as_current_span("store-document-in-indexer-db"):
             try:
                 nodes_split = self._note_splitter.split_documents(doc=doc)
-                nodes_to_insert: list[TextNode] = []
                 llama_index_nodes: list[TextNode] = [
                     TextNode(text=node.content) for node in nodes_split
                 ]
 
-                index = VectorStoreIndex.from_vector_store(  # type: ignore
-                    vector_store=LlamaIndexVectorStoreSession.Instance().get_database(
-                        collection=collection,
-                        sparse_model=self._config.sparse_model,
-                        top_k_dense=1,
-                        top_k_sparse=1,
-                    ),
-                    embed_model=self.embedding,
-                )
-
-                vector_store = LlamaIndexVectorStoreSession.Instance().get_database(
+                index = LLamaIndexHolder.Instance().get_index(
                     collection=collection,
+                    embedding_model=self.embedding,
                     sparse_model=self._config.sparse_model,
                     top_k_dense=1,
                     top_k_sparse=1,
                 )
+                vector_store = index.vector_store
 
                 for i, node in enumerate(llama_index_nodes):
                     node.metadata = nodes_split[i].metadata
@@ -100,25 +100,25 @@ class LlamaIndexVectorStore(AsyncDocumentIndexer):
                         node.as_related_node_info()
                     )
 
-                if LlamaIndexVectorStoreSession.Instance().is_database_init(
-                    collection=collection
-                ):
-                    for node in llama_index_nodes:
-                        result = await vector_store.aget_nodes(
-                            filters=MetadataFilters(
-                                filters=[
-                                    MetadataFilter(
-                                        key="hash", value=node.metadata["hash"]
-                                    )
-                                ]
-                            )
-                        )
-                        if len(result) == 0:
-                            nodes_to_insert.append(node)
+                client = LlamaIndexVectorStoreSession.get_instance().get_qdrant_client()
+                config = LlamaIndexVectorStoreSession.get_instance().get_config()
+                collection_name = collection or config.collection
+                if await client.collection_exists(collection_name):
+                    existing = await self._existing_hashes(
+                        collection_name,
+                        [node.metadata["hash"] for node in llama_index_nodes],
+                    )
+                    nodes_to_insert = [
+                        node
+                        for node in llama_index_nodes
+                        if node.metadata["hash"] not in existing
+                    ]
                 else:
                     nodes_to_insert = [node for node in llama_index_nodes]
 
-                index.insert_nodes(nodes=nodes_to_insert)
+                await self._insert_nodes(
+                    cast(QdrantVectorStore, vector_store), nodes_to_insert
+                )
                 logger.info(f"inster {len(nodes_to_insert)} nodes")
                 logger.info(f"stored {doc.id}")
                 return Result.Ok(None)
@@ -126,6 +126,81 @@ class LlamaIndexVectorStore(AsyncDocumentIndexer):
                 logging.getLogger(__name__).error(f"{e}", exc_info=True)
                 return Result.Err(e)
 
+    async def _existing_hashes(self, collection_name: str, hashes: list[str]) -> set[str]:
+        """
+        Returns the hashes that are already stored in the collection,
+        one filtered scroll per hash_lookup_batch_size hashes instead of one lookup per node.
+        """
+        client = LlamaIndexVectorStoreSession.get_instance().get_qdrant_client()
+        unique = list(dict.fromkeys(hashes))
+        existing: set[str] = set()
+        step = self._config.hash_lookup_batch_size
+        for start in range(0, len(unique), step):
+            scroll_filter = models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="hash",
+                        match=models.MatchAny(any=unique[start : start + step]),
+                    )
+                ]
+            )
+            offset = None
+            while True:
+                points, offset = await client.scroll(
+                    collection_name=collection_name,
+                    scroll_filter=scroll_filter,
+                    limit=step,
+                    offset=offset,
+                    with_payload=["hash"],
+                    with_vectors=False,
+                )
+                existing.update(
+                    point.payload["hash"] for point in points if point.payload
+                )
+                if offset is None:
+                    break
+        return existing
+
+    async def _embed_batch(self, nodes: list[TextNode]) -> list[TextNode]:
+        """Sets the dense embedding of the nodes with one batched request."""
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+        embeddings = await self.embedding.aget_text_embedding_batch(texts)
+        for node, embedding in zip(nodes, embeddings):
+            node.embedding = embedding
+        return nodes
+
+    async def _insert_nodes(
+        self, vector_store: QdrantVectorStore, nodes: list[TextNode]
+    ) -> None:
+        """
+        Embeds and adds the nodes in batches of ingest_batch_size,
+        at most ingest_concurrency batches are in flight.
+        QdrantVectorStore.async_add builds the sparse vectors and upserts in chunks of its batch_size.
+        """
+        if len(nodes) == 0:
+            return
+        client = LlamaIndexVectorStoreSession.get_instance().get_qdrant_client()
+        collection_name = vector_store.collection_name
+        slots = asyncio.Semaphore(self._config.ingest_concurrency)
+        step = self._config.ingest_batch_size
+        batches = [nodes[start : start + step] for start in range(0, len(nodes), step)]
+
+        async def insert(batch: list[TextNode]):
+            async with slots:
+                await vector_store.async_add(await self._embed_batch(batch))  # type: ignore[arg-type]
+
+        if not await client.collection_exists(collection_name):
+            # the first batch creates the collection, concurrent batches would all try to
+            await insert(batches.pop(0))
+            # the hash lookup of later ingestions filters on it
+            await client.create_payload_index(
+                collection_name=collection_name,
+                field_name="hash",
+                field_schema=models.PayloadSchemaType.KEYWORD,
+            )
+
+        await asyncio.gather(*[insert(batch) for batch in batches])
+
     async def update_document(
         self, doc: Document, collection: str | None = None
     ) -> Result[None]:
@@ -200,14 +275,12 @@ class LlamaIndexVectorStore(AsyncDocumentIndexer):
 
                 metadata_filters.condition = FilterCondition.OR
 
-                index = VectorStoreIndex.from_vector_store(  # type: ignore
-                    vector_store=LlamaIndexVectorStoreSession.Instance().get_database(
-                        collection=collection,
-                        sparse_model=self._config.sparse_model,
-                        top_k_sparse=self._config.top_n_count_sparse,
-                        top_k_dense=self._config.top_n_count_dens,
-                    ),
-                    embed_model=self.embedding,
+                index = LLamaIndexHolder.Instance().get_index(
+                    collection=collection,
+                    embedding_model=self.embedding,
+                    sparse_model=self._config.sparse_model,
+                    top_k_sparse=self._config.top_n_count_sparse,
+                    top_k_dense=self._config.top_n_count_dens,
                 )
 
                 query_engine = index.as_query_engine(  # type: ignore
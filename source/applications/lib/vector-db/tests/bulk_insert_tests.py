@@ -0,0 +1,289 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+import pytest
+import llama_index.vector_stores.qdrant.base as qdrant_base
+import llama_index_extension.build_components as build_components
+from core.logger import init_logging
+from core.result import Result
+from core.singelton import BaseSingleton
+from domain.rag.indexer.model import Document, SplitNode
+from domain.text_embedding.model import (
+    EmbeddingRequestDto,
+    EmbeddingResponseDto,
+    RerankRequestDto,
+    RerankResponseDto,
+)
+from domain_test import AsyncTestBase
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters
+from llama_index_extension.build_components import (
+    LLamaIndexHolder,
+    LlamaIndexRAGConfig,
+    LlamaIndexVectorStoreSession,
+)
+from llama_index_extension.vector_store_session import (
+    LlamaIndexVectorStoreSessionConfig,
+)
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+from vector_db.qdrant_vector_store import (
+    LlamaIndexVectorStore,
+    LlamaIndexVectorStoreConfig,
+)
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+COLLECTION = "documents"
+DIM = 8
+# round trip of one embedding request
+LATENCY = 0.002
+
+
+def fake_sparse_encoder(model_name: str = "", **kwargs) -> Callable:
+    """Stands in for fastembed_sparse_encoder, the models can not be downloaded in tests."""
+
+    def encode(texts: list[str]) -> tuple[list[list[int]], list[list[float]]]:
+        indices = [sorted({len(word) for word in text.split()}) for text in texts]
+        return indices, [[1.0] * len(i) for i in indices]
+
+    return encode
+
+
+class FakeEmbedder:
+    """Sync and async embedding client with a fixed latency per request."""
+
+    def __init__(self):
+        self.requests = 0
+        self.texts = 0
+
+    def _vectors(self, request: EmbeddingRequestDto):
+        self.requests += 1
+        inputs = [request.inputs] if isinstance(request.inputs, str) else request.inputs
+        self.texts += len(inputs)
+        vectors = [[float(len(text) % 7 + i) for i in range(DIM)] for text in inputs]
+        if isinstance(request.inputs, str):
+            return Result.Ok(EmbeddingResponseDto(root=vectors[0]))
+        return Result.Ok(vectors)
+
+    @staticmethod
+    def _request(text: str | list[str]) -> EmbeddingRequestDto:
+        return EmbeddingRequestDto(
+            inputs=text,
+            normalize=True,
+            prompt_name=None,
+            truncate=True,
+            truncation_direction="right",
+        )
+
+    def embed(self, request: EmbeddingRequestDto):
+        time.sleep(LATENCY)
+        return self._vectors(request)
+
+    def embed_doc(self, text: str | list[str]):
+        return self.embed(self._request(text))
+
+    def embed_query(self, text: str | list[str]):
+        return self.embed(self._request(text))
+
+
+class FakeAsyncEmbedder(FakeEmbedder):
+    async def embed(self, request: EmbeddingRequestDto):  # type: ignore
+        await asyncio.sleep(LATENCY)
+        return self._vectors(request)
+
+    async def embed_doc(self, text: str | list[str]):  # type: ignore
+        return await self.embed(self._request(text))
+
+    async def embed_query(self, text: str | list[str]):  # type: ignore
+        return await self.embed(self._request(text))
+
+
+class FakeReranker:
+    async def rerank(self, request: RerankRequestDto) -> Result[RerankResponseDto]:
+        return Result.Ok(RerankResponseDto(root=[]))
+
+
+class SentenceSplitter:
+    def split_documents(self, doc: Document) -> list[SplitNode]:
+        assert isinstance(doc.content, str)
+        return [
+            SplitNode(id=f"{doc.id}-{i}", content=part, metadata={"file_id": doc.id})
+            for i, part in enumerate(doc.content.split("\n"))
+        ]
+
+
+def document(doc_id: str, sentences: range) -> Document:
+    return Document(
+        id=doc_id,
+        content="\n".join(f"sentence number {i} of the corpus" for i in sentences),
+        metadata={},
+    )
+
+
+class TestBulkInsert(AsyncTestBase):
+    __test__ = True
+
+    @pytest.fixture(autouse=True)
+    def _fake_sparse_models(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(build_components, "fastembed_sparse_encoder", fake_sparse_encoder)
+        monkeypatch.setattr(qdrant_base, "fastembed_sparse_encoder", fake_sparse_encoder)
+
+    async def setup_method_async(self, test_name: str):
+        BaseSingleton.clear_all()
+        LlamaIndexVectorStoreSession.create(  # type: ignore
+            config=LlamaIndexVectorStoreSessionConfig(
+                qdrant_host="localhost",
+                qdrant_port=6333,
+                qdrant_api_key=None,
+                collection=COLLECTION,
+                batch_size=64,
+            )
+        )
+        self.session = LlamaIndexVectorStoreSession.Instance()
+        self.session._client = QdrantClient(location=":memory:")
+        self.session._aclient = AsyncQdrantClient(location=":memory:")
+        LLamaIndexHolder.create(config=LlamaIndexRAGConfig())  # type: ignore
+        self.embedder = FakeEmbedder()
+        self.async_embedder = FakeAsyncEmbedder()
+        self.store = LlamaIndexVectorStore(
+            note_splitter=SentenceSplitter(),
+            config=LlamaIndexVectorStoreConfig(
+                embedding=self.embedder,
+                async_embedding=self.async_embedder,
+                reranker=FakeReranker(),  # type: ignore
+                top_n_count_dens=5,
+                top_n_count_sparse=5,
+                top_n_count_reranker=5,
+            ),
+        )
+
+    async def teardown_method_async(self, test_name: str):
+        BaseSingleton.clear_all()
+
+    def _count_upserts(self) -> list[int]:
+        """Records the number of points of every upsert of the async client."""
+        sizes: list[int] = []
+        upsert = self.session._aclient.upsert  # type: ignore
+
+        async def counted(collection_name: str, points, **kwargs):
+            sizes.append(len(points))
+            return await upsert(collection_name=collection_name, points=points, **kwargs)
+
+        self.session._aclient.upsert = counted  # type: ignore
+        return sizes
+
+    async def _count(self) -> int:
+        return (await self.session._aclient.count(COLLECTION)).count  # type: ignore
+
+    async def test_reingest_inserts_only_new_nodes(self):
+        assert (await self.store.create_document(document("a", range(100)))).is_ok()
+        assert await self._count() == 100
+        embedded = self.async_embedder.texts
+
+        assert (await self.store.create_document(document("b", range(50, 180)))).is_ok()
+        assert await self._count() == 180
+        assert self.async_embedder.texts - embedded == 80
+        # the sync client is not used on the async path
+        assert self.embedder.requests == 0
+
+        points, _ = await self.session._aclient.scroll(  # type: ignore
+            COLLECTION, limit=1, with_vectors=True, with_payload=True
+        )
+        assert set(points[0].vector) == {"text-dense", "text-sparse-new"}  # type: ignore
+        # the overlapping nodes stay with the document that stored them first
+        of_b = await self.session._aclient.count(  # type: ignore
+            COLLECTION,
+            count_filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="file_id", match=models.MatchValue(value="b")
+                    )
+                ]
+            ),
+        )
+        assert of_b.count == 80
+
+    async def test_benchmark_ingestion_throughput(self):
+        """
+        10k nodes with fake embedders, before: one hash lookup per node and a blocking insert,
+        after: one scroll per hash batch, batched async embedding and chunked upserts.
+        """
+        nodes_count = 10_000
+        doc = document("big", range(nodes_count))
+        # the collection exists, the document is new
+        assert (await self.store.create_document(document("seed", range(-10, 0)))).is_ok()
+
+        def legacy_nodes() -> list[TextNode]:
+            split = SentenceSplitter().split_documents(doc)
+            nodes = [TextNode(text=n.content, metadata=n.metadata) for n in split]
+            for node in nodes:
+                node.metadata["hash"] = str(hash(node.text))
+            return nodes
+
+        # the in memory sync client used by the blocking insert has its own collections
+        self.session._client.create_collection(  # type: ignore
+            COLLECTION,
+            vectors_config={
+                "text-dense": models.VectorParams(size=DIM, distance=models.Distance.COSINE)
+            },
+            sparse_vectors_config={"text-sparse-new": models.SparseVectorParams()},
+        )
+        index = LLamaIndexHolder.Instance().get_index(
+            embedding_model=self.store.embedding,
+            sparse_model="Qdrant/bm25",
+            top_k_dense=1,
+            top_k_sparse=1,
+        )
+        nodes = legacy_nodes()
+        start = time.perf_counter()
+        nodes_to_insert = []
+        for node in nodes:
+            found = await index.vector_store.aget_nodes(  # type: ignore
+                filters=MetadataFilters(
+                    filters=[MetadataFilter(key="hash", value=node.metadata["hash"])]
+                )
+            )
+            if len(found) == 0:
+                nodes_to_insert.append(node)
+        await asyncio.to_thread(index.insert_nodes, nodes_to_insert)
+        before = time.perf_counter() - start
+
+        upserts = self._count_upserts()
+        self.async_embedder.requests = self.async_embedder.texts = 0
+        start = time.perf_counter()
+        assert (await self.store.create_document(doc)).is_ok()
+        after = time.perf_counter() - start
+        assert await self._count() == nodes_count + 10
+        requests = self.async_embedder.requests
+        # every node is embedded once, in requests of embed_batch_size texts per ingest batch,
+        # and upserted in chunks of the session batch size
+        ingest_batch, embed_batch = 256, self.store.embedding.embed_batch_size
+        assert self.async_embedder.texts == nodes_count
+        assert requests == sum(
+            -(-min(ingest_batch, nodes_count - start) // embed_batch)
+            for start in range(0, nodes_count, ingest_batch)
+        )
+        assert sum(upserts) == nodes_count
+        assert max(upserts) <= 64
+
+        upserts.clear()
+        start = time.perf_counter()
+        assert (await self.store.create_document(doc)).is_ok()
+        reingest = time.perf_counter() - start
+        assert await self._count() == nodes_count + 10
+        # all hashes are known, nothing is embedded or upserted again
+        assert self.async_embedder.texts == nodes_count
+        assert upserts == []
+
+        logger.info(
+            f"ingestion of {nodes_count} nodes: "
+            f"before {nodes_count / before:.0f} nodes/s ({before:.2f} s), "
+            f"after {nodes_count / after:.0f} nodes/s ({after:.2f} s), "
+            # local mode scans every point for each hash batch, the server uses the hash index
+            f"re-ingest of the unchanged document {reingest:.2f} s (local mode), "
+            f"{requests} embedding requests"
+        )
@@ -0,0 +1,2 @@
+set -e 
+pytest tests/bulk_insert_tests.py
@@ -8,8 +8,6 @@ from __future__ import annotations
 
 import logging
 import os
-import subprocess
-import tempfile
 from typing import Final
 
 from opentelemetry import trace
@@ -18,6 +16,8 @@ from core.result import Result
 from domain.file_converter.interface import FileConverter
 from domain.file_converter.model import Page
 
+from word_converter.office_pool import OfficeConversionPool
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +25,8 @@ class OfficeToPDFConverter(FileConverter):
     """
     Converts modern/legacy Word and PowerPoint to PDF, then forwards the
     resulting PDF to *pdf_converter*.
+    The PDF is rendered by the long-lived workers of *pool* and removed
+    once the PDF converter is done with it.
 
     Supported extensions:
         * .doc  • .docx
@@ -32,15 +34,19 @@ class OfficeToPDFConverter(FileConverter):
     """
 
     _pdf_converter: FileConverter
+    _pool: OfficeConversionPool
     tracer: trace.Tracer
 
     _SUPPORTED_EXTS: Final[set[str]] = {"doc", "docx", "ppt", "pptx"}
 
-    def __init__(self, pdf_converter: FileConverter) -> None:
+    def __init__(
+        self, pdf_converter: FileConverter, pool: OfficeConversionPool | None = None
+    ) -> None:
         # Make sure the delegate understands PDF
         assert pdf_converter.does_convert_filetype("pdf")
 
         self._pdf_converter = pdf_converter
+        self._pool = pool or OfficeConversionPool()
         self.tracer = trace.get_tracer(__name__)
         super().__init__()
 
@@ -59,8 +65,17 @@ class OfficeToPDFConverter(FileConverter):
         """
         with self.tracer.start_as_current_span("office-to-pdf"):
             try:
-                pdf_path = self._convert_to_pdf(file)
-                return self._pdf_converter.convert_file(pdf_path)
+                self._validate(file)
+                with self._pool.job_directory() as output_dir:
+                    logger.debug("LibreOffice: %s ➜ pdf", file)
+                    result = self._pool.convert(file, output_dir)
+                    if result.is_error():
+                        return result.propagate_exception()
+                    pages = self._pdf_converter.convert_file(result.get_ok())
+                    if pages.is_error():
+                        return pages.propagate_exception()
+                    # the pdf is removed with the job directory, read lazy pages before
+                    return Result.Ok(list(pages.get_ok()))
             except Exception as exc:  # noqa: BLE001
                 logger.error(exc.with_traceback(None))
                 return Result.Err(exc)
@@ -69,53 +84,10 @@ class OfficeToPDFConverter(FileConverter):
     # Internal helpers
     # ------------------------------------------------------------------ #
 
-    def _convert_to_pdf(self, file: str) -> str:
-        """
-        Use LibreOffice to turn *file* into a PDF:
-
-            soffice --headless --convert-to pdf --outdir <tmp> <file>
-
-        Returns the path to the generated PDF (lives in a temp dir that is
-        cleaned up when the program exits). Any error is raised so the caller
-        can wrap it in a Result.
-        """
+    def _validate(self, file: str):
         if not os.path.exists(file):
             raise FileNotFoundError(f"File not found: {file}")
 
         ext = os.path.splitext(file)[1].lstrip(".").lower()
         if ext not in self._SUPPORTED_EXTS:
             raise ValueError(f"Unsupported file type: {ext}")
-
-        tmp_dir = tempfile.mkdtemp()
-        output_dir = os.path.join(tmp_dir, "loo_output")
-        os.makedirs(output_dir, exist_ok=True)
-
-        logger.debug("LibreOffice: %s ➜ pdf", ext)
-        subprocess.run(
-            [
-                "soffice",
-                "--headless",
-                "--convert-to",
-                "pdf",
-                "--outdir",
-                output_dir,
-                file,
-            ],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-
-        # Expect exactly one PDF with the same base name
-        base = os.path.splitext(os.path.basename(file))[0]
-        pdf_candidates = [
-            f
-            for f in os.listdir(output_dir)
-            if f.startswith(base) and f.lower().endswith(".pdf")
-        ]
-        if not pdf_candidates:
-            raise RuntimeError(f"LibreOffice failed to create a PDF for {file}")
-
-        pdf_path = os.path.join(output_dir, pdf_candidates[0])
-        logger.debug("Generated PDF at %s", pdf_path)
-        return pdf_path
@@ -1,14 +1,34 @@
+import math
+from datetime import time
+from typing import Any, Iterable, Iterator
+
 from core.result import Result
 from pathlib import Path
 from domain.file_converter.interface import FileConverter
 from domain.file_converter.model import Page, TableFragement
+from pydantic import BaseModel
+import numpy as np
 import pandas as pd
+from pandas.io.parsers import TextParser
+
+
+class ExcelToMarkdownConverterConfig(BaseModel):
+    # workbooks larger than this are read row by row instead of loading each sheet into pandas
+    streaming_threshold_bytes: int = 10 * 1024 * 1024
+    # rows per emitted page in streaming mode, every page repeats the header row
+    rows_per_page: int = 1000
 
 
 class ExcelToMarkdownConverter(FileConverter):
     #: Recognised file extensions (lower‑case, with leading dot)
     SUPPORTED_EXTENSIONS: frozenset[str] = frozenset({"xlsx", "xls"})
 
+    _config: ExcelToMarkdownConverterConfig
+
+    def __init__(self, config: ExcelToMarkdownConverterConfig | None = None):
+        self._config = config or ExcelToMarkdownConverterConfig()
+        super().__init__()
+
     # ------------------------------------------------------------------
     # *Interface* compliance helpers
     # ------------------------------------------------------------------
@@ -16,37 +36,170 @@ class ExcelToMarkdownConverter(FileConverter):
     def does_convert_filetype(self, filetype: str) -> bool:  # noqa: D401, ANN001
         return filetype.lower() in self.SUPPORTED_EXTENSIONS
 
-    def convert_file(self, file: str) -> Result[list[Page]]:  # noqa: D401
+    def convert_file(self, file: str) -> Result[Iterable[Page]]:  # noqa: D401
         path = Path(file)
 
         if not path.exists():
             return Result.Err(FileNotFoundError(path))
 
+        if path.stat().st_size > self._config.streaming_threshold_bytes:
+            # pages are produced while the caller iterates, the file has to exist until then
+            return Result.Ok(self.stream_pages(file))
+
         try:
             xls = pd.ExcelFile(path)  # pandas picks the correct engine automatically
             pages: list[Page] = []
 
             for sheet_name in xls.sheet_names:
                 df = xls.parse(sheet_name)  # type: ignore
-
-                # Markdown representation (GitHub‑flavoured) – requires ``tabulate``.
-                markdown_table: str = df.to_markdown(index=False)  # type: ignore
-
-                # Helper fields ------------------------------------------------
-                header: str = ", ".join(map(str, df.columns))  # type: ignore
-                column: str = str(df.columns[0]) if df.columns.size else ""  # type: ignore
-
-                fragment = TableFragement(
-                    full_tabel=markdown_table,
-                    header=header,
-                    column=[str(columns) for columns in df.columns],
-                )
-
-                page = Page(document_fragements=[fragment])
-                pages.append(page)
+                pages.append(self._table_page(df))
 
             return Result(pages)
 
         # -------- Failure path -------------------------------------------------
         except Exception as exc:  # pylint: disable=broad-except
             return Result.Err(exc)
+
+    @staticmethod
+    def _table_page(df: pd.DataFrame) -> Page:
+        # Markdown representation (GitHub‑flavoured) – requires ``tabulate``.
+        markdown_table: str = df.to_markdown(index=False)  # type: ignore
+
+        fragment = TableFragement(
+            full_tabel=markdown_table,
+            header=", ".join(map(str, df.columns)),  # type: ignore
+            column=[str(columns) for columns in df.columns],
+        )
+        return Page(document_fragements=[fragment])
+
+    # ------------------------------------------------------------------
+    # Streaming mode
+    # ------------------------------------------------------------------
+
+    def stream_pages(self, file: str) -> Iterator[Page]:
+        """
+        Reads the workbook row by row and yields one page per ``rows_per_page`` rows.
+        Only the rows of the current page are held in memory.
+        Cells are converted and parsed like ``pd.read_excel`` does, so the pages have
+        the shape of the pandas conversion, split into parts that repeat the header.
+        Column types are inferred per page.
+        """
+        suffix = Path(file).suffix.lstrip(".").lower()
+        sheets = self._xls_sheets(file) if suffix == "xls" else self._xlsx_sheets(file)
+        for rows in sheets:
+            yield from self._pages(rows)
+
+    def _pages(self, rows: Iterator[list[Any]]) -> Iterator[Page]:
+        header = next(rows, None)
+        if header is None:
+            # pandas reads an empty sheet as an empty frame
+            yield self._table_page(pd.DataFrame())
+            return
+
+        chunk: list[list[Any]] = []
+        emitted = False
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self._config.rows_per_page:
+                yield self._table_page(self._parse(header, chunk))
+                emitted = True
+                chunk = []
+        # a sheet with only a header still gets its page
+        if chunk or not emitted:
+            yield self._table_page(self._parse(header, chunk))
+
+    @staticmethod
+    def _parse(header: list[Any], rows: list[list[Any]]) -> pd.DataFrame:
+        # the parser read_excel uses, it names and deduplicates the columns
+        return TextParser([header, *rows], header=0, skip_blank_lines=False).read()
+
+    @staticmethod
+    def _xlsx_sheets(file: str) -> Iterator[Iterator[list[Any]]]:
+        import openpyxl
+        from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+        def convert(cell: Any) -> Any:
+            # pandas' openpyxl reader
+            if cell.value is None:
+                return ""
+            if cell.data_type == TYPE_ERROR:
+                return np.nan
+            if cell.data_type == TYPE_NUMERIC:
+                value = int(cell.value)
+                return value if value == cell.value else float(cell.value)
+            return cell.value
+
+        def trimmed(sheet: Any) -> Iterator[list[Any]]:
+            for row in sheet.rows:
+                converted = [convert(cell) for cell in row]
+                while converted and converted[-1] == "":
+                    converted.pop()
+                yield converted
+
+        def rows(sheet: Any) -> Iterator[list[Any]]:
+            # a first pass finds the width and the last row with data,
+            # pandas needs the whole sheet for both
+            width = 0
+            last_row_with_data = -1
+            for number, row in enumerate(trimmed(sheet)):
+                if row:
+                    width = max(width, len(row))
+                    last_row_with_data = number
+            for number, row in enumerate(trimmed(sheet)):
+                if number > last_row_with_data:
+                    break
+                yield row + [""] * (width - len(row))
+
+        # read only keeps the sheet xml on disk and parses it while iterating
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                # the stored dimension may be wrong, like pandas measure the rows
+                sheet.reset_dimensions()  # type: ignore
+                yield rows(sheet)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _xls_sheets(file: str) -> Iterator[Iterator[list[Any]]]:
+        import xlrd
+        from xlrd import XL_CELL_BOOLEAN, XL_CELL_DATE, XL_CELL_ERROR, XL_CELL_NUMBER
+
+        def convert(value: Any, cell_type: int, datemode: int) -> Any:
+            # pandas' xlrd reader
+            if cell_type == XL_CELL_DATE:
+                try:
+                    value = xlrd.xldate.xldate_as_datetime(value, datemode)
+                except OverflowError:
+                    return value
+                year = value.timetuple()[0:3]
+                if (not datemode and year == (1899, 12, 31)) or (
+                    datemode and year == (1904, 1, 1)
+                ):
+                    value = time(value.hour, value.minute, value.second, value.microsecond)
+            elif cell_type == XL_CELL_ERROR:
+                value = np.nan
+            elif cell_type == XL_CELL_BOOLEAN:
+                value = bool(value)
+            elif cell_type == XL_CELL_NUMBER and math.isfinite(value):
+                if int(value) == value:
+                    value = int(value)
+            return value
+
+        # the BIFF file is read at once, the sheets are parsed and released one after another
+        workbook = xlrd.open_workbook(file, on_demand=True)
+        try:
+            for index in range(workbook.nsheets):
+                sheet = workbook.sheet_by_index(index)
+                yield (
+                    [
+                        convert(value, cell_type, workbook.datemode)
+                        for value, cell_type in zip(
+                            sheet.row_values(row), sheet.row_types(row)
+                        )
+                    ]
+                    for row in range(sheet.nrows)
+                )
+                workbook.unload_sheet(index)
+        finally:
+            workbook.release_resources()
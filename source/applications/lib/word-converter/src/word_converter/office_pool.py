@@ -0,0 +1,270 @@
+"""
+office_pool.py
+Pool of long-lived office conversion workers (see office_worker.py).
+Each worker owns one warm LibreOffice profile and talks JSON lines over a pipe.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from opentelemetry import metrics
+from pydantic import BaseModel
+
+from core.result import Result
+
+logger = logging.getLogger(__name__)
+
+_WORKER_SCRIPT = str(Path(__file__).with_name("office_worker.py"))
+
+
+class OfficeConversionPoolConfig(BaseModel):
+    workers: int = 2
+    job_timeout: float = 300
+    startup_timeout: float = 120
+    # recycles a worker to bound memory growth of a long running office process
+    max_jobs_per_worker: int = 500
+    # interpreter that has the LibreOffice uno bindings, falls back to the running interpreter
+    python_executable: str | None = None
+    # parent directory for profiles and job directories, a private temp dir by default
+    work_dir: str | None = None
+    # replaces [python_executable, office_worker.py]
+    worker_command: list[str] | None = None
+
+
+class OfficeConversionPoolStats(BaseModel):
+    conversions: int
+    failures: int
+    restarts: int
+    # workers started, recycled ones included
+    starts: int
+
+
+class _JobFailed(RuntimeError):
+    """The worker answered with an error, it stays usable for the next job."""
+
+
+class _Worker:
+    def __init__(self, command: list[str], profile_dir: str, startup_timeout: float):
+        self.jobs = 0
+        self.process = subprocess.Popen(
+            [*command, "--profile", profile_dir],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            # the worker and its soffice child are killed together
+            start_new_session=True,
+        )
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+        try:
+            self.backend = self._next(startup_timeout).get("backend")
+        except Exception:
+            self.kill()
+            raise
+
+    def _read(self):
+        assert self.process.stdout
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _next(self, timeout: float) -> dict[str, Any]:
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"office worker did not answer within {timeout}s")
+        if line is None:
+            raise RuntimeError(
+                f"office worker exited with code {self.process.wait()}"
+            )
+        return json.loads(line)
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, job: dict[str, Any], timeout: float) -> dict[str, Any]:
+        assert self.process.stdin
+        self.jobs += 1
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        while True:
+            response = self._next(timeout)
+            if response.get("id") == job["id"]:
+                return response
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.process.wait()
+
+    def stop(self, timeout: float = 10):
+        try:
+            assert self.process.stdin
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except Exception:
+            self.kill()
+
+
+class OfficeConversionPool:
+    """
+    Converts office documents to PDF with a fixed number of long-lived workers.
+    Jobs wait for an idle worker; a worker that times out or crashes is killed
+    together with its office process and replaced on the next job.
+    Job directories are removed when the job_directory context exits,
+    the work dir (profiles included) when the pool is closed.
+    """
+
+    _config: OfficeConversionPoolConfig
+
+    def __init__(self, config: OfficeConversionPoolConfig | None = None):
+        self._config = config or OfficeConversionPoolConfig()
+        self._owns_work_dir = self._config.work_dir is None
+        self._work_dir = Path(
+            self._config.work_dir or tempfile.mkdtemp(prefix="office-pool-")
+        )
+        (self._work_dir / "jobs").mkdir(parents=True, exist_ok=True)
+        self._workers: list[_Worker | None] = [None] * self._config.workers
+        self._idle: queue.Queue[int] = queue.Queue()
+        for slot in range(self._config.workers):
+            self._idle.put(slot)
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._conversions = 0
+        self._failures = 0
+        self._restarts = 0
+        self._starts = 0
+        self._closed = False
+
+        meter = metrics.get_meter("office_conversion_pool")
+        self._conversion_counter = meter.create_counter(
+            name="office.conversions",
+            unit="1",
+            description="Office documents converted to PDF",
+        )
+        self._restart_counter = meter.create_counter(
+            name="office.worker_restarts",
+            unit="1",
+            description="Office workers replaced after a timeout or crash",
+        )
+        atexit.register(self.close)
+
+    def _command(self) -> list[str]:
+        if self._config.worker_command:
+            return self._config.worker_command
+        python = self._config.python_executable
+        if not python or not os.path.exists(python):
+            python = sys.executable
+        return [python, _WORKER_SCRIPT]
+
+    def _start(self, slot: int) -> _Worker:
+        profile = self._work_dir / f"profile-{slot}"
+        profile.mkdir(exist_ok=True)
+        worker = _Worker(self._command(), str(profile), self._config.startup_timeout)
+        with self._lock:
+            self._starts += 1
+        logger.info(f"office worker {slot} started with {worker.backend} backend")
+        return worker
+
+    def _discard(self, slot: int):
+        worker = self._workers[slot]
+        self._workers[slot] = None
+        if worker is not None:
+            worker.kill()
+            with self._lock:
+                self._restarts += 1
+            self._restart_counter.add(1)
+
+    def stats(self) -> OfficeConversionPoolStats:
+        with self._lock:
+            return OfficeConversionPoolStats(
+                conversions=self._conversions,
+                failures=self._failures,
+                restarts=self._restarts,
+                starts=self._starts,
+            )
+
+    @contextmanager
+    def job_directory(self) -> Iterator[str]:
+        """Private output directory of one job, removed on exit."""
+        directory = tempfile.mkdtemp(dir=self._work_dir / "jobs")
+        try:
+            yield directory
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def convert(self, source: str, output_dir: str) -> Result[str]:
+        """Converts *source* to a PDF inside *output_dir* and returns its path."""
+        if self._closed:
+            return Result.Err(RuntimeError("office conversion pool is closed"))
+        slot = self._idle.get()
+        try:
+            worker = self._workers[slot]
+            if worker is not None and (
+                not worker.alive() or worker.jobs >= self._config.max_jobs_per_worker
+            ):
+                worker.stop()
+                worker = self._workers[slot] = None
+            if worker is None:
+                worker = self._workers[slot] = self._start(slot)
+
+            response = worker.run(
+                {
+                    "id": next(self._job_ids),
+                    "input": os.path.abspath(source),
+                    "output_dir": os.path.abspath(output_dir),
+                },
+                self._config.job_timeout,
+            )
+            if not response["ok"]:
+                raise _JobFailed(response.get("error", "unknown error"))
+            pdf = response["pdf"]
+            with self._lock:
+                self._conversions += 1
+            self._conversion_counter.add(1)
+            return Result.Ok(pdf)
+        except Exception as e:
+            logger.error(f"office conversion of {source} failed: {e}")
+            with self._lock:
+                self._failures += 1
+            worker = self._workers[slot]
+            if worker is not None and (
+                not isinstance(e, _JobFailed) or not worker.alive()
+            ):
+                # the worker is stuck, gone or out of sync with the protocol
+                # (e.g. an invalid response line), the next job gets a fresh one
+                self._discard(slot)
+            return Result.Err(e)
+        finally:
+            self._idle.put(slot)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        for worker in self._workers:
+            if worker is not None:
+                worker.stop()
+        self._workers = [None] * self._config.workers
+        if self._owns_work_dir:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
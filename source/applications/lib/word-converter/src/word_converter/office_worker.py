@@ -0,0 +1,204 @@
+"""
+office_worker.py
+Long-lived office conversion worker, started and fed by OfficeConversionPool.
+
+Protocol (one JSON object per line):
+    stdout  {"ready": true, "backend": "uno" | "cli"}        once after startup
+    stdin   {"id": 1, "input": "/path/a.docx", "output_dir": "/tmp/job"}
+    stdout  {"id": 1, "ok": true, "pdf": "/tmp/job/a.pdf"}
+            {"id": 1, "ok": false, "error": "..."}
+
+The module only uses the standard library (and the optional LibreOffice `uno` bindings)
+so it can run under the interpreter that ships python3-uno instead of the application interpreter.
+If `uno` is importable one headless soffice is started per worker and reused for every job,
+otherwise every job runs `soffice --convert-to pdf` with the warm profile of the worker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+_FILTERS = {
+    "doc": "writer_pdf_Export",
+    "docx": "writer_pdf_Export",
+    "ppt": "impress_pdf_Export",
+    "pptx": "impress_pdf_Export",
+}
+
+
+class OfficeExited(RuntimeError):
+    """The office process is gone, the worker exits so that the pool restarts it."""
+
+
+def _soffice_binary() -> str:
+    return shutil.which("soffice") or shutil.which("libreoffice") or "soffice"
+
+
+def _pdf_path(source: str, output_dir: str) -> str:
+    base = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(output_dir, f"{base}.pdf")
+
+
+class CliBackend:
+    name = "cli"
+
+    def __init__(self, profile_dir: str):
+        self._profile_url = Path(profile_dir).absolute().as_uri()
+
+    def convert(self, source: str, output_dir: str) -> str:
+        subprocess.run(
+            [
+                _soffice_binary(),
+                f"-env:UserInstallation={self._profile_url}",
+                "--headless",
+                "--norestore",
+                "--convert-to",
+                "pdf",
+                "--outdir",
+                output_dir,
+                source,
+            ],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        pdf = _pdf_path(source, output_dir)
+        if not os.path.exists(pdf):
+            raise RuntimeError(f"LibreOffice failed to create a PDF for {source}")
+        return pdf
+
+    def alive(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+class UnoBackend:
+    name = "uno"
+
+    def __init__(self, profile_dir: str, pipe_name: str, startup_timeout: float = 60):
+        import uno  # type: ignore
+
+        self._uno = uno
+        self._office = subprocess.Popen(
+            [
+                _soffice_binary(),
+                f"-env:UserInstallation={Path(profile_dir).absolute().as_uri()}",
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext"
+                )
+                break
+            except Exception:
+                if self._office.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("soffice did not accept connections")
+                time.sleep(0.1)
+        self._desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def _property(self, name: str, value: object):
+        prop = self._uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+        prop.Name = name
+        prop.Value = value
+        return prop
+
+    def convert(self, source: str, output_dir: str) -> str:
+        if self._office.poll() is not None:
+            raise OfficeExited("soffice exited")
+        ext = os.path.splitext(source)[1].lstrip(".").lower()
+        pdf = _pdf_path(source, output_dir)
+        document = self._desktop.loadComponentFromURL(
+            Path(source).absolute().as_uri(),
+            "_blank",
+            0,
+            (self._property("Hidden", True), self._property("ReadOnly", True)),
+        )
+        if document is None:
+            raise RuntimeError(f"LibreOffice could not open {source}")
+        try:
+            document.storeToURL(
+                Path(pdf).absolute().as_uri(),
+                (self._property("FilterName", _FILTERS[ext]),),
+            )
+        finally:
+            document.close(True)
+        return pdf
+
+    def alive(self) -> bool:
+        return self._office.poll() is None
+
+    def close(self):
+        try:
+            self._desktop.terminate()
+        except Exception:
+            pass
+        try:
+            self._office.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._office.kill()
+
+
+def _backend(profile_dir: str, pipe_name: str) -> CliBackend | UnoBackend:
+    try:
+        import uno  # type: ignore # noqa: F401
+    except ImportError:
+        return CliBackend(profile_dir)
+    return UnoBackend(profile_dir, pipe_name)
+
+
+def _write(message: dict[str, object]):
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", required=True)
+    parser.add_argument("--pipe-name", default=f"office-worker-{os.getpid()}")
+    args = parser.parse_args()
+
+    backend = _backend(args.profile, args.pipe_name)
+    _write({"ready": True, "backend": backend.name})
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            try:
+                pdf = backend.convert(job["input"], job["output_dir"])
+                _write({"id": job["id"], "ok": True, "pdf": pdf})
+            except Exception as exc:
+                _write({"id": job["id"], "ok": False, "error": str(exc)})
+                if isinstance(exc, OfficeExited) or not backend.alive():
+                    raise SystemExit(1)
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Stands in for office_worker.py with a persistent office process:
+the startup cost is paid once, every job only copies the input.
+Inputs named *crash* kill the worker, inputs named *hang* never finish,
+inputs named *garbled* get an invalid line and *incomplete* a response without the pdf.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+
+STARTUP_SECONDS = float(os.environ.get("FAKE_OFFICE_STARTUP", "0.02"))
+DOCUMENT_SECONDS = float(os.environ.get("FAKE_OFFICE_DOCUMENT", "0.002"))
+
+
+def main():
+    time.sleep(STARTUP_SECONDS)
+    print(json.dumps({"ready": True, "backend": "fake"}), flush=True)
+    for line in sys.stdin:
+        job = json.loads(line)
+        name = os.path.basename(job["input"])
+        if "crash" in name:
+            os._exit(3)
+        if "hang" in name:
+            time.sleep(3600)
+        if "garbled" in name:
+            print("not json", flush=True)
+            continue
+        if "incomplete" in name:
+            print(json.dumps({"id": job["id"], "ok": True}), flush=True)
+            continue
+        time.sleep(DOCUMENT_SECONDS)
+        pdf = os.path.join(job["output_dir"], os.path.splitext(name)[0] + ".pdf")
+        shutil.copyfile(job["input"], pdf)
+        print(json.dumps({"id": job["id"], "ok": True, "pdf": pdf}), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+import openpyxl
+from core.logger import init_logging
+from domain.file_converter.model import Page, TableFragement
+from domain_test import AsyncTestBase
+
+from word_converter.excel_converter import (
+    ExcelToMarkdownConverter,
+    ExcelToMarkdownConverterConfig,
+)
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+# the peak memory difference shows from a few ten thousand rows on, set it to 1M for a full run
+BENCHMARK_ROWS = int(os.environ.get("EXCEL_BENCHMARK_ROWS", "50000"))
+
+_PACKAGE_PARTS = {
+    "[Content_Types].xml": '<?xml version="1.0" encoding="UTF-8"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"><Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/><Default Extension="xml" ContentType="application/xml"/><Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/><Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/></Types>',
+    "_rels/.rels": '<?xml version="1.0" encoding="UTF-8"?><Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/></Relationships>',
+    "xl/workbook.xml": '<?xml version="1.0" encoding="UTF-8"?><workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets><sheet name="data" sheetId="1" r:id="rId1"/></sheets></workbook>',
+    "xl/_rels/workbook.xml.rels": '<?xml version="1.0" encoding="UTF-8"?><Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/></Relationships>',
+}
+
+
+def write_synthetic_workbook(path: str, rows: int):
+    """
+    Writes the sheet xml directly, openpyxl needs minutes for a million rows.
+    Like Excel the sheet starts with its dimension, read only mode relies on it.
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _PACKAGE_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            header = "".join(
+                f'<c r="{col}1" t="inlineStr"><is><t>{name}</t></is></c>'
+                for col, name in zip("ABCD", ["id", "name", "amount", "note"])
+            )
+            sheet.write(
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<dimension ref="A1:D{rows + 1}"/><sheetData><row r="1">{header}</row>'.encode()
+            )
+            for i in range(rows):
+                r = i + 2
+                sheet.write(
+                    f'<row r="{r}"><c r="A{r}"><v>{i}</v></c>'
+                    f'<c r="B{r}" t="inlineStr"><is><t>customer {i}</t></is></c>'
+                    f'<c r="C{r}"><v>{i * 0.5}</v></c>'
+                    f'<c r="D{r}" t="inlineStr"><is><t>ok</t></is></c></row>'.encode()
+                )
+            sheet.write(b"</sheetData></worksheet>")
+
+
+_MEASURE = """
+import json, resource, sys, time
+from word_converter.excel_converter import ExcelToMarkdownConverter, ExcelToMarkdownConverterConfig
+
+threshold = 0 if sys.argv[1] == "stream" else 2**62
+converter = ExcelToMarkdownConverter(ExcelToMarkdownConverterConfig(streaming_threshold_bytes=threshold))
+rows = 0
+start = time.perf_counter()
+# consumed like the file converter service does, one page after the other
+for page in converter.convert_file(sys.argv[2]).get_ok():
+    rows += page.document_fragements[0].full_tabel.count("\\n") - 1
+seconds = time.perf_counter() - start
+print(json.dumps({"rows": rows, "seconds": seconds, "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def measure(mode: str, file: str) -> dict[str, float]:
+    """Runs one conversion in a fresh interpreter so ru_maxrss is the peak of that conversion."""
+    output = subprocess.run(
+        [sys.executable, "-c", _MEASURE, mode, file],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+class TestExcelStreaming(AsyncTestBase):
+    __test__ = True
+
+    def setup_method_sync(self, test_name: str):
+        self.root = Path(tempfile.mkdtemp())
+
+    def teardown_method_sync(self, test_name: str):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _workbook(self) -> str:
+        path = str(self.root / "sheets.xlsx")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "first"  # type: ignore
+        sheet.append(["name", "note", None])  # type: ignore
+        for i in range(5):
+            sheet.append([f"row {i}", "a | b" if i == 0 else "line\nbreak", i])  # type: ignore
+        sheet.append([None, None, None])  # type: ignore
+        second = workbook.create_sheet("second")
+        second.append(["id"])
+        second.append([1.0])
+        workbook.save(path)
+        return path
+
+    def _pages(self, path: str, **config) -> list[Page]:
+        result = ExcelToMarkdownConverter(
+            ExcelToMarkdownConverterConfig(**config)
+        ).convert_file(path)
+        assert result.is_ok()
+        return list(result.get_ok())
+
+    def test_stream_pages_are_split_by_rows(self):
+        pages = self._pages(self._workbook(), streaming_threshold_bytes=0, rows_per_page=2)
+        fragments: list[TableFragement] = [page.document_fragements[0] for page in pages]  # type: ignore
+        assert all(isinstance(f, TableFragement) for f in fragments)
+
+        # 5 rows of the first sheet in pages of 2, the trailing blank row is dropped
+        # like pandas does, one page for the second sheet
+        assert len(fragments) == 4
+        assert [f.full_tabel.count("| row ") for f in fragments[:3]] == [2, 2, 1]
+        assert all(f.column == ["name", "note", "Unnamed: 2"] for f in fragments[:3])
+        assert fragments[0].header == "name, note, Unnamed: 2"
+        assert fragments[3].column == ["id"]
+        assert fragments[3].header == "id"
+
+    def test_stream_pages_match_the_pandas_pages(self):
+        path = self._workbook()
+        pandas_pages = self._pages(path)
+        streamed_pages = self._pages(path, streaming_threshold_bytes=0, rows_per_page=100)
+        assert streamed_pages == pandas_pages
+
+    def test_small_files_keep_the_pandas_conversion(self):
+        pages = self._pages(self._workbook())
+        fragment: TableFragement = pages[0].document_fragements[0]  # type: ignore
+        assert fragment.column == ["name", "note", "Unnamed: 2"]
+
+    def test_legacy_xls_is_streamed(self):
+        path = "./tests/test_files/test_file.xls"
+        streamed_pages = self._pages(path, streaming_threshold_bytes=0, rows_per_page=10**6)
+        assert len(streamed_pages) > 0
+        assert streamed_pages == self._pages(path)
+
+    def test_benchmark_peak_memory(self):
+        """Peak RSS and rows per second of convert_file for a synthetic workbook, pandas against streaming."""
+        file = str(self.root / "large.xlsx")
+        write_synthetic_workbook(file, BENCHMARK_ROWS)
+
+        streamed = measure("stream", file)
+        legacy = measure("pandas", file)
+        assert streamed["rows"] == legacy["rows"] == BENCHMARK_ROWS
+
+        logger.info(
+            f"{BENCHMARK_ROWS} rows, {os.path.getsize(file) / 2**20:.1f} MiB xlsx: "
+            f"before {legacy['rows'] / legacy['seconds']:.0f} rows/s, "
+            f"peak RSS {legacy['rss_mb']:.0f} MiB, "
+            f"after {streamed['rows'] / streamed['seconds']:.0f} rows/s, "
+            f"peak RSS {streamed['rss_mb']:.0f} MiB"
+        )
+        assert streamed["rss_mb"] < legacy["rss_mb"]
@@ -0,0 +1,200 @@
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from core.logger import init_logging
+from core.result import Result
+from domain.file_converter.model import Page
+from domain_test import AsyncTestBase
+
+from word_converter import OfficeToPDFConverter
+from word_converter.office_pool import OfficeConversionPool, OfficeConversionPoolConfig
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+FAKE_WORKER = str(Path(__file__).with_name("fake_office_worker.py"))
+# launching soffice costs seconds, the fakes scale it down
+STARTUP_SECONDS = 0.02
+DOCUMENT_SECONDS = 0.002
+
+FAKE_SOFFICE = f"""#!/bin/sh
+# fake soffice --convert-to pdf --outdir <dir> <file>
+sleep {STARTUP_SECONDS + DOCUMENT_SECONDS}
+while [ $# -gt 1 ]; do
+  if [ "$1" = "--outdir" ]; then outdir="$2"; fi
+  shift
+done
+name=$(basename "$1")
+cp "$1" "$outdir/${{name%.*}}.pdf"
+"""
+
+
+class PdfBytesConverter:
+    """PDF converter that only reads the rendered file."""
+
+    def __init__(self):
+        self.sizes: list[int] = []
+
+    def does_convert_filetype(self, filetype: str) -> bool:
+        return filetype == "pdf"
+
+    def convert_file(self, file: str) -> Result[list[Page]]:
+        self.sizes.append(len(Path(file).read_bytes()))
+        return Result.Ok([Page(document_fragements=[])])
+
+
+def legacy_convert(file: str) -> str:
+    """The former conversion, one soffice launch per file and a temp dir that stays behind."""
+    output_dir = os.path.join(tempfile.mkdtemp(), "loo_output")
+    os.makedirs(output_dir, exist_ok=True)
+    subprocess.run(
+        ["soffice", "--headless", "--convert-to", "pdf", "--outdir", output_dir, file],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    return os.path.join(output_dir, Path(file).stem + ".pdf")
+
+
+class TestOfficeConversionPool(AsyncTestBase):
+    __test__ = True
+
+    @pytest.fixture(autouse=True)
+    def _sandbox(self, monkeypatch: pytest.MonkeyPatch):
+        self.root = Path(tempfile.mkdtemp())
+        self.tmp = self.root / "tmp"
+        self.tmp.mkdir()
+        bin_dir = self.root / "bin"
+        bin_dir.mkdir()
+        soffice = bin_dir / "soffice"
+        soffice.write_text(FAKE_SOFFICE)
+        soffice.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+        monkeypatch.setenv("FAKE_OFFICE_STARTUP", str(STARTUP_SECONDS))
+        monkeypatch.setenv("FAKE_OFFICE_DOCUMENT", str(DOCUMENT_SECONDS))
+        monkeypatch.setattr(tempfile, "tempdir", str(self.tmp))
+        self.docs = self.root / "docs"
+        self.docs.mkdir()
+        yield
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _document(self, name: str) -> str:
+        path = self.docs / name
+        path.write_bytes(f"office document {name}".encode())
+        return str(path)
+
+    def _pool(self, **kwargs) -> OfficeConversionPool:
+        return OfficeConversionPool(
+            OfficeConversionPoolConfig(
+                worker_command=[sys.executable, FAKE_WORKER], **kwargs
+            )
+        )
+
+    def test_converter_removes_the_pdf(self):
+        pool = self._pool(workers=1)
+        pdf_converter = PdfBytesConverter()
+        converter = OfficeToPDFConverter(pdf_converter, pool=pool)
+
+        result = converter.convert_file(self._document("report.docx"))
+        assert result.is_ok()
+        assert pdf_converter.sizes == [len(b"office document report.docx")]
+        assert converter.convert_file(self._document("report.xlsx")).is_error()
+        assert converter.convert_file(str(self.docs / "missing.doc")).is_error()
+        assert list((pool._work_dir / "jobs").iterdir()) == []
+
+        pool.close()
+        assert list(self.tmp.iterdir()) == []
+
+    def test_crashed_and_stuck_workers_are_replaced(self):
+        pool = self._pool(workers=1, job_timeout=0.5)
+        with pool.job_directory() as output_dir:
+            assert pool.convert(self._document("crash.docx"), output_dir).is_error()
+            assert pool.convert(self._document("hang.pptx"), output_dir).is_error()
+            assert pool.convert(self._document("ok.pptx"), output_dir).is_ok()
+        stats = pool.stats()
+        assert stats.restarts == 2
+        assert stats.failures == 2
+        assert stats.conversions == 1
+        pool.close()
+
+    def test_malformed_responses_release_the_worker(self):
+        pool = self._pool(workers=1)
+        with pool.job_directory() as output_dir:
+            assert pool.convert(self._document("garbled.docx"), output_dir).is_error()
+            assert pool.convert(self._document("incomplete.docx"), output_dir).is_error()
+            # the slot is free again and a fresh worker answers the next job
+            assert pool.convert(self._document("ok.docx"), output_dir).is_ok()
+        stats = pool.stats()
+        assert stats.failures == 2
+        assert stats.restarts == 2
+        assert stats.starts == 3
+        assert stats.conversions == 1
+        pool.close()
+
+    def test_workers_are_recycled(self):
+        pool = self._pool(workers=1, max_jobs_per_worker=2)
+        with pool.job_directory() as output_dir:
+            for i in range(5):
+                assert pool.convert(self._document(f"{i}.doc"), output_dir).is_ok()
+        assert pool.stats().conversions == 5
+        assert pool.stats().restarts == 0
+        assert pool.stats().starts == 3
+        pool.close()
+
+    def test_office_worker_cli_backend(self):
+        # without the uno bindings the worker runs soffice with its warm profile
+        pool = OfficeConversionPool(OfficeConversionPoolConfig(workers=1))
+        with pool.job_directory() as output_dir:
+            result = pool.convert(self._document("slides.pptx"), output_dir)
+            assert result.is_ok()
+            assert Path(result.get_ok()).read_bytes() == b"office document slides.pptx"
+        pool.close()
+
+    def test_benchmark_small_documents(self):
+        """Documents per minute and temp dir growth over 1,000 small DOCX/PPTX conversions."""
+        documents = [
+            self._document(f"doc-{i}.{'docx' if i % 2 else 'pptx'}") for i in range(1_000)
+        ]
+        workers = 2
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(legacy_convert, documents))
+        before = time.perf_counter() - start
+        before_growth = len(list(self.tmp.iterdir()))
+        for entry in self.tmp.iterdir():
+            shutil.rmtree(entry)
+
+        pool = self._pool(workers=workers, max_jobs_per_worker=len(documents))
+        converter = OfficeToPDFConverter(PdfBytesConverter(), pool=pool)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(converter.convert_file, documents))
+        after = time.perf_counter() - start
+        assert all(r.is_ok() for r in results)
+        stats = pool.stats()
+        # only the work dir of the pool, no job directory is left behind
+        after_growth = len(list(self.tmp.iterdir())) - 1 + len(
+            list((pool._work_dir / "jobs").iterdir())
+        )
+        pool.close()
+
+        logger.info(
+            f"{len(documents)} conversions with {workers} workers: "
+            f"before {len(documents) / before * 60:.0f} docs/min, {before_growth} temp dirs left, "
+            f"after {len(documents) / after * 60:.0f} docs/min, {after_growth} temp dirs left"
+        )
+        assert before_growth == len(documents)
+        assert after_growth == 0
+        # one office start per worker instead of one per document
+        assert stats.starts == workers
+        assert stats.restarts == 0
+        assert stats.conversions == len(documents)
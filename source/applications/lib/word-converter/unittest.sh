@@ -1,2 +1,4 @@
 pytest tests/test_word_conversation.py
 pytest tests/test_execl_conversation.py
+pytest tests/test_excel_streaming.py
+pytest tests/test_office_pool.py
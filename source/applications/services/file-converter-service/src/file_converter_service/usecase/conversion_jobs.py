@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+
+from core.result import Result
+from core.singelton import BaseSingleton
+from domain.file_converter.model import PageLite
+from opentelemetry import metrics, trace
+from pydantic import BaseModel
+
+from file_converter_service.usecase.convert_file import (
+    ConvertFileToMarkdown,
+    UploadedFiles,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TooManyJobsException(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class ConversionJobStatus(Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class ConversionJob(BaseModel):
+    id: str
+    filename: str
+    source_bucket: str
+    destination_bucket: str
+    status: ConversionJobStatus = ConversionJobStatus.PENDING
+    pages: list[PageLite] | None = None
+    error: str | None = None
+    submitted_at: float
+    finished_at: float | None = None
+
+    def is_finished(self) -> bool:
+        return self.status in (ConversionJobStatus.DONE, ConversionJobStatus.FAILED)
+
+
+class ConversionJobsConfig(BaseModel):
+    # conversions running at the same time, each one occupies a worker thread
+    workers: int = 2
+    # submissions beyond this number of unfinished jobs are rejected
+    max_unfinished_jobs: int = 1000
+    # finished jobs can be polled for this long
+    result_ttl_seconds: float = 3600
+
+
+class ConversionJobs(BaseSingleton):
+    """
+    Runs conversions as jobs on a bounded thread pool, off the event loop of the API.
+    A submission of a file that is already pending or running returns that job.
+    All methods must be called from the same event loop.
+    """
+
+    _converter: ConvertFileToMarkdown
+    _config: ConversionJobsConfig
+    _executor: ThreadPoolExecutor
+    _jobs: dict[str, ConversionJob]
+    _tasks: dict[str, asyncio.Task[None]]
+    _in_flight: dict[tuple[str, str, str], str]
+    _errors: dict[str, Exception]
+    tracer: trace.Tracer
+
+    def _init_once(
+        self,
+        converter: ConvertFileToMarkdown,
+        config: ConversionJobsConfig | None = None,
+    ):
+        logger.info("created ConversionJobs Usecase")
+        self._converter = converter
+        self._config = config or ConversionJobsConfig()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._config.workers, thread_name_prefix="conversion"
+        )
+        self._jobs = {}
+        self._tasks = {}
+        self._in_flight = {}
+        self._errors = {}
+        self.tracer = trace.get_tracer("ConversionJobs")
+
+        meter = metrics.get_meter("conversion_jobs")
+        self._submitted_counter = meter.create_counter(
+            name="conversion.jobs.submitted",
+            unit="1",
+            description="Conversion jobs accepted",
+        )
+        self._deduplicated_counter = meter.create_counter(
+            name="conversion.jobs.deduplicated",
+            unit="1",
+            description="Submissions answered with an in-flight job",
+        )
+
+    def _reset(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(
+        self, source_bucket: str, destination_bucket: str, filename: str
+    ) -> Result[ConversionJob]:
+        self._prune()
+        key = (source_bucket, destination_bucket, filename)
+        in_flight_id = self._in_flight.get(key)
+        if in_flight_id is not None:
+            self._deduplicated_counter.add(1)
+            return Result.Ok(self._jobs[in_flight_id])
+
+        if len(self._in_flight) >= self._config.max_unfinished_jobs:
+            return Result.Err(
+                TooManyJobsException(
+                    f"{len(self._in_flight)} conversions are waiting, try again later"
+                )
+            )
+
+        job = ConversionJob(
+            id=str(uuid.uuid4()),
+            filename=filename,
+            source_bucket=source_bucket,
+            destination_bucket=destination_bucket,
+            submitted_at=time.time(),
+        )
+        self._jobs[job.id] = job
+        self._in_flight[key] = job.id
+        self._tasks[job.id] = asyncio.create_task(self._run(job, key))
+        self._submitted_counter.add(1)
+        logger.info(f"submitted conversion job {job.id} for {filename}")
+        return Result.Ok(job)
+
+    async def convert(
+        self, source_bucket: str, destination_bucket: str, filename: str
+    ) -> Result[UploadedFiles]:
+        """Submits a job and waits for it, the error of a failed job is returned as raised."""
+        submit_result = self.submit(source_bucket, destination_bucket, filename)
+        if submit_result.is_error():
+            return submit_result.propagate_exception()
+        job = await self.wait(submit_result.get_ok().id, timeout=None)
+        assert job is not None and job.is_finished()
+        if job.status == ConversionJobStatus.FAILED:
+            return Result.Err(self._errors.get(job.id, RuntimeError(job.error)))
+        return Result.Ok(UploadedFiles(job.pages or []))
+
+    def get(self, job_id: str) -> ConversionJob | None:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float | None) -> ConversionJob | None:
+        """Returns the job once it is finished or *timeout* seconds passed."""
+        job = self._jobs.get(job_id)
+        if job is None or job.is_finished():
+            return job
+        task = self._tasks.get(job_id)
+        if task is not None:
+            # shield, a client that gives up must not cancel the conversion
+            done, _ = await asyncio.wait([asyncio.shield(task)], timeout=timeout)
+            if not done:
+                logger.debug(f"job {job_id} still running after {timeout}s")
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: ConversionJob, key: tuple[str, str, str]):
+        loop = asyncio.get_running_loop()
+        try:
+            job.status = ConversionJobStatus.RUNNING
+            with self.tracer.start_as_current_span("conversion-job"):
+                result = await loop.run_in_executor(
+                    self._executor,
+                    lambda: self._converter.convert_file(
+                        source_bucket=job.source_bucket,
+                        destination_bucket=job.destination_bucket,
+                        filename=job.filename,
+                    ),
+                )
+            if result.is_error():
+                self._fail(job, result.get_error())
+            else:
+                job.pages = result.get_ok().root
+                job.status = ConversionJobStatus.DONE
+        except Exception as e:
+            logger.error(f"conversion job {job.id} crashed", exc_info=True)
+            self._fail(job, e)
+        finally:
+            job.finished_at = time.time()
+            self._in_flight.pop(key, None)
+            self._tasks.pop(job.id, None)
+            logger.info(f"conversion job {job.id} {job.status.value}")
+
+    def _fail(self, job: ConversionJob, error: Exception):
+        self._errors[job.id] = error
+        job.error = f"{type(error).__name__}: {error}"
+        job.status = ConversionJobStatus.FAILED
+
+    def _prune(self):
+        deadline = time.time() - self._config.result_ttl_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < deadline
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._errors.pop(job_id, None)
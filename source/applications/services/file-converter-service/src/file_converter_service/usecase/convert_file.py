@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Iterable
 from core.result import Result
 from core.string_handler import str_to_bytes
 import logging
@@ -62,7 +63,7 @@ class ConvertFileToMarkdown(BaseSingleton):
         assert load_file
 
         suffixe = load_file.get_file_suffix()
-        pages: list[Page] | None = None
+        base_filename = load_file.filename.replace(f".{suffixe}", "")
         p = Path(load_file.filename)
         with self.tracer.start_as_current_span("write-file-to-tmp-file"):
             with tempfile.NamedTemporaryFile(
@@ -77,17 +78,27 @@ class ConvertFileToMarkdown(BaseSingleton):
                         convert_result = converter.convert_file(tmp.name)
                         if convert_result.is_error():
                             return convert_result.propagate_exception()
-                        pages = convert_result.get_ok()
-                        break
+                        # pages can be produced lazily from the tmp file,
+                        # they are uploaded one by one before it is removed
+                        try:
+                            return self._upload_pages(
+                                pages=convert_result.get_ok(),
+                                base_filename=base_filename,
+                                destination_bucket=destination_bucket,
+                            )
+                        except Exception as e:
+                            logger.error(e, exc_info=True)
+                            return Result.Err(e)
 
-        if pages is None:
-            return Result.Err(
-                NotFoundException(
-                    f"Did not find any file converter that could convert {suffixe}"
-                )
+        return Result.Err(
+            NotFoundException(
+                f"Did not find any file converter that could convert {suffixe}"
             )
+        )
 
-        base_filename = load_file.filename.replace(f".{suffixe}", "")
+    def _upload_pages(
+        self, pages: Iterable[Page], base_filename: str, destination_bucket: str
+    ) -> Result[UploadedFiles]:
         uploaded_files: list[PageLite] = []
 
         with self.tracer.start_as_current_span("uploade-files"):
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+from core.logger import init_logging
+from core.model import NotFoundException
+from core.result import Result
+from core.singelton import SingletonMeta
+from domain.file_converter.model import PageLite
+from domain_test import AsyncTestBase
+
+from file_converter_service.usecase.conversion_jobs import (
+    ConversionJobs,
+    ConversionJobsConfig,
+    ConversionJobStatus,
+    TooManyJobsException,
+)
+from file_converter_service.usecase.convert_file import UploadedFiles
+
+init_logging("info")
+
+
+class TestConversionJobs(AsyncTestBase):
+    __test__ = True
+
+    def setup_method_sync(self, test_name: str):
+        self.release = threading.Event()
+        self.converter = Mock()
+        self.converter.convert_file.side_effect = self._convert
+        self.jobs = ConversionJobs.create(
+            converter=self.converter,
+            config=ConversionJobsConfig(workers=2, max_unfinished_jobs=3),
+        )
+
+    def teardown_method_sync(self, test_name: str):
+        self.release.set()
+        self.jobs._reset()
+        SingletonMeta.clear_all()
+
+    def _convert(
+        self, source_bucket: str, destination_bucket: str, filename: str
+    ) -> Result[UploadedFiles]:
+        self.release.wait(timeout=5)
+        if filename.startswith("missing"):
+            return Result.Err(NotFoundException(f"File {filename} not found"))
+        return Result.Ok(UploadedFiles([PageLite(page_number=0, fragments=[])]))
+
+    async def test_identical_submissions_share_one_job(self):
+        first = self.jobs.submit("src", "dest", "a.pdf").get_ok()
+        second = self.jobs.submit("src", "dest", "a.pdf").get_ok()
+        other = self.jobs.submit("src", "dest", "b.pdf").get_ok()
+        assert first.id == second.id
+        assert first.id != other.id
+
+        self.release.set()
+        job = await self.jobs.wait(first.id, timeout=5)
+        assert job is not None and job.status == ConversionJobStatus.DONE
+        assert job.pages is not None and len(job.pages) == 1
+        await self.jobs.wait(other.id, timeout=5)
+        assert self.converter.convert_file.call_count == 2
+
+        # a finished job is not reused, the file may have changed since
+        again = self.jobs.submit("src", "dest", "a.pdf").get_ok()
+        assert again.id != first.id
+
+    async def test_wait_returns_after_the_timeout(self):
+        job = self.jobs.submit("src", "dest", "a.pdf").get_ok()
+        start = time.perf_counter()
+        polled = await self.jobs.wait(job.id, timeout=0.1)
+        assert time.perf_counter() - start < 1
+        assert polled is not None and not polled.is_finished()
+
+        # the timed out wait did not cancel the conversion
+        self.release.set()
+        polled = await self.jobs.wait(job.id, timeout=5)
+        assert polled is not None and polled.status == ConversionJobStatus.DONE
+
+    async def test_failed_job_keeps_the_error(self):
+        self.release.set()
+        result = await self.jobs.convert("src", "dest", "missing.pdf")
+        assert result.is_error()
+        assert isinstance(result.get_error(), NotFoundException)
+
+        job = self.jobs.submit("src", "dest", "missing.pdf").get_ok()
+        job = await self.jobs.wait(job.id, timeout=5)
+        assert job is not None and job.status == ConversionJobStatus.FAILED
+        assert job.error is not None and "missing.pdf" in job.error
+
+    async def test_submissions_beyond_the_limit_are_rejected(self):
+        for i in range(3):
+            assert self.jobs.submit("src", "dest", f"{i}.pdf").is_ok()
+        result = self.jobs.submit("src", "dest", "3.pdf")
+        assert result.is_error()
+        assert isinstance(result.get_error(), TooManyJobsException)
+
+        self.release.set()
+        while self.converter.convert_file.call_count < 3 or self.jobs._in_flight:
+            await asyncio.sleep(0.01)
+        assert self.jobs.submit("src", "dest", "3.pdf").is_ok()
+
+    async def test_unknown_job(self):
+        assert self.jobs.get("unknown") is None
+        assert await self.jobs.wait("unknown", timeout=1) is None
@@ -1 +1,2 @@
 pytest tests/service_test.py
+pytest tests/conversion_jobs_test.py
@@ -1,3 +1,5 @@
+import asyncio
+
 from core.result import Result
 from core.string_handler import to_str
 from domain.database.config.model import RagEmbeddingConfig
@@ -6,6 +8,7 @@ from core.singelton import BaseSingleton
 from core.model import NotFoundException
 from domain.database import BaseModel
 from domain.file_converter.model import (
+    DocumentFragement,
     FragementLite,
     FragementTypes,
     Page,
@@ -31,6 +34,16 @@ class EmbedDoc(BaseModel):
 
 class EmbeddFilePiplineUsecaseConfig(BaseModel):
     consider_images: bool = True
+    # fragments fetched from the storage at the same time
+    parallel_downloads: int = 8
+    # fetched content waiting to be indexed
+    max_buffered_bytes: int = 32 * 1024 * 1024
+    # pages indexed at the same time, keeps an indexer with internal concurrency
+    # (e.g. the parallel OpenIE requests of HippoRAG) busy across page boundaries
+    parallel_pages: int = 4
+
+
+_FetchedFragement = tuple[DocumentFragement, int]
 
 
 class EmbeddFilePiplineUsecase(BaseSingleton):
@@ -66,7 +79,6 @@ class EmbeddFilePiplineUsecase(BaseSingleton):
         file_id: str,
     ) -> Result[None]:
         pages: list[PageLite] = []
-        pages_document: list[Page] = []
 
         with self.tracer.start_as_current_span("fetch-fragements-from-database"):
             result = await self._file_database.get(id=file_id)
@@ -115,40 +127,188 @@ class EmbeddFilePiplineUsecase(BaseSingleton):
         }
         collection: str = f"{file.metadata.project_id}-{self._embed_config.id}"
 
-        with self.tracer.start_as_current_span("fetch-fragements-from-storage"):
-            for page in pages:
-                page_document = Page(document_fragements=[])
+        with self.tracer.start_as_current_span("index-pages"):
+            return await self._index_pages(
+                pages=pages,
+                bucket=file.metadata.project_id,
+                metadata=metadata,
+                collection=collection,
+            )
+
+    async def _index_pages(
+        self,
+        pages: list[PageLite],
+        bucket: str,
+        metadata: dict[str, str | int | float],
+        collection: str,
+    ) -> Result[None]:
+        """
+        Indexes up to parallel_pages pages at a time while the fragments of the next pages are fetched.
+        Fetching pauses while more than max_buffered_bytes wait to be indexed.
+        """
+        downloads = asyncio.Semaphore(self._config.parallel_downloads)
+        indexing = asyncio.Semaphore(self._config.parallel_pages)
+        buffer = _ContentBuffer(self._config.max_buffered_bytes)
+        fetched: asyncio.Queue[list[asyncio.Task[Result[_FetchedFragement]]]] = (
+            asyncio.Queue()
+        )
+        tasks: list[asyncio.Task[Result[_FetchedFragement]]] = []
+        index_tasks: list[asyncio.Task[Result[None]]] = []
+
+        async def fetch_in_order():
+            # one fragment after another, a later page never overtakes an earlier one
+            for page_number, page in enumerate(pages):
+                page_tasks: list[asyncio.Task[Result[_FetchedFragement]]] = []
                 for fragement in page.fragments:
-                    with self.tracer.start_as_current_span(
-                        f"fetch-{fragement.filename}"
-                    ):
-                        if fragement.fragement_type == FragementTypes.IMAGE:
-                            continue
-                        fetched_page_result = self._file_storage.fetch_file(
-                            filename=fragement.filename, bucket=file.metadata.project_id
-                        )
-                        if fetched_page_result.is_error():
-                            return fetched_page_result.propagate_exception()
-                        fetched_page = fetched_page_result.get_ok()
-                        if fetched_page is None:
-                            return Result.Err(
-                                NotFoundException(
-                                    f"Page with the name {page} not found in {file.metadata.project_id}"
-                                )
-                            )
-                        if fragement.fragement_type == FragementTypes.TABEL:
-                            page_document.document_fragements.append(
-                                TableFragement(full_tabel=to_str(fetched_page.content))
-                            )
-                        if fragement.fragement_type == FragementTypes.TEXT:
-                            page_document.document_fragements.append(
-                                TextFragement(text=to_str(fetched_page.content))
-                            )
+                    if fragement.fragement_type == FragementTypes.IMAGE:
+                        continue
+                    await buffer.wait_for_room(page_number)
+                    await downloads.acquire()
+                    task = asyncio.create_task(
+                        self._fetch_fragement(fragement, bucket, downloads, buffer)
+                    )
+                    page_tasks.append(task)
+                    tasks.append(task)
+                await fetched.put(page_tasks)
+
+        def first_error() -> Result[None] | None:
+            for task in index_tasks:
+                if task.done() and task.result().is_error():
+                    return task.result()
+            return None
+
+        producer = asyncio.create_task(fetch_in_order())
+        try:
+            for page_number in range(len(pages)):
+                page_results = await asyncio.gather(*(await fetched.get()))
+                page_document = Page(document_fragements=[])
+                page_size = 0
+                for page_result in page_results:
+                    if page_result.is_error():
+                        return page_result.propagate_exception()
+                    fragement, size = page_result.get_ok()
+                    page_document.document_fragements.append(fragement)
+                    page_size += size
                 logger.debug(page_document)
-                pages_document.append(page_document)
 
-        with self.tracer.start_as_current_span("insert-document in indexer store"):
+                await indexing.acquire()
+                error = first_error()
+                if error is not None:
+                    indexing.release()
+                    return error
+                index_tasks.append(
+                    asyncio.create_task(
+                        self._index_page(
+                            page_document,
+                            page_number,
+                            page_size,
+                            metadata,
+                            collection,
+                            indexing,
+                            buffer,
+                        )
+                    )
+                )
+                await buffer.start_page(page_number + 1)
+
+            for result in await asyncio.gather(*index_tasks):
+                if result.is_error():
+                    return result
+            return Result.Ok()
+        finally:
+            for task in [producer, *tasks, *index_tasks]:
+                task.cancel()
+            await asyncio.gather(
+                producer, *tasks, *index_tasks, return_exceptions=True
+            )
+
+    async def _index_page(
+        self,
+        page_document: Page,
+        page_number: int,
+        page_size: int,
+        metadata: dict[str, str | int | float],
+        collection: str,
+        indexing: asyncio.Semaphore,
+        buffer: "_ContentBuffer",
+    ) -> Result[None]:
+        try:
+            if not page_document.document_fragements:
+                return Result.Ok()
             return await self._vectore_store.create_document(
-                doc=Document(id="", content=pages_document, metadata=metadata),
+                doc=Document(
+                    id="",
+                    content=[page_document],
+                    metadata=metadata,
+                    page_offset=page_number,
+                ),
                 collection=collection,
             )
+        finally:
+            indexing.release()
+            await buffer.release(page_size)
+
+    async def _fetch_fragement(
+        self,
+        fragement: FragementLite,
+        bucket: str,
+        downloads: asyncio.Semaphore,
+        buffer: "_ContentBuffer",
+    ) -> Result[_FetchedFragement]:
+        try:
+            with self.tracer.start_as_current_span(f"fetch-{fragement.filename}"):
+                # the storage client is blocking
+                fetched_result = await asyncio.to_thread(
+                    self._file_storage.fetch_file,
+                    filename=fragement.filename,
+                    bucket=bucket,
+                )
+        finally:
+            downloads.release()
+        if fetched_result.is_error():
+            return fetched_result.propagate_exception()
+        fetched = fetched_result.get_ok()
+        if fetched is None:
+            return Result.Err(
+                NotFoundException(
+                    f"Fragement with the name {fragement.filename} not found in {bucket}"
+                )
+            )
+        size = len(fetched.content)
+        await buffer.add(size)
+        if fragement.fragement_type == FragementTypes.TABEL:
+            return Result.Ok((TableFragement(full_tabel=to_str(fetched.content)), size))
+        return Result.Ok((TextFragement(text=to_str(fetched.content)), size))
+
+
+class _ContentBuffer:
+    """
+    Bytes fetched but not indexed yet.
+    Fetches for later pages wait while it is full, the page collected for indexing never waits.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._size = 0
+        self._collecting = 0
+        self._changed = asyncio.Condition()
+
+    async def wait_for_room(self, page_number: int):
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self._size < self._limit or page_number <= self._collecting
+            )
+
+    async def add(self, size: int):
+        async with self._changed:
+            self._size += size
+
+    async def start_page(self, page_number: int):
+        async with self._changed:
+            self._collecting = page_number
+            self._changed.notify_all()
+
+    async def release(self, size: int):
+        async with self._changed:
+            self._size -= size
+            self._changed.notify_all()
@@ -1,7 +1,9 @@
 # tests/test_embedd_file_pipline_usecase.py
 from unittest.mock import AsyncMock, Mock
 from datetime import datetime
+import asyncio
 import logging
+import time
 
 from core.singelton import SingletonMeta
 from core.result import Result
@@ -29,9 +31,134 @@ from file_embedding_pipline_service.usecase.embbeding_document import (
 )
 
 from domain_test import AsyncTestBase
+from core.logger import init_logging
 
+init_logging("info")
 logger = logging.getLogger(__name__)
 
+FRAGMENT_SIZE = 10 * 1024
+
+
+class FakeStorage:
+    """Blocking storage with a fixed latency per fetch, like the minio client."""
+
+    def __init__(self, latency: float, indexer: "FakeIndexer"):
+        self.latency = latency
+        self.indexer = indexer
+        self.fetched_bytes = 0
+        self.max_buffered_bytes = 0
+
+    def fetch_file(self, filename: str, bucket: str) -> Result[FileStorageObject | None]:
+        time.sleep(self.latency)
+        self.fetched_bytes += FRAGMENT_SIZE
+        self.max_buffered_bytes = max(
+            self.max_buffered_bytes, self.fetched_bytes - self.indexer.indexed_bytes
+        )
+        return Result.Ok(
+            FileStorageObject(
+                filetype="text/markdown",
+                content=b"x" * FRAGMENT_SIZE,
+                bucket=bucket,
+                filename=filename,
+            )
+        )
+
+
+class FakeIndexer:
+    """Indexer whose latency grows with the fragments of the document."""
+
+    def __init__(self, latency: float, latency_per_fragment: float):
+        self.latency = latency
+        self.latency_per_fragment = latency_per_fragment
+        self.indexed_bytes = 0
+        self.pages: list[int] = []
+
+    async def create_document(
+        self, doc: Document, collection: str | None = None
+    ) -> Result[None]:
+        assert isinstance(doc.content, list)
+        fragments = [f for page in doc.content for f in page.document_fragements]
+        await asyncio.sleep(self.latency + self.latency_per_fragment * len(fragments))
+        self.indexed_bytes += sum(len(getattr(f, "text", "")) for f in fragments)
+        self.pages.extend(doc.page_offset + i for i in range(len(doc.content)))
+        return Result.Ok(None)
+
+
+class ConcurrentFakeIndexer(FakeIndexer):
+    """
+    Indexer that sends one request per fragment, at most `slots` at a time,
+    like the parallel OpenIE requests of HippoRAG.
+    """
+
+    def __init__(self, latency_per_fragment: float, slots: int):
+        super().__init__(latency=0, latency_per_fragment=latency_per_fragment)
+        self._slots = asyncio.Semaphore(slots)
+        self.active = 0
+        self.max_active = 0
+
+    async def _request(self, fragment) -> None:
+        async with self._slots:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            await asyncio.sleep(self.latency_per_fragment)
+            self.active -= 1
+        self.indexed_bytes += len(getattr(fragment, "text", ""))
+
+    async def create_document(
+        self, doc: Document, collection: str | None = None
+    ) -> Result[None]:
+        assert isinstance(doc.content, list)
+        fragments = [f for page in doc.content for f in page.document_fragements]
+        await asyncio.gather(*(self._request(f) for f in fragments))
+        self.pages.extend(doc.page_offset + i for i in range(len(doc.content)))
+        return Result.Ok(None)
+
+
+def build_file(metadata: FileMetadata, pages: int, fragments_per_page: int) -> File:
+    return File(
+        id="large",
+        filepath="/fake/large.pdf",
+        filename="large.pdf",
+        bucket="bucket123",
+        metadata=metadata,
+        pages=[
+            FilePage(
+                bucket="bucket123",
+                page_number=page_number,
+                metadata=PageMetadata(**metadata.model_dump()),
+                fragements=[
+                    PageFragement(
+                        fragement_type=FragementTypesDB.TEXT,
+                        storage_filename=f"page_{page_number}_{number}.md",
+                        fragement_number=number,
+                    )
+                    for number in range(fragments_per_page)
+                ],
+            )
+            for page_number in range(pages)
+        ],
+    )
+
+
+async def legacy_embedd_file(file: File, storage: FakeStorage, indexer: FakeIndexer):
+    """The embedding as it was, every fragment fetched in turn, then one document."""
+    pages: list[Page] = []
+    for page in file.pages:
+        page_document = Page(document_fragements=[])
+        for fragement in page.fragements:
+            fetched = storage.fetch_file(
+                filename=fragement.storage_filename, bucket=file.metadata.project_id
+            ).get_ok()
+            assert fetched is not None
+            page_document.document_fragements.append(
+                TextFragement(text=fetched.content.decode())
+            )
+        pages.append(page_document)
+    result = await indexer.create_document(
+        doc=Document(id="", content=pages, metadata={}), collection="collection"
+    )
+    assert result.is_ok()
+
 
 class TestEmbeddFilePiplineUsecase(AsyncTestBase):
     __test__ = True
@@ -211,3 +338,112 @@ class TestEmbeddFilePiplineUsecase(AsyncTestBase):
         assert isinstance(page.document_fragements[0], TextFragement)
         assert isinstance(page.document_fragements[1], TableFragement)
         # Third is image; depending on your use case it may be skipped or included.
+
+    # ------------------------------------------------------------- pipeline
+    def _pipeline_usecase(
+        self, storage: FakeStorage, indexer: FakeIndexer, **config
+    ) -> EmbeddFilePiplineUsecase:
+        SingletonMeta.clear_all()
+        return EmbeddFilePiplineUsecase.create(
+            file_storage=storage,
+            vectore_store=indexer,
+            file_database=self.mock_db,
+            config=EmbeddFilePiplineUsecaseConfig(**config),
+            embed_config=RagEmbeddingConfig(
+                id="", chunk_size=0, chunk_overlap=0, addition_information={}, models={}
+            ),
+        )
+
+    async def test_buffered_content_is_capped(self):
+        indexer = FakeIndexer(latency=0.02, latency_per_fragment=0)
+        storage = FakeStorage(latency=0, indexer=indexer)
+        usecase = self._pipeline_usecase(
+            storage, indexer, parallel_downloads=4, max_buffered_bytes=20 * FRAGMENT_SIZE
+        )
+        self.mock_db.get.return_value = Result.Ok(
+            build_file(self.metadata, pages=20, fragments_per_page=5)
+        )
+
+        result = await usecase.embedd_file("large")
+
+        assert result.is_ok()
+        # pages are indexed in parallel and may finish out of order
+        assert sorted(indexer.pages) == list(range(20))
+        assert storage.fetched_bytes == indexer.indexed_bytes == 100 * FRAGMENT_SIZE
+        # the cap is soft by the downloads in flight and the page collected for indexing
+        assert storage.max_buffered_bytes <= (20 + 4 + 5) * FRAGMENT_SIZE
+
+    async def test_benchmark_1000_fragments(self):
+        """Files per minute of a file with 1,000 fragments, sequential against pipelined."""
+        file = build_file(self.metadata, pages=100, fragments_per_page=10)
+        self.mock_db.get.return_value = Result.Ok(file)
+        measured: dict[str, float] = {}
+
+        indexer = FakeIndexer(latency=0.01, latency_per_fragment=0.0005)
+        storage = FakeStorage(latency=0.005, indexer=indexer)
+        start = time.perf_counter()
+        await legacy_embedd_file(file, storage, indexer)
+        measured["before"] = 60 / (time.perf_counter() - start)
+
+        indexer = FakeIndexer(latency=0.01, latency_per_fragment=0.0005)
+        storage = FakeStorage(latency=0.005, indexer=indexer)
+        usecase = self._pipeline_usecase(storage, indexer, parallel_downloads=8)
+        start = time.perf_counter()
+        result = await usecase.embedd_file("large")
+        measured["after"] = 60 / (time.perf_counter() - start)
+
+        assert result.is_ok()
+        assert indexer.indexed_bytes == 1000 * FRAGMENT_SIZE
+        logger.info(
+            f"1000 fragments: before {measured['before']:.1f} files/minute, "
+            f"after {measured['after']:.1f} files/minute"
+        )
+        assert measured["after"] > 2 * measured["before"]
+
+    async def test_index_errors_stop_the_pipeline(self):
+        indexer = FakeIndexer(latency=0.01, latency_per_fragment=0)
+        indexer.create_document = AsyncMock(  # type: ignore[method-assign]
+            return_value=Result.Err(Exception("index failed"))
+        )
+        storage = FakeStorage(latency=0, indexer=indexer)
+        usecase = self._pipeline_usecase(storage, indexer, parallel_pages=2)
+        self.mock_db.get.return_value = Result.Ok(
+            build_file(self.metadata, pages=20, fragments_per_page=2)
+        )
+
+        result = await usecase.embedd_file("large")
+
+        assert result.is_error()
+        # no more pages are handed to the indexer after the first failure showed up
+        assert indexer.create_document.await_count < 20
+
+    async def test_benchmark_parallel_pages(self):
+        """Files per minute against an indexer with internal concurrency, one page against several pages in flight."""
+        file = build_file(self.metadata, pages=100, fragments_per_page=10)
+        self.mock_db.get.return_value = Result.Ok(file)
+        measured: dict[int, float] = {}
+        max_active: dict[int, int] = {}
+
+        for parallel_pages in [1, 4]:
+            indexer = ConcurrentFakeIndexer(latency_per_fragment=0.01, slots=64)
+            storage = FakeStorage(latency=0, indexer=indexer)
+            usecase = self._pipeline_usecase(
+                storage, indexer, parallel_downloads=8, parallel_pages=parallel_pages
+            )
+            start = time.perf_counter()
+            result = await usecase.embedd_file("large")
+            measured[parallel_pages] = 60 / (time.perf_counter() - start)
+            max_active[parallel_pages] = indexer.max_active
+
+            assert result.is_ok()
+            assert indexer.indexed_bytes == 1000 * FRAGMENT_SIZE
+            assert sorted(indexer.pages) == list(range(100))
+
+        logger.info(
+            f"1000 fragments, 64 indexer slots: 1 page {measured[1]:.1f} files/minute "
+            f"({max_active[1]} requests in flight), 4 pages {measured[4]:.1f} files/minute "
+            f"({max_active[4]} requests in flight)"
+        )
+        # a single page never fills the slots of the indexer
+        assert max_active[1] == 10
+        assert max_active[4] > 10
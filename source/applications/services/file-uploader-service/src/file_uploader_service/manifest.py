@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import os
+from typing import NamedTuple
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestEntry(BaseModel):
+    path: str
+    size: int
+    mtime_ns: int
+    hash: str
+    version: int
+
+
+class _Record(NamedTuple):
+    size: int
+    mtime_ns: int
+    hash: str
+    version: int
+
+
+class UploadManifest:
+    """
+    Local record of the files that were uploaded, one JSON line per file.
+    A file whose size, mtime and application version match its entry is
+    skipped without being read or looked up in the database.
+    """
+
+    _path: str
+    # plain tuples, a model per file costs several times the memory on large trees
+    _entries: dict[str, _Record]
+
+    def __init__(self, path: str, entries: list[ManifestEntry] | None = None):
+        self._path = path
+        self._entries = {}
+        for entry in entries or []:
+            self.put(entry)
+
+    @classmethod
+    def load(cls, path: str) -> "UploadManifest":
+        manifest = cls(path)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as manifest_file:
+                for line in manifest_file:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = ManifestEntry.model_validate_json(line)
+                    except ValueError:
+                        # a broken line only costs a rehash of that file
+                        logger.warning(f"skipped invalid manifest line in {path}")
+                        continue
+                    manifest.put(entry)
+        return manifest
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str) -> ManifestEntry | None:
+        record = self._entries.get(path)
+        if record is None:
+            return None
+        return ManifestEntry(path=path, **record._asdict())
+
+    def put(self, entry: ManifestEntry):
+        self._entries[entry.path] = _Record(
+            size=entry.size,
+            mtime_ns=entry.mtime_ns,
+            hash=entry.hash,
+            version=entry.version,
+        )
+
+    def prune(self, paths: set[str]) -> int:
+        """Removes the entries of files that are not in *paths*, returns how many."""
+        removed = [path for path in self._entries if path not in paths]
+        for path in removed:
+            del self._entries[path]
+        return len(removed)
+
+    def is_unchanged(self, path: str, size: int, mtime_ns: int, version: int) -> bool:
+        record = self._entries.get(path)
+        return (
+            record is not None
+            and record.size == size
+            and record.mtime_ns == mtime_ns
+            and record.version >= version
+        )
+
+    def save(self):
+        """Replaces the manifest file atomically, a crash keeps the previous one."""
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            for path in self._entries:
+                entry = self.get(path)
+                assert entry is not None
+                manifest_file.write(entry.model_dump_json())
+                manifest_file.write("\n")
+        os.replace(tmp_path, self._path)
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """sha256 of the file content, read in chunks of *chunk_size* bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as content:
+        while chunk := content.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,8 +1,10 @@
+import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import os
 from core.hash import compute_mdhash_id
-from typing import Tuple
+from typing import Awaitable, Callable, Iterator, NamedTuple, Tuple
 from domain.database.project.model import Project
 from opentelemetry import trace
 from pathlib import Path
@@ -13,11 +15,14 @@ from domain.storage.interface import FileStorage
 from domain.storage import get_content_type
 from domain.storage.model import FileStorageObject, FileStorageObjectMetadata
 from domain.database.file.interface import FileDatabase
-from domain.database.file.model import File, FileMetadata
+from domain.database.file.model import File, FileHeader, FileMetadata
 from domain.database.project.interface import ProjectDatabase
-from pydantic import RootModel
+from pydantic import BaseModel, RootModel
 
 from file_uploader_service.defaults import DEFAULT_PROJECT_NAME
+from file_uploader_service.manifest import ManifestEntry, UploadManifest, hash_file
+
+CONTENT_HASH_KEY = "content_hash"
 
 
 class UploadedFiles(RootModel[list[str]]): ...
@@ -30,6 +35,30 @@ class ReasonForUpdate(Enum):
     NoReasonForUpdate = "NoReasonForUpdate"
 
 
+class IncrementalUploadConfig(BaseModel):
+    # defaults to .upload_manifest.jsonl inside the root dir
+    manifest_path: str | None = None
+    # files hashed and uploaded at the same time
+    concurrency: int = 8
+    # paths looked up in the file database per query
+    db_batch_size: int = 500
+    read_chunk_size: int = 1024 * 1024
+
+
+class LocalFile(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+
+
+@dataclass
+class _UploadRun:
+    manifest: UploadManifest
+    semaphore: asyncio.Semaphore
+    project_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    project_ids: dict[str, str] = field(default_factory=dict)
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,6 +76,7 @@ class UploadeFilesUsecase(BaseSingleton):
     supported_file_types: list[str]
     root_dir: str
     application_version: int
+    upload_config: IncrementalUploadConfig
     tracer: trace.Tracer
 
     def _init_once(
@@ -57,6 +87,7 @@ class UploadeFilesUsecase(BaseSingleton):
         supported_file_types: list[str],
         root_dir: str,
         application_version: int,
+        upload_config: IncrementalUploadConfig | None = None,
     ):
         logger.info("created UploadFiles Usecase")
         logger.info(
@@ -69,6 +100,7 @@ class UploadeFilesUsecase(BaseSingleton):
         self.root_dir = root_dir
         self.application_version = application_version
         self.project_database = project_database
+        self.upload_config = upload_config or IncrementalUploadConfig()
 
     def get_all_files_from_root_dir(self) -> list[str]:
         with self.tracer.start_as_current_span("read-all-existing-files"):
@@ -87,7 +119,9 @@ class UploadeFilesUsecase(BaseSingleton):
     async def should_file_be_uploaded(
         self, filepath: str
     ) -> Result[Tuple[bool, ReasonForUpdate]]:
-        fetched_file_result = await self.file_database.fetch_by_path(path=filepath)
+        fetched_file_result = await self.file_database.fetch_header_by_path(
+            path=filepath
+        )
         if fetched_file_result.is_error():
             return fetched_file_result.propagate_exception()
 
@@ -123,25 +157,10 @@ class UploadeFilesUsecase(BaseSingleton):
 
         existing_file = result.get_ok()
 
-        result_project = await self.project_database.fetch_by_name(project_name)
+        result_project = await self._resolve_project(project_name)
         if result_project.is_error():
             return result_project.propagate_exception()
-
-        project_optional = result_project.get_ok()
-        if project_optional:
-            project_id = project_optional.id
-        else:
-            project = Project(
-                id="",
-                version=self.application_version,
-                year=0,
-                name=project_name,
-                address=None,
-            )
-            result_create = await self.project_database.create(obj=project)
-            if result_create.is_error():
-                return result_create.propagate_exception()
-            project_id = result_create.get_ok()
+        project_id = result_project.get_ok()
 
         file = File(
             id="",
@@ -159,6 +178,49 @@ class UploadeFilesUsecase(BaseSingleton):
             pages=[],
         )
 
+        async def store(db_id: str) -> Result[None]:
+            return self.file_storage.upload_file(
+                file=self._build_file_storage_object(
+                    filename=filename,
+                    data=content,
+                    destination_bucket=project_id,
+                    db_id=db_id,
+                )
+            )
+
+        return await self._save_file(file=file, existing_file=existing_file, store=store)
+
+    async def _resolve_project(self, project_name: str) -> Result[str]:
+        result_project = await self.project_database.fetch_by_name(project_name)
+        if result_project.is_error():
+            return result_project.propagate_exception()
+
+        project_optional = result_project.get_ok()
+        if project_optional:
+            return Result.Ok(project_optional.id)
+
+        project = Project(
+            id="",
+            version=self.application_version,
+            year=0,
+            name=project_name,
+            address=None,
+        )
+        result_create = await self.project_database.create(obj=project)
+        if result_create.is_error():
+            return result_create.propagate_exception()
+        return Result.Ok(result_create.get_ok())
+
+    async def _save_file(
+        self,
+        file: File,
+        existing_file: File | None,
+        store: Callable[[str], Awaitable[Result[None]]],
+    ) -> Result[str]:
+        """
+        Creates or updates the database entry, then stores the content.
+        The entry is rolled back if storing fails.
+        """
         if existing_file:
             file.id = existing_file.id
             result_db_action = await self.file_database.update(obj=file)
@@ -171,17 +233,10 @@ class UploadeFilesUsecase(BaseSingleton):
                 return result_db_action.propagate_exception()
             db_id = result_db_action.get_ok()
 
-        result = self.file_storage.upload_file(
-            file=self._build_file_storage_object(
-                filename=filename,
-                data=content,
-                destination_bucket=project_id,
-                db_id=db_id,
-            )
-        )
+        result = await store(db_id)
         if result.is_error():
             logger.error(
-                f"Failed uploading file: {filepath} Error: {result.get_error()}"
+                f"Failed uploading file: {file.filepath} Error: {result.get_error()}"
             )
             if existing_file:
                 result_db_action = await self.file_database.update(obj=existing_file)
@@ -192,15 +247,11 @@ class UploadeFilesUsecase(BaseSingleton):
 
             return Result.Err(result.get_error())
 
-        logger.info(f"uploaded file: {filepath}")
+        logger.info(f"uploaded file: {file.filepath}")
         return Result.Ok(db_id)
 
     async def upload_file(self, filepath: str) -> Result[str]:
-        path_elemtens = Path(filepath).parts
-        project_name = DEFAULT_PROJECT_NAME
-
-        if len(path_elemtens) > 1:
-            project_name = path_elemtens[1]
+        project_name = self._project_name(filepath)
 
         try:
             with open(filepath, "rb") as file_content:
@@ -235,6 +286,230 @@ class UploadeFilesUsecase(BaseSingleton):
 
         return uploaded_file_results
 
+    # ------------------------------------------------------------------
+    # Incremental upload
+    # ------------------------------------------------------------------
+
+    async def upload_changed_files(self) -> list[Result[str]]:
+        """
+        Uploads new and changed files of the root dir.
+        Files that match their manifest entry are skipped without reading them,
+        the rest is looked up in the file database per batch and hashed and
+        uploaded by at most ``concurrency`` tasks, streaming from disk.
+        Returns one result per uploaded or failed file.
+        """
+        manifest = UploadManifest.load(self._manifest_path())
+        run = _UploadRun(
+            manifest=manifest,
+            semaphore=asyncio.Semaphore(self.upload_config.concurrency),
+        )
+        results: list[Result[str]] = []
+        with self.tracer.start_as_current_span("upload-changed-files"):
+            candidates = 0
+            removed = 0
+            seen: set[str] = set()
+            batch: list[LocalFile] = []
+            try:
+                # only the paths are kept, file content is read by the upload tasks
+                for local_file in self.scan_root_dir():
+                    seen.add(local_file.path)
+                    if manifest.is_unchanged(
+                        local_file.path,
+                        local_file.size,
+                        local_file.mtime_ns,
+                        self.application_version,
+                    ):
+                        continue
+                    candidates += 1
+                    batch.append(local_file)
+                    if len(batch) >= self.upload_config.db_batch_size:
+                        results.extend(await self._upload_batch(batch, run))
+                        batch = []
+                if batch:
+                    results.extend(await self._upload_batch(batch, run))
+                # only after a complete scan, files deleted from the root dir
+                removed = manifest.prune(seen)
+            finally:
+                manifest.save()
+            logger.info(
+                f"{candidates} new or changed files, {removed} removed, "
+                f"{len(manifest)} in manifest"
+            )
+        return results
+
+    def scan_root_dir(self) -> Iterator[LocalFile]:
+        """Supported files of the root dir with the size and mtime of one stat call."""
+        file_types = [file_type.lower() for file_type in self.supported_file_types]
+        directories = [self.root_dir]
+        while directories:
+            try:
+                entries = os.scandir(directories.pop())
+            except OSError as e:
+                logger.warning(f"Could not read directory: {e}")
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                        continue
+                    name = entry.name.lower()
+                    if not any(name.endswith(t) for t in file_types):
+                        continue
+                    try:
+                        stat_info = entry.stat()
+                    except OSError as e:
+                        logger.warning(f"Could not stat file: {e}")
+                        continue
+                    yield LocalFile(
+                        path=entry.path,
+                        size=stat_info.st_size,
+                        mtime_ns=stat_info.st_mtime_ns,
+                    )
+
+    def _manifest_path(self) -> str:
+        return self.upload_config.manifest_path or os.path.join(
+            self.root_dir, ".upload_manifest.jsonl"
+        )
+
+    async def _upload_batch(
+        self, batch: list[LocalFile], run: _UploadRun
+    ) -> list[Result[str]]:
+        fetched_result = await self.file_database.fetch_headers_by_paths(
+            paths=[local_file.path for local_file in batch]
+        )
+        if fetched_result.is_error():
+            return [Result.Err(fetched_result.get_error()) for _ in batch]
+
+        existing_files: dict[str, FileHeader] = {}
+        for fetched_file in fetched_result.get_ok():
+            existing_files.setdefault(fetched_file.filepath, fetched_file)
+
+        uploaded = await asyncio.gather(
+            *[
+                self._upload_changed_file(
+                    local_file, existing_files.get(local_file.path), run
+                )
+                for local_file in batch
+            ]
+        )
+        return [result for result in uploaded if result is not None]
+
+    async def _upload_changed_file(
+        self, local_file: LocalFile, existing_file: FileHeader | None, run: _UploadRun
+    ) -> Result[str] | None:
+        async with run.semaphore:
+            try:
+                content_hash = await asyncio.to_thread(
+                    hash_file, local_file.path, self.upload_config.read_chunk_size
+                )
+            except OSError as e:
+                return Result.Err(e)
+
+            reason = self._reason_for_update(local_file, existing_file, content_hash)
+            result: Result[str] | None = None
+            if reason != ReasonForUpdate.NoReasonForUpdate:
+                logger.debug(f"upload {local_file.path}: {reason.value}")
+                result = await self._upload_streamed(
+                    local_file, existing_file, content_hash, run
+                )
+                if result.is_error():
+                    return result
+
+            run.manifest.put(
+                ManifestEntry(
+                    path=local_file.path,
+                    size=local_file.size,
+                    mtime_ns=local_file.mtime_ns,
+                    hash=content_hash,
+                    version=self.application_version,
+                )
+            )
+            return result
+
+    def _reason_for_update(
+        self, local_file: LocalFile, existing_file: FileHeader | None, content_hash: str
+    ) -> ReasonForUpdate:
+        if existing_file is None:
+            return ReasonForUpdate.NotExisting
+        if existing_file.metadata.version < self.application_version:
+            return ReasonForUpdate.NewVersionOfApplication
+
+        stored_hash = existing_file.metadata.other_metadata.get(CONTENT_HASH_KEY)
+        if stored_hash is not None:
+            # a touched but unchanged file is not uploaded again
+            if stored_hash != content_hash:
+                return ReasonForUpdate.NewVersionOfFile
+            return ReasonForUpdate.NoReasonForUpdate
+
+        update_date = datetime.fromtimestamp(local_file.mtime_ns / 1e9)
+        if existing_file.metadata.file_updated < update_date:
+            return ReasonForUpdate.NewVersionOfFile
+        return ReasonForUpdate.NoReasonForUpdate
+
+    async def _project_id(self, project_name: str, run: _UploadRun) -> Result[str]:
+        async with run.project_lock:
+            if project_name not in run.project_ids:
+                result = await self._resolve_project(project_name)
+                if result.is_error():
+                    return result.propagate_exception()
+                run.project_ids[project_name] = result.get_ok()
+            return Result.Ok(run.project_ids[project_name])
+
+    async def _upload_streamed(
+        self,
+        local_file: LocalFile,
+        existing_file: FileHeader | None,
+        content_hash: str,
+        run: _UploadRun,
+    ) -> Result[str]:
+        filepath = local_file.path
+        filename = f"{compute_mdhash_id(filepath)}-{os.path.basename(filepath)}"
+
+        result_project = await self._project_id(self._project_name(filepath), run)
+        if result_project.is_error():
+            return result_project.propagate_exception()
+        project_id = result_project.get_ok()
+
+        create_date, update_date = self._get_creation_updatestemp(filepath=filepath)
+        file = File(
+            id="",
+            filepath=filepath,
+            filename=filename,
+            bucket=project_id,
+            metadata=FileMetadata(
+                project_id=project_id,
+                project_year=0,
+                version=self.application_version,
+                file_creation=create_date,
+                file_updated=update_date,
+                other_metadata={CONTENT_HASH_KEY: content_hash},
+            ),
+            pages=[],
+        )
+
+        async def store(db_id: str) -> Result[None]:
+            return await asyncio.to_thread(
+                self.file_storage.upload_from_path,
+                path=filepath,
+                filename=filename,
+                bucket=project_id,
+                filetype=get_content_type(filename),
+                metadata=FileStorageObjectMetadata(
+                    db_id=db_id,
+                    version=self.application_version,
+                ),
+            )
+
+        stored_file: File | None = None
+        if existing_file:
+            # the update replaces the pages, a rollback has to write them back
+            result_stored = await self.file_database.fetch_by_path(path=filepath)
+            if result_stored.is_error():
+                return result_stored.propagate_exception()
+            stored_file = result_stored.get_ok()
+
+        return await self._save_file(file=file, existing_file=stored_file, store=store)
+
     def _build_file_storage_object(
         self, filename: str, data: bytes, destination_bucket: str, db_id: str
     ) -> FileStorageObject:
@@ -249,6 +524,12 @@ class UploadeFilesUsecase(BaseSingleton):
             ),
         )
 
+    def _project_name(self, filepath: str) -> str:
+        path_elemtens = Path(filepath).parts
+        if len(path_elemtens) > 1:
+            return path_elemtens[1]
+        return DEFAULT_PROJECT_NAME
+
     def _get_creation_updatestemp(self, filepath: str) -> Tuple[datetime, datetime]:
         try:
             stat_info = os.stat(filepath)
@@ -0,0 +1,312 @@
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from core.logger import init_logging
+from core.result import Result
+from core.singelton import SingletonMeta
+from domain.database.file.model import (
+    File,
+    FileHeader,
+    FilePage,
+    FragementTypes,
+    PageFragement,
+    PageMetadata,
+)
+from domain.database.project.model import Project
+from domain.storage.model import FileStorageObject, FileStorageObjectMetadata
+from domain_test import AsyncTestBase
+
+from file_uploader_service.manifest import UploadManifest
+from file_uploader_service.usecase.upload_files import (
+    CONTENT_HASH_KEY,
+    IncrementalUploadConfig,
+    UploadeFilesUsecase,
+)
+
+init_logging("info")
+logger = logging.getLogger(__name__)
+
+# 100000 files show the full difference but take minutes
+BENCHMARK_FILES = int(os.environ.get("UPLOAD_BENCHMARK_FILES", "1000"))
+# round trip of one database query
+DB_LATENCY = 0.0002
+
+
+class FakeFileDatabase:
+    def __init__(self):
+        self.files: dict[str, File] = {}
+        self.queries = 0
+
+    async def _round_trip(self):
+        self.queries += 1
+        await asyncio.sleep(DB_LATENCY)
+
+    async def fetch_by_path(self, path: str) -> Result[File | None]:
+        await self._round_trip()
+        return Result.Ok(self.files.get(path))
+
+    async def fetch_header_by_path(self, path: str) -> Result[FileHeader | None]:
+        await self._round_trip()
+        file = self.files.get(path)
+        if file is None:
+            return Result.Ok(None)
+        return Result.Ok(FileHeader(**file.model_dump(exclude={"pages"})))
+
+    async def fetch_headers_by_paths(self, paths: list[str]) -> Result[list[FileHeader]]:
+        await self._round_trip()
+        return Result.Ok(
+            [
+                FileHeader(**self.files[p].model_dump(exclude={"pages"}))
+                for p in paths
+                if p in self.files
+            ]
+        )
+
+    async def create(self, obj: File) -> Result[str]:
+        await self._round_trip()
+        obj.id = str(uuid.uuid4())
+        self.files[obj.filepath] = obj
+        return Result.Ok(obj.id)
+
+    async def update(self, obj: File) -> Result[None]:
+        await self._round_trip()
+        self.files[obj.filepath] = obj
+        return Result.Ok()
+
+    async def delete(self, id: str) -> Result[None]:
+        await self._round_trip()
+        self.files = {p: f for p, f in self.files.items() if f.id != id}
+        return Result.Ok()
+
+
+class FakeProjectDatabase:
+    def __init__(self):
+        self.projects: dict[str, str] = {}
+
+    async def fetch_by_name(self, name: str) -> Result[Project | None]:
+        if name not in self.projects:
+            return Result.Ok(None)
+        return Result.Ok(
+            Project(id=self.projects[name], version=0, year=0, name=name, address=None)
+        )
+
+    async def create(self, obj: Project) -> Result[str]:
+        self.projects[obj.name] = f"project-{len(self.projects)}"
+        return Result.Ok(self.projects[obj.name])
+
+
+class FakeStorage:
+    def __init__(self):
+        self.uploaded: list[str] = []
+        self.fail = False
+
+    def upload_file(self, file: FileStorageObject) -> Result[None]:
+        self.uploaded.append(file.filename)
+        return Result.Ok()
+
+    def upload_from_path(
+        self,
+        path: str,
+        filename: str,
+        bucket: str,
+        filetype: str,
+        metadata: FileStorageObjectMetadata,
+    ) -> Result[None]:
+        if self.fail:
+            return Result.Err(IOError("storage down"))
+        with open(path, "rb") as content:
+            while content.read(64 * 1024):
+                pass
+        self.uploaded.append(filename)
+        return Result.Ok()
+
+
+def write_tree(root: str, files: int, per_directory: int = 1000) -> list[str]:
+    paths: list[str] = []
+    for i in range(files):
+        directory = os.path.join(root, f"project-{i // per_directory}")
+        if i % per_directory == 0:
+            os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"document-{i}.pdf")
+        with open(path, "wb") as document:
+            document.write(f"content of document {i}\n".encode() * 20)
+        paths.append(path)
+    return paths
+
+
+def touch_later(path: str, content: bytes | None = None):
+    if content is not None:
+        with open(path, "wb") as document:
+            document.write(content)
+    stat_info = os.stat(path)
+    os.utime(path, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns + 10**9))
+
+
+class TestIncrementalUpload(AsyncTestBase):
+    __test__ = True
+
+    def setup_method_sync(self, test_name: str):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, "files")
+        self.manifest = os.path.join(self.tmp, "manifest.jsonl")
+        self.storage = FakeStorage()
+        self.file_database = FakeFileDatabase()
+        self.usecase = UploadeFilesUsecase.create(
+            file_storage=self.storage,
+            file_database=self.file_database,
+            project_database=FakeProjectDatabase(),
+            supported_file_types=["pdf"],
+            root_dir=self.root,
+            application_version=1,
+            upload_config=IncrementalUploadConfig(
+                manifest_path=self.manifest, concurrency=4, db_batch_size=50
+            ),
+        )
+
+    def teardown_method_sync(self, test_name: str):
+        SingletonMeta.clear_all()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    async def test_only_changed_files_are_uploaded(self):
+        paths = write_tree(self.root, 120, per_directory=40)
+        results = await self.usecase.upload_changed_files()
+        assert len(results) == 120 and all(r.is_ok() for r in results)
+        assert len(UploadManifest.load(self.manifest)) == 120
+
+        queries = self.file_database.queries
+        assert await self.usecase.upload_changed_files() == []
+        # the manifest answers without a database query
+        assert self.file_database.queries == queries
+
+        touch_later(paths[3], b"new content")
+        touch_later(paths[7])
+        self.storage.uploaded.clear()
+        results = await self.usecase.upload_changed_files()
+        assert len(results) == 1 and results[0].is_ok()
+        assert len(self.storage.uploaded) == 1
+        assert self.storage.uploaded[0].endswith("document-3.pdf")
+        assert self.file_database.files[paths[3]].metadata.other_metadata[
+            CONTENT_HASH_KEY
+        ] == UploadManifest.load(self.manifest).get(paths[3]).hash  # type: ignore
+        # the touched file is recorded with its new mtime
+        assert await self.usecase.upload_changed_files() == []
+
+    async def test_lost_manifest_is_rebuilt_from_the_stored_hashes(self):
+        write_tree(self.root, 30)
+        await self.usecase.upload_changed_files()
+        os.remove(self.manifest)
+        self.storage.uploaded.clear()
+
+        assert await self.usecase.upload_changed_files() == []
+        assert self.storage.uploaded == []
+        assert len(UploadManifest.load(self.manifest)) == 30
+
+    async def test_failed_upload_is_rolled_back_and_retried(self):
+        paths = write_tree(self.root, 5)
+        self.storage.fail = True
+        results = await self.usecase.upload_changed_files()
+        assert len(results) == 5 and all(r.is_error() for r in results)
+        assert self.file_database.files == {}
+        assert len(UploadManifest.load(self.manifest)) == 0
+
+        self.storage.fail = False
+        results = await self.usecase.upload_changed_files()
+        assert all(r.is_ok() for r in results)
+        assert set(self.file_database.files) == set(paths)
+
+    async def test_failed_update_restores_the_pages(self):
+        paths = write_tree(self.root, 1)
+        await self.usecase.upload_changed_files()
+        stored = self.file_database.files[paths[0]]
+        stored.pages = [
+            FilePage(
+                bucket=stored.bucket,
+                fragements=[
+                    PageFragement(
+                        fragement_type=FragementTypes.TEXT,
+                        storage_filename="page-0.md",
+                        fragement_number=0,
+                    )
+                ],
+                page_number=0,
+                metadata=PageMetadata(
+                    project_id=stored.metadata.project_id,
+                    project_year=0,
+                    version=1,
+                    file_creation=stored.metadata.file_creation,
+                    file_updated=stored.metadata.file_updated,
+                ),
+            )
+        ]
+        pages = [page.model_copy(deep=True) for page in stored.pages]
+
+        touch_later(paths[0], b"new content")
+        self.storage.fail = True
+        results = await self.usecase.upload_changed_files()
+        assert len(results) == 1 and results[0].is_error()
+        assert self.file_database.files[paths[0]].pages == pages
+
+    async def test_deleted_files_leave_the_manifest(self):
+        paths = write_tree(self.root, 10)
+        await self.usecase.upload_changed_files()
+        for path in paths[:3]:
+            os.remove(path)
+
+        assert await self.usecase.upload_changed_files() == []
+        manifest = UploadManifest.load(self.manifest)
+        assert len(manifest) == 7
+        assert manifest.get(paths[0]) is None
+
+    async def test_benchmark_one_percent_changed(self):
+        """Files per second and peak memory over a tree with 1% changed files."""
+        paths = write_tree(self.root, BENCHMARK_FILES)
+        # one large file shows the memory of reading a whole file at once
+        large = paths[0]
+        with open(large, "wb") as document:
+            document.write(os.urandom(64 * 1024 * 1024))
+        assert all(r.is_ok() for r in await self.usecase.upload_changed_files())
+
+        def change():
+            for i, path in enumerate(paths[:: len(paths) // (len(paths) // 100)]):
+                touch_later(path, None if path == large else f"changed {i}".encode())
+
+        change()
+        self.file_database.queries = 0
+        tracemalloc.start()
+        start = time.perf_counter()
+        legacy_uploads = 0
+        for path in self.usecase.get_all_files_from_root_dir():
+            should = await self.usecase.should_file_be_uploaded(filepath=path)
+            if should.get_ok()[0]:
+                assert (await self.usecase.upload_file(path)).is_ok()
+                legacy_uploads += 1
+        before = time.perf_counter() - start
+        _, before_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        before_queries = self.file_database.queries
+
+        change()
+        self.file_database.queries = 0
+        tracemalloc.start()
+        start = time.perf_counter()
+        results = await self.usecase.upload_changed_files()
+        after = time.perf_counter() - start
+        _, after_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        logger.info(
+            f"{len(paths)} files, {legacy_uploads} changed: "
+            f"before {len(paths) / before:.0f} files/s, peak {before_peak / 2**20:.0f} MiB, "
+            f"{before_queries} queries, "
+            f"after {len(paths) / after:.0f} files/s, peak {after_peak / 2**20:.0f} MiB, "
+            f"{self.file_database.queries} queries"
+        )
+        assert len(results) == legacy_uploads and all(r.is_ok() for r in results)
+        assert self.file_database.queries < before_queries
+        assert after_peak < before_peak
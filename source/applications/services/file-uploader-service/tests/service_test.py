@@ -78,13 +78,13 @@ class TestUploadFilesUsecase(AsyncTestBase):
     # should_file_be_uploaded
     # ------------------------------------------------------------------
     async def test_should_file_be_uploaded_new_file(self):
-        self.mock_file_database.fetch_by_path.return_value = Result.Ok(None)
+        self.mock_file_database.fetch_header_by_path.return_value = Result.Ok(None)
         res = await self.usecase.should_file_be_uploaded("dummy.pdf")
         assert res.is_ok()
         assert res.get_ok() == (True, ReasonForUpdate.NotExisting)
 
     async def test_should_file_be_uploaded_old_app_version(self):
-        self.mock_file_database.fetch_by_path.return_value = Result.Ok(
+        self.mock_file_database.fetch_header_by_path.return_value = Result.Ok(
             Mock(metadata=Mock(version=0, file_updated=datetime(2000, 1, 1)))
         )
         res = await self.usecase.should_file_be_uploaded("dummy.pdf")
@@ -96,7 +96,7 @@ class TestUploadFilesUsecase(AsyncTestBase):
     async def test_should_file_be_uploaded_new_version_of_file(self):
         old_ts = datetime(2000, 1, 1)
         new_ts = datetime(2025, 1, 1)
-        self.mock_file_database.fetch_by_path.return_value = Result.Ok(
+        self.mock_file_database.fetch_header_by_path.return_value = Result.Ok(
             Mock(metadata=Mock(version=1, file_updated=old_ts))
         )
         with patch.object(
@@ -108,7 +108,7 @@ class TestUploadFilesUsecase(AsyncTestBase):
 
     async def test_should_file_be_uploaded_no_upload_needed(self):
         now = datetime.now()
-        self.mock_file_database.fetch_by_path.return_value = Result.Ok(
+        self.mock_file_database.fetch_header_by_path.return_value = Result.Ok(
             Mock(metadata=Mock(version=1, file_updated=now))
         )
         with patch.object(
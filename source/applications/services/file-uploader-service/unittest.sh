@@ -1 +1,2 @@
 pytest tests/service_test.py
+pytest tests/incremental_upload_test.py
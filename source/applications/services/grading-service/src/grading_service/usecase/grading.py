@@ -12,6 +12,7 @@ from domain.database.validation.model import RAGSystemAnswer, TestSample
 from domain.hippo_rag.interfaces import OpenIEInterface
 import logging
 from core.singelton import BaseSingleton
+from domain.llm.caller import llm_caller
 from domain.llm.interface import AsyncLLM
 from domain.database.config.model import (
     Config,
@@ -77,7 +78,10 @@ class GradingServiceUsecases(BaseSingleton):
     async def evaluate_answer(
         self, test_sample_id: str, candidate_to_evaluate: str
     ) -> Result[None]:
-        with self.tracer.start_as_current_span("generate-response-question"):
+        with (
+            self.tracer.start_as_current_span("generate-response-question"),
+            llm_caller("grading"),
+        ):
             result, can_begin = await self._can_evaluation_begin(
                 test_sample_id=test_sample_id,
                 candidate_to_evaluate=candidate_to_evaluate,
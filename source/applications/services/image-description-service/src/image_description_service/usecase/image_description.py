@@ -1,12 +1,20 @@
+from domain.database.file.model import (
+    File,
+    FragementTypes as FragementTypesDB,
+    PageFragement,
+)
 from domain.storage.model import FileStorageObject
 from domain.file_converter.model import FragementLite, FragementTypes
 from domain.storage import get_content_type
 from opentelemetry import trace
 from core.model import NotFoundException
+from core.que_runner import index_with_queue
 from domain.storage.interface import FileStorage
 from domain.llm.interface import AsyncLLM
 from core.result import Result
+import asyncio
 import logging
+from typing import Iterable
 from core.singelton import BaseSingleton
 from pydantic import BaseModel
 import base64
@@ -18,6 +26,45 @@ logger = logging.getLogger(__name__)
 class DescribeImageUsecaseConfig(BaseModel):
     system_prompt: str
     prompt: str
+    max_context_chars: int = 16_000
+    max_parallel_descriptions: int = 4
+
+
+class ImageDescriptionRequest(BaseModel):
+    filename: str
+    bucket: str
+    context_files: list[str] = []
+
+
+def _nearest_text(fragements: Iterable[PageFragement]) -> str | None:
+    for fragement in fragements:
+        if fragement.fragement_type == FragementTypesDB.TEXT:
+            return fragement.storage_filename
+    return None
+
+
+def build_image_description_requests(file: File) -> list[ImageDescriptionRequest]:
+    """
+    One request per image of *file*.
+    The nearest text fragments before and after the image on its page are the context.
+    """
+    requests: list[ImageDescriptionRequest] = []
+    for page in file.pages:
+        for index, fragement in enumerate(page.fragements):
+            if fragement.fragement_type != FragementTypesDB.IMAGE:
+                continue
+            neighbours = (
+                _nearest_text(reversed(page.fragements[:index])),
+                _nearest_text(page.fragements[index + 1 :]),
+            )
+            requests.append(
+                ImageDescriptionRequest(
+                    filename=fragement.storage_filename,
+                    bucket=file.metadata.project_id,
+                    context_files=[n for n in neighbours if n is not None],
+                )
+            )
+    return requests
 
 
 class DescribeImageUsecase(BaseSingleton):
@@ -44,46 +91,75 @@ class DescribeImageUsecase(BaseSingleton):
         self._file_storage = file_storage
         self._config = config
 
+    async def describe_images(
+        self, requests: list[ImageDescriptionRequest]
+    ) -> Result[None]:
+        """
+        Describes many images, at most max_parallel_descriptions are in flight against the multimodal model.
+        """
+        with self.tracer.start_as_current_span("describe-images"):
+            return await index_with_queue(
+                objects=requests,
+                workers=self._config.max_parallel_descriptions,
+                index_one=lambda request: self.describe_image(
+                    filename=request.filename,
+                    bucket=request.bucket,
+                    context_files=request.context_files,
+                ),
+            )
+
+    async def _fetch_file(
+        self, filename: str, bucket: str
+    ) -> Result[FileStorageObject]:
+        # FileStorage is blocking, keep the event loop free while waiting for it
+        fetched_result = await asyncio.to_thread(
+            self._file_storage.fetch_file, filename=filename, bucket=bucket
+        )
+        if fetched_result.is_error():
+            return fetched_result.propagate_exception()
+        fetched = fetched_result.get_ok()
+        if fetched is None:
+            return Result.Err(
+                NotFoundException(f"File {filename} in Bucket {bucket} not found")
+            )
+        return Result.Ok(fetched)
+
+    def _build_context(self, context_files: list[FileStorageObject]) -> str:
+        parts: list[str] = []
+        remaining = self._config.max_context_chars
+        for file in context_files:
+            part = f"\n-----{file.filename}----\n{file.content.decode()} "
+            if len(part) > remaining:
+                logger.warning(
+                    f"context for image truncated to {self._config.max_context_chars} chars"
+                )
+                parts.append(part[:remaining])
+                break
+            parts.append(part)
+            remaining -= len(part)
+        return "".join(parts)
+
     async def describe_image(
         self, filename: str, bucket: str, context_files: list[str]
     ) -> Result[None]:
         try:
             with self.tracer.start_as_current_span(f"fetch-{filename}"):
-                fetched_image_result = self._file_storage.fetch_file(
-                    filename=filename, bucket=bucket
+                fetched_results = await asyncio.gather(
+                    self._fetch_file(filename=filename, bucket=bucket),
+                    *[
+                        self._fetch_file(filename=file, bucket=bucket)
+                        for file in context_files
+                    ],
+                )
+                for fetched_result in fetched_results:
+                    if fetched_result.is_error():
+                        return fetched_result.propagate_exception()
+                fetched_image = fetched_results[0].get_ok()
+                context = self._build_context(
+                    [result.get_ok() for result in fetched_results[1:]]
                 )
-                if fetched_image_result.is_error():
-                    return fetched_image_result.propagate_exception()
-                fetched_image = fetched_image_result.get_ok()
-                if fetched_image is None:
-                    return Result.Err(
-                        NotFoundException(
-                            f"File {filename} in Bucket {bucket} not found"
-                        )
-                    )
 
-            context = ""
-            with self.tracer.start_as_current_span("fetch-context-files"):
-                for file in context_files:
-                    with self.tracer.start_as_current_span(
-                        f"fetch-context-file-{file}"
-                    ):
-                        fetched_context_result = self._file_storage.fetch_file(
-                            filename=file, bucket=bucket
-                        )
-                        if fetched_context_result.is_error():
-                            return fetched_context_result.propagate_exception()
-                        fetched_context = fetched_context_result.get_ok()
-                        if fetched_context is None:
-                            return Result.Err(
-                                NotFoundException(
-                                    f"File {file} in Bucket {bucket} not found"
-                                )
-                            )
-                        data = fetched_context.content.decode()
-                        context = f"{context}\n-----{file}----\n{data} "
             with self.tracer.start_as_current_span("describe file"):
-                self._async_ollama_client.run_image_against_multimodal_model
                 base64_str = base64.b64encode(fetched_image.content).decode("utf-8")
                 description_result = (
                     await self._async_ollama_client.run_image_against_multimodal_model(
@@ -101,13 +177,14 @@ class DescribeImageUsecase(BaseSingleton):
                     fragement_number=0,
                     fragement_type=FragementTypes.IMAGE,
                 ).get_image_description_filename()
-                upload_description = self._file_storage.upload_file(
+                upload_description = await asyncio.to_thread(
+                    self._file_storage.upload_file,
                     FileStorageObject(
                         content=description.encode("utf-8"),
                         filetype=get_content_type(filetype=filename_for_description),
                         filename=filename_for_description,
                         bucket=bucket,
-                    )
+                    ),
                 )
                 if upload_description.is_error():
                     return upload_description.propagate_exception()
@@ -1,21 +1,141 @@
 # tests/test_describe_image_usecase.py
+import asyncio
+import logging
+import time
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 
+from core.logger import init_logging
 from core.result import Result
 from core.model import NotFoundException
 from core.singelton import SingletonMeta
 
-from domain.storage.model import FileStorageObject
+from domain.database.file.model import (
+    File,
+    FileMetadata,
+    FilePage,
+    FragementTypes,
+    PageFragement,
+    PageMetadata,
+)
+from domain.storage.model import FileStorageObject, FileStorageObjectMetadata
 from domain.llm.interface import AsyncLLM
 from domain.storage.interface import FileStorage
 
 from image_description_service.usecase.image_description import (
     DescribeImageUsecase,
     DescribeImageUsecaseConfig,
+    ImageDescriptionRequest,
+    build_image_description_requests,
 )
 
 from domain_test import AsyncTestBase
 
+init_logging("debug")
+logger = logging.getLogger(__name__)
+
+
+def _by_filename(files: dict[str, Result[FileStorageObject | None]]):
+    # context files are fetched concurrently, so answer by name instead of call order
+    def fetch_file(filename: str, bucket: str) -> Result[FileStorageObject | None]:
+        return files[filename]
+
+    return fetch_file
+
+
+class FakeStorage(FileStorage):
+    """Blocking storage with a fixed latency per request, like the minio client."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.uploaded: list[str] = []
+
+    def upload_file(self, file: FileStorageObject) -> Result[None]:
+        time.sleep(self.latency)
+        self.uploaded.append(file.filename)
+        return Result.Ok()
+
+    def does_file_exist(self, filename: str, bucket: str) -> Result[bool]:
+        return Result.Ok(True)
+
+    def get_file_info(
+        self, filename: str, bucket: str
+    ) -> Result[FileStorageObjectMetadata | None]:
+        return Result.Ok(None)
+
+    def fetch_file(
+        self, filename: str, bucket: str
+    ) -> Result[FileStorageObject | None]:
+        time.sleep(self.latency)
+        return Result.Ok(
+            FileStorageObject(
+                filename=filename,
+                bucket=bucket,
+                filetype="text/plain",
+                content=f"content of {filename}".encode(),
+            )
+        )
+
+
+class FakeMultimodalLLM:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run_image_against_multimodal_model(
+        self, system_prompt: str, prompt: str, base64_image: str
+    ) -> Result[str]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return Result.Ok("an image")
+
+
+def build_document(pages: int, images_per_page: int) -> File:
+    """Pages of alternating text and image fragments, starting and ending with text."""
+    now = datetime.now()
+    page_metadata = PageMetadata(
+        project_id="images", project_year=2024, version=1, file_creation=now, file_updated=now
+    )
+    document_pages: list[FilePage] = []
+    for page_number in range(pages):
+        fragements: list[PageFragement] = []
+        for number in range(images_per_page * 2 + 1):
+            fragement_type = FragementTypes.IMAGE if number % 2 else FragementTypes.TEXT
+            suffix = "png" if number % 2 else "md"
+            fragements.append(
+                PageFragement(
+                    fragement_type=fragement_type,
+                    fragement_number=number,
+                    storage_filename=f"page_{page_number}_fragement_{number}.{suffix}",
+                )
+            )
+        document_pages.append(
+            FilePage(
+                bucket="images",
+                page_number=page_number,
+                metadata=page_metadata,
+                fragements=fragements,
+            )
+        )
+    return File(
+        id="document",
+        filepath="/document.pdf",
+        filename="document.pdf",
+        bucket="images",
+        metadata=FileMetadata(
+            project_id="images",
+            project_year=2024,
+            version=1,
+            file_creation=now,
+            file_updated=now,
+            other_metadata={},
+        ),
+        pages=document_pages,
+    )
+
 
 class TestDescribeImageUsecase(AsyncTestBase):
     __test__ = True
@@ -57,11 +177,13 @@ class TestDescribeImageUsecase(AsyncTestBase):
             content=b"second file",
         )
 
-        self.mock_storage.fetch_file.side_effect = [
-            Result.Ok(mock_image),
-            Result.Ok(mock_context_file_1),
-            Result.Ok(mock_context_file_2),
-        ]
+        self.mock_storage.fetch_file.side_effect = _by_filename(
+            {
+                "test.jpg": Result.Ok(mock_image),
+                "note.txt": Result.Ok(mock_context_file_1),
+                "summary.txt": Result.Ok(mock_context_file_2),
+            }
+        )
         self.mock_llm.run_image_against_multimodal_model.return_value = Result.Ok(
             "A cat playing with a ball."
         )
@@ -84,10 +206,12 @@ class TestDescribeImageUsecase(AsyncTestBase):
             content=b"binarydata",
         )
 
-        self.mock_storage.fetch_file.side_effect = [
-            Result.Ok(mock_image),
-            Result.Ok(None),  # Simulate missing context file
-        ]
+        self.mock_storage.fetch_file.side_effect = _by_filename(
+            {
+                "test.jpg": Result.Ok(mock_image),
+                "missing.txt": Result.Ok(None),  # Simulate missing context file
+            }
+        )
 
         result = await self.usecase.describe_image(
             "test.jpg", "images", ["missing.txt"]
@@ -106,10 +230,12 @@ class TestDescribeImageUsecase(AsyncTestBase):
             content=b"binarydata",
         )
 
-        self.mock_storage.fetch_file.side_effect = [
-            Result.Ok(mock_image),
-            Result.Err(IOError("failed to fetch context")),
-        ]
+        self.mock_storage.fetch_file.side_effect = _by_filename(
+            {
+                "test.jpg": Result.Ok(mock_image),
+                "corrupt.txt": Result.Err(IOError("failed to fetch context")),
+            }
+        )
 
         result = await self.usecase.describe_image(
             "test.jpg", "images", ["corrupt.txt"]
@@ -119,3 +245,169 @@ class TestDescribeImageUsecase(AsyncTestBase):
         assert isinstance(result.get_error(), IOError)
         self.mock_llm.run_image_against_multimodal_model.assert_not_called()
         self.mock_storage.upload_file.assert_not_called()
+
+    async def test_context_is_capped(self):
+        SingletonMeta.clear_all()
+        usecase = DescribeImageUsecase.create(
+            async_ollama_client=self.mock_llm,
+            config=DescribeImageUsecaseConfig(
+                system_prompt="s", prompt="p", max_context_chars=100
+            ),
+            file_storage=self.mock_storage,
+        )
+        self.mock_storage.fetch_file.side_effect = _by_filename(
+            {
+                "test.jpg": Result.Ok(
+                    FileStorageObject(
+                        filename="test.jpg",
+                        bucket="images",
+                        filetype="image/jpeg",
+                        content=b"binarydata",
+                    )
+                ),
+                "long.txt": Result.Ok(
+                    FileStorageObject(
+                        filename="long.txt",
+                        bucket="images",
+                        filetype="text/plain",
+                        content=b"x" * 10_000,
+                    )
+                ),
+            }
+        )
+        self.mock_llm.run_image_against_multimodal_model.return_value = Result.Ok(
+            "description"
+        )
+        self.mock_storage.upload_file.return_value = Result.Ok()
+
+        result = await usecase.describe_image("test.jpg", "images", ["long.txt"])
+
+        assert result.is_ok()
+        prompt = self.mock_llm.run_image_against_multimodal_model.await_args.kwargs[
+            "prompt"
+        ]
+        assert len(prompt) <= len("p \n ") + 100
+
+    async def test_describe_images_bounded_concurrency(self):
+        SingletonMeta.clear_all()
+        storage = FakeStorage(latency=0.0)
+        llm = FakeMultimodalLLM(latency=0.01)
+        usecase = DescribeImageUsecase.create(
+            async_ollama_client=llm,
+            config=DescribeImageUsecaseConfig(
+                system_prompt="s", prompt="p", max_parallel_descriptions=3
+            ),
+            file_storage=storage,
+        )
+        requests = [
+            ImageDescriptionRequest(
+                filename=f"image_{i}.png", bucket="images", context_files=["a.txt"]
+            )
+            for i in range(12)
+        ]
+
+        result = await usecase.describe_images(requests)
+
+        assert result.is_ok()
+        assert len(storage.uploaded) == 12
+        assert llm.max_in_flight == 3
+
+    async def test_throughput_with_latency(self):
+        """
+        20 images with 4 context files each against a storage with 20ms and an LLM with 100ms latency.
+        """
+        SingletonMeta.clear_all()
+        storage = FakeStorage(latency=0.02)
+        llm = FakeMultimodalLLM(latency=0.1)
+        usecase = DescribeImageUsecase.create(
+            async_ollama_client=llm,
+            config=DescribeImageUsecaseConfig(
+                system_prompt="s", prompt="p", max_parallel_descriptions=8
+            ),
+            file_storage=storage,
+        )
+        requests = [
+            ImageDescriptionRequest(
+                filename=f"image_{i}.png",
+                bucket="images",
+                context_files=[f"context_{i}_{c}.txt" for c in range(4)],
+            )
+            for i in range(20)
+        ]
+
+        # before: every file fetched one after another, one image at a time
+        sequential = len(requests) * ((1 + 4) * storage.latency + llm.latency + storage.latency)
+
+        start = time.perf_counter()
+        result = await usecase.describe_images(requests)
+        elapsed = time.perf_counter() - start
+
+        assert result.is_ok()
+        logger.info(
+            f"described {len(requests)} images in {elapsed:.2f}s, sequential {sequential:.2f}s"
+        )
+        assert elapsed < sequential / 3
+
+    async def test_requests_take_the_text_around_each_image(self):
+        document = build_document(pages=1, images_per_page=2)
+        document.pages[0].fragements.append(
+            PageFragement(
+                fragement_type=FragementTypes.IMAGE,
+                fragement_number=5,
+                storage_filename="last.png",
+            )
+        )
+
+        requests = build_image_description_requests(document)
+
+        assert [r.filename for r in requests] == [
+            "page_0_fragement_1.png",
+            "page_0_fragement_3.png",
+            "last.png",
+        ]
+        assert requests[0].context_files == [
+            "page_0_fragement_0.md",
+            "page_0_fragement_2.md",
+        ]
+        # an image at the end of the page only has text before it
+        assert requests[2].context_files == ["page_0_fragement_4.md"]
+        assert all(r.bucket == "images" for r in requests)
+
+    async def test_benchmark_document_with_200_images(self):
+        """Wall time of a document with 200 images, one at a time against the concurrent stage."""
+        SingletonMeta.clear_all()
+        storage = FakeStorage(latency=0.002)
+        llm = FakeMultimodalLLM(latency=0.05)
+        usecase = DescribeImageUsecase.create(
+            async_ollama_client=llm,
+            config=DescribeImageUsecaseConfig(
+                system_prompt="s", prompt="p", max_parallel_descriptions=8
+            ),
+            file_storage=storage,
+        )
+        document = build_document(pages=20, images_per_page=10)
+        requests = build_image_description_requests(document)
+        assert len(requests) == 200
+
+        # before: the flow awaited one description after the other
+        start = time.perf_counter()
+        for request in requests:
+            result = await usecase.describe_image(
+                filename=request.filename,
+                bucket=request.bucket,
+                context_files=request.context_files,
+            )
+            assert result.is_ok()
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = await usecase.describe_images(requests)
+        after = time.perf_counter() - start
+
+        assert result.is_ok()
+        logger.info(
+            f"described {len(requests)} images, before {before:.2f}s, after {after:.2f}s"
+        )
+        assert len(storage.uploaded) == 2 * len(requests)
+        assert llm.max_in_flight == 8
+        assert after * 4 < before
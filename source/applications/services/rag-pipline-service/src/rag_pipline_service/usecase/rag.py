@@ -1,4 +1,5 @@
 from core.result import Result
+from core.retry import RetryConfig, RetryPolicy
 import time
 import logging
 from core.singelton import BaseSingleton
@@ -19,6 +20,14 @@ logger = logging.getLogger(__name__)
 class RagUsecaseConfig(BaseModel):
     retries: int = 3
     time_to_wait_in_secondes: int = 5
+    max_elapsed_in_secondes: float | None = 600
+
+
+class _GeneratedAnswer(BaseModel):
+    answer: str
+    context: list[str]
+    retrival_ms: float
+    generation_ms: float
 
 
 class RAGUsecase(BaseSingleton):
@@ -34,6 +43,7 @@ class RAGUsecase(BaseSingleton):
     _project_database: ProjectDatabase
     _config: RAGConfig
     _usecase_config: RagUsecaseConfig = RagUsecaseConfig()
+    _retry: RetryPolicy
 
     def _init_once(
         self,
@@ -50,6 +60,14 @@ class RAGUsecase(BaseSingleton):
         self._config = config
         self._project_database = project_database
         self._usecase_config = usecase_config
+        self._retry = RetryPolicy(
+            name="rag_generation",
+            config=RetryConfig(
+                attempts=usecase_config.retries + 1,
+                initial_backoff=usecase_config.time_to_wait_in_secondes,
+                max_elapsed=usecase_config.max_elapsed_in_secondes,
+            ),
+        )
 
     async def generate_reponse(self, test_sample_id: str) -> Result[str]:
         with self.tracer.start_as_current_span("simple-rag-request"):
@@ -88,69 +106,31 @@ class RAGUsecase(BaseSingleton):
                 )
 
             project = optional_project
-            response_message: str | None = None
-            response_context: list[str] = []
-            retries = 0
-            retrival_ms = 0.0
-            generation_ms = 0.0
-            request_failed = True
-
-            while retries <= self._usecase_config.retries and request_failed:
-                try:
-                    start_time = time.perf_counter()
-                    response_result = await self.rag_llm.request(
-                        conversation=Conversation(
-                            messages=[
-                                Message(message=sample.question, role=RoleType.User)
-                            ],
-                            model=self._config.retrieval_config.generator_model,
-                        ),
-                        # metadata_filters=sample.metatdata_filter,
-                        collection=f"{project.id}-{self._config.embedding.id}",
-                    )
-                    if response_result.is_error():
-                        raise response_result.get_error()
-
-                    response = response_result.get_ok()
-                    assert response.generator
-                    response_message = ""
-                    for node in response.nodes:
-                        response_context.append(node.model_dump_json())
-
-                    start_time_generation = time.perf_counter()
-                    async for token in response.generator:
-                        response_message = f"{response_message}{token}"
-                    generation_ms = (
-                        time.perf_counter() - start_time_generation
-                    ) * 1_000
-                    total_ms = (time.perf_counter() - start_time) * 1_000
-                    retrival_ms = total_ms - generation_ms
-
-                    request_failed = False
-                except Exception as e:
-                    logger.error(
-                        f"an error appeared will generating response: {e}, will retry"
-                    )
-                    request_failed = True
-                    retries = retries + 1
-                    time.sleep(
-                        pow(self._usecase_config.time_to_wait_in_secondes, retries)
-                    )
-
-            if response_message is None or len(response_context) == 0:
-                logger.error(f"Response Context {response_context}")
-                logger.error(f"Respons Message {response_message}")
+            generated_result = await self._retry.run(
+                lambda: self._generate_once(
+                    question=sample.question,
+                    collection=f"{project.id}-{self._config.embedding.id}",
+                )
+            )
+            if generated_result.is_error():
+                logger.error(
+                    f"an error appeared will generating response: {generated_result.get_error()}"
+                )
+                return Result.Err(Exception("Failed to generate Response"))
+            generated = generated_result.get_ok()
+            if len(generated.context) == 0:
+                logger.error(f"Respons Message {generated.answer}")
                 return Result.Err(Exception("Failed to generate Response"))
 
             result = await self._database.add_system_answer(
                 sample_id=test_sample_id,
                 system_answer=RAGSystemAnswer(
                     id="",
-                    answer=response_message,
-                    given_rag_context=response_context,
+                    answer=generated.answer,
+                    given_rag_context=generated.context,
                     config_id=self._config.id,
-                    retrieval_latency_ms=retrival_ms,
-                    generation_latency_ms=generation_ms,
+                    retrieval_latency_ms=generated.retrival_ms,
+                    generation_latency_ms=generated.generation_ms,
                     token_count_prompt=0,
                     token_count_completion=0,
                     facts=[],
@@ -164,3 +144,39 @@ class RAGUsecase(BaseSingleton):
                 return result.propagate_exception()
 
             return Result.Ok(self._config.id)
+
+    async def _generate_once(
+        self, question: str, collection: str
+    ) -> Result[_GeneratedAnswer]:
+        """One attempt of the rag request, the whole answer is streamed before it counts."""
+        start_time = time.perf_counter()
+        response_result = await self.rag_llm.request(
+            conversation=Conversation(
+                messages=[Message(message=question, role=RoleType.User)],
+                model=self._config.retrieval_config.generator_model,
+            ),
+            # metadata_filters=sample.metatdata_filter,
+            collection=collection,
+        )
+        if response_result.is_error():
+            return response_result.propagate_exception()
+
+        response = response_result.get_ok()
+        if response.generator is None:
+            return Result.Err(ValueError("rag response has no generator"))
+        context = [node.model_dump_json() for node in response.nodes]
+
+        start_time_generation = time.perf_counter()
+        answer = ""
+        async for token in response.generator:
+            answer = f"{answer}{token}"
+        generation_ms = (time.perf_counter() - start_time_generation) * 1_000
+        total_ms = (time.perf_counter() - start_time) * 1_000
+        return Result.Ok(
+            _GeneratedAnswer(
+                answer=answer,
+                context=context,
+                retrival_ms=total_ms - generation_ms,
+                generation_ms=generation_ms,
+            )
+        )
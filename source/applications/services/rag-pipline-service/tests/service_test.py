@@ -1,4 +1,5 @@
 # tests/test_rag_usecase.py
+import asyncio
 import logging
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -350,3 +351,46 @@ class TestRAGUsecase(AsyncTestBase):
 
         # Ensure save attempted
         self.mock_db.add_system_answer.assert_called_once()
+
+    async def test_backoff_does_not_block_the_event_loop(self):
+        """Other coroutines keep running while a failed generation waits to retry."""
+        SingletonMeta.clear_all()
+        RAGUsecase.create(  # type: ignore
+            rag_llm=self.mock_llm,
+            database=self.mock_db,
+            config=self.config,
+            project_database=self.mock_project_db,
+            usecase_config=RagUsecaseConfig(retries=1, time_to_wait_in_secondes=1),
+        )
+        sample = MagicMock(question="Retry?", dataset_id="ds-retry")
+        project = MagicMock(id="proj-retry")
+        self.mock_db.get.return_value = Result.Ok(sample)
+        self._prime_db_no_prior_answer()
+        self.mock_project_db.fetch_by_name.return_value = Result.Ok(project)
+        nodes = [Node(id="n1", content="ctx", similarity=1.0, metadata={})]
+        self.mock_llm.request.side_effect = [
+            Result.Err(Exception("LLM fail")),
+            Result.Ok(
+                RAGResponse.create_stream_response(generator=_agen(["ok"]), nodes=nodes)
+            ),
+        ]
+        self.mock_db.add_system_answer.return_value = Result.Ok(None)
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            res = await RAGUsecase.Instance().generate_reponse("retry")
+        finally:
+            ticking.cancel()
+
+        assert res.is_ok()
+        assert self.mock_llm.request.call_count == 2
+        # the backoff lasts at least 0.8s, the ticker ran through it
+        assert ticks >= 40
@@ -1,5 +1,7 @@
-from core.result import Result
+import asyncio
 import logging
+
+from core.result import Result
 from domain.rag.model import Conversation, RAGResponse
 from domain.rag.interface import RAGLLM
 from opentelemetry import trace
@@ -32,3 +34,55 @@ class SimpleRAGUsecase:
                 metadata_filters=metadata_filters,
                 collection=collection,
             )
+
+    async def complete(
+        self,
+        conversation: Conversation,
+        metadata_filters: dict[str, list[str] | list[int] | list[float]] | None = None,
+        collection: str | None = None,
+    ) -> Result[RAGResponse]:
+        """Runs the request to its end, the response carries the whole message."""
+        with self.tracer.start_as_current_span("simple-rag-complete"):
+            response_result = await self.rag_llm.request(
+                conversation=conversation,
+                metadata_filters=metadata_filters,
+                collection=collection,
+            )
+            if response_result.is_error():
+                return response_result.propagate_exception()
+            response = response_result.get_ok()
+            if response.generator is None:
+                return Result.Ok(response)
+            try:
+                tokens = [token async for token in response.generator]
+            except Exception as e:
+                logger.error(f"generation failed: {e}", exc_info=True)
+                return Result.Err(e)
+            return Result.Ok(
+                RAGResponse.create_simple_response(
+                    message="".join(tokens), nodes=response.nodes
+                )
+            )
+
+    async def complete_many(
+        self,
+        conversations: list[Conversation],
+        collection: str | None = None,
+        max_parallel: int = 8,
+    ) -> Result[list[RAGResponse]]:
+        """Completes all conversations concurrently, the responses keep their order."""
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def complete_one(conversation: Conversation) -> Result[RAGResponse]:
+            async with semaphore:
+                return await self.complete(
+                    conversation=conversation, collection=collection
+                )
+
+        results = await asyncio.gather(
+            *(complete_one(conversation) for conversation in conversations)
+        )
+        for result in results:
+            if result.is_error():
+                return result.propagate_exception()
+        return Result.Ok([result.get_ok() for result in results])
@@ -1,12 +1,55 @@
+import asyncio
+from typing import AsyncGenerator
+
 from core.logger import init_logging
+from core.result import Result
+from domain.rag.model import Conversation, Message, Node, RAGResponse, RoleType
 
 from domain_test import AsyncTestBase
+from simple_rag_service.usecase.rag import SimpleRAGUsecase
 
 init_logging("debug")
 
-"""
-Just a place holder at the moment is the usecase to simple as that it could be used in a meaning full way
-"""
+
+class FakeRAGLLM:
+    """Streams the question back word by word, fails for questions starting with 'fail'."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def request(
+        self,
+        conversation: Conversation,
+        metadata_filters: dict[str, list[str] | list[int] | list[float]] | None = None,
+        collection: str | None = None,
+    ) -> Result[RAGResponse]:
+        question = conversation.messages[-1].message
+        if question.startswith("fail"):
+            return Result.Err(ValueError(question))
+
+        async def tokens() -> AsyncGenerator[str, None]:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                for word in question.split(" "):
+                    await asyncio.sleep(0.01)
+                    yield f"{word} "
+            finally:
+                self.running -= 1
+
+        return Result.Ok(
+            RAGResponse.create_stream_response(
+                generator=tokens(),
+                nodes=[Node(id="n1", content=collection or "", similarity=1.0, metadata={})],
+            )
+        )
+
+
+def conversation(question: str) -> Conversation:
+    return Conversation(
+        messages=[Message(message=question, role=RoleType.User)], model="llm"
+    )
 
 
 class TestEmbeddFileUsecase(AsyncTestBase):
@@ -14,3 +57,35 @@ class TestEmbeddFileUsecase(AsyncTestBase):
 
     def test_sample_test(self):
         assert True
+
+
+class TestSimpleRAGCompletion(AsyncTestBase):
+    __test__ = True
+
+    async def test_complete_joins_the_stream(self):
+        usecase = SimpleRAGUsecase(rag_llm=FakeRAGLLM())
+        result = await usecase.complete(conversation("what is rag"), collection="c")
+        assert result.is_ok()
+        response = result.get_ok()
+        assert response.generator is None
+        assert response.message == "what is rag "
+        assert response.nodes[0].content == "c"
+
+    async def test_complete_many_keeps_the_order_and_bounds_concurrency(self):
+        rag_llm = FakeRAGLLM()
+        usecase = SimpleRAGUsecase(rag_llm=rag_llm)
+        questions = [f"question {i}" for i in range(10)]
+        result = await usecase.complete_many(
+            [conversation(q) for q in questions], max_parallel=3
+        )
+        assert result.is_ok()
+        assert [r.message for r in result.get_ok()] == [f"{q} " for q in questions]
+        assert rag_llm.max_running == 3
+
+    async def test_complete_many_returns_the_first_error(self):
+        usecase = SimpleRAGUsecase(rag_llm=FakeRAGLLM())
+        result = await usecase.complete_many(
+            [conversation("fine"), conversation("fail now")]
+        )
+        assert result.is_error()
+        assert str(result.get_error()) == "fail now"